@@ -0,0 +1,561 @@
+#include "arrow_writer.h"
+#include "xml_struct_parser.h"
+#include "byte_swap.h"
+#include <algorithm>
+#include <cstring>
+#include <limits>
+#include <stdexcept>
+
+namespace binary_parser {
+
+namespace {
+
+// FlatBuffers and the IPC framing are little-endian whatever the host
+void putLittle(std::string& bytes, uint64_t value, size_t size) {
+    for (size_t i = 0; i < size; i++) {
+        bytes += static_cast<char>(value >> (8 * i));
+    }
+}
+
+// Appends text to out as UTF-8, replacing each ill-formed sequence (the
+// lead byte and the continuation bytes that could still have completed it)
+// with U+FFFD. Arrow requires utf8 values to be valid, and char arrays hold
+// whatever bytes the producer left in them.
+void appendUtf8(std::string& out, const char* text, size_t size) {
+    const auto* bytes = reinterpret_cast<const unsigned char*>(text);
+    size_t i = 0;
+    while (i < size) {
+        unsigned char lead = bytes[i];
+        if (lead < 0x80) {
+            size_t start = i;
+            while (i < size && bytes[i] < 0x80) i++;
+            out.append(text + start, i - start);
+            continue;
+        }
+        // Sequence length and the allowed range of the second byte
+        size_t length = 0;
+        unsigned char low = 0x80, high = 0xBF;
+        if (lead >= 0xC2 && lead <= 0xDF) {
+            length = 2;
+        } else if (lead >= 0xE0 && lead <= 0xEF) {
+            length = 3;
+            if (lead == 0xE0) low = 0xA0;       // Overlong
+            if (lead == 0xED) high = 0x9F;      // Surrogates
+        } else if (lead >= 0xF0 && lead <= 0xF4) {
+            length = 4;
+            if (lead == 0xF0) low = 0x90;       // Overlong
+            if (lead == 0xF4) high = 0x8F;      // Above U+10FFFF
+        }
+        size_t valid = length ? 1 : 0;
+        while (valid < length && i + valid < size) {
+            unsigned char next = bytes[i + valid];
+            if (valid == 1 ? (next < low || next > high) : (next & 0xC0) != 0x80) break;
+            valid++;
+        }
+        if (length && valid == length) {
+            out.append(text + i, length);
+            i += length;
+        } else {
+            out.append("\xEF\xBF\xBD");
+            i += std::max<size_t>(valid, 1);
+        }
+    }
+}
+
+// Minimal FlatBuffers encoder for the Arrow metadata. Objects are laid out
+// front to back, each table ahead of the strings, vectors and tables it
+// refers to, so every offset points forward as the format requires.
+class FlatTable {
+public:
+    FlatTable& scalar(uint16_t id, uint64_t value, size_t size) {
+        Field& field = add(id, Kind::SCALAR);
+        field.size = size;
+        field.bits = value;
+        return *this;
+    }
+
+    FlatTable& table(uint16_t id, FlatTable table) {
+        add(id, Kind::TABLE).tables.push_back(std::move(table));
+        return *this;
+    }
+
+    FlatTable& string(uint16_t id, std::string_view value) {
+        add(id, Kind::STRING).bytes = std::string(value);
+        return *this;
+    }
+
+    FlatTable& tables(uint16_t id, std::vector<FlatTable> tables) {
+        add(id, Kind::TABLES).tables = std::move(tables);
+        return *this;
+    }
+
+    // Vector of count structs of 8-byte aligned members, already encoded
+    FlatTable& structs(uint16_t id, std::string bytes, size_t count) {
+        Field& field = add(id, Kind::STRUCTS);
+        field.bytes = std::move(bytes);
+        field.count = count;
+        return *this;
+    }
+
+    // Complete buffer with this table as its root, padded to 8 bytes
+    std::string finish() const {
+        std::string buffer(4, '\0');
+        patch(buffer, 0, serialize(buffer));
+        buffer.resize(alignUp(buffer.size(), 8), '\0');
+        return buffer;
+    }
+
+private:
+    enum class Kind { SCALAR, TABLE, STRING, TABLES, STRUCTS };
+
+    struct Field {
+        uint16_t id;
+        Kind kind;
+        size_t size = 4;  // Inline bytes; offsets take 4
+        uint64_t bits = 0;
+        std::vector<FlatTable> tables;
+        std::string bytes;
+        size_t count = 0;
+    };
+
+    Field& add(uint16_t id, Kind kind) {
+        Field& field = fields_.emplace_back();
+        field.id = id;
+        field.kind = kind;
+        return field;
+    }
+
+    static size_t alignUp(size_t value, size_t alignment) {
+        return (value + alignment - 1) / alignment * alignment;
+    }
+
+    template <typename T>
+    static void put(std::string& buffer, T value) {
+        putLittle(buffer, static_cast<uint64_t>(value), sizeof(T));
+    }
+
+    // Stores the forward offset from position at to target
+    static void patch(std::string& buffer, size_t at, size_t target) {
+        std::string offset;
+        putLittle(offset, target - at, 4);
+        buffer.replace(at, 4, offset);
+    }
+
+    // Appends the vtable and the table; returns the table's position
+    size_t serialize(std::string& buffer) const {
+        // Inline layout: the vtable offset, then fields by decreasing size
+        std::vector<size_t> order(fields_.size());
+        for (size_t i = 0; i < order.size(); i++) order[i] = i;
+        std::stable_sort(order.begin(), order.end(),
+                         [&](size_t a, size_t b) { return fields_[a].size > fields_[b].size; });
+        std::vector<size_t> positions(fields_.size());
+        size_t inline_size = 4;
+        uint16_t slots = 0;
+        for (size_t i : order) {
+            inline_size = alignUp(inline_size, fields_[i].size);
+            positions[i] = inline_size;
+            inline_size += fields_[i].size;
+            slots = std::max<uint16_t>(slots, fields_[i].id + 1);
+        }
+
+        buffer.resize(alignUp(buffer.size(), 2), '\0');
+        size_t vtable = buffer.size();
+        put<uint16_t>(buffer, static_cast<uint16_t>(4 + 2 * slots));
+        put<uint16_t>(buffer, static_cast<uint16_t>(inline_size));
+        std::vector<uint16_t> slot_offsets(slots, 0);
+        for (size_t i = 0; i < fields_.size(); i++) {
+            slot_offsets[fields_[i].id] = static_cast<uint16_t>(positions[i]);
+        }
+        for (uint16_t offset : slot_offsets) put<uint16_t>(buffer, offset);
+
+        // 8-byte alignment keeps 8-byte scalars aligned
+        buffer.resize(alignUp(buffer.size(), 8), '\0');
+        size_t table = buffer.size();
+        buffer.resize(table + inline_size, '\0');
+        patch(buffer, table, table + (table - vtable));  // Vtable precedes the table
+        for (size_t i = 0; i < fields_.size(); i++) {
+            if (fields_[i].kind == Kind::SCALAR) {
+                for (size_t b = 0; b < fields_[i].size; b++) {
+                    buffer[table + positions[i] + b] = static_cast<char>(fields_[i].bits >> (8 * b));
+                }
+            }
+        }
+
+        for (size_t i = 0; i < fields_.size(); i++) {
+            const Field& field = fields_[i];
+            size_t at = table + positions[i];
+            switch (field.kind) {
+                case Kind::SCALAR:
+                    break;
+                case Kind::TABLE:
+                    patch(buffer, at, field.tables[0].serialize(buffer));
+                    break;
+                case Kind::STRING: {
+                    buffer.resize(alignUp(buffer.size(), 4), '\0');
+                    size_t start = buffer.size();
+                    put<uint32_t>(buffer, static_cast<uint32_t>(field.bytes.size()));
+                    buffer += field.bytes;
+                    buffer += '\0';
+                    patch(buffer, at, start);
+                    break;
+                }
+                case Kind::TABLES: {
+                    buffer.resize(alignUp(buffer.size(), 4), '\0');
+                    size_t start = buffer.size();
+                    put<uint32_t>(buffer, static_cast<uint32_t>(field.tables.size()));
+                    buffer.resize(start + 4 + 4 * field.tables.size(), '\0');
+                    for (size_t t = 0; t < field.tables.size(); t++) {
+                        patch(buffer, start + 4 + 4 * t, field.tables[t].serialize(buffer));
+                    }
+                    patch(buffer, at, start);
+                    break;
+                }
+                case Kind::STRUCTS: {
+                    // The elements after the length must be 8-byte aligned
+                    buffer.resize(alignUp(buffer.size() + 4, 8) - 4, '\0');
+                    size_t start = buffer.size();
+                    put<uint32_t>(buffer, static_cast<uint32_t>(field.count));
+                    buffer += field.bytes;
+                    patch(buffer, at, start);
+                    break;
+                }
+            }
+        }
+        return table;
+    }
+
+    std::vector<Field> fields_;
+};
+
+// Arrow format constants (Schema.fbs, Message.fbs)
+constexpr uint16_t kMetadataV5 = 4;
+constexpr uint8_t kHeaderSchema = 1;
+constexpr uint8_t kHeaderRecordBatch = 3;
+constexpr uint8_t kTypeInt = 2;
+constexpr uint8_t kTypeFloatingPoint = 3;
+constexpr uint8_t kTypeUtf8 = 5;
+constexpr uint8_t kTypeStruct = 13;
+constexpr uint8_t kTypeFixedSizeList = 16;
+constexpr uint16_t kPrecisionSingle = 1;
+constexpr uint16_t kPrecisionDouble = 2;
+constexpr char kMagic[] = "ARROW1";
+
+bool isAggregate(const FieldInfo& field) {
+    return field.type == FieldType::STRUCT || field.type == FieldType::UNION || field.type == FieldType::UNKNOWN;
+}
+
+FlatTable numberType(ValueType type, uint8_t& type_id) {
+    FlatTable table;
+    switch (type) {
+        case ValueType::FLOAT:
+            type_id = kTypeFloatingPoint;
+            return table.scalar(0, kPrecisionSingle, 2);
+        case ValueType::DOUBLE:
+            type_id = kTypeFloatingPoint;
+            return table.scalar(0, kPrecisionDouble, 2);
+        default: {
+            bool is_signed = type == ValueType::INT8 || type == ValueType::INT16 || type == ValueType::INT32 ||
+                             type == ValueType::INT64;
+            type_id = kTypeInt;
+            return table.scalar(0, valueTypeWidth(type) * 8, 4).scalar(1, is_signed, 1);
+        }
+    }
+}
+
+FlatTable fieldTable(std::string_view name, uint8_t type_id, FlatTable type, std::vector<FlatTable> children) {
+    FlatTable table;
+    table.string(0, name)
+         .scalar(1, 0, 1)  // Not nullable
+         .scalar(2, type_id, 1)
+         .table(3, std::move(type))
+         .tables(5, std::move(children));
+    return table;
+}
+
+// Schema Field for a schema field, mirroring ArrowWriter::makeColumn()
+FlatTable arrowField(const FieldInfo& field) {
+    std::vector<FlatTable> members;
+    if (isAggregate(field)) {
+        for (const FieldInfo& member : field.sub_fields) {
+            members.push_back(arrowField(member));
+        }
+    }
+
+    if (field.array_size > 1) {
+        std::vector<FlatTable> item;
+        if (isAggregate(field)) {
+            item.push_back(fieldTable("item", kTypeStruct, FlatTable(), std::move(members)));
+        } else if (field.type == FieldType::CHAR) {
+            return fieldTable(field.name, kTypeUtf8, FlatTable(), {});
+        } else {
+            uint8_t type_id = 0;
+            FlatTable type = numberType(valueTypeFor(field.type), type_id);
+            item.push_back(fieldTable("item", type_id, std::move(type), {}));
+        }
+        return fieldTable(field.name, kTypeFixedSizeList, FlatTable().scalar(0, field.array_size, 4), std::move(item));
+    }
+    if (field.type == FieldType::STRUCT || field.type == FieldType::UNION) {
+        return fieldTable(field.name, kTypeStruct, FlatTable(), std::move(members));
+    }
+    uint8_t type_id = 0;
+    FlatTable type = numberType(valueTypeFor(field.type), type_id);
+    return fieldTable(field.name, type_id, std::move(type), {});
+}
+
+// Tagged unions decode one member per record, which a fixed column layout
+// cannot hold; inside arrays of structs every member is decoded
+void rejectTaggedUnions(const FieldList& fields) {
+    for (const FieldInfo& field : fields) {
+        if (field.array_size > 1) continue;
+        if (field.selector) {
+            throw std::runtime_error("Field " + std::string(field.name) + " is a tagged union, which has no Arrow type");
+        }
+        rejectTaggedUnions(field.sub_fields);
+    }
+}
+
+FlatTable schemaTable(const StructInfo& struct_info) {
+    std::vector<FlatTable> fields;
+    for (const FieldInfo& field : struct_info.fields) {
+        fields.push_back(arrowField(field));
+    }
+    FlatTable table;
+    table.scalar(0, hostIsLittleEndian() ? 0 : 1, 2).tables(1, std::move(fields));
+    return table;
+}
+
+FlatTable messageTable(uint8_t header_type, FlatTable header, int64_t body_length) {
+    FlatTable table;
+    table.scalar(0, kMetadataV5, 2)
+         .scalar(1, header_type, 1)
+         .table(2, std::move(header))
+         .scalar(3, static_cast<uint64_t>(body_length), 8);
+    return table;
+}
+
+} // namespace
+
+ArrowWriter::ArrowWriter(std::ostream& out, const StructInfo& struct_info, const ArrowWriterOptions& options)
+    : out_(out), struct_info_(struct_info), options_(options) {
+    if (options_.batch_records == 0) {
+        throw std::runtime_error("Arrow batch size must not be zero");
+    }
+    rejectTaggedUnions(struct_info.fields);
+    for (const FieldInfo& field : struct_info.fields) {
+        columns_.push_back(makeColumn(field));
+    }
+
+    if (!options_.stream) {
+        writeBytes(kMagic, 6);
+        writeBytes("\0\0", 2);
+    }
+    writeMessage(messageTable(kHeaderSchema, schemaTable(struct_info), 0).finish(), std::string());
+}
+
+ArrowWriter::Column ArrowWriter::makeColumn(const FieldInfo& field) {
+    Column column;
+    if (field.array_size > 1) {
+        if (field.type == FieldType::CHAR) {
+            column.kind = Kind::UTF8;
+            column.list_size = field.array_size;
+            column.offsets.assign(1, 0);
+            return column;
+        }
+        column.kind = Kind::LIST;
+        column.list_size = field.array_size;
+        Column& item = column.children.emplace_back();
+        if (isAggregate(field)) {
+            item.kind = Kind::STRUCT;
+            for (const FieldInfo& member : field.sub_fields) {
+                item.children.push_back(makeColumn(member));
+            }
+        } else {
+            item.type = valueTypeFor(field.type);
+        }
+        if (item.kind == Kind::PRIMITIVE && item.type == ValueType::NONE) {
+            throw std::runtime_error("Field " + std::string(field.name) + " has no Arrow type");
+        }
+        return column;
+    }
+    if (field.type == FieldType::STRUCT || field.type == FieldType::UNION) {
+        column.kind = Kind::STRUCT;
+        for (const FieldInfo& member : field.sub_fields) {
+            column.children.push_back(makeColumn(member));
+        }
+        return column;
+    }
+    column.type = valueTypeFor(field.type);
+    if (column.type == ValueType::NONE) {
+        throw std::runtime_error("Field " + std::string(field.name) + " has no Arrow type");
+    }
+    return column;
+}
+
+void ArrowWriter::write(const ParsedStruct& record) {
+    if (finished_) {
+        throw std::runtime_error("Arrow writer is already finished");
+    }
+    if (record.fields.size() != columns_.size()) {
+        throw std::runtime_error("Record does not match the Arrow schema");
+    }
+    for (size_t i = 0; i < columns_.size(); i++) {
+        append(struct_info_.fields[i], record.fields[i], columns_[i], 1);
+    }
+    records_++;
+    if (++batch_rows_ == options_.batch_records) {
+        writeBatch();
+    }
+}
+
+void ArrowWriter::append(const FieldInfo& field, const ParsedField& parsed, Column& column, size_t rows) {
+    auto mismatch = [&]() {
+        return std::runtime_error("Field " + std::string(field.name) + " does not match the Arrow schema");
+    };
+
+    column.length += rows;
+    switch (column.kind) {
+        case Kind::PRIMITIVE: {
+            if (parsed.value.type() != column.type || parsed.value.size() != rows) throw mismatch();
+            column.data.append(reinterpret_cast<const char*>(parsed.value.bytes()), rows * valueTypeWidth(column.type));
+            break;
+        }
+        case Kind::UTF8: {
+            size_t width = column.list_size;
+            if (parsed.value.type() != ValueType::UINT8 || parsed.value.size() != rows * width) throw mismatch();
+            const char* chars = reinterpret_cast<const char*>(parsed.value.bytes());
+            for (size_t row = 0; row < rows; row++) {
+                const char* value = chars + row * width;
+                const void* nul = std::memchr(value, '\0', width);
+                appendUtf8(column.data, value, nul ? static_cast<const char*>(nul) - value : width);
+                if (column.data.size() > static_cast<size_t>(std::numeric_limits<int32_t>::max())) {
+                    throw std::runtime_error("Arrow string column exceeds 2 GiB; use a smaller batch size");
+                }
+                column.offsets.push_back(static_cast<int32_t>(column.data.size()));
+            }
+            break;
+        }
+        case Kind::STRUCT: {
+            if (parsed.sub_fields.size() != column.children.size()) throw mismatch();
+            for (size_t i = 0; i < column.children.size(); i++) {
+                append(field.sub_fields[i], parsed.sub_fields[i], column.children[i], rows);
+            }
+            break;
+        }
+        case Kind::LIST: {
+            Column& item = column.children[0];
+            size_t items = rows * column.list_size;
+            item.length += items;
+            if (item.kind == Kind::STRUCT) {
+                // Arrays of structs arrive as columns over all their elements
+                if (parsed.array_size != column.list_size || parsed.sub_fields.size() != item.children.size()) {
+                    throw mismatch();
+                }
+                for (size_t i = 0; i < item.children.size(); i++) {
+                    append(field.sub_fields[i], parsed.sub_fields[i], item.children[i], items);
+                }
+            } else {
+                if (parsed.value.type() != item.type || parsed.value.size() != items) throw mismatch();
+                item.data.append(reinterpret_cast<const char*>(parsed.value.bytes()),
+                                 items * valueTypeWidth(item.type));
+            }
+            break;
+        }
+    }
+}
+
+void ArrowWriter::writeBatch() {
+    std::string nodes;
+    std::string buffers;
+    size_t node_count = 0;
+    size_t buffer_count = 0;
+    body_.clear();
+
+    auto addBuffer = [&](const void* data, size_t size) {
+        putLittle(buffers, body_.size(), 8);
+        putLittle(buffers, size, 8);
+        buffer_count++;
+        if (size > 0) body_.append(static_cast<const char*>(data), size);
+        body_.resize((body_.size() + 7) / 8 * 8, '\0');
+    };
+
+    // Field nodes and buffers in depth-first order; no value is ever null,
+    // so every validity bitmap is left empty
+    auto collect = [&](auto& self, Column& column) -> void {
+        putLittle(nodes, column.length, 8);
+        putLittle(nodes, 0, 8);  // Null count
+        node_count++;
+        addBuffer(nullptr, 0);
+        if (column.kind == Kind::PRIMITIVE) {
+            addBuffer(column.data.data(), column.data.size());
+        } else if (column.kind == Kind::UTF8) {
+            addBuffer(column.offsets.data(), column.offsets.size() * sizeof(int32_t));
+            addBuffer(column.data.data(), column.data.size());
+        }
+        for (Column& child : column.children) {
+            self(self, child);
+        }
+        // Buffers keep their capacity for the next batch
+        column.length = 0;
+        column.data.clear();
+        if (column.kind == Kind::UTF8) column.offsets.resize(1);
+    };
+    for (Column& column : columns_) {
+        collect(collect, column);
+    }
+
+    FlatTable batch;
+    batch.scalar(0, batch_rows_, 8)
+         .structs(1, std::move(nodes), node_count)
+         .structs(2, std::move(buffers), buffer_count);
+
+    int64_t offset = position_;
+    std::string metadata = messageTable(kHeaderRecordBatch, std::move(batch), static_cast<int64_t>(body_.size())).finish();
+    writeMessage(metadata, body_);
+    blocks_.push_back({offset, static_cast<int32_t>(8 + metadata.size()), static_cast<int64_t>(body_.size())});
+    batch_rows_ = 0;
+}
+
+void ArrowWriter::writeMessage(const std::string& metadata, const std::string& body) {
+    std::string prefix;
+    putLittle(prefix, 0xFFFFFFFFu, 4);  // Continuation marker
+    putLittle(prefix, metadata.size(), 4);
+    writeBytes(prefix.data(), prefix.size());
+    writeBytes(metadata.data(), metadata.size());
+    writeBytes(body.data(), body.size());
+}
+
+void ArrowWriter::writeBytes(const void* data, size_t size) {
+    out_.write(static_cast<const char*>(data), static_cast<std::streamsize>(size));
+    position_ += static_cast<int64_t>(size);
+}
+
+void ArrowWriter::finish() {
+    if (finished_) return;
+    if (batch_rows_ > 0) {
+        writeBatch();
+    }
+    writeMessage(std::string(), std::string());  // End-of-stream marker
+
+    if (!options_.stream) {
+        std::string blocks;
+        for (const Block& block : blocks_) {
+            putLittle(blocks, static_cast<uint64_t>(block.offset), 8);
+            putLittle(blocks, static_cast<uint64_t>(block.metadata_length), 4);
+            putLittle(blocks, 0, 4);  // Padding
+            putLittle(blocks, static_cast<uint64_t>(block.body_length), 8);
+        }
+        FlatTable footer;
+        footer.scalar(0, kMetadataV5, 2)
+              .table(1, schemaTable(struct_info_))
+              .structs(2, std::string(), 0)
+              .structs(3, std::move(blocks), blocks_.size());
+        std::string footer_bytes = footer.finish();
+        putLittle(footer_bytes, footer_bytes.size(), 4);
+        footer_bytes.append(kMagic, 6);
+        writeBytes(footer_bytes.data(), footer_bytes.size());
+    }
+    out_.flush();
+    finished_ = true;
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,87 @@
+#ifndef ARROW_WRITER_H
+#define ARROW_WRITER_H
+
+#include "binary_parser.h"
+#include <cstdint>
+#include <cstddef>
+#include <ostream>
+#include <string>
+#include <vector>
+
+namespace binary_parser {
+
+struct StructInfo;
+struct FieldInfo;
+
+struct ArrowWriterOptions {
+    size_t batch_records = 65536;  // Records per record batch
+    bool stream = false;           // IPC stream format instead of the file format
+};
+
+// Writes decoded records as Apache Arrow IPC (the file format, or the
+// stream format with options.stream) without depending on the Arrow
+// libraries. Each top-level field of the schema becomes a column: structs
+// and unions map to struct columns, arrays to fixed-size lists (arrays of
+// structs to lists of structs), char arrays to utf8 strings cut at the
+// first NUL (ill-formed UTF-8 is replaced with U+FFFD), and numbers and bitfields to the matching int or floating
+// point type. Records are buffered by column and written as one record
+// batch every batch_records records, so memory use is bounded by the batch
+// size; the buffers are reused from one batch to the next.
+class ArrowWriter {
+public:
+    // struct_info must describe the records passed to write() and outlive
+    // the writer. The schema is written immediately.
+    ArrowWriter(std::ostream& out, const StructInfo& struct_info,
+                const ArrowWriterOptions& options = ArrowWriterOptions());
+
+    void write(const ParsedStruct& record);
+
+    // Writes the pending batch, the end-of-stream marker and, for the file
+    // format, the footer. Nothing may be written afterwards.
+    void finish();
+
+    size_t records() const { return records_; }
+    size_t batches() const { return blocks_.size(); }
+
+private:
+    enum class Kind { PRIMITIVE, UTF8, STRUCT, LIST };
+
+    // Arrow array under construction for one field
+    struct Column {
+        Kind kind = Kind::PRIMITIVE;
+        ValueType type = ValueType::NONE;  // PRIMITIVE
+        size_t list_size = 0;              // LIST: elements per value; UTF8: bytes per value
+        size_t length = 0;                 // Values in the current batch
+        std::string data;                  // PRIMITIVE values or UTF8 characters
+        std::vector<int32_t> offsets;      // UTF8 value offsets
+        std::vector<Column> children;      // STRUCT members or the LIST element
+    };
+
+    // Location of a record batch in the file, for the footer
+    struct Block {
+        int64_t offset;
+        int32_t metadata_length;
+        int64_t body_length;
+    };
+
+    static Column makeColumn(const FieldInfo& field);
+    void append(const FieldInfo& field, const ParsedField& parsed, Column& column, size_t rows);
+    void writeBatch();
+    void writeMessage(const std::string& metadata, const std::string& body);
+    void writeBytes(const void* data, size_t size);
+
+    std::ostream& out_;
+    const StructInfo& struct_info_;
+    ArrowWriterOptions options_;
+    std::vector<Column> columns_;
+    std::string body_;      // Record batch body, reused between batches
+    std::vector<Block> blocks_;
+    size_t batch_rows_ = 0;
+    size_t records_ = 0;
+    int64_t position_ = 0;  // Bytes written to out_
+    bool finished_ = false;
+};
+
+} // namespace binary_parser
+
+#endif // ARROW_WRITER_H
\ No newline at end of file
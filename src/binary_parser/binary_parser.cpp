@@ -1,5 +1,7 @@
 #include "binary_parser.h"
 #include "xml_struct_parser.h"
+#include "record_filter.h"
+#include "byte_swap.h"
 #include <cstring>
 #include <stdexcept>
 #include <algorithm>
@@ -7,21 +9,18 @@
 
 namespace binary_parser {
 
-// Check system endianness
-static bool isLittleEndian() {
-    uint16_t test = 1;
-    return *reinterpret_cast<uint8_t*>(&test) == 1;
+ByteSwaps::ByteSwaps(Endianness endianness) {
+    bool little = hostIsLittleEndian();
+    swaps_[static_cast<size_t>(ByteOrder::DEFAULT)] = (endianness == Endianness::LITTLE) != little;
+    swaps_[static_cast<size_t>(ByteOrder::LITTLE)] = !little;
+    swaps_[static_cast<size_t>(ByteOrder::BIG)] = little;
 }
 
 BinaryParser::BinaryParser(Endianness endianness) 
-    : endianness_(endianness) {
-    // Cache endianness check at construction time
-    bool systemIsLittleEndian = isLittleEndian();
-    needs_swap_ = (endianness_ == Endianness::LITTLE) != systemIsLittleEndian;
-}
+    : endianness_(endianness), swaps_(endianness) {}
 
 bool BinaryParser::needsByteSwap() const {
-    return needs_swap_;  // Return cached value
+    return swaps_[ByteOrder::DEFAULT];
 }
 
 uint16_t BinaryParser::byteSwap16(uint16_t value) {
@@ -46,6 +45,90 @@ uint64_t BinaryParser::byteSwap64(uint64_t value) {
            ((value << 56) & 0xFF00000000000000ULL);
 }
 
+ParsedField& ParsedFields::add(std::string_view name) {
+    ParsedField& field = fields_.emplace_back();
+    field.name = std::string(name);
+    return field;
+}
+
+ParsedField& ParsedFields::operator[](std::string_view name) {
+    const ParsedField* field = find(name);
+    return field ? const_cast<ParsedField&>(*field) : add(name);
+}
+
+ParsedField& ParsedFields::at(std::string_view name) {
+    return const_cast<ParsedField&>(static_cast<const ParsedFields&>(*this).at(name));
+}
+
+const ParsedField& ParsedFields::at(std::string_view name) const {
+    const ParsedField* field = find(name);
+    if (!field) {
+        throw std::out_of_range("No parsed field named " + std::string(name));
+    }
+    return *field;
+}
+
+const ParsedField* ParsedFields::find(std::string_view name) const {
+    for (const ParsedField& field : fields_) {
+        if (field.name == name) return &field;
+    }
+    return nullptr;
+}
+
+namespace {
+
+// Copies elements [first, first + count) of the columns of an array with
+// total elements into out
+void sliceColumns(const ParsedFields& columns, size_t first, size_t count, size_t total, ParsedFields& out) {
+    out.reserve(columns.size());
+    for (const ParsedField& column : columns) {
+        ParsedField& field = out.add(column.name);
+        if (column.array_size > 0) {
+            size_t per_element = column.array_size;
+            field.array_size = per_element;
+            sliceColumns(column.sub_fields, first * per_element, count * per_element, total * per_element,
+                         field.sub_fields);
+        } else if (!column.sub_fields.empty()) {
+            sliceColumns(column.sub_fields, first, count, total, field.sub_fields);
+        } else if (column.value.hasValue()) {
+            size_t per_element = column.value.size() / total;
+            field.value = count == 1 && per_element == 1 ? column.value.at(first)
+                                                         : column.value.slice(first * per_element, count * per_element);
+        }
+    }
+}
+
+// Copies one Width-byte value per row into consecutive slots of dst
+template <size_t Width>
+void gatherColumn(uint8_t* dst, const uint8_t* src, const std::vector<size_t>& rows) {
+    for (size_t i = 0; i < rows.size(); i++) {
+        std::memcpy(dst + i * Width, src + rows[i], Width);
+    }
+}
+
+} // namespace
+
+ParsedField ParsedField::element(size_t index) const {
+    if (index >= array_size) {
+        throw std::out_of_range("Element " + std::to_string(index) + " out of range for " + name);
+    }
+    ParsedField element;
+    element.name = std::to_string(index);
+    sliceColumns(sub_fields, index, 1, array_size, element.sub_fields);
+    return element;
+}
+
+const ParsedField* ParsedStruct::find(const std::vector<uint32_t>& positions) const {
+    const ParsedFields* level = &fields;
+    const ParsedField* field = nullptr;
+    for (uint32_t position : positions) {
+        if (position >= level->size()) return nullptr;
+        field = &(*level)[position];
+        level = &field->sub_fields;
+    }
+    return field;
+}
+
 std::unique_ptr<ParsedStruct> BinaryParser::parse(
     const uint8_t* data,
     size_t data_size,
@@ -56,13 +139,64 @@ std::unique_ptr<ParsedStruct> BinaryParser::parse(
     }
     
     auto parsed = std::make_unique<ParsedStruct>();
-    parsed->struct_name = struct_info.name;
+    parseInto(data, data_size, struct_info, *parsed);
+    return parsed;
+}
+
+void BinaryParser::parseInto(
+    const uint8_t* data,
+    size_t data_size,
+    const StructInfo& struct_info,
+    ParsedStruct& result) {
     
-    for (const auto& field : struct_info.fields) {
-        parsed->fields[field->name] = parseField(data, data_size, 0, *field);
+    if (data_size < struct_info.size) {
+        throw std::runtime_error("Data size is smaller than struct size");
     }
     
-    return parsed;
+    if (result.schema != &struct_info) {
+        result.fields.clear();
+        result.struct_name = struct_info.name;
+        result.schema = &struct_info;
+    }
+    rows_depth_ = 0;  // In case a previous record threw mid-array
+    
+    if (field_bounds_checks_ || !struct_info.layout_validated) {
+        parseFieldsInto<true>(data, data_size, 0, struct_info.fields, result.fields);
+        return;
+    }
+    
+    // One check covers every read of the record
+    if (data_size < struct_info.extent) {
+        throw std::runtime_error("Data size " + std::to_string(data_size) +
+                                 " is smaller than schema extent " + std::to_string(struct_info.extent));
+    }
+    parseFieldsInto<false>(data, data_size, 0, struct_info.fields, result.fields);
+}
+
+size_t BinaryParser::parseMany(
+    const uint8_t* data,
+    size_t data_size,
+    size_t stride,
+    const StructInfo& struct_info,
+    const RecordCallback& callback) {
+    
+    if (stride == 0) stride = struct_info.size;
+    if (stride == 0) {
+        throw std::runtime_error("Record stride must not be zero");
+    }
+    
+    // Bytes a record needs; the last record may end before the next stride
+    size_t record_size = std::max(struct_info.size, struct_info.extent);
+    
+    size_t count = 0;
+    size_t index = 0;
+    for (size_t offset = 0; offset < data_size && data_size - offset >= record_size; offset += stride, index++) {
+        if (record_filter_ && !record_filter_->matches(data + offset)) continue;
+        parseInto(data + offset, data_size - offset, struct_info, record_);
+        callback(index, offset, record_);
+        count++;
+    }
+    return count;
 }
 
 ParsedField BinaryParser::parseField(
@@ -70,29 +204,218 @@ ParsedField BinaryParser::parseField(
     size_t data_size,
     size_t base_offset,
     const FieldInfo& field_info) {
-    
     ParsedField parsed_field;
-    parsed_field.name = field_info.name;
+    parsed_field.name = std::string(field_info.name);
+    rows_depth_ = 0;
+    parseFieldInto<true>(data, data_size, base_offset, field_info, parsed_field);
+    return parsed_field;
+}
+
+std::vector<size_t>& BinaryParser::acquireRows() {
+    if (rows_depth_ == rows_pool_.size()) {
+        rows_pool_.emplace_back();
+    }
+    std::vector<size_t>& rows = rows_pool_[rows_depth_++];
+    rows.clear();
+    return rows;
+}
+
+template <bool Checked>
+void BinaryParser::parseFieldsInto(
+    const uint8_t* data,
+    size_t data_size,
+    size_t base_offset,
+    const FieldList& fields,
+    ParsedFields& parsed_fields) {
+    
+    parsed_fields.reserve(fields.size());
+    for (size_t i = 0; i < fields.size();) {
+        const FieldInfo& field = fields[i];
+        if (field.unit_fields <= 1) {
+            parseFieldInto<Checked>(data, data_size, base_offset, field, parsed_fields.slot(i, field.name));
+            i++;
+            continue;
+        }
+        
+        // Bitfields sharing a storage unit: one load and swap for all of them
+        size_t offset = base_offset + field.offset;
+        if constexpr (Checked) {
+            if (offset + field.size > data_size) {
+                throw std::runtime_error("Field offset + size exceeds data size: " + std::string(field.name) +
+                                         " at offset " + std::to_string(offset) + " with size " +
+                                         std::to_string(field.size) + " exceeds data size " +
+                                         std::to_string(data_size));
+            }
+        }
+        uint64_t unit = loadUnsigned(data + offset, static_cast<unsigned>(field.size), swaps_[field.byte_order]);
+        for (size_t end = i + field.unit_fields; i < end; i++) {
+            parsed_fields.slot(i, fields[i].name).value = bitfieldValue(unit, fields[i]);
+        }
+    }
+}
+
+template <bool Checked>
+void BinaryParser::parseColumnsInto(
+    const uint8_t* data,
+    size_t data_size,
+    const std::vector<size_t>& rows,
+    size_t base_offset,
+    const FieldList& fields,
+    ParsedFields& columns) {
+    
+    columns.reserve(fields.size());
+    for (size_t index = 0; index < fields.size(); index++) {
+        const FieldInfo& field = fields[index];
+        ParsedField& column = columns.slot(index, field.name);
+        size_t offset = base_offset + field.offset;
+        
+        if constexpr (Checked) {
+            for (size_t row : rows) {
+                if (row + offset + field.size > data_size) {
+                    throw std::runtime_error("Field offset + size exceeds data size: " + std::string(field.name) +
+                                             " at offset " + std::to_string(row + offset) + " with size " +
+                                             std::to_string(field.size) + " exceeds data size " +
+                                             std::to_string(data_size));
+                }
+            }
+        }
+        
+        if (field.array_size > 1 && (field.type == FieldType::STRUCT || field.type == FieldType::UNION ||
+                                     field.type == FieldType::UNKNOWN)) {
+            // Nested array: every element of every row becomes a row
+            size_t element_size = field.size / field.array_size;
+            std::vector<size_t>& element_rows = acquireRows();
+            for (size_t row : rows) {
+                for (size_t i = 0; i < field.array_size; i++) {
+                    element_rows.push_back(row + offset + i * element_size);
+                }
+            }
+            column.array_size = field.array_size;
+            parseColumnsInto<Checked>(data, data_size, element_rows, 0, field.sub_fields, column.sub_fields);
+            releaseRows();
+            continue;
+        }
+        if (field.array_size <= 1 && (field.type == FieldType::STRUCT || field.type == FieldType::UNION)) {
+            parseColumnsInto<Checked>(data, data_size, rows, offset, field.sub_fields, column.sub_fields);
+            continue;
+        }
+        
+        ValueType type = valueTypeFor(field.type);
+        if (type == ValueType::NONE) {
+            throw std::runtime_error("Unsupported field type");
+        }
+        const size_t count = field.array_size > 1 ? field.array_size : 1;
+        const size_t width = valueTypeWidth(type);
+        const uint8_t* src = data + offset;
+        uint8_t* dst = column.value.assignArray(type, rows.size() * count);
+        
+        if (field.bits > 0 && count == 1) {
+            if (field.size != 1 && field.size != 2 && field.size != 4 && field.size != 8) {
+                throw std::runtime_error("Unsupported bitfield size");
+            }
+            for (size_t i = 0; i < rows.size(); i++) {
+                uint64_t unit = loadUnsigned(src + rows[i], static_cast<unsigned>(field.size),
+                                             swaps_[field.byte_order]);
+                std::memcpy(dst + i * width, bitfieldValue(unit, field).bytes(), width);
+            }
+            continue;
+        }
+        
+        // Gather with the row stride, then swap the whole column at once
+        const size_t element_size = field.size / count;
+        if (count == 1) {
+            switch (width) {
+                case 1: gatherColumn<1>(dst, src, rows); break;
+                case 2: gatherColumn<2>(dst, src, rows); break;
+                case 4: gatherColumn<4>(dst, src, rows); break;
+                default: gatherColumn<8>(dst, src, rows); break;
+            }
+        } else if (element_size == width) {
+            for (size_t i = 0; i < rows.size(); i++) {
+                std::memcpy(dst + i * count * width, src + rows[i], count * width);
+            }
+        } else {
+            for (size_t i = 0; i < rows.size(); i++) {
+                for (size_t j = 0; j < count; j++) {
+                    std::memcpy(dst + (i * count + j) * width, src + rows[i] + j * element_size, width);
+                }
+            }
+        }
+        if (swaps_[field.byte_order] && width > 1) {
+            switch (width) {
+                case 2: bswapArray<2>(dst, dst, rows.size() * count); break;
+                case 4: bswapArray<4>(dst, dst, rows.size() * count); break;
+                default: bswapArray<8>(dst, dst, rows.size() * count); break;
+            }
+        }
+    }
+}
+
+template <bool Checked>
+void BinaryParser::parseFieldInto(
+    const uint8_t* data,
+    size_t data_size,
+    size_t base_offset,
+    const FieldInfo& field_info,
+    ParsedField& parsed_field) {
     
     size_t actual_offset = base_offset + field_info.offset;
     
-    if (actual_offset + field_info.size > data_size) {
-        std::string error_msg = "Field offset + size exceeds data size: " +
-                                field_info.name + " at offset " + std::to_string(actual_offset) +
-                                " with size " + std::to_string(field_info.size) +
-                                " exceeds data size " + std::to_string(data_size);
-        throw std::runtime_error(error_msg);
+    if constexpr (Checked) {
+        if (actual_offset + field_info.size > data_size) {
+            std::string error_msg = "Field offset + size exceeds data size: " +
+                                    std::string(field_info.name) + " at offset " + std::to_string(actual_offset) +
+                                    " with size " + std::to_string(field_info.size) +
+                                    " exceeds data size " + std::to_string(data_size);
+            throw std::runtime_error(error_msg);
+        }
     }
     
-    if (field_info.array_size > 1) {
-        // Parse array (including struct arrays)
-        parsed_field.value = parseArray(data, data_size, actual_offset, field_info);
+    if (field_info.array_size > 1 && (field_info.type == FieldType::STRUCT ||
+                                       field_info.type == FieldType::UNION ||
+                                       field_info.type == FieldType::UNKNOWN)) {
+        // For unknown types (typedefs), structs, and unions, decode each
+        // member of all elements into one column; without sub_fields there
+        // are no columns
+        size_t element_size = field_info.size / field_info.array_size;
+        std::vector<size_t>& rows = acquireRows();
+        for (size_t i = 0; i < field_info.array_size; i++) {
+            rows.push_back(actual_offset + i * element_size);
+        }
+        parsed_field.array_size = field_info.array_size;
+        parseColumnsInto<Checked>(data, data_size, rows, 0, field_info.sub_fields, parsed_field.sub_fields);
+        releaseRows();
+    } else if (field_info.array_size > 1) {
+        // Parse array of primitives
+        parseArrayInto(data, actual_offset, field_info, parsed_field.value);
+    } else if (field_info.selector) {
+        // Tagged union: only the member selected by the discriminator, which
+        // lies in the struct holding the union
+        const UnionSelector& selector = *field_info.selector;
+        size_t discriminator_offset = base_offset + selector.offset;
+        if constexpr (Checked) {
+            if (discriminator_offset + selector.width > data_size) {
+                throw std::runtime_error("Discriminator of " + std::string(field_info.name) +
+                                         " exceeds data size " + std::to_string(data_size));
+            }
+        }
+        uint64_t value = (loadUnsigned(data + discriminator_offset, selector.width, swaps_[selector.byte_order]) >>
+                          selector.shift) & selector.mask;
+        value = (value ^ selector.sign) - selector.sign;
+        uint32_t member = selector.select(value);
+        ParsedFields& members = parsed_field.sub_fields;
+        if (member == UnionSelector::kNoMember) {
+            members.truncate(0);
+        } else {
+            const FieldInfo& member_info = field_info.sub_fields[member];
+            if (!members.empty() && members[0].name != member_info.name) {
+                members.truncate(0);  // The previous record selected another member
+            }
+            parseFieldInto<Checked>(data, data_size, actual_offset, member_info, members.slot(0, member_info.name));
+        }
     } else if (field_info.type == FieldType::STRUCT || field_info.type == FieldType::UNION) {
         // Parse sub-fields for single struct/union
-        for (const auto& sub_field : field_info.sub_fields) {
-            parsed_field.sub_fields[sub_field->name] = 
-                parseField(data, data_size, actual_offset, *sub_field);
-        }
+        parseFieldsInto<Checked>(data, data_size, actual_offset, field_info.sub_fields, parsed_field.sub_fields);
     } else if (field_info.bits > 0) {
         // Parse bitfield
         parsed_field.value = parseBitfield(data, actual_offset, field_info);
@@ -100,16 +423,15 @@ ParsedField BinaryParser::parseField(
         // Parse primitive value
         parsed_field.value = parseValue(data, actual_offset, field_info);
     }
-    
-    return parsed_field;
 }
 
-std::any BinaryParser::parseValue(
+FieldValue BinaryParser::parseValue(
     const uint8_t* data,
     size_t offset,
     const FieldInfo& field_info) {
     
     const uint8_t* ptr = data + offset;
+    const bool swap = swaps_[field_info.byte_order];
     
     switch (field_info.type) {
         case FieldType::UINT8:
@@ -122,13 +444,13 @@ std::any BinaryParser::parseValue(
         case FieldType::UINT16: {
             uint16_t value;
             std::memcpy(&value, ptr, sizeof(value));
-            return needs_swap_ ? byteSwap16(value) : value;
+            return swap ? byteSwap16(value) : value;
         }
         
         case FieldType::INT16: {
             int16_t value;
             std::memcpy(&value, ptr, sizeof(value));
-            if (needs_swap_) {
+            if (swap) {
                 uint16_t temp;
                 std::memcpy(&temp, &value, sizeof(temp));
                 temp = byteSwap16(temp);
@@ -140,13 +462,13 @@ std::any BinaryParser::parseValue(
         case FieldType::UINT32: {
             uint32_t value;
             std::memcpy(&value, ptr, sizeof(value));
-            return needs_swap_ ? byteSwap32(value) : value;
+            return swap ? byteSwap32(value) : value;
         }
         
         case FieldType::INT32: {
             int32_t value;
             std::memcpy(&value, ptr, sizeof(value));
-            if (needs_swap_) {
+            if (swap) {
                 uint32_t temp;
                 std::memcpy(&temp, &value, sizeof(temp));
                 temp = byteSwap32(temp);
@@ -158,13 +480,13 @@ std::any BinaryParser::parseValue(
         case FieldType::UINT64: {
             uint64_t value;
             std::memcpy(&value, ptr, sizeof(value));
-            return needs_swap_ ? byteSwap64(value) : value;
+            return swap ? byteSwap64(value) : value;
         }
         
         case FieldType::INT64: {
             int64_t value;
             std::memcpy(&value, ptr, sizeof(value));
-            if (needs_swap_) {
+            if (swap) {
                 uint64_t temp;
                 std::memcpy(&temp, &value, sizeof(temp));
                 temp = byteSwap64(temp);
@@ -175,7 +497,7 @@ std::any BinaryParser::parseValue(
         
         case FieldType::FLOAT: {
             float value;
-            if (needs_swap_) {
+            if (swap) {
                 uint32_t temp;
                 std::memcpy(&temp, ptr, sizeof(temp));
                 temp = byteSwap32(temp);
@@ -188,7 +510,7 @@ std::any BinaryParser::parseValue(
         
         case FieldType::DOUBLE: {
             double value;
-            if (needs_swap_) {
+            if (swap) {
                 uint64_t temp;
                 std::memcpy(&temp, ptr, sizeof(temp));
                 temp = byteSwap64(temp);
@@ -204,194 +526,85 @@ std::any BinaryParser::parseValue(
     }
 }
 
-std::any BinaryParser::parseArray(
+void BinaryParser::parseArrayInto(
     const uint8_t* data,
-    size_t data_size,
     size_t offset,
-    const FieldInfo& field_info) {
+    const FieldInfo& field_info,
+    FieldValue& array) {
     
-    size_t element_size = field_info.size / field_info.array_size;
+    ValueType type = valueTypeFor(field_info.type);
+    if (type == ValueType::NONE) {
+        throw std::runtime_error("Unsupported array element type");
+    }
     
-    switch (field_info.type) {
-        case FieldType::UINT8:
-        case FieldType::CHAR: {
-            // Direct memory copy for byte arrays - much faster
-            std::vector<uint8_t> array(field_info.array_size);
-            std::memcpy(array.data(), data + offset, field_info.array_size);
-            return array;
-        }
-        
-        case FieldType::UINT16: {
-            std::vector<uint16_t> array(field_info.array_size);
-            const bool swap = needs_swap_;  // Use cached value
-            for (size_t i = 0; i < field_info.array_size; i++) {
-                uint16_t value;
-                std::memcpy(&value, data + offset + i * element_size, sizeof(value));
-                array[i] = swap ? byteSwap16(value) : value;
-            }
-            return array;
-        }
-        
-        case FieldType::UINT32: {
-            std::vector<uint32_t> array(field_info.array_size);
-            const bool swap = needs_swap_;
-            for (size_t i = 0; i < field_info.array_size; i++) {
-                uint32_t value;
-                std::memcpy(&value, data + offset + i * element_size, sizeof(value));
-                array[i] = swap ? byteSwap32(value) : value;
-            }
-            return array;
-        }
-        
-        case FieldType::UINT64: {
-            std::vector<uint64_t> array(field_info.array_size);
-            const bool swap = needs_swap_;
-            for (size_t i = 0; i < field_info.array_size; i++) {
-                uint64_t value;
-                std::memcpy(&value, data + offset + i * element_size, sizeof(value));
-                array[i] = swap ? byteSwap64(value) : value;
-            }
-            return array;
-        }
-        
-        case FieldType::FLOAT: {
-            std::vector<float> array(field_info.array_size);
-            const bool swap = needs_swap_;
-            for (size_t i = 0; i < field_info.array_size; i++) {
-                if (swap) {
-                    uint32_t temp;
-                    std::memcpy(&temp, data + offset + i * element_size, sizeof(temp));
-                    temp = byteSwap32(temp);
-                    std::memcpy(&array[i], &temp, sizeof(float));
-                } else {
-                    std::memcpy(&array[i], data + offset + i * element_size, sizeof(float));
-                }
-            }
-            return array;
-        }
-        
-        case FieldType::DOUBLE: {
-            std::vector<double> array(field_info.array_size);
-            const bool swap = needs_swap_;
-            for (size_t i = 0; i < field_info.array_size; i++) {
-                if (swap) {
-                    uint64_t temp;
-                    std::memcpy(&temp, data + offset + i * element_size, sizeof(temp));
-                    temp = byteSwap64(temp);
-                    std::memcpy(&array[i], &temp, sizeof(double));
-                } else {
-                    std::memcpy(&array[i], data + offset + i * element_size, sizeof(double));
-                }
-            }
-            return array;
-        }
-        
-        case FieldType::UNKNOWN:
-        case FieldType::STRUCT:
-        case FieldType::UNION: {
-            // For unknown types (typedefs), structs, and unions, parse as array of ParsedFields
-            std::vector<std::any> array;
-            array.reserve(field_info.array_size);
-            
-            // Each element should have sub_fields
-            if (!field_info.sub_fields.empty()) {
-                for (size_t i = 0; i < field_info.array_size; i++) {
-                    ParsedField element;
-                    element.name = std::to_string(i);
-                    for (const auto& sub_field : field_info.sub_fields) {
-                        element.sub_fields[sub_field->name] = 
-                            parseField(data, data_size, offset + i * element_size, *sub_field);
-                    }
-                    array.push_back(element);
-                }
-            } else {
-                // If no sub_fields, just skip this array
-                for (size_t i = 0; i < field_info.array_size; i++) {
-                    array.push_back(std::any{});  // Empty element
-                }
-            }
-            return array;
+    const size_t count = field_info.array_size;
+    const size_t width = valueTypeWidth(type);
+    const size_t element_size = field_info.size / count;
+    const uint8_t* src = data + offset;
+    uint8_t* dst = array.assignArray(type, count);
+    
+    if (element_size != width) {
+        // Padded elements are gathered first, then swapped in place
+        for (size_t i = 0; i < count; i++) {
+            std::memcpy(dst + i * width, src + i * element_size, width);
         }
-        
-        default:
-            throw std::runtime_error("Unsupported array element type");
+        src = dst;
+    }
+    
+    if (!swaps_[field_info.byte_order] || width == 1) {
+        if (src != dst) std::memcpy(dst, src, count * width);
+        return;
+    }
+    switch (width) {
+        case 2: bswapArray<2>(dst, src, count); break;
+        case 4: bswapArray<4>(dst, src, count); break;
+        default: bswapArray<8>(dst, src, count); break;
     }
 }
 
-std::any BinaryParser::parseBitfield(
+FieldValue BinaryParser::parseBitfield(
     const uint8_t* data,
     size_t offset,
     const FieldInfo& field_info) {
     
-    // Read the full value from memory
-    const uint8_t* ptr = data + offset;
-    uint64_t full_value = 0;
-    
-    // Read based on the field size
-    switch (field_info.size) {
-        case 1:
-            full_value = *ptr;
-            break;
-        case 2: {
-            uint16_t temp;
-            std::memcpy(&temp, ptr, sizeof(temp));
-            if (needs_swap_) temp = byteSwap16(temp);
-            full_value = temp;
-            break;
-        }
-        case 4: {
-            uint32_t temp;
-            std::memcpy(&temp, ptr, sizeof(temp));
-            if (needs_swap_) temp = byteSwap32(temp);
-            full_value = temp;
-            break;
-        }
-        case 8:
-            std::memcpy(&full_value, ptr, sizeof(full_value));
-            if (needs_swap_) full_value = byteSwap64(full_value);
-            break;
-        default:
-            throw std::runtime_error("Unsupported bitfield size");
+    // Read the full storage unit from memory
+    if (field_info.size != 1 && field_info.size != 2 && field_info.size != 4 && field_info.size != 8) {
+        throw std::runtime_error("Unsupported bitfield size");
+    }
+    uint64_t unit = loadUnsigned(data + offset, static_cast<unsigned>(field_info.size), swaps_[field_info.byte_order]);
+    return bitfieldValue(unit, field_info);
+}
+
+FieldValue BinaryParser::bitfieldValue(uint64_t unit, const FieldInfo& field_info) {
+    // Constants precomputed by validateLayout(); hand-built schemas may lack them
+    uint64_t mask = field_info.bit_mask;
+    uint64_t sign = field_info.bit_sign;
+    if (mask == 0) {
+        bitfieldConstants(field_info, mask, sign);
     }
     
-    // Extract the bitfield value
-    // Create mask with the specified number of bits
-    uint64_t mask = (1ULL << field_info.bits) - 1;
-    
-    // Shift right to get the bits we want, then apply mask
-    uint64_t bitfield_value = (full_value >> field_info.bit_offset) & mask;
+    uint64_t value = (unit >> field_info.bit_offset) & mask;
+    value = (value ^ sign) - sign;  // Sign-extend; a no-op when sign is 0
     
     // Return the value as the appropriate type
     switch (field_info.type) {
         case FieldType::UINT8:
-            return static_cast<uint8_t>(bitfield_value);
+        case FieldType::CHAR:
+            return static_cast<uint8_t>(value);
         case FieldType::UINT16:
-            return static_cast<uint16_t>(bitfield_value);
+            return static_cast<uint16_t>(value);
         case FieldType::UINT32:
-            return static_cast<uint32_t>(bitfield_value);
+            return static_cast<uint32_t>(value);
         case FieldType::UINT64:
-            return bitfield_value;
+            return value;
         case FieldType::INT8:
-            // Sign extend if needed
-            if (field_info.bits < 8 && (bitfield_value & (1ULL << (field_info.bits - 1)))) {
-                bitfield_value |= ~((1ULL << field_info.bits) - 1);
-            }
-            return static_cast<int8_t>(bitfield_value);
+            return static_cast<int8_t>(value);
         case FieldType::INT16:
-            if (field_info.bits < 16 && (bitfield_value & (1ULL << (field_info.bits - 1)))) {
-                bitfield_value |= ~((1ULL << field_info.bits) - 1);
-            }
-            return static_cast<int16_t>(bitfield_value);
+            return static_cast<int16_t>(value);
         case FieldType::INT32:
-            if (field_info.bits < 32 && (bitfield_value & (1ULL << (field_info.bits - 1)))) {
-                bitfield_value |= ~((1ULL << field_info.bits) - 1);
-            }
-            return static_cast<int32_t>(bitfield_value);
+            return static_cast<int32_t>(value);
         case FieldType::INT64:
-            if (field_info.bits < 64 && (bitfield_value & (1ULL << (field_info.bits - 1)))) {
-                bitfield_value |= ~((1ULL << field_info.bits) - 1);
-            }
-            return static_cast<int64_t>(bitfield_value);
+            return static_cast<int64_t>(value);
         default:
             throw std::runtime_error("Unsupported bitfield type");
     }
@@ -4,8 +4,10 @@
 #include <string>
 #include <vector>
 #include <memory>
-#include <unordered_map>
-#include <any>
+#include <string_view>
+#include <functional>
+#include <deque>
+#include "field_value.h"
 
 namespace binary_parser {
 
@@ -14,18 +16,107 @@ enum class Endianness {
     BIG
 };
 
+enum class ByteOrder : uint8_t;
+
+// Whether to byte-swap the values of a field, by the field's ByteOrder.
+// Fixed when a parser is created: fields with a declared order ignore its
+// endianness, the others follow it, and decoding only looks the decision up.
+class ByteSwaps {
+public:
+    explicit ByteSwaps(Endianness endianness = Endianness::LITTLE);
+    
+    bool operator[](ByteOrder order) const { return swaps_[static_cast<size_t>(order)]; }
+    
+private:
+    bool swaps_[3];
+};
+
 struct StructInfo;
 struct FieldInfo;
+class FieldList;
+class RecordFilter;
+
+struct ParsedField;
+
+// Parsed fields of one struct level in declaration order: position i holds
+// the i-th field of the schema's FieldList (a tagged union holds only its
+// selected member, or nothing). Lookups by name scan the level;
+// StructInfo::findPath() resolves a dotted path to positions once, for use
+// with ParsedStruct::find().
+class ParsedFields {
+public:
+    using iterator = std::vector<ParsedField>::iterator;
+    using const_iterator = std::vector<ParsedField>::const_iterator;
+    
+    size_t size() const { return fields_.size(); }
+    bool empty() const { return fields_.empty(); }
+    void reserve(size_t count) { fields_.reserve(count); }
+    void clear() { fields_.clear(); }
+    
+    iterator begin() { return fields_.begin(); }
+    iterator end() { return fields_.end(); }
+    const_iterator begin() const { return fields_.begin(); }
+    const_iterator end() const { return fields_.end(); }
+    
+    // By schema position
+    ParsedField& operator[](size_t index) { return fields_[index]; }
+    const ParsedField& operator[](size_t index) const { return fields_[index]; }
+    
+    // Appends a new field named name
+    ParsedField& add(std::string_view name);
+    
+    // Field at position index, for overwriting a previous record in place:
+    // the existing field, or a new one named name when index is size()
+    ParsedField& slot(size_t index, std::string_view name) {
+        return index < fields_.size() ? fields_[index] : add(name);
+    }
+    
+    // Drops the fields from position count on
+    void truncate(size_t count) {
+        if (count < fields_.size()) fields_.erase(fields_.begin() + count, fields_.end());
+    }
+    
+    // By name. operator[] appends the field if it is missing; at() throws
+    // std::out_of_range.
+    ParsedField& operator[](std::string_view name);
+    ParsedField& at(std::string_view name);
+    const ParsedField& at(std::string_view name) const;
+    const ParsedField* find(std::string_view name) const;
+    size_t count(std::string_view name) const { return find(name) ? 1 : 0; }
+    
+private:
+    std::vector<ParsedField> fields_;
+};
 
+// Arrays of structs/unions are stored by column: array_size is the element
+// count and sub_fields hold one column per member instead of one object per
+// element. A leaf column's value holds the member for every element back to
+// back (all elements of a member array for element 0, then for element 1,
+// ...); a nested struct member is a struct of columns over the same
+// elements, and a nested struct array has its own array_size with columns
+// over array_size times as many elements.
 struct ParsedField {
     std::string name;
-    std::any value;
-    std::unordered_map<std::string, ParsedField> sub_fields;
+    FieldValue value;  // Primitive fields, arrays of primitives, and leaf columns
+    ParsedFields sub_fields;  // Struct/union members, or the columns of a struct array
+    size_t array_size = 0;  // Elements of an array of structs/unions; 0 otherwise
+    
+    // Element index of an array of structs/unions, copied out of the columns
+    // as a struct field named after the index. Allocates; the columns
+    // themselves are the way to read large arrays.
+    ParsedField element(size_t index) const;
 };
 
 struct ParsedStruct {
     std::string struct_name;
-    std::unordered_map<std::string, ParsedField> fields;
+    ParsedFields fields;
+    
+    // Schema the fields were shaped for by BinaryParser::parseInto()
+    const StructInfo* schema = nullptr;
+    
+    // Field at the schema positions returned by StructInfo::findPath(), or
+    // nullptr if the record has no such field
+    const ParsedField* find(const std::vector<uint32_t>& positions) const;
 };
 
 class BinaryParser {
@@ -39,16 +130,60 @@ public:
         const StructInfo& struct_info
     );
     
+    // Parse one record into an existing result. A result last filled from
+    // the same schema keeps its fields, names and array storage and only has
+    // its values overwritten, so decoding record after record into one
+    // result does not allocate once it has been shaped (tagged unions that
+    // switch members reshape that union). Any other result is cleared and
+    // shaped for struct_info first.
+    void parseInto(
+        const uint8_t* data,
+        size_t data_size,
+        const StructInfo& struct_info,
+        ParsedStruct& result
+    );
+    
+    // Called by parseMany() for each record with its index and byte offset
+    using RecordCallback = std::function<void(size_t index, size_t offset, const ParsedStruct& record)>;
+    
+    // Parse back-to-back records, one every stride bytes (0 means the struct
+    // size), until fewer than a whole record remains. Each record is checked
+    // once against the schema extent, as in parse(). With a record filter,
+    // records it rejects are skipped undecoded and index still counts every
+    // record. Returns the number of records passed to callback. The record
+    // passed to callback is reused for the next one (see parseInto()), so it
+    // is only valid during the call.
+    size_t parseMany(
+        const uint8_t* data,
+        size_t data_size,
+        size_t stride,
+        const StructInfo& struct_info,
+        const RecordCallback& callback
+    );
+    
+    // Debug mode: check every field against data_size while decoding.
+    // Otherwise a record is checked once against the schema extent computed
+    // by validateLayout(). Schemas without a validated layout are always
+    // checked field by field.
+    void setFieldBoundsChecks(bool enabled) { field_bounds_checks_ = enabled; }
+    bool fieldBoundsChecks() const { return field_bounds_checks_; }
+    
+    // Records parseMany() decodes; nullptr (the default) for all. The
+    // filter must outlive its use by this parser.
+    void setRecordFilter(const RecordFilter* filter) { record_filter_ = filter; }
+    const RecordFilter* recordFilter() const { return record_filter_; }
+    
     // Get parsed value as specific type
     template<typename T>
     static T getValue(const ParsedField& field) {
-        return std::any_cast<T>(field.value);
+        return field.value.get<T>();
     }
     
     // Get array values
     template<typename T>
     static std::vector<T> getArray(const ParsedField& field) {
-        return std::any_cast<std::vector<T>>(field.value);
+        ArrayView<T> view = field.value.elements<T>();
+        return std::vector<T>(view.begin(), view.end());
     }
 
     // --- Functions moved for testing ---
@@ -59,26 +194,30 @@ public:
         const FieldInfo& field_info
     );
     
-    std::any parseValue(
+    FieldValue parseValue(
         const uint8_t* data,
         size_t offset,
         const FieldInfo& field_info
     );
     
-    std::any parseArray(
+    // Primitive array at offset into an existing value, reusing its storage
+    void parseArrayInto(
         const uint8_t* data,
-        size_t data_size,
         size_t offset,
-        const FieldInfo& field_info
+        const FieldInfo& field_info,
+        FieldValue& value
     );
     
-    std::any parseBitfield(
+    FieldValue parseBitfield(
         const uint8_t* data,
         size_t offset,
         const FieldInfo& field_info
     );
     
-    // Check if byte swapping is needed
+    // Extracts a bitfield from its already loaded (and swapped) storage unit
+    static FieldValue bitfieldValue(uint64_t unit, const FieldInfo& field_info);
+    
+    // Check if byte swapping is needed for fields without a declared order
     bool needsByteSwap() const;
 
     // Byte swapping utilities
@@ -87,8 +226,51 @@ public:
     uint64_t byteSwap64(uint64_t value);
 
 private:
+    // Fills one parsed field per schema field into parsed_fields, reusing
+    // the fields it already has
+    template <bool Checked>
+    void parseFieldsInto(
+        const uint8_t* data,
+        size_t data_size,
+        size_t base_offset,
+        const FieldList& fields,
+        ParsedFields& parsed_fields
+    );
+    
+    // Decodes the members of an array of structs/unions into one column per
+    // member; rows holds the byte offset of each element. Columns already
+    // present are refilled in place.
+    template <bool Checked>
+    void parseColumnsInto(
+        const uint8_t* data,
+        size_t data_size,
+        const std::vector<size_t>& rows,
+        size_t base_offset,
+        const FieldList& fields,
+        ParsedFields& columns
+    );
+    
+    template <bool Checked>
+    void parseFieldInto(
+        const uint8_t* data,
+        size_t data_size,
+        size_t base_offset,
+        const FieldInfo& field_info,
+        ParsedField& parsed_field
+    );
+    
+    // Element offsets of the struct arrays being decoded, one buffer per
+    // nesting level, kept between records
+    std::vector<size_t>& acquireRows();
+    void releaseRows() { rows_depth_--; }
+    
     Endianness endianness_;
-    bool needs_swap_;  // Cache endianness check result
+    ByteSwaps swaps_;
+    bool field_bounds_checks_ = false;
+    const RecordFilter* record_filter_ = nullptr;
+    std::deque<std::vector<size_t>> rows_pool_;
+    size_t rows_depth_ = 0;
+    ParsedStruct record_;  // Reused by parseMany()
 };
 
 } // namespace binary_parser
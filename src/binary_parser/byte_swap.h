@@ -0,0 +1,130 @@
+#ifndef BYTE_SWAP_H
+#define BYTE_SWAP_H
+
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+
+#if defined(__AVX2__)
+#include <immintrin.h>
+#elif defined(__SSSE3__)
+#include <tmmintrin.h>
+#endif
+
+namespace binary_parser {
+
+inline bool hostIsLittleEndian() {
+    uint16_t test = 1;
+    uint8_t first;
+    std::memcpy(&first, &test, 1);
+    return first == 1;
+}
+
+inline uint16_t bswap16(uint16_t value) {
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_bswap16(value);
+#else
+    return static_cast<uint16_t>((value >> 8) | (value << 8));
+#endif
+}
+
+inline uint32_t bswap32(uint32_t value) {
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_bswap32(value);
+#else
+    return ((value >> 24) & 0xFF) |
+           ((value >> 8) & 0xFF00) |
+           ((value << 8) & 0xFF0000) |
+           ((value << 24) & 0xFF000000);
+#endif
+}
+
+inline uint64_t bswap64(uint64_t value) {
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_bswap64(value);
+#else
+    return (static_cast<uint64_t>(bswap32(static_cast<uint32_t>(value))) << 32) |
+           bswap32(static_cast<uint32_t>(value >> 32));
+#endif
+}
+
+// Load an unsigned value of the given width (1, 2, 4 or 8 bytes)
+inline uint64_t loadUnsigned(const uint8_t* ptr, unsigned width, bool swap) {
+    switch (width) {
+        case 1:
+            return *ptr;
+        case 2: {
+            uint16_t value;
+            std::memcpy(&value, ptr, sizeof(value));
+            return swap ? bswap16(value) : value;
+        }
+        case 4: {
+            uint32_t value;
+            std::memcpy(&value, ptr, sizeof(value));
+            return swap ? bswap32(value) : value;
+        }
+        default: {
+            uint64_t value;
+            std::memcpy(&value, ptr, sizeof(value));
+            return swap ? bswap64(value) : value;
+        }
+    }
+}
+
+#if defined(__AVX2__) || defined(__SSSE3__)
+// pshufb control reversing every Width-byte group of a 16-byte lane
+template <unsigned Width>
+inline __m128i bswapShuffle() {
+    alignas(16) uint8_t control[16];
+    for (unsigned i = 0; i < 16; i++) {
+        control[i] = static_cast<uint8_t>(i - i % Width + (Width - 1 - i % Width));
+    }
+    return _mm_load_si128(reinterpret_cast<const __m128i*>(control));
+}
+#endif
+
+// Copy count values of Width (2, 4 or 8) bytes from src to dst, reversing
+// the bytes of each. dst may equal src. Uses AVX2 or SSSE3 shuffles when
+// the compiler targets them (e.g. -march=native) and a scalar loop, which
+// compilers can still vectorise, otherwise.
+template <unsigned Width>
+inline void bswapArray(uint8_t* dst, const uint8_t* src, size_t count) {
+    static_assert(Width == 2 || Width == 4 || Width == 8, "Unsupported swap width");
+    size_t i = 0;
+#if defined(__AVX2__)
+    const __m256i control256 = _mm256_broadcastsi128_si256(bswapShuffle<Width>());
+    for (; i + 32 / Width <= count; i += 32 / Width) {
+        __m256i block = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(src + i * Width));
+        _mm256_storeu_si256(reinterpret_cast<__m256i*>(dst + i * Width), _mm256_shuffle_epi8(block, control256));
+    }
+#endif
+#if defined(__AVX2__) || defined(__SSSE3__)
+    const __m128i control = bswapShuffle<Width>();
+    for (; i + 16 / Width <= count; i += 16 / Width) {
+        __m128i block = _mm_loadu_si128(reinterpret_cast<const __m128i*>(src + i * Width));
+        _mm_storeu_si128(reinterpret_cast<__m128i*>(dst + i * Width), _mm_shuffle_epi8(block, control));
+    }
+#endif
+    for (; i < count; i++) {
+        if constexpr (Width == 2) {
+            uint16_t value;
+            std::memcpy(&value, src + i * 2, 2);
+            value = bswap16(value);
+            std::memcpy(dst + i * 2, &value, 2);
+        } else if constexpr (Width == 4) {
+            uint32_t value;
+            std::memcpy(&value, src + i * 4, 4);
+            value = bswap32(value);
+            std::memcpy(dst + i * 4, &value, 4);
+        } else {
+            uint64_t value;
+            std::memcpy(&value, src + i * 8, 8);
+            value = bswap64(value);
+            std::memcpy(dst + i * 8, &value, 8);
+        }
+    }
+}
+
+} // namespace binary_parser
+
+#endif // BYTE_SWAP_H
\ No newline at end of file
@@ -0,0 +1,198 @@
+#include "csv_writer.h"
+#include "xml_struct_parser.h"
+#include <charconv>
+#include <cstring>
+#include <stdexcept>
+
+namespace binary_parser {
+
+namespace {
+
+template <typename T>
+void appendNumber(const uint8_t* bytes, std::string& row) {
+    T value;
+    std::memcpy(&value, bytes, sizeof(T));
+    // Enough for any 64-bit integer and the shortest form of any double
+    char text[32];
+    auto result = std::to_chars(text, text + sizeof(text), value);
+    row.append(text, result.ptr);
+}
+
+void appendNumber(ValueType type, const uint8_t* bytes, std::string& row) {
+    switch (type) {
+        case ValueType::UINT8: appendNumber<uint8_t>(bytes, row); break;
+        case ValueType::INT8: appendNumber<int8_t>(bytes, row); break;
+        case ValueType::UINT16: appendNumber<uint16_t>(bytes, row); break;
+        case ValueType::INT16: appendNumber<int16_t>(bytes, row); break;
+        case ValueType::UINT32: appendNumber<uint32_t>(bytes, row); break;
+        case ValueType::INT32: appendNumber<int32_t>(bytes, row); break;
+        case ValueType::UINT64: appendNumber<uint64_t>(bytes, row); break;
+        case ValueType::INT64: appendNumber<int64_t>(bytes, row); break;
+        case ValueType::FLOAT: appendNumber<float>(bytes, row); break;
+        case ValueType::DOUBLE: appendNumber<double>(bytes, row); break;
+        case ValueType::NONE: break;
+    }
+}
+
+// Column names of a leaf: its path with the indices of every array on the
+// way, one name per value, or just the path when arrays are joined
+void appendColumnNames(const StructInfo& struct_info, const LeafColumn& leaf, bool join_arrays,
+                       std::vector<std::string>& names) {
+    if (join_arrays || leaf.values == 1) {
+        names.push_back(leaf.path);
+        return;
+    }
+
+    // Path segments, each followed by a slot for an index if it is an array
+    std::vector<std::string> segments;
+    std::vector<bool> indexed;
+    const FieldList* fields = &struct_info.fields;
+    for (size_t level = 0; level < leaf.positions.size(); level++) {
+        const FieldInfo& field = (*fields)[leaf.positions[level]];
+        bool last = level + 1 == leaf.positions.size();
+        segments.emplace_back(field.name);
+        indexed.push_back(field.array_size > 1 && !(last && leaf.text));
+        fields = &field.sub_fields;
+    }
+
+    std::vector<size_t> index(leaf.shape.size(), 0);
+    for (size_t value = 0; value < leaf.values; value++) {
+        std::string name;
+        size_t dimension = 0;
+        for (size_t i = 0; i < segments.size(); i++) {
+            if (i > 0) name += '.';
+            name += segments[i];
+            if (indexed[i]) {
+                name += '[' + std::to_string(index[dimension++]) + ']';
+            }
+        }
+        names.push_back(std::move(name));
+
+        // Row-major: the last dimension varies fastest
+        for (size_t i = index.size(); i-- > 0;) {
+            if (++index[i] < leaf.shape[i]) break;
+            index[i] = 0;
+        }
+    }
+}
+
+} // namespace
+
+CsvWriter::CsvWriter(std::ostream& out, const StructInfo& struct_info, const CsvWriterOptions& options)
+    : out_(out), options_(options), leaves_(leafColumns(struct_info)) {
+    if (options_.delimiter == '"' || options_.delimiter == '\n' || options_.delimiter == '\r' ||
+        options_.delimiter == options_.array_separator) {
+        throw std::runtime_error("Invalid CSV delimiter");
+    }
+
+    for (const LeafColumn& leaf : leaves_) {
+        appendColumnNames(struct_info, leaf, options_.join_arrays, header_);
+    }
+
+    buffer_.reserve(options_.buffer_size + options_.buffer_size / 4);
+    for (size_t i = 0; i < header_.size(); i++) {
+        if (i > 0) buffer_ += options_.delimiter;
+        appendText(header_[i].data(), header_[i].size(), buffer_);
+    }
+    buffer_ += '\n';
+}
+
+void CsvWriter::appendText(const char* text, size_t size, std::string& row) const {
+    if (options_.delimiter != ',') {
+        for (size_t i = 0; i < size; i++) {
+            switch (text[i]) {
+                case '\t': row += "\\t"; break;
+                case '\n': row += "\\n"; break;
+                case '\r': row += "\\r"; break;
+                case '\\': row += "\\\\"; break;
+                default: row += text[i]; break;
+            }
+        }
+        return;
+    }
+
+    bool quote = false;
+    for (size_t i = 0; i < size && !quote; i++) {
+        char c = text[i];
+        quote = c == ',' || c == '"' || c == '\n' || c == '\r';
+    }
+    if (!quote) {
+        row.append(text, size);
+        return;
+    }
+    row += '"';
+    for (size_t i = 0; i < size; i++) {
+        if (text[i] == '"') row += '"';
+        row += text[i];
+    }
+    row += '"';
+}
+
+void CsvWriter::formatRow(const ParsedStruct& record, std::string& row) const {
+    bool first_cell = true;
+    for (const LeafColumn& leaf : leaves_) {
+        const uint8_t* bytes = leafValue(record, leaf).bytes();
+        // A joined text cell is quoted as a whole once its elements are in
+        bool joined_text = leaf.text && options_.join_arrays && leaf.values > 1 && options_.delimiter == ',';
+        size_t cell_start = 0;
+        for (size_t value = 0; value < leaf.values; value++) {
+            if (value == 0 || !options_.join_arrays) {
+                if (!first_cell) row += options_.delimiter;
+                first_cell = false;
+                cell_start = row.size();
+            } else {
+                row += options_.array_separator;
+            }
+
+            const uint8_t* item = bytes + value * leaf.width;
+            if (leaf.text) {
+                const char* text = reinterpret_cast<const char*>(item);
+                const void* end = std::memchr(text, '\0', leaf.width);
+                size_t size = end ? static_cast<const char*>(end) - text : leaf.width;
+                if (joined_text) {
+                    row.append(text, size);
+                } else {
+                    appendText(text, size, row);
+                }
+            } else {
+                appendNumber(leaf.type, item, row);
+            }
+        }
+        if (joined_text && row.find_first_of(",\"\n\r", cell_start) != std::string::npos) {
+            std::string cell = row.substr(cell_start);
+            row.resize(cell_start);
+            appendText(cell.data(), cell.size(), row);
+        }
+    }
+    row += '\n';
+}
+
+void CsvWriter::write(const ParsedStruct& record) {
+    formatRow(record, buffer_);
+    records_++;
+    flushIfFull();
+}
+
+void CsvWriter::writeFormatted(const std::string& rows, size_t count) {
+    buffer_ += rows;
+    records_ += count;
+    flushIfFull();
+}
+
+void CsvWriter::flushIfFull() {
+    if (buffer_.size() >= options_.buffer_size) {
+        out_.write(buffer_.data(), static_cast<std::streamsize>(buffer_.size()));
+        buffer_.clear();
+    }
+}
+
+void CsvWriter::finish() {
+    out_.write(buffer_.data(), static_cast<std::streamsize>(buffer_.size()));
+    buffer_.clear();
+    out_.flush();
+    if (!out_) {
+        throw std::runtime_error("Cannot write CSV output");
+    }
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,66 @@
+#ifndef CSV_WRITER_H
+#define CSV_WRITER_H
+
+#include "binary_parser.h"
+#include "leaf_columns.h"
+#include <ostream>
+#include <string>
+#include <vector>
+
+namespace binary_parser {
+
+struct StructInfo;
+
+struct CsvWriterOptions {
+    char delimiter = ',';           // '\t' for TSV
+    bool join_arrays = false;       // One cell per array instead of one column per element
+    char array_separator = ' ';     // Between the elements of a joined cell
+    size_t buffer_size = 1 << 20;   // Output is flushed in blocks of about this size
+};
+
+// Writes decoded records as delimited text, one row per record after a
+// header row of the schema's leaves (see leafColumns()). Arrays are exploded
+// into one column per element named like --fields paths, e.g.
+// "points[1].x", or with options.join_arrays kept in one cell. Numbers are
+// formatted with std::to_chars (shortest round-trip form for floating
+// point) and char arrays are written up to their first NUL. With a ','
+// delimiter, cells containing the delimiter, quotes or line breaks are
+// quoted as in RFC 4180; with any other delimiter, tabs, line breaks and
+// backslashes are escaped as \t, \n, \r and \\.
+class CsvWriter {
+public:
+    // struct_info must describe the records passed to write() and outlive
+    // the writer. The header row is written with the first flush.
+    CsvWriter(std::ostream& out, const StructInfo& struct_info,
+              const CsvWriterOptions& options = CsvWriterOptions());
+
+    void write(const ParsedStruct& record);
+
+    // Appends the row of a record to row without writing it; safe to call
+    // from several threads
+    void formatRow(const ParsedStruct& record, std::string& row) const;
+
+    // Rows produced by formatRow() for count records
+    void writeFormatted(const std::string& rows, size_t count);
+
+    // Writes the buffered rows and flushes the stream
+    void finish();
+
+    size_t records() const { return records_; }
+    const std::vector<std::string>& header() const { return header_; }
+
+private:
+    void appendText(const char* text, size_t size, std::string& row) const;
+    void flushIfFull();
+
+    std::ostream& out_;
+    CsvWriterOptions options_;
+    std::vector<LeafColumn> leaves_;
+    std::vector<std::string> header_;
+    std::string buffer_;  // Pending output, reused between flushes
+    size_t records_ = 0;
+};
+
+} // namespace binary_parser
+
+#endif // CSV_WRITER_H
\ No newline at end of file
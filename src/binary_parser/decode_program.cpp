@@ -0,0 +1,198 @@
+#include "decode_program.h"
+#include "byte_swap.h"
+#include <algorithm>
+#include <climits>
+#include <cstring>
+#include <stdexcept>
+
+namespace binary_parser {
+
+namespace {
+
+bool isSigned(FieldType type) {
+    return type == FieldType::INT8 || type == FieldType::INT16 ||
+           type == FieldType::INT32 || type == FieldType::INT64;
+}
+
+uint64_t lowMask(unsigned bits) {
+    return bits >= 64 ? ~0ULL : (1ULL << bits) - 1;
+}
+
+uint32_t checkedU32(size_t value, const std::string& path) {
+    if (value > UINT32_MAX) {
+        throw std::runtime_error("Field exceeds 4 GiB record limit: " + path);
+    }
+    return static_cast<uint32_t>(value);
+}
+
+template <unsigned Width>
+void runInstruction(const DecodeInstruction& in, const uint8_t* data, DecodedValue* out) {
+    const uint8_t* ptr = data + in.offset;
+    const uint32_t count = in.count;
+    const uint32_t stride = in.stride;
+    const bool swap = in.swap;
+
+    switch (in.op) {
+        case DecodeOp::UNSIGNED:
+            for (uint32_t n = 0; n < count; n++, ptr += stride) {
+                out[n].u = loadUnsigned(ptr, Width, swap);
+            }
+            break;
+        case DecodeOp::SIGNED:
+            for (uint32_t n = 0; n < count; n++, ptr += stride) {
+                uint64_t raw = loadUnsigned(ptr, Width, swap);
+                out[n].i = static_cast<int64_t>((raw ^ in.sign) - in.sign);
+            }
+            break;
+        case DecodeOp::FLOAT32:
+            for (uint32_t n = 0; n < count; n++, ptr += stride) {
+                uint32_t bits = static_cast<uint32_t>(loadUnsigned(ptr, 4, swap));
+                float value;
+                std::memcpy(&value, &bits, sizeof(value));
+                out[n].f = value;
+            }
+            break;
+        case DecodeOp::FLOAT64:
+            for (uint32_t n = 0; n < count; n++, ptr += stride) {
+                uint64_t bits = loadUnsigned(ptr, 8, swap);
+                std::memcpy(&out[n].f, &bits, sizeof(double));
+            }
+            break;
+        case DecodeOp::BITS_UNSIGNED:
+            for (uint32_t n = 0; n < count; n++, ptr += stride) {
+                out[n].u = (loadUnsigned(ptr, Width, swap) >> in.shift) & in.mask;
+            }
+            break;
+        case DecodeOp::BITS_SIGNED:
+            for (uint32_t n = 0; n < count; n++, ptr += stride) {
+                uint64_t value = (loadUnsigned(ptr, Width, swap) >> in.shift) & in.mask;
+                out[n].i = static_cast<int64_t>((value ^ in.sign) - in.sign);
+            }
+            break;
+    }
+}
+
+} // namespace
+
+DecodeProgram DecodeProgram::compile(const StructInfo& struct_info, Endianness endianness,
+                                     bool union_members) {
+    DecodeProgram program;
+    program.swaps_ = ByteSwaps(endianness);
+    program.union_members_ = union_members;
+    program.record_size_ = struct_info.size;
+    program.compileFields(struct_info.fields, 0, "");
+    return program;
+}
+
+void DecodeProgram::compileFields(const FieldList& fields, size_t base_offset,
+                                  const std::string& prefix) {
+    for (const FieldInfo& field : fields) {
+        compileField(field, base_offset, std::string(prefix).append(field.name));
+    }
+}
+
+void DecodeProgram::compileField(const FieldInfo& field, size_t base_offset, const std::string& path) {
+    if (field.type == FieldType::UNION && !union_members_) return;
+
+    size_t offset = base_offset + field.offset;
+    bool aggregate = field.type == FieldType::STRUCT || field.type == FieldType::UNION ||
+                     field.type == FieldType::UNKNOWN;
+
+    if (field.array_size > 1 && aggregate) {
+        // Arrays of structs are unrolled; elements without a layout carry no data
+        size_t element_size = field.size / field.array_size;
+        for (size_t i = 0; i < field.array_size && !field.sub_fields.empty(); i++) {
+            compileFields(field.sub_fields, offset + i * element_size,
+                          path + "[" + std::to_string(i) + "].");
+        }
+    } else if (field.type == FieldType::STRUCT || field.type == FieldType::UNION) {
+        compileFields(field.sub_fields, offset, path + ".");
+    } else {
+        addLeaf(field, offset, path);
+    }
+}
+
+void DecodeProgram::addLeaf(const FieldInfo& field, size_t offset, const std::string& path) {
+    unsigned type_width = fieldTypeWidth(field.type);
+    if (type_width == 0) {
+        throw std::runtime_error("Unsupported field type: " + path);
+    }
+
+    DecodeInstruction in{};
+    in.offset = checkedU32(offset, path);
+    in.slot = checkedU32(slot_count_, path);
+    in.count = checkedU32(std::max<size_t>(field.array_size, 1), path);
+    in.swap = swaps_[field.byte_order];
+
+    if (field.bits > 0) {
+        if (field.type == FieldType::FLOAT || field.type == FieldType::DOUBLE) {
+            throw std::runtime_error("Unsupported bitfield type: " + path);
+        }
+        if (field.size != 1 && field.size != 2 && field.size != 4 && field.size != 8) {
+            throw std::runtime_error("Unsupported bitfield size: " + path);
+        }
+        // Values are truncated to the declared type, as the tree parser does
+        unsigned bits = std::min<unsigned>(static_cast<unsigned>(field.bits), type_width * 8);
+        in.width = static_cast<uint8_t>(field.size);
+        in.stride = in.width;
+        in.shift = static_cast<uint8_t>(field.bit_offset);
+        in.mask = lowMask(bits);
+        if (isSigned(field.type)) {
+            in.op = DecodeOp::BITS_SIGNED;
+            in.sign = 1ULL << (bits - 1);
+        } else {
+            in.op = DecodeOp::BITS_UNSIGNED;
+        }
+    } else {
+        in.width = static_cast<uint8_t>(type_width);
+        in.stride = checkedU32(field.array_size > 1 ? field.size / field.array_size : type_width, path);
+        if (field.type == FieldType::FLOAT) {
+            in.op = DecodeOp::FLOAT32;
+        } else if (field.type == FieldType::DOUBLE) {
+            in.op = DecodeOp::FLOAT64;
+        } else if (isSigned(field.type)) {
+            in.op = DecodeOp::SIGNED;
+            in.sign = 1ULL << (type_width * 8 - 1);
+        } else {
+            in.op = DecodeOp::UNSIGNED;
+        }
+    }
+
+    size_t end = offset + static_cast<size_t>(in.count - 1) * in.stride + in.width;
+    extent_ = std::max(extent_, end);
+
+    leaf_index_[path] = leaves_.size();
+    leaves_.push_back(DecodeLeaf{path, field.type, in.slot, in.count, field.bits});
+    instructions_.push_back(in);
+    slot_count_ += in.count;
+}
+
+void DecodeProgram::run(const uint8_t* data, DecodedValue* slots) const {
+    for (const DecodeInstruction& in : instructions_) {
+        DecodedValue* out = slots + in.slot;
+        switch (in.width) {
+            case 1: runInstruction<1>(in, data, out); break;
+            case 2: runInstruction<2>(in, data, out); break;
+            case 4: runInstruction<4>(in, data, out); break;
+            default: runInstruction<8>(in, data, out); break;
+        }
+    }
+}
+
+void DecodeProgram::decode(const uint8_t* data, size_t data_size,
+                           std::vector<DecodedValue>& slots) const {
+    if (data_size < std::max(record_size_, extent_)) {
+        throw std::runtime_error("Data size is smaller than struct size");
+    }
+    if (slots.size() < slot_count_) {
+        slots.resize(slot_count_);
+    }
+    run(data, slots.data());
+}
+
+const DecodeLeaf* DecodeProgram::findLeaf(const std::string& path) const {
+    auto it = leaf_index_.find(path);
+    return it == leaf_index_.end() ? nullptr : &leaves_[it->second];
+}
+
+} // namespace binary_parser
\ No newline at end of file
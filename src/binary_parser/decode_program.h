@@ -0,0 +1,111 @@
+#ifndef DECODE_PROGRAM_H
+#define DECODE_PROGRAM_H
+
+#include "binary_parser.h"
+#include "xml_struct_parser.h"
+#include <string>
+#include <vector>
+#include <unordered_map>
+#include <cstdint>
+
+namespace binary_parser {
+
+// One decoded value. Which member is valid follows from the type of the
+// leaf that owns the slot: unsigned types use u, signed types i and
+// floating point types f.
+union DecodedValue {
+    uint64_t u;
+    int64_t i;
+    double f;
+};
+
+enum class DecodeOp : uint8_t {
+    UNSIGNED,       // Zero-extended integer
+    SIGNED,         // Sign-extended integer
+    FLOAT32,
+    FLOAT64,
+    BITS_UNSIGNED,  // (value >> shift) & mask
+    BITS_SIGNED     // As above, then sign-extended from the top bit of mask
+};
+
+struct DecodeInstruction {
+    uint32_t offset;  // Byte offset of the first element within the record
+    uint32_t slot;    // First output slot
+    uint32_t count;   // Number of elements (1 for scalars)
+    uint32_t stride;  // Bytes between consecutive elements
+    uint8_t width;    // Load width: 1, 2, 4 or 8 bytes
+    DecodeOp op;
+    bool swap;        // Byte-swap after loading
+    uint8_t shift;    // Bitfields only
+    uint64_t mask;    // Bitfields only
+    uint64_t sign;    // Bitfields only: top bit of mask
+};
+
+// A decoded value as seen by consumers of a program
+struct DecodeLeaf {
+    std::string path;   // e.g. "header.seq", "items[2].value"
+    FieldType type;
+    uint32_t slot;      // First slot
+    uint32_t count;     // Array size (1 for scalars)
+    int bits;           // Bitfield width, 0 otherwise
+};
+
+// StructInfo lowered to a linear list of load instructions.
+//
+// Nested structs and arrays of structs are flattened at compile time into
+// absolute offsets, so decoding a record is a single loop over the
+// instructions with no recursion, no allocation and no type erasure. Each
+// leaf value is written to a fixed slot of a caller-provided array.
+//
+// BinaryParser does not run programs: its results keep the record's shape
+// (tagged union selection, per-member columns, in-place refills). Programs
+// serve code that needs fixed loads for individual fields, such as
+// RecordFilter and SchemaRegistry.
+class DecodeProgram {
+public:
+    // Union members overlap, so a program cannot know which one holds data.
+    // They are left out unless union_members is set, in which case every
+    // member is compiled and reads the shared bytes as in C.
+    static DecodeProgram compile(const StructInfo& struct_info,
+                                 Endianness endianness = Endianness::LITTLE,
+                                 bool union_members = false);
+
+    // Decode one record. data must hold at least extent() bytes.
+    void run(const uint8_t* data, DecodedValue* slots) const;
+
+    // Bounds-checked wrapper around run(); resizes slots as needed
+    void decode(const uint8_t* data, size_t data_size, std::vector<DecodedValue>& slots) const;
+
+    const std::vector<DecodeInstruction>& instructions() const { return instructions_; }
+    const std::vector<DecodeLeaf>& leaves() const { return leaves_; }
+
+    // Returns nullptr if no leaf has this path
+    const DecodeLeaf* findLeaf(const std::string& path) const;
+
+    // The instruction that produces a leaf of this program
+    const DecodeInstruction& instructionFor(const DecodeLeaf& leaf) const {
+        return instructions_[static_cast<size_t>(&leaf - leaves_.data())];
+    }
+
+    size_t slotCount() const { return slot_count_; }
+    size_t recordSize() const { return record_size_; }
+    size_t extent() const { return extent_; }  // Bytes read from each record
+
+private:
+    void compileFields(const FieldList& fields, size_t base_offset, const std::string& prefix);
+    void compileField(const FieldInfo& field, size_t base_offset, const std::string& path);
+    void addLeaf(const FieldInfo& field, size_t offset, const std::string& path);
+
+    std::vector<DecodeInstruction> instructions_;
+    std::vector<DecodeLeaf> leaves_;
+    std::unordered_map<std::string, size_t> leaf_index_;
+    size_t slot_count_ = 0;
+    size_t record_size_ = 0;
+    size_t extent_ = 0;
+    ByteSwaps swaps_;
+    bool union_members_ = false;
+};
+
+} // namespace binary_parser
+
+#endif // DECODE_PROGRAM_H
\ No newline at end of file
@@ -0,0 +1,138 @@
+#include "field_value.h"
+
+namespace binary_parser {
+
+size_t valueTypeWidth(ValueType type) {
+    switch (type) {
+        case ValueType::UINT8:
+        case ValueType::INT8:
+            return 1;
+        case ValueType::UINT16:
+        case ValueType::INT16:
+            return 2;
+        case ValueType::UINT32:
+        case ValueType::INT32:
+        case ValueType::FLOAT:
+            return 4;
+        case ValueType::UINT64:
+        case ValueType::INT64:
+        case ValueType::DOUBLE:
+            return 8;
+        default:
+            return 0;
+    }
+}
+
+const char* valueTypeName(ValueType type) {
+    switch (type) {
+        case ValueType::UINT8: return "uint8_t";
+        case ValueType::INT8: return "int8_t";
+        case ValueType::UINT16: return "uint16_t";
+        case ValueType::INT16: return "int16_t";
+        case ValueType::UINT32: return "uint32_t";
+        case ValueType::INT32: return "int32_t";
+        case ValueType::UINT64: return "uint64_t";
+        case ValueType::INT64: return "int64_t";
+        case ValueType::FLOAT: return "float";
+        case ValueType::DOUBLE: return "double";
+        default: return "null";
+    }
+}
+
+FieldValue FieldValue::array(ValueType type, size_t count, uint8_t** data) {
+    FieldValue value;
+    *data = value.initArray(type, count);
+    return value;
+}
+
+uint8_t* FieldValue::assignArray(ValueType type, size_t count) {
+    if (is_array_ && type_ == type && size_ == count) {
+        return const_cast<uint8_t*>(bytes());
+    }
+    release();
+    return initArray(type, count);
+}
+
+uint8_t* FieldValue::initArray(ValueType type, size_t count) {
+    type_ = type;
+    is_array_ = true;
+    size_ = count;
+    size_t bytes = count * valueTypeWidth(type);
+    if (bytes > kInlineBytes) {
+        storage_.heap = new uint8_t[bytes];
+        return storage_.heap;
+    }
+    return storage_.bytes;
+}
+
+void FieldValue::release() {
+    if (is_array_ && size_ * valueTypeWidth(type_) > kInlineBytes) {
+        delete[] storage_.heap;
+    }
+    type_ = ValueType::NONE;
+    is_array_ = false;
+    size_ = 0;
+}
+
+FieldValue::FieldValue(const FieldValue& other) {
+    *this = other;
+}
+
+FieldValue::FieldValue(FieldValue&& other) noexcept {
+    *this = std::move(other);
+}
+
+FieldValue& FieldValue::operator=(const FieldValue& other) {
+    if (this == &other) return *this;
+    release();
+    if (other.is_array_) {
+        std::memcpy(initArray(other.type_, other.size_), other.bytes(), other.size_ * valueTypeWidth(other.type_));
+    } else {
+        type_ = other.type_;
+        storage_ = other.storage_;
+    }
+    return *this;
+}
+
+FieldValue& FieldValue::operator=(FieldValue&& other) noexcept {
+    if (this == &other) return *this;
+    release();
+    type_ = other.type_;
+    is_array_ = other.is_array_;
+    size_ = other.size_;
+    storage_ = other.storage_;
+    // The heap block, if any, now belongs to this value
+    other.type_ = ValueType::NONE;
+    other.is_array_ = false;
+    other.size_ = 0;
+    return *this;
+}
+
+FieldValue FieldValue::at(size_t index) const {
+    if (!is_array_ || index >= size_) {
+        throw std::out_of_range("Field value index " + std::to_string(index) + " out of range");
+    }
+    FieldValue value;
+    value.type_ = type_;
+    std::memcpy(value.storage_.bytes, bytes() + index * valueTypeWidth(type_), valueTypeWidth(type_));
+    return value;
+}
+
+FieldValue FieldValue::slice(size_t first, size_t count) const {
+    if (!is_array_ || first > size_ || count > size_ - first) {
+        throw std::out_of_range("Field value slice " + std::to_string(first) + "+" + std::to_string(count) +
+                                " out of range");
+    }
+    size_t width = valueTypeWidth(type_);
+    FieldValue value;
+    std::memcpy(value.initArray(type_, count), bytes() + first * width, count * width);
+    return value;
+}
+
+std::string FieldValue::mismatch(ValueType requested, bool array) const {
+    std::string held = hasValue() ? valueTypeName(type_) : "no value";
+    if (is_array_) held += "[]";
+    return std::string("Field value is ") + held + ", not " + valueTypeName(requested) + (array ? "[]" : "");
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,154 @@
+#ifndef FIELD_VALUE_H
+#define FIELD_VALUE_H
+
+#include <cstdint>
+#include <cstddef>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+#include <type_traits>
+#include <vector>
+
+namespace binary_parser {
+
+// Element type of a FieldValue
+enum class ValueType : uint8_t {
+    NONE,
+    UINT8,
+    INT8,
+    UINT16,
+    INT16,
+    UINT32,
+    INT32,
+    UINT64,
+    INT64,
+    FLOAT,
+    DOUBLE
+};
+
+// ValueType of a C++ type; NONE for anything that cannot be stored
+template <typename T> constexpr ValueType valueTypeOf() { return ValueType::NONE; }
+template <> constexpr ValueType valueTypeOf<uint8_t>() { return ValueType::UINT8; }
+template <> constexpr ValueType valueTypeOf<int8_t>() { return ValueType::INT8; }
+template <> constexpr ValueType valueTypeOf<uint16_t>() { return ValueType::UINT16; }
+template <> constexpr ValueType valueTypeOf<int16_t>() { return ValueType::INT16; }
+template <> constexpr ValueType valueTypeOf<uint32_t>() { return ValueType::UINT32; }
+template <> constexpr ValueType valueTypeOf<int32_t>() { return ValueType::INT32; }
+template <> constexpr ValueType valueTypeOf<uint64_t>() { return ValueType::UINT64; }
+template <> constexpr ValueType valueTypeOf<int64_t>() { return ValueType::INT64; }
+template <> constexpr ValueType valueTypeOf<float>() { return ValueType::FLOAT; }
+template <> constexpr ValueType valueTypeOf<double>() { return ValueType::DOUBLE; }
+
+// Bytes per element; 0 for NONE
+size_t valueTypeWidth(ValueType type);
+
+// C type name, e.g. "uint16_t"
+const char* valueTypeName(ValueType type);
+
+// Read-only view of an array held by a FieldValue
+template <typename T>
+class ArrayView {
+public:
+    ArrayView(const T* data, size_t size) : data_(data), size_(size) {}
+
+    const T* data() const { return data_; }
+    size_t size() const { return size_; }
+    bool empty() const { return size_ == 0; }
+    const T& operator[](size_t index) const { return data_[index]; }
+    const T* begin() const { return data_; }
+    const T* end() const { return data_ + size_; }
+
+private:
+    const T* data_;
+    size_t size_;
+};
+
+// Decoded value of a primitive field: a scalar or an array of one
+// primitive type, tagged with its ValueType. Scalars and arrays of up to
+// kInlineBytes bytes are stored inline; longer arrays own one heap block.
+class FieldValue {
+public:
+    static constexpr size_t kInlineBytes = 16;
+
+    FieldValue() = default;
+
+    template <typename T, typename = std::enable_if_t<valueTypeOf<T>() != ValueType::NONE>>
+    FieldValue(T value) : type_(valueTypeOf<T>()) {
+        std::memcpy(storage_.bytes, &value, sizeof(T));
+    }
+
+    template <typename T, typename = std::enable_if_t<valueTypeOf<T>() != ValueType::NONE>>
+    FieldValue(const std::vector<T>& values) {
+        std::memcpy(initArray(valueTypeOf<T>(), values.size()), values.data(), values.size() * sizeof(T));
+    }
+
+    FieldValue(const FieldValue& other);
+    FieldValue(FieldValue&& other) noexcept;
+    FieldValue& operator=(const FieldValue& other);
+    FieldValue& operator=(FieldValue&& other) noexcept;
+    ~FieldValue() { release(); }
+
+    // An array of count elements of type, to be filled through the returned
+    // pointer (count * valueTypeWidth(type) bytes)
+    static FieldValue array(ValueType type, size_t count, uint8_t** data);
+    
+    // Turns this value into an array of count elements of type, to be filled
+    // through the returned pointer. An array of the same type and size keeps
+    // its storage, so refilling a value for every record does not allocate.
+    uint8_t* assignArray(ValueType type, size_t count);
+
+    ValueType type() const { return type_; }
+    bool isArray() const { return is_array_; }
+    bool hasValue() const { return type_ != ValueType::NONE; }
+
+    // Number of array elements; 1 for a scalar, 0 for an empty value
+    size_t size() const { return is_array_ ? size_ : (hasValue() ? 1 : 0); }
+
+    // The scalar as T; throws if the value holds anything else
+    template <typename T>
+    T get() const {
+        if (type_ != valueTypeOf<T>() || is_array_) {
+            throw std::runtime_error(mismatch(valueTypeOf<T>(), false));
+        }
+        T value;
+        std::memcpy(&value, storage_.bytes, sizeof(T));
+        return value;
+    }
+
+    // The array elements as T; throws if the value holds anything else
+    template <typename T>
+    ArrayView<T> elements() const {
+        if (type_ != valueTypeOf<T>() || !is_array_) {
+            throw std::runtime_error(mismatch(valueTypeOf<T>(), true));
+        }
+        return ArrayView<T>(reinterpret_cast<const T*>(bytes()), size_);
+    }
+
+    // Element index of an array as a scalar
+    FieldValue at(size_t index) const;
+
+    // count array elements starting at first, as an array
+    FieldValue slice(size_t first, size_t count) const;
+
+    // Raw element bytes (host byte order)
+    const uint8_t* bytes() const {
+        return is_array_ && size_ * valueTypeWidth(type_) > kInlineBytes ? storage_.heap : storage_.bytes;
+    }
+
+private:
+    uint8_t* initArray(ValueType type, size_t count);
+    void release();
+    std::string mismatch(ValueType requested, bool array) const;
+
+    ValueType type_ = ValueType::NONE;
+    bool is_array_ = false;
+    size_t size_ = 0;  // Array element count
+    union Storage {
+        alignas(8) uint8_t bytes[kInlineBytes];  // Scalars and short arrays
+        uint8_t* heap;                           // Longer arrays
+    } storage_ = {};
+};
+
+} // namespace binary_parser
+
+#endif // FIELD_VALUE_H
\ No newline at end of file
@@ -1,7 +1,9 @@
 #include "json_converter.h"
-#include <typeinfo>
 #include <vector>
+#include <charconv>
+#include <cmath>
 #include <cstring>
+#include <type_traits>
 
 namespace binary_parser {
 
@@ -10,8 +12,8 @@ JsonValue JsonConverter::convert(const ParsedStruct& parsed_struct,
     // For simple output, just return the fields directly
     JsonValue result = JsonValue::createObject();
     
-    for (const auto& [field_name, field] : parsed_struct.fields) {
-        result.set(field_name, convertFieldSimple(field));
+    for (const ParsedField& field : parsed_struct.fields) {
+        result.set(field.name, convertFieldSimple(field));
     }
     
     return result;
@@ -24,19 +26,25 @@ JsonValue JsonConverter::convertField(const ParsedField& field,
     field_obj.set("name", JsonValue(field.name));
     
     // If it has sub_fields, it's a struct or union
-    if (!field.sub_fields.empty()) {
+    if (!field.sub_fields.empty() && field.array_size == 0) {
         JsonValue sub_fields_obj;
-        for (const auto& [sub_name, sub_field] : field.sub_fields) {
-            sub_fields_obj.set(sub_name, convertField(sub_field, options));
+        for (const ParsedField& sub_field : field.sub_fields) {
+            sub_fields_obj.set(sub_field.name, convertField(sub_field, options));
         }
         field_obj.set("sub_fields", sub_fields_obj);
+    } else if (field.array_size > 0) {
+        JsonValue elements = JsonValue::createArray();
+        for (size_t i = 0; i < field.array_size; i++) {
+            elements.pushBack(convertField(field.element(i), options));
+        }
+        field_obj.set("elements", elements);
     } else {
         // Convert the value
         field_obj.set("value", convertValue(field.value));
     }
     
     // Add type information if requested
-    if (options.include_type_info && field.value.has_value()) {
+    if (options.include_type_info && field.value.hasValue()) {
         field_obj.set("type", JsonValue(getTypeName(field.value)));
     }
     
@@ -44,11 +52,18 @@ JsonValue JsonConverter::convertField(const ParsedField& field,
 }
 
 JsonValue JsonConverter::convertFieldSimple(const ParsedField& field) {
-    // If it has sub_fields, it's a struct or union
-    if (!field.sub_fields.empty()) {
+    if (field.array_size > 0) {
+        // Array of structs/unions, read row by row from its columns
+        JsonValue arr = JsonValue::createArray();
+        for (size_t i = 0; i < field.array_size; i++) {
+            arr.pushBack(convertRow(field.sub_fields, i, field.array_size));
+        }
+        return arr;
+    } else if (!field.sub_fields.empty()) {
+        // If it has sub_fields, it's a struct or union
         JsonValue obj = JsonValue::createObject();
-        for (const auto& [sub_name, sub_field] : field.sub_fields) {
-            obj.set(sub_name, convertFieldSimple(sub_field));
+        for (const ParsedField& sub_field : field.sub_fields) {
+            obj.set(sub_field.name, convertFieldSimple(sub_field));
         }
         return obj;
     } else {
@@ -57,164 +72,258 @@ JsonValue JsonConverter::convertFieldSimple(const ParsedField& field) {
     }
 }
 
-JsonValue JsonConverter::convertValue(const std::any& value) {
-    if (!value.has_value()) {
-        return JsonValue();  // null
-    }
+JsonValue JsonConverter::convertRow(const ParsedFields& columns, size_t row, size_t rows) {
+    // Elements without members are null, like empty structs
+    if (columns.empty()) return JsonValue();
     
-    // Try to convert each possible type
-    try {
-        // Boolean types
-        if (value.type() == typeid(bool)) {
-            return JsonValue(std::any_cast<bool>(value));
-        }
-        
-        // Integer types
-        if (value.type() == typeid(uint8_t)) {
-            return JsonValue(static_cast<int>(std::any_cast<uint8_t>(value)));
-        }
-        if (value.type() == typeid(int8_t)) {
-            return JsonValue(static_cast<int>(std::any_cast<int8_t>(value)));
-        }
-        if (value.type() == typeid(uint16_t)) {
-            return JsonValue(static_cast<int>(std::any_cast<uint16_t>(value)));
-        }
-        if (value.type() == typeid(int16_t)) {
-            return JsonValue(static_cast<int>(std::any_cast<int16_t>(value)));
-        }
-        if (value.type() == typeid(uint32_t)) {
-            return JsonValue(static_cast<double>(std::any_cast<uint32_t>(value)));
-        }
-        if (value.type() == typeid(int32_t)) {
-            return JsonValue(static_cast<double>(std::any_cast<int32_t>(value)));
-        }
-        if (value.type() == typeid(uint64_t)) {
-            return JsonValue(static_cast<double>(std::any_cast<uint64_t>(value)));
-        }
-        if (value.type() == typeid(int64_t)) {
-            return JsonValue(static_cast<double>(std::any_cast<int64_t>(value)));
-        }
-        
-        // Floating point types
-        if (value.type() == typeid(float)) {
-            return JsonValue(static_cast<double>(std::any_cast<float>(value)));
-        }
-        if (value.type() == typeid(double)) {
-            return JsonValue(std::any_cast<double>(value));
-        }
-        
-        // Array types
-        if (value.type() == typeid(std::vector<uint8_t>)) {
-            auto vec = std::any_cast<std::vector<uint8_t>>(value);
-            
-            // Check if it's a char array (string)
-            if (isCharArray(vec)) {
-                return JsonValue(charArrayToString(vec));
-            }
-            
-            // Otherwise, convert as array
+    JsonValue obj = JsonValue::createObject();
+    for (const ParsedField& column : columns) {
+        if (column.array_size > 0) {
+            size_t count = column.array_size;
             JsonValue arr = JsonValue::createArray();
-            for (uint8_t val : vec) {
-                arr.pushBack(JsonValue(static_cast<int>(val)));
+            for (size_t i = 0; i < count; i++) {
+                arr.pushBack(convertRow(column.sub_fields, row * count + i, rows * count));
             }
-            return arr;
-        }
-        
-        if (value.type() == typeid(std::vector<uint16_t>)) {
-            auto vec = std::any_cast<std::vector<uint16_t>>(value);
-            JsonValue arr;
-            for (uint16_t val : vec) {
-                arr.pushBack(JsonValue(static_cast<int>(val)));
+            obj.set(column.name, arr);
+        } else if (!column.sub_fields.empty()) {
+            obj.set(column.name, convertRow(column.sub_fields, row, rows));
+        } else {
+            size_t per_row = column.value.size() / rows;
+            if (per_row == 0) {
+                obj.set(column.name, JsonValue());
+            } else if (per_row == 1) {
+                obj.set(column.name, convertValue(column.value.at(row)));
+            } else {
+                obj.set(column.name, convertValue(column.value.slice(row * per_row, per_row)));
             }
-            return arr;
         }
-        
-        if (value.type() == typeid(std::vector<uint32_t>)) {
-            auto vec = std::any_cast<std::vector<uint32_t>>(value);
-            JsonValue arr = JsonValue::createArray();
-            for (uint32_t val : vec) {
-                arr.pushBack(JsonValue(static_cast<double>(val)));
-            }
-            return arr;
+    }
+    return obj;
+}
+
+namespace {
+
+// JSON array of the elements of an array value
+template <typename T>
+JsonValue arrayOf(const FieldValue& value) {
+    JsonValue arr = JsonValue::createArray();
+    for (T element : value.elements<T>()) {
+        if constexpr (sizeof(T) <= 2 && std::is_integral_v<T>) {
+            arr.pushBack(JsonValue(static_cast<int>(element)));
+        } else {
+            arr.pushBack(JsonValue(static_cast<double>(element)));
         }
-        
-        if (value.type() == typeid(std::vector<uint64_t>)) {
-            auto vec = std::any_cast<std::vector<uint64_t>>(value);
-            JsonValue arr = JsonValue::createArray();
-            for (uint64_t val : vec) {
-                arr.pushBack(JsonValue(static_cast<double>(val)));
+    }
+    return arr;
+}
+
+} // namespace
+
+JsonValue JsonConverter::convertValue(const FieldValue& value) {
+    if (value.isArray()) {
+        switch (value.type()) {
+            case ValueType::UINT8: {
+                // Check if it's a char array (string)
+                ArrayView<uint8_t> bytes = value.elements<uint8_t>();
+                if (isCharArray(bytes)) {
+                    return JsonValue(charArrayToString(bytes));
+                }
+                return arrayOf<uint8_t>(value);
             }
-            return arr;
+            case ValueType::INT8: return arrayOf<int8_t>(value);
+            case ValueType::UINT16: return arrayOf<uint16_t>(value);
+            case ValueType::INT16: return arrayOf<int16_t>(value);
+            case ValueType::UINT32: return arrayOf<uint32_t>(value);
+            case ValueType::INT32: return arrayOf<int32_t>(value);
+            case ValueType::UINT64: return arrayOf<uint64_t>(value);
+            case ValueType::INT64: return arrayOf<int64_t>(value);
+            case ValueType::FLOAT: return arrayOf<float>(value);
+            case ValueType::DOUBLE: return arrayOf<double>(value);
+            default: return JsonValue();
         }
-        
-        if (value.type() == typeid(std::vector<float>)) {
-            auto vec = std::any_cast<std::vector<float>>(value);
-            JsonValue arr = JsonValue::createArray();
-            for (float val : vec) {
-                arr.pushBack(JsonValue(static_cast<double>(val)));
-            }
-            return arr;
+    }
+    
+    switch (value.type()) {
+        // Integer types
+        case ValueType::UINT8: return JsonValue(static_cast<int>(value.get<uint8_t>()));
+        case ValueType::INT8: return JsonValue(static_cast<int>(value.get<int8_t>()));
+        case ValueType::UINT16: return JsonValue(static_cast<int>(value.get<uint16_t>()));
+        case ValueType::INT16: return JsonValue(static_cast<int>(value.get<int16_t>()));
+        case ValueType::UINT32: return JsonValue(static_cast<double>(value.get<uint32_t>()));
+        case ValueType::INT32: return JsonValue(static_cast<double>(value.get<int32_t>()));
+        case ValueType::UINT64: return JsonValue(static_cast<double>(value.get<uint64_t>()));
+        case ValueType::INT64: return JsonValue(static_cast<double>(value.get<int64_t>()));
+        // Floating point types
+        case ValueType::FLOAT: return JsonValue(static_cast<double>(value.get<float>()));
+        case ValueType::DOUBLE: return JsonValue(value.get<double>());
+        default: return JsonValue();  // null
+    }
+}
+
+void JsonConverter::writeString(std::string_view text, std::string& out) {
+    static const char kHex[] = "0123456789abcdef";
+    out += '"';
+    for (size_t i = 0; i < text.size(); i++) {
+        char c = text[i];
+        switch (c) {
+            case '"': out += "\\\""; break;
+            case '\\': out += "\\\\"; break;
+            case '\b': out += "\\b"; break;
+            case '\f': out += "\\f"; break;
+            case '\n': out += "\\n"; break;
+            case '\r': out += "\\r"; break;
+            case '\t': out += "\\t"; break;
+            default:
+                if ('\x00' <= c && c <= '\x1f') {
+                    out += "\\u00";
+                    out += kHex[(c >> 4) & 0xF];
+                    out += kHex[c & 0xF];
+                } else {
+                    out += c;
+                }
         }
-        
-        if (value.type() == typeid(std::vector<double>)) {
-            auto vec = std::any_cast<std::vector<double>>(value);
-            JsonValue arr = JsonValue::createArray();
-            for (double val : vec) {
-                arr.pushBack(JsonValue(val));
+    }
+    out += '"';
+}
+
+namespace {
+
+template <typename T>
+void writeNumber(const uint8_t* bytes, std::string& out) {
+    T value;
+    std::memcpy(&value, bytes, sizeof(T));
+    if constexpr (std::is_floating_point_v<T>) {
+        if (!std::isfinite(value)) {
+            out += "null";
+            return;
+        }
+    }
+    // Enough for any 64-bit integer and the shortest form of any double
+    char text[32];
+    auto result = std::to_chars(text, text + sizeof(text), value);
+    out.append(text, result.ptr);
+}
+
+template <typename T>
+void writeNumbers(const uint8_t* bytes, size_t count, bool array, std::string& out) {
+    if (array) out += '[';
+    for (size_t i = 0; i < count; i++) {
+        if (i > 0) out += ',';
+        writeNumber<T>(bytes + i * sizeof(T), out);
+    }
+    if (array) out += ']';
+}
+
+} // namespace
+
+void JsonConverter::write(const ParsedStruct& parsed_struct, std::string& out) {
+    out += '{';
+    for (size_t i = 0; i < parsed_struct.fields.size(); i++) {
+        const ParsedField& field = parsed_struct.fields[i];
+        if (i > 0) out += ',';
+        writeString(field.name, out);
+        out += ':';
+        writeField(field, out);
+    }
+    out += '}';
+}
+
+void JsonConverter::writeField(const ParsedField& field, std::string& out) {
+    if (field.array_size > 0) {
+        out += '[';
+        for (size_t i = 0; i < field.array_size; i++) {
+            if (i > 0) out += ',';
+            writeRow(field.sub_fields, i, field.array_size, out);
+        }
+        out += ']';
+    } else if (!field.sub_fields.empty()) {
+        out += '{';
+        for (size_t i = 0; i < field.sub_fields.size(); i++) {
+            const ParsedField& sub_field = field.sub_fields[i];
+            if (i > 0) out += ',';
+            writeString(sub_field.name, out);
+            out += ':';
+            writeField(sub_field, out);
+        }
+        out += '}';
+    } else {
+        writeValue(field.value, 0, field.value.size(), field.value.isArray(), out);
+    }
+}
+
+void JsonConverter::writeRow(const ParsedFields& columns, size_t row, size_t rows, std::string& out) {
+    if (columns.empty()) {
+        out += "null";
+        return;
+    }
+    
+    out += '{';
+    for (size_t c = 0; c < columns.size(); c++) {
+        const ParsedField& column = columns[c];
+        if (c > 0) out += ',';
+        writeString(column.name, out);
+        out += ':';
+        if (column.array_size > 0) {
+            size_t count = column.array_size;
+            out += '[';
+            for (size_t i = 0; i < count; i++) {
+                if (i > 0) out += ',';
+                writeRow(column.sub_fields, row * count + i, rows * count, out);
             }
-            return arr;
+            out += ']';
+        } else if (!column.sub_fields.empty()) {
+            writeRow(column.sub_fields, row, rows, out);
+        } else {
+            size_t per_row = column.value.size() / rows;
+            writeValue(column.value, row * per_row, per_row, per_row > 1, out);
         }
-        
-        // Handle ParsedField arrays (for typedef arrays)
-        if (value.type() == typeid(std::vector<std::any>)) {
-            auto vec = std::any_cast<std::vector<std::any>>(value);
-            JsonValue arr = JsonValue::createArray();
-            for (const auto& elem : vec) {
-                if (elem.type() == typeid(ParsedField)) {
-                    arr.pushBack(convertFieldSimple(std::any_cast<ParsedField>(elem)));
-                } else {
-                    arr.pushBack(convertValue(elem));
-                }
+    }
+    out += '}';
+}
+
+void JsonConverter::writeValue(const FieldValue& value, size_t first, size_t count, bool array,
+                               std::string& out) {
+    if (count == 0) {
+        out += "null";
+        return;
+    }
+    const uint8_t* bytes = value.bytes() + first * valueTypeWidth(value.type());
+    switch (value.type()) {
+        case ValueType::UINT8: {
+            ArrayView<uint8_t> chars(bytes, count);
+            if (array && isCharArray(chars)) {
+                const void* end = std::memchr(bytes, '\0', count);
+                size_t size = end ? static_cast<const uint8_t*>(end) - bytes : count;
+                writeString(std::string_view(reinterpret_cast<const char*>(bytes), size), out);
+            } else {
+                writeNumbers<uint8_t>(bytes, count, array, out);
             }
-            return arr;
+            break;
         }
-        
-    } catch (const std::bad_any_cast& e) {
-        // If cast fails, return null
+        case ValueType::INT8: writeNumbers<int8_t>(bytes, count, array, out); break;
+        case ValueType::UINT16: writeNumbers<uint16_t>(bytes, count, array, out); break;
+        case ValueType::INT16: writeNumbers<int16_t>(bytes, count, array, out); break;
+        case ValueType::UINT32: writeNumbers<uint32_t>(bytes, count, array, out); break;
+        case ValueType::INT32: writeNumbers<int32_t>(bytes, count, array, out); break;
+        case ValueType::UINT64: writeNumbers<uint64_t>(bytes, count, array, out); break;
+        case ValueType::INT64: writeNumbers<int64_t>(bytes, count, array, out); break;
+        case ValueType::FLOAT: writeNumbers<float>(bytes, count, array, out); break;
+        case ValueType::DOUBLE: writeNumbers<double>(bytes, count, array, out); break;
+        default: out += "null"; break;
     }
-    
-    return JsonValue();  // Default to null
 }
 
-std::string JsonConverter::getTypeName(const std::any& value) {
-    if (!value.has_value()) return "null";
-    
-    if (value.type() == typeid(bool)) return "bool";
-    if (value.type() == typeid(uint8_t)) return "uint8_t";
-    if (value.type() == typeid(int8_t)) return "int8_t";
-    if (value.type() == typeid(uint16_t)) return "uint16_t";
-    if (value.type() == typeid(int16_t)) return "int16_t";
-    if (value.type() == typeid(uint32_t)) return "uint32_t";
-    if (value.type() == typeid(int32_t)) return "int32_t";
-    if (value.type() == typeid(uint64_t)) return "uint64_t";
-    if (value.type() == typeid(int64_t)) return "int64_t";
-    if (value.type() == typeid(float)) return "float";
-    if (value.type() == typeid(double)) return "double";
-    
-    if (value.type() == typeid(std::vector<uint8_t>)) {
-        auto vec = std::any_cast<std::vector<uint8_t>>(value);
-        return isCharArray(vec) ? "char[]" : "uint8_t[]";
-    }
-    if (value.type() == typeid(std::vector<uint16_t>)) return "uint16_t[]";
-    if (value.type() == typeid(std::vector<uint32_t>)) return "uint32_t[]";
-    if (value.type() == typeid(std::vector<uint64_t>)) return "uint64_t[]";
-    if (value.type() == typeid(std::vector<float>)) return "float[]";
-    if (value.type() == typeid(std::vector<double>)) return "double[]";
-    
-    return "unknown";
+std::string JsonConverter::getTypeName(const FieldValue& value) {
+    if (!value.isArray()) {
+        return valueTypeName(value.type());
+    }
+    if (value.type() == ValueType::UINT8 && isCharArray(value.elements<uint8_t>())) {
+        return "char[]";
+    }
+    return std::string(valueTypeName(value.type())) + "[]";
 }
 
-bool JsonConverter::isCharArray(const std::vector<uint8_t>& vec) {
+bool JsonConverter::isCharArray(ArrayView<uint8_t> vec) {
     if (vec.empty()) return false;
     
     // Check if it contains a null terminator within reasonable range
@@ -241,7 +350,7 @@ bool JsonConverter::isCharArray(const std::vector<uint8_t>& vec) {
     return vec.size() <= 1024 && printable_count >= vec.size() * 0.8;
 }
 
-std::string JsonConverter::charArrayToString(const std::vector<uint8_t>& vec) {
+std::string JsonConverter::charArrayToString(ArrayView<uint8_t> vec) {
     std::string result;
     for (uint8_t ch : vec) {
         if (ch == 0) break;  // Stop at null terminator
@@ -3,7 +3,8 @@
 
 #include "binary_parser.h"
 #include "../json/json_value.h"
-#include <any>
+#include <string>
+#include <string_view>
 
 namespace binary_parser {
 
@@ -20,6 +21,14 @@ public:
     JsonValue convert(const ParsedStruct& parsed_struct, 
                      const JsonConvertOptions& options = JsonConvertOptions());
     
+    // Append the compact JSON text of convert(parsed_struct) to out without
+    // building a JsonValue. Numbers are written exactly (shortest round-trip
+    // form for floating point) and non-finite values as null.
+    void write(const ParsedStruct& parsed_struct, std::string& out);
+    
+    // Append text to out as a quoted, escaped JSON string
+    static void writeString(std::string_view text, std::string& out);
+    
 private:
     // Convert ParsedField to JsonValue (complex version)
     JsonValue convertField(const ParsedField& field, const JsonConvertOptions& options);
@@ -27,17 +36,27 @@ private:
     // Convert ParsedField to JsonValue (simple version - just values)
     JsonValue convertFieldSimple(const ParsedField& field);
     
-    // Convert std::any value to JsonValue
-    JsonValue convertValue(const std::any& value);
+    // Object for element row of the columns of an array with rows elements
+    JsonValue convertRow(const ParsedFields& columns, size_t row, size_t rows);
+    
+    // Convert FieldValue to JsonValue
+    JsonValue convertValue(const FieldValue& value);
+    
+    // Text counterparts of convertFieldSimple, convertRow and convertValue;
+    // writeValue writes count elements of value from first, as an array if
+    // array is set
+    void writeField(const ParsedField& field, std::string& out);
+    void writeRow(const ParsedFields& columns, size_t row, size_t rows, std::string& out);
+    void writeValue(const FieldValue& value, size_t first, size_t count, bool array, std::string& out);
     
-    // Get type name from std::any
-    std::string getTypeName(const std::any& value);
+    // Get type name of a FieldValue
+    std::string getTypeName(const FieldValue& value);
     
-    // Check if vector contains char/uint8_t that represents a string
-    bool isCharArray(const std::vector<uint8_t>& vec);
+    // Check if a byte array represents a string
+    bool isCharArray(ArrayView<uint8_t> bytes);
     
     // Convert char array to string
-    std::string charArrayToString(const std::vector<uint8_t>& vec);
+    std::string charArrayToString(ArrayView<uint8_t> bytes);
 };
 
 } // namespace binary_parser
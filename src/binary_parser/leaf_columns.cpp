@@ -0,0 +1,72 @@
+#include "leaf_columns.h"
+#include "xml_struct_parser.h"
+#include <stdexcept>
+
+namespace binary_parser {
+
+namespace {
+
+void collectLeaves(const FieldList& fields, const std::string& prefix, std::vector<size_t>& shape,
+                   std::vector<uint32_t>& positions, std::vector<LeafColumn>& leaves) {
+    for (size_t i = 0; i < fields.size(); i++) {
+        const FieldInfo& field = fields[i];
+        std::string path = prefix.empty() ? std::string(field.name) : prefix + "." + std::string(field.name);
+        positions.push_back(static_cast<uint32_t>(i));
+        // Decoded as BinaryParser does: typedefs without a type are structs only in arrays
+        bool nested = field.type == FieldType::STRUCT || field.type == FieldType::UNION ||
+                      (field.type == FieldType::UNKNOWN && field.array_size > 1);
+
+        if (field.selector && field.array_size <= 1 && shape.empty()) {
+            throw std::runtime_error("Field " + path + " is a tagged union, which has no fixed columns");
+        }
+        if (nested) {
+            // Struct arrays add a dimension to every member
+            if (field.array_size > 1) shape.push_back(field.array_size);
+            collectLeaves(field.sub_fields, path, shape, positions, leaves);
+            if (field.array_size > 1) shape.pop_back();
+        } else {
+            LeafColumn leaf;
+            leaf.path = path;
+            leaf.type = valueTypeFor(field.type);
+            if (leaf.type == ValueType::NONE) {
+                throw std::runtime_error("Field " + path + " has no primitive type");
+            }
+            leaf.shape = shape;
+            leaf.width = valueTypeWidth(leaf.type);
+            if (field.array_size > 1 && field.type == FieldType::CHAR) {
+                leaf.text = true;
+                leaf.width = field.array_size;
+            } else if (field.array_size > 1) {
+                leaf.shape.push_back(field.array_size);
+            }
+            for (size_t dimension : leaf.shape) leaf.values *= dimension;
+            leaf.positions = positions;
+            leaves.push_back(std::move(leaf));
+        }
+        positions.pop_back();
+    }
+}
+
+} // namespace
+
+std::vector<LeafColumn> leafColumns(const StructInfo& struct_info) {
+    std::vector<LeafColumn> leaves;
+    std::vector<size_t> shape;
+    std::vector<uint32_t> positions;
+    collectLeaves(struct_info.fields, std::string(), shape, positions, leaves);
+    return leaves;
+}
+
+const FieldValue& leafValue(const ParsedStruct& record, const LeafColumn& leaf) {
+    // Arrays of structs keep one column per member in sub_fields, so the
+    // schema positions lead to the member's values for every element
+    const ParsedField* field = record.find(leaf.positions);
+    size_t bytes = leaf.values * leaf.width;
+    if (!field || valueTypeWidth(field->value.type()) * field->value.size() != bytes ||
+        (!leaf.text && field->value.type() != leaf.type)) {
+        throw std::runtime_error("Field " + leaf.path + " does not match the schema");
+    }
+    return field->value;
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,38 @@
+#ifndef LEAF_COLUMNS_H
+#define LEAF_COLUMNS_H
+
+#include "binary_parser.h"
+#include <cstdint>
+#include <cstddef>
+#include <string>
+#include <vector>
+
+namespace binary_parser {
+
+struct StructInfo;
+
+// A primitive leaf of a schema flattened for column-per-leaf exports.
+// Members of arrays of structs are single leaves with the array as a
+// dimension, e.g. "points.x" with shape {4} for Point points[4].
+struct LeafColumn {
+    std::string path;                // Dotted path, e.g. "header.seq" or "points.x"
+    ValueType type = ValueType::NONE;
+    bool text = false;               // char array: one string of width bytes per value
+    size_t width = 0;                // Bytes per value (per string for text)
+    std::vector<size_t> shape;       // Dimensions per record: enclosing struct arrays, then the field's own array
+    size_t values = 1;               // Values per record (product of shape)
+    std::vector<uint32_t> positions; // For ParsedStruct::find()
+};
+
+// Leaves of the schema in declaration order. Throws if a field has no
+// primitive type to store or is a tagged union (outside arrays of
+// structs), whose members vary from record to record.
+std::vector<LeafColumn> leafColumns(const StructInfo& struct_info);
+
+// The leaf's data in a decoded record: values * width bytes in host byte
+// order. Throws if the record does not match the schema.
+const FieldValue& leafValue(const ParsedStruct& record, const LeafColumn& leaf);
+
+} // namespace binary_parser
+
+#endif // LEAF_COLUMNS_H
\ No newline at end of file
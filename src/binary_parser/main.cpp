@@ -2,92 +2,677 @@
 #include <fstream>
 #include <vector>
 #include <iomanip>
+#include <limits>
+#include <unordered_map>
 #include "xml_struct_parser.h"
 #include "binary_parser.h"
 #include "json_converter.h"
+#include "schema_cache.h"
+#include "schema_registry.h"
+#include "mapped_file.h"
+#include "record_reader.h"
+#include "parallel_parser.h"
+#include "schema_projection.h"
+#include "record_filter.h"
+#include "arrow_writer.h"
+#include "npy_writer.h"
+#include "csv_writer.h"
 #include "../json/json_value.h"
+#include <filesystem>
+#include <thread>
+#ifdef _WIN32
+#include <fcntl.h>
+#include <io.h>
+#endif
+
+enum class OutputFormat {
+    TEXT,
+    JSON,
+    ARROW,         // Arrow IPC file
+    ARROW_STREAM,  // Arrow IPC stream
+    NPY,           // Directory of .npy files
+    CSV,
+    TSV,
+    NDJSON         // One JSON object per line
+};
+
+struct Options {
+    binary_parser::Endianness endianness = binary_parser::Endianness::LITTLE;
+    OutputFormat format = OutputFormat::TEXT;
+    bool pretty_print = false;
+    std::string output_file;
+    bool use_schema_cache = true;
+    std::string discriminator;
+    bool check_bounds = false;
+    std::string fields;  // Comma-separated field paths to decode; empty for all
+    std::string where;   // Record filter expression; empty for all records
+    
+    // Record-stream mode
+    bool records = false;
+    size_t count = std::numeric_limits<size_t>::max();
+    size_t offset = 0;
+    size_t stride = 0;  // 0: struct size
+    size_t threads = 1;
+    size_t batch_size = 65536;  // Records per Arrow record batch
+    bool join_arrays = false;   // CSV/TSV: one cell per array
+};
 
 void printUsage(const char* program_name) {
     std::cout << "Usage: " << program_name << " <xml_file> <binary_file> [options]\n";
+    std::cout << "       " << program_name << " <schema_dir> <binary_file> --discriminator <path> [options]\n";
     std::cout << "  xml_file    : XML struct definition file\n";
-    std::cout << "  binary_file : Binary data file to parse\n";
+    std::cout << "  schema_dir  : Directory of XML schemas for a stream of mixed records\n";
+    std::cout << "  binary_file : Binary data file to parse ('-' reads from stdin)\n";
     std::cout << "\nOptions:\n";
     std::cout << "  --big-endian, -b  : Parse as big-endian (default: little-endian)\n";
     std::cout << "  --json            : Output as JSON format\n";
     std::cout << "  --pretty          : Pretty print JSON output\n";
+    std::cout << "  --format <fmt>    : Output format: text (default), json, arrow (IPC file), arrow-stream,\n";
+    std::cout << "                      npy (one .npy file per field in the -o directory), csv, tsv,\n";
+    std::cout << "                      ndjson (one JSON object per line)\n";
+    std::cout << "  --batch-size <n>  : Records per Arrow record batch (default: 65536)\n";
+    std::cout << "  --join-arrays     : CSV/TSV: write each array in one cell instead of a column per element\n";
     std::cout << "  -o <file>         : Output to file instead of stdout\n";
+    std::cout << "  --no-schema-cache : Always parse the XML file (skip the schema cache)\n";
+    std::cout << "  --discriminator <path> : Field selecting the schema of each record (with schema_dir)\n";
+    std::cout << "  --check-bounds    : Check every field against the data size (debug)\n";
+    std::cout << "  --fields <paths>  : Decode only these fields, e.g. header.seq,samples[0..15]\n";
+    std::cout << "  --records         : Parse every record in the file, not just the first\n";
+    std::cout << "  --count <n>       : Parse at most n records (implies --records)\n";
+    std::cout << "  --offset <bytes>  : Start parsing at this byte offset\n";
+    std::cout << "  --stride <bytes>  : Distance between records (default: struct size, implies --records)\n";
+    std::cout << "  --threads <n>     : Decode records on n threads, 0 for one per core (implies --records)\n";
+    std::cout << "  --where <expr>    : Only output records matching expr, e.g. 'header.type == 3 && flags & 0x4'\n";
+    std::cout << "                      (implies --records)\n";
 }
 
-void printParsedField(const binary_parser::ParsedField& field, int indent = 0) {
-    std::string prefix(indent * 2, ' ');
+size_t parseSizeArgument(const std::string& option, const char* value) {
+    try {
+        size_t pos = 0;
+        unsigned long long result = std::stoull(value, &pos, 0);
+        if (value[pos] == '\0') {
+            return static_cast<size_t>(result);
+        }
+    } catch (const std::exception&) {
+    }
+    throw std::runtime_error("Invalid value for " + option + ": " + value);
+}
+
+OutputFormat parseFormatArgument(const std::string& value) {
+    if (value == "text") return OutputFormat::TEXT;
+    if (value == "json") return OutputFormat::JSON;
+    if (value == "arrow") return OutputFormat::ARROW;
+    if (value == "arrow-stream") return OutputFormat::ARROW_STREAM;
+    if (value == "npy") return OutputFormat::NPY;
+    if (value == "csv") return OutputFormat::CSV;
+    if (value == "tsv") return OutputFormat::TSV;
+    if (value == "ndjson") return OutputFormat::NDJSON;
+    throw std::runtime_error("Unknown output format: " + value);
+}
+
+// Formats written column by column from records in input order
+bool isColumnarFormat(OutputFormat format) {
+    return format == OutputFormat::ARROW || format == OutputFormat::ARROW_STREAM || format == OutputFormat::NPY;
+}
+
+// Formats with one row per record under a header row of the schema's leaves
+bool isDelimitedFormat(OutputFormat format) {
+    return format == OutputFormat::CSV || format == OutputFormat::TSV;
+}
+
+binary_parser::MappedFile openBinaryFile(const char* binary_file, binary_parser::MappedFile::Access access) {
+    try {
+        return binary_parser::MappedFile(binary_file, access);
+    } catch (const std::runtime_error&) {
+        throw std::runtime_error(std::string("Cannot open binary file: ") + binary_file);
+    }
+}
+
+bool writeJson(const JsonValue& json, bool pretty_print, const std::string& output_file) {
+    std::string json_str = json.toString(pretty_print);
     
-    if (!field.sub_fields.empty()) {
-        std::cout << prefix << field.name << ":\n";
-        for (const auto& [name, sub_field] : field.sub_fields) {
-            printParsedField(sub_field, indent + 1);
+    if (!output_file.empty()) {
+        // Write to file
+        std::ofstream out_file(output_file);
+        if (!out_file) {
+            std::cerr << "Error: Cannot create output file: " << output_file << "\n";
+            return false;
         }
+        out_file << json_str << "\n";
     } else {
-        std::cout << prefix << field.name << " = ";
-        
-        // Try to print value as different types
-        try {
-            if (field.value.type() == typeid(uint8_t)) {
-                std::cout << "0x" << std::hex << std::setw(2) << std::setfill('0') 
-                          << static_cast<int>(std::any_cast<uint8_t>(field.value));
-            } else if (field.value.type() == typeid(uint16_t)) {
-                std::cout << "0x" << std::hex << std::setw(4) << std::setfill('0') 
-                          << std::any_cast<uint16_t>(field.value);
-            } else if (field.value.type() == typeid(uint32_t)) {
-                std::cout << "0x" << std::hex << std::setw(8) << std::setfill('0') 
-                          << std::any_cast<uint32_t>(field.value);
-            } else if (field.value.type() == typeid(uint64_t)) {
-                std::cout << "0x" << std::hex << std::setw(16) << std::setfill('0') 
-                          << std::any_cast<uint64_t>(field.value);
-            } else if (field.value.type() == typeid(float)) {
-                std::cout << std::dec << std::any_cast<float>(field.value);
-            } else if (field.value.type() == typeid(double)) {
-                std::cout << std::dec << std::any_cast<double>(field.value);
-            } else if (field.value.type() == typeid(std::vector<uint8_t>)) {
-                auto vec = std::any_cast<std::vector<uint8_t>>(field.value);
-                std::cout << "[";
+        // Write to stdout
+        std::cout << json_str << "\n";
+    }
+    return true;
+}
+
+// Prints up to limit elements of a numeric array
+template <typename T>
+void printArray(std::ostream& out, const binary_parser::FieldValue& value, size_t limit = 10) {
+    binary_parser::ArrayView<T> vec = value.elements<T>();
+    out << "[";
+    for (size_t i = 0; i < vec.size() && i < limit; ++i) {
+        if (i > 0) out << ", ";
+        if constexpr (sizeof(T) == 1) {
+            out << static_cast<int>(vec[i]);
+        } else {
+            out << vec[i];
+        }
+    }
+    if (vec.size() > limit) out << ", ...";
+    out << "]";
+}
+
+void printParsedField(std::ostream& out, const binary_parser::ParsedField& field, int indent = 0) {
+    using binary_parser::ValueType;
+    std::string prefix(indent * 2, ' ');
+    
+    if (field.array_size > 0) {
+        out << prefix << field.name << ":\n";
+        for (size_t i = 0; i < field.array_size; i++) {
+            printParsedField(out, field.element(i), indent + 1);
+        }
+    } else if (!field.sub_fields.empty()) {
+        out << prefix << field.name << ":\n";
+        for (const binary_parser::ParsedField& sub_field : field.sub_fields) {
+            printParsedField(out, sub_field, indent + 1);
+        }
+    } else if (field.value.isArray()) {
+        out << prefix << field.name << " = ";
+        
+        switch (field.value.type()) {
+            case ValueType::UINT8: {
+                binary_parser::ArrayView<uint8_t> vec = field.value.elements<uint8_t>();
+                out << "[";
                 for (size_t i = 0; i < vec.size() && i < 16; ++i) {
-                    if (i > 0) std::cout << " ";
+                    if (i > 0) out << " ";
                     if (vec[i] >= 32 && vec[i] < 127) {
-                        std::cout << "'" << static_cast<char>(vec[i]) << "'";
+                        out << "'" << static_cast<char>(vec[i]) << "'";
                     } else {
-                        std::cout << "0x" << std::hex << std::setw(2) << std::setfill('0') 
-                                  << static_cast<int>(vec[i]);
+                        out << "0x" << std::hex << std::setw(2) << std::setfill('0') 
+                                  << static_cast<int>(vec[i]) << std::dec;
                     }
                 }
-                if (vec.size() > 16) std::cout << " ...";
-                std::cout << "]";
-            } else if (field.value.type() == typeid(std::vector<uint16_t>)) {
-                auto vec = std::any_cast<std::vector<uint16_t>>(field.value);
-                std::cout << "[";
-                for (size_t i = 0; i < vec.size() && i < 10; ++i) {
-                    if (i > 0) std::cout << ", ";
-                    std::cout << vec[i];
-                }
-                if (vec.size() > 10) std::cout << ", ...";
-                std::cout << "]";
-            } else if (field.value.type() == typeid(std::vector<uint32_t>)) {
-                auto vec = std::any_cast<std::vector<uint32_t>>(field.value);
-                std::cout << "[";
-                for (size_t i = 0; i < vec.size() && i < 10; ++i) {
-                    if (i > 0) std::cout << ", ";
-                    std::cout << vec[i];
-                }
-                if (vec.size() > 10) std::cout << ", ...";
-                std::cout << "]";
+                if (vec.size() > 16) out << " ...";
+                out << "]";
+                break;
+            }
+            case ValueType::INT8: printArray<int8_t>(out, field.value); break;
+            case ValueType::UINT16: printArray<uint16_t>(out, field.value); break;
+            case ValueType::INT16: printArray<int16_t>(out, field.value); break;
+            case ValueType::UINT32: printArray<uint32_t>(out, field.value); break;
+            case ValueType::INT32: printArray<int32_t>(out, field.value); break;
+            case ValueType::UINT64: printArray<uint64_t>(out, field.value); break;
+            case ValueType::INT64: printArray<int64_t>(out, field.value); break;
+            case ValueType::FLOAT: printArray<float>(out, field.value); break;
+            case ValueType::DOUBLE: printArray<double>(out, field.value); break;
+            default: out << "<unknown type>"; break;
+        }
+        
+        out << "\n";
+    } else {
+        out << prefix << field.name << " = ";
+        
+        const binary_parser::FieldValue& value = field.value;
+        switch (value.type()) {
+            case ValueType::UINT8:
+                out << "0x" << std::hex << std::setw(2) << std::setfill('0') 
+                          << static_cast<int>(value.get<uint8_t>());
+                break;
+            case ValueType::UINT16:
+                out << "0x" << std::hex << std::setw(4) << std::setfill('0') << value.get<uint16_t>();
+                break;
+            case ValueType::UINT32:
+                out << "0x" << std::hex << std::setw(8) << std::setfill('0') << value.get<uint32_t>();
+                break;
+            case ValueType::UINT64:
+                out << "0x" << std::hex << std::setw(16) << std::setfill('0') << value.get<uint64_t>();
+                break;
+            case ValueType::INT8: out << static_cast<int>(value.get<int8_t>()); break;
+            case ValueType::INT16: out << value.get<int16_t>(); break;
+            case ValueType::INT32: out << value.get<int32_t>(); break;
+            case ValueType::INT64: out << value.get<int64_t>(); break;
+            case ValueType::FLOAT: out << value.get<float>(); break;
+            case ValueType::DOUBLE: out << value.get<double>(); break;
+            default: out << "<unknown type>"; break;
+        }
+        
+        out << std::dec << "\n";
+    }
+}
+
+// Writes a JSON array one element at a time, so the output of a long record
+// stream never has to be held in memory
+class JsonArrayWriter {
+public:
+    JsonArrayWriter(const std::string& output_file, bool pretty_print)
+        : pretty_print_(pretty_print) {
+        if (!output_file.empty()) {
+            file_.open(output_file);
+            if (!file_) {
+                throw std::runtime_error("Cannot create output file: " + output_file);
+            }
+        }
+        out() << "[";
+    }
+    
+    void write(const JsonValue& value) {
+        out() << separator(count_++) << value.toString(pretty_print_);
+    }
+    
+    // Elements already formatted with separator(), e.g. by worker threads.
+    // When records are filtered the first element may not have index 0, so
+    // its leading comma is dropped here.
+    void writeFormatted(const std::string& elements, size_t count) {
+        size_t skip = count_ == 0 && !elements.empty() && elements[0] == ',' ? 1 : 0;
+        out().write(elements.data() + skip, static_cast<std::streamsize>(elements.size() - skip));
+        count_ += count;
+    }
+    
+    void finish() {
+        out() << (count_ == 0 ? "]\n" : "\n]\n");
+        out().flush();
+    }
+    
+    // Text preceding the element at index
+    static const char* separator(size_t index) { return index == 0 ? "\n" : ",\n"; }
+    
+private:
+    std::ostream& out() { return file_.is_open() ? file_ : std::cout; }
+    
+    std::ofstream file_;
+    bool pretty_print_;
+    size_t count_ = 0;
+};
+
+// Writes newline-delimited JSON, one compact object per record. Records are
+// serialized straight into a buffer that is written out in large blocks.
+class NdjsonWriter {
+public:
+    static constexpr size_t kBufferSize = 1 << 20;
+    
+    NdjsonWriter(const std::string& output_file) {
+        if (!output_file.empty()) {
+            file_.open(output_file, std::ios::binary);
+            if (!file_) {
+                throw std::runtime_error("Cannot create output file: " + output_file);
+            }
+        }
+        buffer_.reserve(kBufferSize + kBufferSize / 4);
+    }
+    
+    void write(const binary_parser::ParsedStruct& record) {
+        converter_.write(record, buffer_);
+        buffer_ += '\n';
+        if (buffer_.size() >= kBufferSize) flush();
+    }
+    
+    // A record of a mixed stream, wrapped like the elements of --json output
+    void write(const binary_parser::ParsedStruct& record, const std::string& struct_name, size_t offset) {
+        buffer_ += "{\"struct\":";
+        binary_parser::JsonConverter::writeString(struct_name, buffer_);
+        buffer_ += ",\"offset\":" + std::to_string(offset) + ",\"fields\":";
+        converter_.write(record, buffer_);
+        buffer_ += "}\n";
+        if (buffer_.size() >= kBufferSize) flush();
+    }
+    
+    // Lines already formatted, e.g. by worker threads
+    void writeFormatted(const std::string& lines) {
+        flush();
+        out().write(lines.data(), static_cast<std::streamsize>(lines.size()));
+    }
+    
+    void finish() {
+        flush();
+        out().flush();
+    }
+    
+private:
+    std::ostream& out() { return file_.is_open() ? file_ : std::cout; }
+    
+    void flush() {
+        out().write(buffer_.data(), static_cast<std::streamsize>(buffer_.size()));
+        buffer_.clear();
+    }
+    
+    std::ofstream file_;
+    binary_parser::JsonConverter converter_;
+    std::string buffer_;
+};
+
+void printParsedStruct(std::ostream& out, const binary_parser::ParsedStruct& parsed, int indent) {
+    for (const binary_parser::ParsedField& field : parsed.fields) {
+        printParsedField(out, field, indent);
+    }
+}
+
+void printEndianness(binary_parser::Endianness endianness) {
+    if (endianness == binary_parser::Endianness::BIG) {
+        std::cout << "Parsing as big-endian\n";
+    } else {
+        std::cout << "Parsing as little-endian (default)\n";
+    }
+    std::cout << "\n";
+}
+
+// Keeps the kernel reading ahead of the decoder, one window at a time
+class ReadAhead {
+public:
+    static constexpr size_t kWindow = 8 * 1024 * 1024;
+    
+    ReadAhead(const binary_parser::MappedFile& input, size_t base)
+        : input_(input), base_(base), hinted_(base) {}
+    
+    // offset is relative to base
+    void advance(size_t offset) {
+        if (base_ + offset + kWindow / 2 >= hinted_) {
+            input_.prefetch(hinted_, kWindow);
+            hinted_ += kWindow;
+        }
+    }
+    
+private:
+    const binary_parser::MappedFile& input_;
+    size_t base_;
+    size_t hinted_;
+};
+
+// Parses a stream of mixed records; each record's schema is selected by its discriminator
+int parseRecordStream(const binary_parser::SchemaRegistry& registry,
+                      const binary_parser::MappedFile& input,
+                      const Options& options) {
+    const uint8_t* data = input.data() + options.offset;
+    size_t data_size = input.size() - options.offset;
+    ReadAhead read_ahead(input, options.offset);
+    
+    binary_parser::BinaryParser parser(options.endianness);
+    parser.setFieldBoundsChecks(options.check_bounds);
+    binary_parser::JsonConverter converter;
+    binary_parser::JsonConvertOptions json_options;
+    json_options.include_type_info = false;
+    
+    std::unique_ptr<JsonArrayWriter> writer;
+    std::unique_ptr<NdjsonWriter> ndjson;
+    if (options.format == OutputFormat::JSON) {
+        writer = std::make_unique<JsonArrayWriter>(options.output_file, options.pretty_print);
+    } else if (options.format == OutputFormat::NDJSON) {
+        ndjson = std::make_unique<NdjsonWriter>(options.output_file);
+    }
+    size_t index = 0;
+    
+    // One result per schema, refilled by every record of that schema
+    std::unordered_map<const binary_parser::StructInfo*, binary_parser::ParsedStruct> results;
+    registry.decodeStream(data, data_size,
+        [&](const binary_parser::SchemaEntry& entry, const uint8_t* record, size_t offset) {
+            read_ahead.advance(offset);
+            const binary_parser::StructInfo& struct_info = *entry.struct_info;
+            binary_parser::ParsedStruct& parsed = results[&struct_info];
+            parser.parseInto(record, data_size - offset, struct_info, parsed);
+            
+            if (writer) {
+                JsonValue item = JsonValue::createObject();
+                item.set("struct", struct_info.name);
+                item.set("offset", static_cast<double>(options.offset + offset));
+                item.set("fields", converter.convert(parsed, json_options));
+                writer->write(item);
+            } else if (ndjson) {
+                ndjson->write(parsed, struct_info.name, options.offset + offset);
             } else {
-                std::cout << "<unknown type>";
+                std::cout << "Record " << index << " (" << struct_info.name
+                          << ", offset " << options.offset + offset << "):\n";
+                printParsedStruct(std::cout, parsed, 1);
             }
-        } catch (const std::bad_any_cast& e) {
-            std::cout << "<cast error>";
+            index++;
+        }, options.count);
+    
+    if (writer) {
+        writer->finish();
+    } else if (ndjson) {
+        ndjson->finish();
+    }
+    return 0;
+}
+
+// Output side of record mode, shared by mapped files and streamed input
+class RecordPrinter {
+public:
+    RecordPrinter(const Options& options, const binary_parser::StructInfo& struct_info)
+        : pretty_print_(options.pretty_print) {
+        json_options_.include_type_info = false;
+        if (options.format == OutputFormat::JSON) {
+            writer_ = std::make_unique<JsonArrayWriter>(options.output_file, options.pretty_print);
+        } else if (options.format == OutputFormat::NPY) {
+            npy_ = std::make_unique<binary_parser::NpyWriter>(options.output_file, struct_info);
+        } else if (options.format == OutputFormat::NDJSON) {
+            ndjson_ = std::make_unique<NdjsonWriter>(options.output_file);
+        } else if (options.format == OutputFormat::CSV || options.format == OutputFormat::TSV) {
+            binary_parser::CsvWriterOptions csv_options;
+            csv_options.delimiter = options.format == OutputFormat::TSV ? '\t' : ',';
+            csv_options.join_arrays = options.join_arrays;
+            csv_ = std::make_unique<binary_parser::CsvWriter>(openBinaryOutput(options.output_file),
+                                                              struct_info, csv_options);
+        } else if (options.format == OutputFormat::ARROW || options.format == OutputFormat::ARROW_STREAM) {
+            binary_parser::ArrowWriterOptions arrow_options;
+            arrow_options.batch_records = options.batch_size;
+            arrow_options.stream = options.format == OutputFormat::ARROW_STREAM;
+            arrow_ = std::make_unique<binary_parser::ArrowWriter>(openBinaryOutput(options.output_file),
+                                                                  struct_info, arrow_options);
+        } else {
+            printEndianness(options.endianness);
+        }
+    }
+    
+    // offset is the record's absolute position in the input
+    void write(size_t index, size_t offset, const binary_parser::ParsedStruct& record) {
+        if (arrow_) {
+            arrow_->write(record);
+        } else if (npy_) {
+            npy_->write(record);
+        } else if (csv_) {
+            csv_->write(record);
+        } else if (ndjson_) {
+            ndjson_->write(record);
+        } else if (writer_) {
+            writer_->write(converter_.convert(record, json_options_));
+        } else {
+            format(index, offset, record, std::cout);
         }
+    }
+    
+    // Formats a record as write() would; safe to call from worker threads
+    void format(size_t index, size_t offset, const binary_parser::ParsedStruct& record,
+                std::ostream& out) const {
+        if (csv_) {
+            std::string row;
+            csv_->formatRow(record, row);
+            out << row;
+        } else if (ndjson_) {
+            std::string line;
+            binary_parser::JsonConverter converter;
+            converter.write(record, line);
+            line += '\n';
+            out << line;
+        } else if (writer_) {
+            binary_parser::JsonConverter converter;
+            out << JsonArrayWriter::separator(index)
+                << converter.convert(record, json_options_).toString(pretty_print_);
+        } else {
+            out << "Record " << index << " (offset " << offset << "):\n";
+            printParsedStruct(out, record, 1);
+        }
+    }
+    
+    // Output of format() for count records
+    void writeFormatted(const std::string& buffer, size_t count) {
+        if (csv_) {
+            csv_->writeFormatted(buffer, count);
+        } else if (ndjson_) {
+            ndjson_->writeFormatted(buffer);
+        } else if (writer_) {
+            writer_->writeFormatted(buffer, count);
+        } else {
+            std::cout << buffer;
+        }
+    }
+    
+    void finish(size_t count) {
+        if (arrow_) {
+            arrow_->finish();
+        } else if (npy_) {
+            npy_->finish();
+        } else if (csv_) {
+            csv_->finish();
+        } else if (ndjson_) {
+            ndjson_->finish();
+        } else if (writer_) {
+            writer_->finish();
+        } else {
+            std::cout << "\n" << count << " record(s) parsed\n";
+        }
+    }
+    
+private:
+    binary_parser::JsonConverter converter_;
+    binary_parser::JsonConvertOptions json_options_;
+    bool pretty_print_;
+    std::unique_ptr<JsonArrayWriter> writer_;
+    std::ofstream file_;
+    std::unique_ptr<binary_parser::ArrowWriter> arrow_;
+    std::unique_ptr<binary_parser::NpyWriter> npy_;
+    std::unique_ptr<binary_parser::CsvWriter> csv_;
+    std::unique_ptr<NdjsonWriter> ndjson_;
+    
+    // Binary output goes to output_file, or to stdout in binary mode
+    std::ostream& openBinaryOutput(const std::string& output_file) {
+        if (output_file.empty()) {
+#ifdef _WIN32
+            _setmode(_fileno(stdout), _O_BINARY);
+#endif
+            return std::cout;
+        }
+        file_.open(output_file, std::ios::binary);
+        if (!file_) {
+            throw std::runtime_error("Cannot create output file: " + output_file);
+        }
+        return file_;
+    }
+};
+
+// Prints a single parsed record in the selected format
+int printParsed(const binary_parser::ParsedStruct& parsed, const binary_parser::StructInfo& struct_info,
+                const Options& options) {
+    if (isColumnarFormat(options.format) || isDelimitedFormat(options.format) ||
+        options.format == OutputFormat::NDJSON) {
+        RecordPrinter printer(options, struct_info);
+        printer.write(0, options.offset, parsed);
+        printer.finish(1);
+    } else if (options.format == OutputFormat::JSON) {
+        // Convert to JSON
+        binary_parser::JsonConverter converter;
+        binary_parser::JsonConvertOptions json_options;
+        json_options.include_type_info = false;  // Can be made configurable later
         
-        std::cout << std::dec << "\n";
+        JsonValue json = converter.convert(parsed, json_options);
+        if (!writeJson(json, options.pretty_print, options.output_file)) {
+            return 1;
+        }
+    } else {
+        // Traditional output
+        printEndianness(options.endianness);
+        
+        std::cout << "Parsed data:\n";
+        printParsedStruct(std::cout, parsed, 0);
     }
+    return 0;
+}
+
+// Parses back-to-back records of one schema and streams each to the output.
+// Records rejected by filter (if any) are skipped before decoding.
+int parseRecords(const binary_parser::StructInfo& struct_info,
+                 const binary_parser::MappedFile& input,
+                 const Options& options,
+                 const binary_parser::RecordFilter* filter) {
+    const uint8_t* data = input.data() + options.offset;
+    size_t data_size = input.size() - options.offset;
+    ReadAhead read_ahead(input, options.offset);
+    
+    size_t stride = options.stride ? options.stride : struct_info.size;
+    size_t record_size = std::max(struct_info.size, struct_info.extent);
+    
+    // Limit the input to the requested number of records
+    if (options.count == 0) {
+        data_size = 0;
+    } else if (stride > 0 && options.count - 1 < (data_size - std::min(data_size, record_size)) / stride) {
+        data_size = (options.count - 1) * stride + record_size;
+    }
+    
+    RecordPrinter printer(options, struct_info);
+    
+    if (options.threads > 1) {
+        binary_parser::ParallelOptions parallel;
+        parallel.threads = options.threads;
+        parallel.endianness = options.endianness;
+        parallel.field_bounds_checks = options.check_bounds;
+        parallel.filter = filter;
+        size_t count = binary_parser::parseManyParallel(data, data_size, stride, struct_info, parallel,
+            [&](size_t index, size_t offset, const binary_parser::ParsedStruct& record, std::ostream& out) {
+                printer.format(index, options.offset + offset, record, out);
+            },
+            [&](const std::string& buffer, size_t records) {
+                printer.writeFormatted(buffer, records);
+            });
+        printer.finish(count);
+        return 0;
+    }
+    
+    binary_parser::BinaryParser parser(options.endianness);
+    parser.setFieldBoundsChecks(options.check_bounds);
+    parser.setRecordFilter(filter);
+    size_t count = parser.parseMany(data, data_size, stride, struct_info,
+        [&](size_t index, size_t offset, const binary_parser::ParsedStruct& record) {
+            read_ahead.advance(offset);
+            printer.write(index, options.offset + offset, record);
+        });
+    
+    printer.finish(count);
+    return 0;
+}
+
+// Parses records arriving on a pipe or stdin. The input is read in fixed-size
+// chunks, so memory use stays bounded however long the stream runs.
+int parseRecordsFromStream(const binary_parser::StructInfo& struct_info,
+                           std::istream& input,
+                           const Options& options,
+                           const binary_parser::RecordFilter* filter) {
+    size_t stride = options.stride ? options.stride : struct_info.size;
+    size_t record_size = std::max(struct_info.size, struct_info.extent);
+    if (stride == 0) {
+        throw std::runtime_error("Record stride must be non-zero");
+    }
+    
+    binary_parser::RecordReader reader(input, stride, record_size);
+    reader.skip(options.offset);
+    
+    binary_parser::BinaryParser parser(options.endianness);
+    parser.setFieldBoundsChecks(options.check_bounds);
+    parser.setRecordFilter(filter);
+    RecordPrinter printer(options, struct_info);
+    
+    size_t count = 0;
+    size_t decoded = 0;
+    binary_parser::RecordReader::Block block;
+    while (count < options.count && reader.next(block)) {
+        size_t records = std::min(block.records, options.count - count);
+        decoded += parser.parseMany(block.data, (records - 1) * stride + record_size, stride, struct_info,
+            [&](size_t index, size_t offset, const binary_parser::ParsedStruct& record) {
+                printer.write(count + index, block.offset + offset, record);
+            });
+        count += records;
+    }
+    
+    printer.finish(decoded);
+    return 0;
 }
 
 int main(int argc, char* argv[]) {
@@ -98,95 +683,192 @@ int main(int argc, char* argv[]) {
     
     const char* xml_file = argv[1];
     const char* binary_file = argv[2];
+    bool from_stdin = std::string(binary_file) == "-";
+    if (from_stdin) {
+        // Large unsynchronised reads; must be set before any I/O
+#ifdef _WIN32
+        _setmode(_fileno(stdin), _O_BINARY);
+#endif
+        std::ios::sync_with_stdio(false);
+    }
     
     // Parse command line options
-    binary_parser::Endianness endianness = binary_parser::Endianness::LITTLE;
-    bool output_json = false;
-    bool pretty_print = false;
-    std::string output_file;
+    Options options;
     
-    for (int i = 3; i < argc; i++) {
-        std::string arg(argv[i]);
-        if (arg == "--big-endian" || arg == "-b") {
-            endianness = binary_parser::Endianness::BIG;
-        } else if (arg == "--json") {
-            output_json = true;
-        } else if (arg == "--pretty") {
-            pretty_print = true;
-        } else if (arg == "-o" && i + 1 < argc) {
-            output_file = argv[++i];
+    try {
+        for (int i = 3; i < argc; i++) {
+            std::string arg(argv[i]);
+            if (arg == "--big-endian" || arg == "-b") {
+                options.endianness = binary_parser::Endianness::BIG;
+            } else if (arg == "--json") {
+                options.format = OutputFormat::JSON;
+            } else if (arg == "--format" && i + 1 < argc) {
+                options.format = parseFormatArgument(argv[++i]);
+            } else if (arg == "--batch-size" && i + 1 < argc) {
+                options.batch_size = parseSizeArgument(arg, argv[++i]);
+                if (options.batch_size == 0) {
+                    throw std::runtime_error("--batch-size must be at least 1");
+                }
+            } else if (arg == "--join-arrays") {
+                options.join_arrays = true;
+            } else if (arg == "--pretty") {
+                options.pretty_print = true;
+            } else if (arg == "-o" && i + 1 < argc) {
+                options.output_file = argv[++i];
+            } else if (arg == "--no-schema-cache") {
+                options.use_schema_cache = false;
+            } else if (arg == "--discriminator" && i + 1 < argc) {
+                options.discriminator = argv[++i];
+            } else if (arg == "--check-bounds") {
+                options.check_bounds = true;
+            } else if (arg == "--fields" && i + 1 < argc) {
+                options.fields = argv[++i];
+            } else if (arg == "--where" && i + 1 < argc) {
+                options.where = argv[++i];
+                options.records = true;
+            } else if (arg == "--records") {
+                options.records = true;
+            } else if (arg == "--count" && i + 1 < argc) {
+                options.count = parseSizeArgument(arg, argv[++i]);
+                options.records = true;
+            } else if (arg == "--offset" && i + 1 < argc) {
+                options.offset = parseSizeArgument(arg, argv[++i]);
+            } else if (arg == "--stride" && i + 1 < argc) {
+                options.stride = parseSizeArgument(arg, argv[++i]);
+                options.records = true;
+            } else if (arg == "--threads" && i + 1 < argc) {
+                options.threads = parseSizeArgument(arg, argv[++i]);
+                if (options.threads == 0) {
+                    options.threads = std::max(1u, std::thread::hardware_concurrency());
+                }
+                options.records = true;
+            }
         }
+    } catch (const std::exception& e) {
+        std::cerr << "Error: " << e.what() << "\n";
+        return 1;
+    }
+    
+    if (isColumnarFormat(options.format) && options.threads > 1) {
+        // Columns are built on one thread from the records in input order
+        std::cerr << "Error: Arrow and npy output cannot be combined with --threads\n";
+        return 1;
+    }
+    
+    if (options.format == OutputFormat::NPY && options.output_file.empty()) {
+        std::cerr << "Error: npy output needs an output directory (-o <dir>)\n";
+        return 1;
     }
     
     try {
-        // Parse XML struct definition
-        binary_parser::XmlStructParser xml_parser;
-        auto struct_info = xml_parser.parse(xml_file);
-        
-        if (!output_json) {
-            std::cout << "Loaded struct: " << struct_info->name 
-                      << " (size: " << struct_info->size << " bytes)\n\n";
+        // Parse XML struct definition (or load it from the schema cache)
+        std::unique_ptr<binary_parser::SchemaCache> schema_cache;
+        if (options.use_schema_cache) {
+            schema_cache = std::make_unique<binary_parser::SchemaCache>();
         }
+        binary_parser::XmlStructParser xml_parser(schema_cache.get());
         
-        // Read binary file
-        std::ifstream bin_file(binary_file, std::ios::binary | std::ios::ate);
-        if (!bin_file) {
-            std::cerr << "Error: Cannot open binary file: " << binary_file << "\n";
-            return 1;
+        if (std::filesystem::is_directory(xml_file)) {
+            if (options.discriminator.empty()) {
+                std::cerr << "Error: --discriminator is required with a schema directory\n";
+                return 1;
+            }
+            
+            if (from_stdin) {
+                std::cerr << "Error: A schema directory cannot be used with stdin input\n";
+                return 1;
+            }
+            
+            if (!options.fields.empty() || !options.where.empty()) {
+                std::cerr << "Error: --fields and --where cannot be used with a schema directory\n";
+                return 1;
+            }
+            
+            if (isColumnarFormat(options.format) || isDelimitedFormat(options.format)) {
+                std::cerr << "Error: Arrow, npy, CSV and TSV output need a single schema, not a schema directory\n";
+                return 1;
+            }
+            
+            // Each record is as long as its own schema, so records are found
+            // one after the other
+            if (options.stride != 0 || options.threads > 1) {
+                std::cerr << "Error: --stride and --threads cannot be used with a schema directory\n";
+                return 1;
+            }
+            
+            binary_parser::SchemaRegistry registry(options.discriminator, options.endianness);
+            registry.loadDirectory(xml_file, xml_parser);
+            
+            binary_parser::MappedFile input = openBinaryFile(binary_file, binary_parser::MappedFile::Access::SEQUENTIAL);
+            if (options.offset > input.size()) {
+                std::cerr << "Error: Offset is beyond the end of the file\n";
+                return 1;
+            }
+            return parseRecordStream(registry, input, options);
         }
         
-        size_t file_size = bin_file.tellg();
-        bin_file.seekg(0);
+        auto struct_info = xml_parser.parse(xml_file);
         
-        std::vector<uint8_t> data(file_size);
-        bin_file.read(reinterpret_cast<char*>(data.data()), file_size);
-        bin_file.close();
+        // Compiled against the full schema: it reads raw record bytes, which
+        // may lie outside the fields selected for output
+        std::unique_ptr<binary_parser::RecordFilter> filter;
+        if (!options.where.empty()) {
+            filter = std::make_unique<binary_parser::RecordFilter>(
+                binary_parser::RecordFilter::compile(options.where, *struct_info, options.endianness));
+        }
         
-        // Parse binary data
-        binary_parser::BinaryParser parser(endianness);
-        auto parsed = parser.parse(data.data(), data.size(), *struct_info);
+        if (!options.fields.empty()) {
+            // Unselected fields are dropped from the schema and never decoded
+            struct_info = binary_parser::projectSchema(*struct_info, binary_parser::splitFieldList(options.fields));
+        }
         
-        if (output_json) {
-            // Convert to JSON
-            binary_parser::JsonConverter converter;
-            binary_parser::JsonConvertOptions options;
-            options.include_type_info = false;  // Can be made configurable later
-            
-            JsonValue json = converter.convert(*parsed, options);
-            std::string json_str = json.toString(pretty_print);
-            
-            if (!output_file.empty()) {
-                // Write to file
-                std::ofstream out_file(output_file);
-                if (!out_file) {
-                    std::cerr << "Error: Cannot create output file: " << output_file << "\n";
-                    return 1;
-                }
-                out_file << json_str << "\n";
-                out_file.close();
-            } else {
-                // Write to stdout
-                std::cout << json_str << "\n";
-            }
-        } else {
-            // Traditional output
-            if (endianness == binary_parser::Endianness::BIG) {
-                std::cout << "Parsing as big-endian\n";
-            } else {
-                std::cout << "Parsing as little-endian (default)\n";
+        if (options.format == OutputFormat::TEXT) {
+            std::cout << "Loaded struct: " << struct_info->name 
+                      << " (size: " << struct_info->size << " bytes)\n\n";
+        }
+        
+        if (from_stdin) {
+            if (options.records) {
+                return parseRecordsFromStream(*struct_info, std::cin, options, filter.get());
             }
-            std::cout << "\n";
             
-            std::cout << "Parsed data:\n";
-            for (const auto& [name, field] : parsed->fields) {
-                printParsedField(field);
+            // Only the first record is read
+            size_t record_size = std::max(struct_info->size, struct_info->extent);
+            binary_parser::RecordReader reader(std::cin, record_size, record_size, record_size);
+            reader.skip(options.offset);
+            binary_parser::RecordReader::Block block;
+            if (!reader.next(block)) {
+                std::cerr << "Error: Input ended before a complete record\n";
+                return 1;
             }
+            binary_parser::BinaryParser parser(options.endianness);
+            parser.setFieldBoundsChecks(options.check_bounds);
+            auto parsed = parser.parse(block.data, block.size, *struct_info);
+            return printParsed(*parsed, *struct_info, options);
+        }
+        
+        // Map the binary file; the parser reads straight from the mapped pages
+        binary_parser::MappedFile input = openBinaryFile(binary_file, options.records
+                                                             ? binary_parser::MappedFile::Access::SEQUENTIAL
+                                                             : binary_parser::MappedFile::Access::NORMAL);
+        if (options.offset > input.size()) {
+            std::cerr << "Error: Offset is beyond the end of the file\n";
+            return 1;
         }
         
+        if (options.records) {
+            return parseRecords(*struct_info, input, options, filter.get());
+        }
+        
+        // Parse binary data
+        binary_parser::BinaryParser parser(options.endianness);
+        parser.setFieldBoundsChecks(options.check_bounds);
+        auto parsed = parser.parse(input.data() + options.offset, input.size() - options.offset,
+                                   *struct_info);
+        
+        return printParsed(*parsed, *struct_info, options);
     } catch (const std::exception& e) {
         std::cerr << "Error: " << e.what() << "\n";
         return 1;
     }
-    
-    return 0;
 }
\ No newline at end of file
@@ -0,0 +1,118 @@
+#include "mapped_file.h"
+#include <algorithm>
+#include <fstream>
+#include <iterator>
+#include <stdexcept>
+#include <utility>
+
+#ifndef _WIN32
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <fcntl.h>
+#include <unistd.h>
+#endif
+
+namespace binary_parser {
+
+namespace {
+
+// Read ahead of a sequential reader at most this far in one hint
+constexpr size_t kInitialReadAhead = 8 * 1024 * 1024;
+
+} // namespace
+
+MappedFile::MappedFile(const std::string& path, Access access) {
+#ifndef _WIN32
+    int fd = ::open(path.c_str(), O_RDONLY);
+    if (fd < 0) {
+        throw std::runtime_error("Cannot open file: " + path);
+    }
+
+    // Files that report a size of zero may still have content (procfs);
+    // those are read like pipes below
+    struct stat st;
+    if (::fstat(fd, &st) == 0 && S_ISREG(st.st_mode) && st.st_size > 0) {
+        size_ = static_cast<size_t>(st.st_size);
+        void* addr = ::mmap(nullptr, size_, PROT_READ, MAP_PRIVATE, fd, 0);
+        if (addr == MAP_FAILED) {
+            ::close(fd);
+            throw std::runtime_error("Cannot map file: " + path);
+        }
+        data_ = static_cast<const uint8_t*>(addr);
+        mapped_ = true;
+
+        if (access == Access::SEQUENTIAL) {
+#ifdef POSIX_FADV_SEQUENTIAL
+            ::posix_fadvise(fd, 0, 0, POSIX_FADV_SEQUENTIAL);
+#endif
+            ::madvise(addr, size_, MADV_SEQUENTIAL);
+            prefetch(0, kInitialReadAhead);
+        }
+        ::close(fd);
+        return;
+    }
+    ::close(fd);
+#else
+    (void)access;
+#endif
+
+    // Fallback: read the whole file into memory
+    std::ifstream file(path, std::ios::binary);
+    if (!file) {
+        throw std::runtime_error("Cannot open file: " + path);
+    }
+    buffer_.assign(std::istreambuf_iterator<char>(file), std::istreambuf_iterator<char>());
+    data_ = buffer_.data();
+    size_ = buffer_.size();
+}
+
+MappedFile::~MappedFile() {
+    release();
+}
+
+MappedFile::MappedFile(MappedFile&& other) noexcept {
+    *this = std::move(other);
+}
+
+MappedFile& MappedFile::operator=(MappedFile&& other) noexcept {
+    if (this != &other) {
+        release();
+        mapped_ = other.mapped_;
+        size_ = other.size_;
+        buffer_ = std::move(other.buffer_);
+        data_ = mapped_ ? other.data_ : buffer_.data();
+        other.data_ = nullptr;
+        other.size_ = 0;
+        other.mapped_ = false;
+    }
+    return *this;
+}
+
+void MappedFile::prefetch(size_t offset, size_t length) const {
+#ifndef _WIN32
+    if (!mapped_ || offset >= size_) return;
+    length = std::min(length, size_ - offset);
+
+    // madvise needs a page-aligned start
+    static const size_t page_size = static_cast<size_t>(::sysconf(_SC_PAGESIZE));
+    size_t aligned = offset - offset % page_size;
+    ::madvise(const_cast<uint8_t*>(data_) + aligned, length + (offset - aligned), MADV_WILLNEED);
+#else
+    (void)offset;
+    (void)length;
+#endif
+}
+
+void MappedFile::release() {
+#ifndef _WIN32
+    if (mapped_ && data_) {
+        ::munmap(const_cast<uint8_t*>(data_), size_);
+    }
+#endif
+    data_ = nullptr;
+    size_ = 0;
+    mapped_ = false;
+    buffer_.clear();
+}
+
+} // namespace binary_parser
\ No newline at end of file
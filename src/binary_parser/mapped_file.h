@@ -0,0 +1,49 @@
+#ifndef MAPPED_FILE_H
+#define MAPPED_FILE_H
+
+#include <string>
+#include <vector>
+#include <cstdint>
+#include <cstddef>
+
+namespace binary_parser {
+
+// Read-only view of a whole file. Uses mmap where available and falls back
+// to reading the file into memory elsewhere, and for files that cannot be
+// mapped (pipes, character devices, procfs).
+class MappedFile {
+public:
+    enum class Access {
+        NORMAL,
+        SEQUENTIAL  // Read front to back once: aggressive read-ahead, pages dropped behind
+    };
+
+    MappedFile() = default;
+    explicit MappedFile(const std::string& path, Access access = Access::NORMAL);
+    ~MappedFile();
+
+    MappedFile(const MappedFile&) = delete;
+    MappedFile& operator=(const MappedFile&) = delete;
+    MappedFile(MappedFile&& other) noexcept;
+    MappedFile& operator=(MappedFile&& other) noexcept;
+
+    const uint8_t* data() const { return data_; }
+    size_t size() const { return size_; }
+    bool isMapped() const { return mapped_; }
+
+    // Hint that [offset, offset + length) will be read soon. No-op when the
+    // file is not mapped.
+    void prefetch(size_t offset, size_t length) const;
+
+private:
+    void release();
+
+    const uint8_t* data_ = nullptr;
+    size_t size_ = 0;
+    bool mapped_ = false;
+    std::vector<uint8_t> buffer_;  // Used when the file could not be mapped
+};
+
+} // namespace binary_parser
+
+#endif // MAPPED_FILE_H
\ No newline at end of file
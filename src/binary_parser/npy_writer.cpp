@@ -0,0 +1,104 @@
+#include "npy_writer.h"
+#include "byte_swap.h"
+#include <filesystem>
+#include <stdexcept>
+
+namespace binary_parser {
+
+namespace {
+
+// NumPy type string of a leaf's elements, in host byte order
+std::string descr(const LeafColumn& leaf) {
+    if (leaf.text) return "|S" + std::to_string(leaf.width);
+    std::string order = leaf.width == 1 ? "|" : (hostIsLittleEndian() ? "<" : ">");
+    switch (leaf.type) {
+        case ValueType::FLOAT:
+        case ValueType::DOUBLE:
+            return order + "f" + std::to_string(leaf.width);
+        case ValueType::INT8:
+        case ValueType::INT16:
+        case ValueType::INT32:
+        case ValueType::INT64:
+            return order + "i" + std::to_string(leaf.width);
+        default:
+            return order + "u" + std::to_string(leaf.width);
+    }
+}
+
+std::string shapeTuple(const std::string& records, const std::vector<size_t>& shape) {
+    std::string tuple = "(" + records + ",";
+    for (size_t dimension : shape) {
+        tuple += " " + std::to_string(dimension) + ",";
+    }
+    if (!shape.empty()) tuple.pop_back();
+    return tuple + ")";
+}
+
+} // namespace
+
+std::string NpyWriter::header(const LeafColumn& leaf, size_t records) {
+    auto dictionary = [&](const std::string& count) {
+        return "{'descr': '" + descr(leaf) + "', 'fortran_order': False, 'shape': " + shapeTuple(count, leaf.shape) +
+               ", }";
+    };
+    // Room for any 64-bit count, so the header can be rewritten in place;
+    // the data starts on a 64-byte boundary
+    size_t length = 10 + dictionary(std::string(20, '9')).size() + 1;
+    length = (length + 63) / 64 * 64;
+
+    std::string text = dictionary(std::to_string(records));
+    text.resize(length - 10 - 1, ' ');
+    text += '\n';
+    uint16_t text_size = static_cast<uint16_t>(text.size());
+    std::string bytes("\x93NUMPY\x01\x00", 8);
+    bytes += static_cast<char>(text_size & 0xFF);
+    bytes += static_cast<char>(text_size >> 8);
+    return bytes + text;
+}
+
+NpyWriter::NpyWriter(const std::string& directory, const StructInfo& struct_info)
+    : directory_(directory), leaves_(leafColumns(struct_info)) {
+    std::error_code error;
+    std::filesystem::create_directories(directory, error);
+    if (!std::filesystem::is_directory(directory)) {
+        throw std::runtime_error("Cannot create output directory: " + directory);
+    }
+
+    files_.resize(leaves_.size());
+    for (size_t i = 0; i < leaves_.size(); i++) {
+        std::string path = (std::filesystem::path(directory) / (leaves_[i].path + ".npy")).string();
+        files_[i].open(path, std::ios::binary | std::ios::trunc);
+        if (!files_[i]) {
+            throw std::runtime_error("Cannot create output file: " + path);
+        }
+        // Valid (and empty) until finish() records the count
+        files_[i] << header(leaves_[i], 0);
+    }
+}
+
+void NpyWriter::write(const ParsedStruct& record) {
+    if (finished_) {
+        throw std::runtime_error("NumPy writer is already finished");
+    }
+    for (size_t i = 0; i < leaves_.size(); i++) {
+        const FieldValue& value = leafValue(record, leaves_[i]);
+        files_[i].write(reinterpret_cast<const char*>(value.bytes()),
+                        static_cast<std::streamsize>(leaves_[i].values * leaves_[i].width));
+    }
+    records_++;
+}
+
+void NpyWriter::finish() {
+    if (finished_) return;
+    finished_ = true;
+    for (size_t i = 0; i < leaves_.size(); i++) {
+        files_[i].seekp(0);
+        files_[i] << header(leaves_[i], records_);
+        files_[i].close();
+        if (files_[i].fail()) {
+            throw std::runtime_error("Cannot write " + leaves_[i].path + ".npy in " + directory_);
+        }
+    }
+}
+
+} // namespace binary_parser
\ No newline at end of file
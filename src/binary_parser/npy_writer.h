@@ -0,0 +1,49 @@
+#ifndef NPY_WRITER_H
+#define NPY_WRITER_H
+
+#include "binary_parser.h"
+#include "leaf_columns.h"
+#include <fstream>
+#include <string>
+#include <vector>
+
+namespace binary_parser {
+
+struct StructInfo;
+
+// Writes decoded records as a directory of NumPy .npy files, one per leaf
+// of the schema (see leafColumns()) named after its dotted path, e.g.
+// "header.seq.npy". Each file holds a C-order array of shape
+// (records, *leaf.shape) in host byte order; char arrays are fixed-width
+// byte strings. Values are appended to the files as records arrive, so
+// memory use does not grow with the number of records. finish() writes the
+// final record count into each header, after which every file loads with
+// numpy.load(path, mmap_mode='r').
+class NpyWriter {
+public:
+    // Creates directory if needed; existing files of the same names are
+    // replaced
+    NpyWriter(const std::string& directory, const StructInfo& struct_info);
+
+    void write(const ParsedStruct& record);
+
+    // Completes the headers and closes the files
+    void finish();
+
+    size_t records() const { return records_; }
+    const std::vector<LeafColumn>& leaves() const { return leaves_; }
+
+private:
+    // NumPy format 1.0 header; padded to the same length for any count
+    static std::string header(const LeafColumn& leaf, size_t records);
+
+    std::string directory_;
+    std::vector<LeafColumn> leaves_;
+    std::vector<std::ofstream> files_;
+    size_t records_ = 0;
+    bool finished_ = false;
+};
+
+} // namespace binary_parser
+
+#endif // NPY_WRITER_H
\ No newline at end of file
@@ -0,0 +1,165 @@
+#include "parallel_parser.h"
+#include "xml_struct_parser.h"
+#include <algorithm>
+#include <atomic>
+#include <condition_variable>
+#include <exception>
+#include <mutex>
+#include <sstream>
+#include <stdexcept>
+#include <thread>
+#include <vector>
+
+namespace binary_parser {
+
+namespace {
+
+// Output buffers shared between the workers and the writer. Chunk k goes in
+// slot k % slots.size(); a worker waits until the writer has released the
+// slot's previous chunk before filling it.
+class ChunkQueue {
+public:
+    explicit ChunkQueue(size_t slots) : slots_(slots) {}
+
+    // Blocks until chunk may be filled; false once the run has failed
+    bool acquire(size_t chunk) {
+        std::unique_lock<std::mutex> lock(mutex_);
+        cv_.wait(lock, [&] { return failed_ || chunk < written_ + slots_.size(); });
+        return !failed_;
+    }
+
+    void publish(size_t chunk, std::string buffer, size_t records) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        Slot& slot = slots_[chunk % slots_.size()];
+        slot.buffer = std::move(buffer);
+        slot.records = records;
+        slot.ready = true;
+        cv_.notify_all();
+    }
+
+    // Blocks until the next chunk in order is ready; false once the run has failed
+    bool next(std::string& buffer, size_t& records) {
+        std::unique_lock<std::mutex> lock(mutex_);
+        Slot& slot = slots_[written_ % slots_.size()];
+        cv_.wait(lock, [&] { return failed_ || slot.ready; });
+        if (failed_) return false;
+        buffer.swap(slot.buffer);
+        records = slot.records;
+        return true;
+    }
+
+    void release() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        slots_[written_ % slots_.size()].ready = false;
+        written_++;
+        cv_.notify_all();
+    }
+
+    void fail(std::exception_ptr error) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        if (!error_) error_ = error;
+        failed_ = true;
+        cv_.notify_all();
+    }
+
+    std::exception_ptr error() const { return error_; }
+
+private:
+    struct Slot {
+        std::string buffer;
+        size_t records = 0;
+        bool ready = false;
+    };
+
+    std::vector<Slot> slots_;
+    std::mutex mutex_;
+    std::condition_variable cv_;
+    size_t written_ = 0;
+    bool failed_ = false;
+    std::exception_ptr error_;
+};
+
+} // namespace
+
+size_t parseManyParallel(
+    const uint8_t* data,
+    size_t data_size,
+    size_t stride,
+    const StructInfo& struct_info,
+    const ParallelOptions& options,
+    const RecordFormatter& formatter,
+    const ChunkWriter& writer) {
+
+    if (stride == 0) stride = struct_info.size;
+    if (stride == 0) {
+        throw std::runtime_error("Record stride must not be zero");
+    }
+
+    // Same record boundaries as parseMany()
+    size_t record_size = std::max<size_t>({struct_info.size, struct_info.extent, 1});
+    size_t total = data_size >= record_size ? (data_size - record_size) / stride + 1 : 0;
+    if (total == 0) return 0;
+
+    size_t chunk_records = std::max<size_t>(options.chunk_records, 1);
+    size_t chunks = (total - 1) / chunk_records + 1;
+    size_t threads = std::min(std::max<size_t>(options.threads, 1), chunks);
+
+    ChunkQueue queue(2 * threads);
+    std::atomic<size_t> next_chunk{0};
+
+    auto worker = [&]() {
+        BinaryParser parser(options.endianness);
+        parser.setFieldBoundsChecks(options.field_bounds_checks);
+        parser.setRecordFilter(options.filter);
+        std::ostringstream out;
+        try {
+            for (size_t chunk = next_chunk++; chunk < chunks; chunk = next_chunk++) {
+                if (!queue.acquire(chunk)) return;
+
+                size_t first = chunk * chunk_records;
+                size_t records = std::min(chunk_records, total - first);
+                size_t offset = first * stride;
+                size_t size = std::min(data_size - offset, (records - 1) * stride + record_size);
+
+                out.str(std::string());
+                size_t decoded = parser.parseMany(data + offset, size, stride, struct_info,
+                    [&](size_t index, size_t record_offset, const ParsedStruct& record) {
+                        formatter(first + index, offset + record_offset, record, out);
+                    });
+                queue.publish(chunk, out.str(), decoded);
+            }
+        } catch (...) {
+            queue.fail(std::current_exception());
+        }
+    };
+
+    std::vector<std::thread> pool;
+    pool.reserve(threads);
+    for (size_t i = 0; i < threads; i++) {
+        pool.emplace_back(worker);
+    }
+
+    // The calling thread writes the chunks in order as they complete
+    std::string buffer;
+    size_t records = 0;
+    size_t decoded = 0;
+    try {
+        for (size_t chunk = 0; chunk < chunks && queue.next(buffer, records); chunk++) {
+            writer(buffer, records);
+            decoded += records;
+            queue.release();
+        }
+    } catch (...) {
+        queue.fail(std::current_exception());
+    }
+
+    for (std::thread& thread : pool) {
+        thread.join();
+    }
+    if (queue.error()) {
+        std::rethrow_exception(queue.error());
+    }
+    return decoded;
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,50 @@
+#ifndef PARALLEL_PARSER_H
+#define PARALLEL_PARSER_H
+
+#include "binary_parser.h"
+#include <ostream>
+#include <string>
+
+namespace binary_parser {
+
+struct StructInfo;
+
+struct ParallelOptions {
+    size_t threads = 1;             // Worker threads
+    size_t chunk_records = 4096;    // Records per chunk handed to a worker
+    Endianness endianness = Endianness::LITTLE;
+    bool field_bounds_checks = false;
+    const RecordFilter* filter = nullptr;  // Records to decode; nullptr for all
+};
+
+// Serializes one decoded record into the worker's output buffer. Called
+// concurrently from the worker threads.
+using RecordFormatter = std::function<void(size_t index, size_t offset,
+                                           const ParsedStruct& record, std::ostream& out)>;
+
+// Receives each chunk's output buffer and the number of records formatted
+// into it, in input order. Called on the calling thread only.
+using ChunkWriter = std::function<void(const std::string& buffer, size_t records)>;
+
+// Multi-threaded parseMany(): the records are split into record-aligned
+// chunks, each decoded and serialized by a worker thread with its own
+// BinaryParser and output buffer, and the buffers are passed to writer in
+// the original order. At most two chunks per thread are in flight, so
+// memory use does not grow with the input. The StructInfo is shared by all
+// workers read-only. Records rejected by options.filter are skipped, and
+// formatter receives each record's index in the input as parseMany() does.
+// Returns the number of records decoded; the first error from a worker or
+// the writer is rethrown after all threads have stopped.
+size_t parseManyParallel(
+    const uint8_t* data,
+    size_t data_size,
+    size_t stride,
+    const StructInfo& struct_info,
+    const ParallelOptions& options,
+    const RecordFormatter& formatter,
+    const ChunkWriter& writer
+);
+
+} // namespace binary_parser
+
+#endif // PARALLEL_PARSER_H
\ No newline at end of file
@@ -0,0 +1,352 @@
+#include "record_filter.h"
+#include "byte_swap.h"
+#include "xml_struct_parser.h"
+#include <cctype>
+#include <cerrno>
+#include <cstdlib>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+
+namespace binary_parser {
+
+// Recursive-descent parser from expression text to filter nodes
+class RecordFilter::Compiler {
+public:
+    Compiler(std::string_view text, const StructInfo& struct_info, Endianness endianness, RecordFilter& filter)
+        : text_(text), struct_info_(struct_info),
+          program_(DecodeProgram::compile(struct_info, endianness, true)), filter_(filter) {}
+    
+    void run() {
+        filter_.root_ = parseOr();
+        skipSpace();
+        if (pos_ != text_.size()) {
+            fail("unexpected '" + std::string(1, text_[pos_]) + "'");
+        }
+    }
+    
+private:
+    uint32_t parseOr() {
+        uint32_t left = parseAnd();
+        while (accept("||")) {
+            Node node;
+            node.op = NodeOp::OR;
+            node.left = left;
+            node.right = parseAnd();
+            left = add(node);
+        }
+        return left;
+    }
+    
+    uint32_t parseAnd() {
+        uint32_t left = parseNot();
+        while (accept("&&")) {
+            Node node;
+            node.op = NodeOp::AND;
+            node.left = left;
+            node.right = parseNot();
+            left = add(node);
+        }
+        return left;
+    }
+    
+    uint32_t parseNot() {
+        skipSpace();
+        if (peek() == '!' && peek(1) != '=') {
+            pos_++;
+            Node node;
+            node.op = NodeOp::NOT;
+            node.left = parseNot();
+            return add(node);
+        }
+        if (accept("(")) {
+            uint32_t inner = parseOr();
+            if (!accept(")")) fail("expected ')'");
+            // A parenthesised operand may be compared: (flags & 0x6) == 4
+            if (filter_.nodes_[inner].op == NodeOp::TEST && acceptComparison(filter_.nodes_[inner].op)) {
+                Operand b = parseOperand();
+                filter_.nodes_[inner].b = b;
+            }
+            return inner;
+        }
+        return parseComparison();
+    }
+    
+    uint32_t parseComparison() {
+        Node node;
+        node.a = parseOperand();
+        if (acceptComparison(node.op)) {
+            node.b = parseOperand();
+        }
+        return add(node);
+    }
+    
+    bool acceptComparison(NodeOp& op) {
+        static const struct { const char* token; NodeOp op; } kComparisons[] = {
+            {"==", NodeOp::EQ}, {"!=", NodeOp::NE}, {"<=", NodeOp::LE},
+            {">=", NodeOp::GE}, {"<", NodeOp::LT}, {">", NodeOp::GT},
+        };
+        for (const auto& comparison : kComparisons) {
+            if (accept(comparison.token)) {
+                op = comparison.op;
+                return true;
+            }
+        }
+        return false;
+    }
+    
+    Operand parseOperand() {
+        skipSpace();
+        char c = peek();
+        Operand operand;
+        bool real = false;
+        if (std::isdigit(static_cast<unsigned char>(c)) || c == '-' || c == '.') {
+            operand.constant = parseNumber();
+            real = operand.constant.kind == Number::Kind::REAL;
+        } else if (std::isalpha(static_cast<unsigned char>(c)) || c == '_') {
+            operand.is_field = true;
+            operand.load = resolvePath(parsePath());
+            real = operand.load.op == DecodeOp::FLOAT32 || operand.load.op == DecodeOp::FLOAT64;
+        } else {
+            fail("expected a field path or a number");
+        }
+        
+        skipSpace();
+        if (peek() == '&' && peek(1) != '&') {
+            pos_++;
+            skipSpace();
+            Number mask = parseNumber();
+            if (mask.kind != Number::Kind::UNSIGNED || real) {
+                fail("'&' needs integer operands");
+            }
+            if (operand.is_field) {
+                operand.masked = true;
+                operand.mask = mask.value.u;
+            } else {
+                operand.constant.kind = Number::Kind::UNSIGNED;
+                operand.constant.value.u &= mask.value.u;
+            }
+        }
+        return operand;
+    }
+    
+    Number parseNumber() {
+        size_t start = pos_;
+        if (peek() == '-') pos_++;
+        while (pos_ < text_.size()) {
+            char c = text_[pos_];
+            bool exponent_sign = (c == '+' || c == '-') && pos_ > start &&
+                                 (text_[pos_ - 1] == 'e' || text_[pos_ - 1] == 'E') &&
+                                 text_.substr(start).find_first_of("xX") == std::string_view::npos;
+            if (!std::isalnum(static_cast<unsigned char>(c)) && c != '.' && !exponent_sign) break;
+            pos_++;
+        }
+        std::string literal(text_.substr(start, pos_ - start));
+        bool hex = literal.find_first_of("xX") != std::string::npos;
+        bool real = !hex && literal.find_first_of(".eE") != std::string::npos;
+        
+        Number number;
+        char* end = nullptr;
+        errno = 0;
+        if (real) {
+            number.kind = Number::Kind::REAL;
+            number.value.f = std::strtod(literal.c_str(), &end);
+        } else if (literal[0] == '-') {
+            number.kind = Number::Kind::SIGNED;
+            number.value.i = std::strtoll(literal.c_str(), &end, 0);
+        } else {
+            number.kind = Number::Kind::UNSIGNED;
+            number.value.u = std::strtoull(literal.c_str(), &end, 0);
+        }
+        if (literal.empty() || end != literal.c_str() + literal.size() || errno == ERANGE) {
+            pos_ = start;
+            fail("invalid number '" + literal + "'");
+        }
+        return number;
+    }
+    
+    std::string parsePath() {
+        size_t start = pos_;
+        while (pos_ < text_.size()) {
+            char c = text_[pos_];
+            if (!std::isalnum(static_cast<unsigned char>(c)) && c != '_' && c != '.' && c != '[' && c != ']') break;
+            pos_++;
+        }
+        return std::string(text_.substr(start, pos_ - start));
+    }
+    
+    // One load for the leaf at path; [i] selects an element of a primitive array
+    DecodeInstruction resolvePath(const std::string& path) {
+        const DecodeLeaf* leaf = program_.findLeaf(path);
+        size_t index = 0;
+        if (!leaf && !path.empty() && path.back() == ']') {
+            size_t bracket = path.rfind('[');
+            std::string digits = path.substr(bracket + 1, path.size() - bracket - 2);
+            if (bracket != std::string::npos && !digits.empty() &&
+                digits.find_first_not_of("0123456789") == std::string::npos && digits.size() < 10) {
+                leaf = program_.findLeaf(path.substr(0, bracket));
+                index = std::stoul(digits);
+                if (leaf && (leaf->count <= 1 || index >= leaf->count)) {
+                    fail("index out of range in " + path);
+                }
+            }
+        } else if (leaf && leaf->count > 1) {
+            fail(path + " is an array; select an element with [i]");
+        }
+        if (!leaf) {
+            fail("no field " + path + " in " + struct_info_.name);
+        }
+        
+        DecodeInstruction load = program_.instructionFor(*leaf);
+        load.offset += static_cast<uint32_t>(index * load.stride);
+        load.count = 1;
+        if (load.offset + load.width > struct_info_.size) {
+            fail(path + " lies beyond the record size");
+        }
+        return load;
+    }
+    
+    uint32_t add(const Node& node) {
+        filter_.nodes_.push_back(node);
+        return static_cast<uint32_t>(filter_.nodes_.size() - 1);
+    }
+    
+    bool accept(const char* token) {
+        skipSpace();
+        size_t length = std::strlen(token);
+        if (text_.substr(pos_, length) != token) return false;
+        pos_ += length;
+        return true;
+    }
+    
+    char peek(size_t ahead = 0) const {
+        return pos_ + ahead < text_.size() ? text_[pos_ + ahead] : '\0';
+    }
+    
+    void skipSpace() {
+        while (pos_ < text_.size() && std::isspace(static_cast<unsigned char>(text_[pos_]))) pos_++;
+    }
+    
+    [[noreturn]] void fail(const std::string& message) const {
+        throw std::runtime_error("Invalid filter expression at position " + std::to_string(pos_ + 1) + ": " +
+                                 message);
+    }
+    
+    std::string_view text_;
+    const StructInfo& struct_info_;
+    DecodeProgram program_;
+    RecordFilter& filter_;
+    size_t pos_ = 0;
+};
+
+RecordFilter RecordFilter::compile(std::string_view expression, const StructInfo& struct_info,
+                                   Endianness endianness) {
+    RecordFilter filter;
+    Compiler(expression, struct_info, endianness, filter).run();
+    return filter;
+}
+
+bool RecordFilter::evaluate(uint32_t index, const uint8_t* record) const {
+    const Node& node = nodes_[index];
+    switch (node.op) {
+        case NodeOp::OR:
+            return evaluate(node.left, record) || evaluate(node.right, record);
+        case NodeOp::AND:
+            return evaluate(node.left, record) && evaluate(node.right, record);
+        case NodeOp::NOT:
+            return !evaluate(node.left, record);
+        case NodeOp::TEST: {
+            Number number = value(node.a, record);
+            return number.kind == Number::Kind::REAL ? number.value.f != 0.0 : number.value.u != 0;
+        }
+        default:
+            return compare(node.op, value(node.a, record), value(node.b, record));
+    }
+}
+
+RecordFilter::Number RecordFilter::value(const Operand& operand, const uint8_t* record) {
+    if (!operand.is_field) return operand.constant;
+    
+    const DecodeInstruction& in = operand.load;
+    uint64_t raw = loadUnsigned(record + in.offset, in.width, in.swap);
+    Number number;
+    switch (in.op) {
+        case DecodeOp::UNSIGNED:
+            number.value.u = raw;
+            break;
+        case DecodeOp::SIGNED:
+            number.kind = Number::Kind::SIGNED;
+            number.value.i = static_cast<int64_t>((raw ^ in.sign) - in.sign);
+            break;
+        case DecodeOp::FLOAT32: {
+            uint32_t bits = static_cast<uint32_t>(raw);
+            float real;
+            std::memcpy(&real, &bits, sizeof(real));
+            number.kind = Number::Kind::REAL;
+            number.value.f = real;
+            break;
+        }
+        case DecodeOp::FLOAT64:
+            number.kind = Number::Kind::REAL;
+            std::memcpy(&number.value.f, &raw, sizeof(double));
+            break;
+        case DecodeOp::BITS_UNSIGNED:
+            number.value.u = (raw >> in.shift) & in.mask;
+            break;
+        case DecodeOp::BITS_SIGNED: {
+            uint64_t bits = (raw >> in.shift) & in.mask;
+            number.kind = Number::Kind::SIGNED;
+            number.value.i = static_cast<int64_t>((bits ^ in.sign) - in.sign);
+            break;
+        }
+    }
+    if (operand.masked) {
+        number.kind = Number::Kind::UNSIGNED;
+        number.value.u &= operand.mask;
+    }
+    return number;
+}
+
+bool RecordFilter::compare(NodeOp op, const Number& a, const Number& b) {
+    if (a.kind == Number::Kind::REAL || b.kind == Number::Kind::REAL) {
+        auto real = [](const Number& n) {
+            switch (n.kind) {
+                case Number::Kind::REAL: return n.value.f;
+                case Number::Kind::SIGNED: return static_cast<double>(n.value.i);
+                default: return static_cast<double>(n.value.u);
+            }
+        };
+        double x = real(a);
+        double y = real(b);
+        switch (op) {
+            case NodeOp::EQ: return x == y;
+            case NodeOp::NE: return x != y;
+            case NodeOp::LT: return x < y;
+            case NodeOp::LE: return x <= y;
+            case NodeOp::GT: return x > y;
+            default: return x >= y;
+        }
+    }
+    
+    // Integers of either signedness: a negative value is below any unsigned one
+    bool a_negative = a.kind == Number::Kind::SIGNED && a.value.i < 0;
+    bool b_negative = b.kind == Number::Kind::SIGNED && b.value.i < 0;
+    int order;
+    if (a_negative != b_negative) {
+        order = a_negative ? -1 : 1;
+    } else if (a_negative) {
+        order = a.value.i < b.value.i ? -1 : (a.value.i > b.value.i ? 1 : 0);
+    } else {
+        order = a.value.u < b.value.u ? -1 : (a.value.u > b.value.u ? 1 : 0);
+    }
+    switch (op) {
+        case NodeOp::EQ: return order == 0;
+        case NodeOp::NE: return order != 0;
+        case NodeOp::LT: return order < 0;
+        case NodeOp::LE: return order <= 0;
+        case NodeOp::GT: return order > 0;
+        default: return order >= 0;
+    }
+}
+
+} // namespace binary_parser
\ No newline at end of file
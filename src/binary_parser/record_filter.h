@@ -0,0 +1,75 @@
+#ifndef RECORD_FILTER_H
+#define RECORD_FILTER_H
+
+#include "binary_parser.h"
+#include "decode_program.h"
+#include <string_view>
+#include <vector>
+
+namespace binary_parser {
+
+struct StructInfo;
+
+// A --where predicate compiled against a schema and evaluated on the raw
+// bytes of a record, before anything is decoded.
+//
+// Expressions compare field paths and numbers with == != < <= > >=,
+// combined with && || ! and parentheses. A path on its own is true when
+// the field is non-zero, and "path & mask" tests bits of an integer field:
+//
+//     header.type == 3 && (status.error || payload.temp > 85.5)
+//     flags & 0x10 && !(samples[0] < -100)
+//
+// Paths name leaf fields as in DecodeProgram ("header.seq",
+// "items[2].value"), plus [i] for an element of a primitive array.
+// Bitfields are extracted and sign-extended like the parser does. Each
+// path becomes one fixed load, and && / || stop at the first operand that
+// decides the result, so a rejected record costs only the loads needed to
+// reject it.
+class RecordFilter {
+public:
+    static RecordFilter compile(std::string_view expression, const StructInfo& struct_info,
+                                Endianness endianness = Endianness::LITTLE);
+    
+    // record must hold the whole record (the schema's size)
+    bool matches(const uint8_t* record) const { return evaluate(root_, record); }
+    
+private:
+    // A loaded or literal number
+    struct Number {
+        enum class Kind : uint8_t { UNSIGNED, SIGNED, REAL };
+        Kind kind = Kind::UNSIGNED;
+        DecodedValue value{};
+    };
+    
+    struct Operand {
+        bool is_field = false;
+        DecodeInstruction load{};  // Fields: count is always 1
+        Number constant;           // Literals
+        bool masked = false;
+        uint64_t mask = 0;
+    };
+    
+    enum class NodeOp : uint8_t { OR, AND, NOT, EQ, NE, LT, LE, GT, GE, TEST };
+    
+    struct Node {
+        NodeOp op = NodeOp::TEST;
+        uint32_t left = 0;   // OR, AND, NOT
+        uint32_t right = 0;  // OR, AND
+        Operand a;           // Comparisons and TEST
+        Operand b;
+    };
+    
+    class Compiler;
+    
+    bool evaluate(uint32_t node, const uint8_t* record) const;
+    static Number value(const Operand& operand, const uint8_t* record);
+    static bool compare(NodeOp op, const Number& a, const Number& b);
+    
+    std::vector<Node> nodes_;
+    uint32_t root_ = 0;
+};
+
+} // namespace binary_parser
+
+#endif // RECORD_FILTER_H
\ No newline at end of file
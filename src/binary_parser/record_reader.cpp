@@ -0,0 +1,68 @@
+#include "record_reader.h"
+#include <algorithm>
+#include <cstring>
+#include <limits>
+#include <stdexcept>
+
+namespace binary_parser {
+
+RecordReader::RecordReader(std::istream& in, size_t stride, size_t record_size, size_t chunk_size)
+    : in_(in), stride_(stride), record_size_(record_size) {
+    if (stride_ == 0 || record_size_ == 0) {
+        throw std::runtime_error("Record stride and size must be non-zero");
+    }
+    // A chunk always has room for at least one record
+    buffer_.resize(std::max(chunk_size, record_size_));
+}
+
+void RecordReader::fill() {
+    while (skip_ > 0 && !eof_) {
+        size_t want = std::min<size_t>(skip_, std::numeric_limits<std::streamsize>::max());
+        in_.ignore(static_cast<std::streamsize>(want));
+        size_t got = static_cast<size_t>(in_.gcount());
+        skip_ -= got;
+        stream_offset_ += got;
+        if (got < want) eof_ = true;
+    }
+    if (!eof_ && filled_ < buffer_.size()) {
+        size_t want = buffer_.size() - filled_;
+        in_.read(reinterpret_cast<char*>(buffer_.data() + filled_), static_cast<std::streamsize>(want));
+        size_t got = static_cast<size_t>(in_.gcount());
+        filled_ += got;
+        if (got < want) eof_ = true;
+    }
+    if (in_.bad()) {
+        throw std::runtime_error("Error reading input stream");
+    }
+}
+
+bool RecordReader::next(Block& block) {
+    // Carry the unconsumed tail (a partial record) to the front
+    if (consumed_ > 0) {
+        std::memmove(buffer_.data(), buffer_.data() + consumed_, filled_ - consumed_);
+        filled_ -= consumed_;
+        stream_offset_ += consumed_;
+        consumed_ = 0;
+    }
+    fill();
+
+    if (filled_ < record_size_) return false;
+    size_t records = (filled_ - record_size_) / stride_ + 1;
+
+    block.data = buffer_.data();
+    block.size = (records - 1) * stride_ + record_size_;
+    block.offset = stream_offset_;
+    block.records = records;
+
+    // The gap after the last record may not have been read yet
+    size_t advance = records * stride_;
+    if (advance > filled_) {
+        skip_ += advance - filled_;
+        consumed_ = filled_;
+    } else {
+        consumed_ = advance;
+    }
+    return true;
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,62 @@
+#ifndef RECORD_READER_H
+#define RECORD_READER_H
+
+#include <istream>
+#include <vector>
+#include <cstdint>
+#include <cstddef>
+
+namespace binary_parser {
+
+// Reads back-to-back fixed-stride records from a stream (stdin, a pipe, a
+// socket) in large chunks. Memory use is bounded by the chunk size no
+// matter how long the stream is: each block handed out holds only complete
+// records, and a partial record at the end of a chunk is carried over to
+// the next one.
+class RecordReader {
+public:
+    static constexpr size_t kDefaultChunkSize = 4 * 1024 * 1024;
+
+    // A run of complete records. Passing data, size and the reader's stride
+    // to BinaryParser::parseMany() decodes exactly `records` records.
+    struct Block {
+        const uint8_t* data = nullptr;
+        size_t size = 0;
+        size_t offset = 0;   // Stream offset of data[0]
+        size_t records = 0;
+    };
+
+    // record_size is the number of bytes one record needs (at least the
+    // struct size); stride is the distance between record starts
+    RecordReader(std::istream& in, size_t stride, size_t record_size,
+                 size_t chunk_size = kDefaultChunkSize);
+
+    // Discard bytes from the stream before the first record. Must be called
+    // before the first next().
+    void skip(size_t bytes) { skip_ += bytes; }
+
+    // Returns false once the stream is exhausted
+    bool next(Block& block);
+
+    // Bytes left at the end of the stream that do not form a whole record
+    size_t trailingBytes() const { return eof_ ? filled_ - consumed_ : 0; }
+
+    size_t capacity() const { return buffer_.size(); }
+
+private:
+    void fill();
+
+    std::istream& in_;
+    size_t stride_;
+    size_t record_size_;
+    std::vector<uint8_t> buffer_;
+    size_t filled_ = 0;        // Valid bytes in buffer_
+    size_t consumed_ = 0;      // Bytes of buffer_ handed out in earlier blocks
+    size_t skip_ = 0;          // Stream bytes still to be discarded
+    size_t stream_offset_ = 0; // Stream offset of buffer_[0]
+    bool eof_ = false;
+};
+
+} // namespace binary_parser
+
+#endif // RECORD_READER_H
\ No newline at end of file
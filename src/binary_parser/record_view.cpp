@@ -0,0 +1,185 @@
+#include "record_view.h"
+#include <cstring>
+#include <stdexcept>
+
+namespace binary_parser {
+
+static bool isAggregate(const FieldInfo& info) {
+    return info.type == FieldType::STRUCT || info.type == FieldType::UNION || info.type == FieldType::UNKNOWN;
+}
+
+static const FieldInfo* findMember(const FieldList& fields, std::string_view name) {
+    for (const FieldInfo& field : fields) {
+        if (field.name == name) return &field;
+    }
+    return nullptr;
+}
+
+FieldView FieldView::field(std::string_view name) const {
+    if (isArray()) {
+        throw std::runtime_error("Field " + std::string(info_->name) + " is an array; select an element first");
+    }
+    const FieldInfo* member = findMember(info_->sub_fields, name);
+    if (!member) {
+        throw std::runtime_error("Field " + std::string(info_->name) + " has no member " + std::string(name));
+    }
+    return FieldView(data_ + member->offset, *member, false, endianness_);
+}
+
+FieldView FieldView::field(size_t index) const {
+    if (isArray()) {
+        throw std::runtime_error("Field " + std::string(info_->name) + " is an array; select an element first");
+    }
+    if (index >= info_->sub_fields.size()) {
+        throw std::out_of_range("Field " + std::string(info_->name) + " has no member at position " +
+                                std::to_string(index));
+    }
+    const FieldInfo& member = info_->sub_fields[index];
+    return FieldView(data_ + member.offset, member, false, endianness_);
+}
+
+FieldView FieldView::element(size_t index) const {
+    if (!isArray() || !isAggregate(*info_)) {
+        throw std::runtime_error("Field " + std::string(info_->name) + " is not an array of structs");
+    }
+    if (index >= info_->array_size) {
+        throw std::out_of_range("Index " + std::to_string(index) + " is out of range for " +
+                                std::string(info_->name));
+    }
+    size_t element_size = info_->size / info_->array_size;
+    return FieldView(data_ + index * element_size, *info_, true, endianness_);
+}
+
+template <typename T>
+FieldValue FieldView::decode() const {
+    if (!isArray()) {
+        return get<T>();
+    }
+    ArraySpan<T> span = array<T>();
+    FieldValue array;
+    uint8_t* dst = array.assignArray(valueTypeOf<T>(), span.size());
+    for (size_t i = 0; i < span.size(); i++) {
+        T element = span[i];
+        std::memcpy(dst + i * sizeof(T), &element, sizeof(T));
+    }
+    return array;
+}
+
+FieldValue FieldView::value() const {
+    if (element_ || isAggregate(*info_)) {
+        return FieldValue();
+    }
+    switch (valueTypeFor(info_->type)) {
+        case ValueType::UINT8: return decode<uint8_t>();
+        case ValueType::INT8: return decode<int8_t>();
+        case ValueType::UINT16: return decode<uint16_t>();
+        case ValueType::INT16: return decode<int16_t>();
+        case ValueType::UINT32: return decode<uint32_t>();
+        case ValueType::INT32: return decode<int32_t>();
+        case ValueType::UINT64: return decode<uint64_t>();
+        case ValueType::INT64: return decode<int64_t>();
+        case ValueType::FLOAT: return decode<float>();
+        case ValueType::DOUBLE: return decode<double>();
+        default:
+            throw std::runtime_error("Unsupported field type");
+    }
+}
+
+std::string_view FieldView::str() const {
+    if (info_->type != FieldType::CHAR) {
+        throw std::runtime_error("Field " + std::string(info_->name) + " is not a char array");
+    }
+    const char* chars = reinterpret_cast<const char*>(data_);
+    size_t length = arraySize();
+    const void* nul = std::memchr(chars, '\0', length);
+    if (nul) length = static_cast<const char*>(nul) - chars;
+    return std::string_view(chars, length);
+}
+
+RecordView::RecordView(const uint8_t* data, size_t data_size, const StructInfo& struct_info,
+                       Endianness endianness)
+    : data_(data), struct_info_(&struct_info), endianness_(endianness) {
+    if (!struct_info.layout_validated) {
+        throw std::runtime_error("RecordView needs a schema with a validated layout");
+    }
+    // One check covers every field the view can reach
+    if (data_size < struct_info.extent || data_size < struct_info.size) {
+        throw std::runtime_error("Data size " + std::to_string(data_size) +
+                                 " is smaller than schema extent " + std::to_string(struct_info.extent));
+    }
+}
+
+FieldView RecordView::field(size_t index) const {
+    if (index >= struct_info_->fields.size()) {
+        throw std::out_of_range("Struct " + struct_info_->name + " has no field at position " +
+                                std::to_string(index));
+    }
+    const FieldInfo& info = struct_info_->fields[index];
+    return FieldView(data_ + info.offset, info, false, endianness_);
+}
+
+FieldView RecordView::field(std::string_view path) const {
+    const FieldList* level = &struct_info_->fields;
+    const uint8_t* base = data_;
+    const FieldInfo* info = nullptr;
+    bool element = false;
+    
+    size_t start = 0;
+    while (true) {
+        size_t dot = path.find('.', start);
+        std::string_view segment = path.substr(start, dot == std::string_view::npos ? std::string_view::npos
+                                                                                     : dot - start);
+        // Optional element index: name[i]
+        std::string_view name = segment;
+        size_t index = 0;
+        bool indexed = false;
+        size_t bracket = segment.find('[');
+        if (bracket != std::string_view::npos) {
+            if (segment.back() != ']' || bracket + 2 >= segment.size()) {
+                throw std::runtime_error("Malformed field path: " + std::string(path));
+            }
+            name = segment.substr(0, bracket);
+            for (char c : segment.substr(bracket + 1, segment.size() - bracket - 2)) {
+                if (c < '0' || c > '9') {
+                    throw std::runtime_error("Malformed field path: " + std::string(path));
+                }
+                index = index * 10 + static_cast<size_t>(c - '0');
+            }
+            indexed = true;
+        }
+        
+        info = findMember(*level, name);
+        if (!info) {
+            throw std::runtime_error("Struct " + struct_info_->name + " has no field " + std::string(path));
+        }
+        base += info->offset;
+        element = false;
+        if (indexed) {
+            FieldView selected = FieldView(base, *info, false, endianness_).element(index);
+            base = selected.data_;
+            element = true;
+        }
+        
+        if (dot == std::string_view::npos) break;
+        if (info->array_size > 1 && !element) {
+            throw std::runtime_error("Field path " + std::string(path) + " needs an element index for " +
+                                     std::string(info->name));
+        }
+        level = &info->sub_fields;
+        start = dot + 1;
+    }
+    return FieldView(base, *info, element, endianness_);
+}
+
+FieldView RecordView::field(const std::vector<uint32_t>& positions) const {
+    if (positions.empty()) {
+        throw std::runtime_error("Empty field position path");
+    }
+    FieldView view = field(static_cast<size_t>(positions[0]));
+    for (size_t i = 1; i < positions.size(); i++) {
+        view = view.field(static_cast<size_t>(positions[i]));
+    }
+    return view;
+}
+
+} // namespace binary_parser
\ No newline at end of file
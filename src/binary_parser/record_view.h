@@ -0,0 +1,185 @@
+#ifndef RECORD_VIEW_H
+#define RECORD_VIEW_H
+
+#include "binary_parser.h"
+#include "byte_swap.h"
+#include "xml_struct_parser.h"
+#include <cstddef>
+#include <iterator>
+#include <stdexcept>
+#include <string>
+#include <string_view>
+#include <type_traits>
+
+namespace binary_parser {
+
+// Numeric array read in place from the record buffer. Each element is
+// loaded (and byte-swapped if needed) when it is accessed.
+template <typename T>
+class ArraySpan {
+public:
+    class iterator {
+    public:
+        using iterator_category = std::input_iterator_tag;
+        using value_type = T;
+        using difference_type = std::ptrdiff_t;
+        using pointer = const T*;
+        using reference = T;
+        
+        iterator(const ArraySpan* span, size_t index) : span_(span), index_(index) {}
+        T operator*() const { return (*span_)[index_]; }
+        iterator& operator++() { ++index_; return *this; }
+        bool operator==(const iterator& other) const { return index_ == other.index_; }
+        bool operator!=(const iterator& other) const { return index_ != other.index_; }
+
+    private:
+        const ArraySpan* span_;
+        size_t index_;
+    };
+
+    ArraySpan(const uint8_t* data, size_t size, size_t stride, bool swap)
+        : data_(data), size_(size), stride_(stride), swap_(swap) {}
+
+    size_t size() const { return size_; }
+    bool empty() const { return size_ == 0; }
+
+    T operator[](size_t index) const {
+        uint64_t raw = loadUnsigned(data_ + index * stride_, sizeof(T), swap_ && sizeof(T) > 1);
+        T value;
+        if constexpr (sizeof(T) == 1) {
+            uint8_t narrow = static_cast<uint8_t>(raw);
+            std::memcpy(&value, &narrow, 1);
+        } else if constexpr (sizeof(T) == 2) {
+            uint16_t narrow = static_cast<uint16_t>(raw);
+            std::memcpy(&value, &narrow, 2);
+        } else if constexpr (sizeof(T) == 4) {
+            uint32_t narrow = static_cast<uint32_t>(raw);
+            std::memcpy(&value, &narrow, 4);
+        } else {
+            std::memcpy(&value, &raw, 8);
+        }
+        return value;
+    }
+
+    iterator begin() const { return iterator(this, 0); }
+    iterator end() const { return iterator(this, size_); }
+
+private:
+    const uint8_t* data_;
+    size_t size_;
+    size_t stride_;
+    bool swap_;
+};
+
+// One field of a record viewed in place. Copying a FieldView is cheap; the
+// record buffer and schema must outlive it.
+class FieldView {
+public:
+    FieldView(const uint8_t* data, const FieldInfo& info, bool element, Endianness endianness)
+        : data_(data), info_(&info), element_(element), endianness_(endianness) {}
+
+    const FieldInfo& info() const { return *info_; }
+    std::string_view name() const { return info_->name; }
+    FieldType type() const { return info_->type; }
+
+    // Array fields; an element of a struct array is not itself an array
+    bool isArray() const { return !element_ && info_->array_size > 1; }
+    size_t arraySize() const { return isArray() ? info_->array_size : 1; }
+
+    // Struct/union member by name or declaration position
+    FieldView field(std::string_view name) const;
+    FieldView field(size_t index) const;
+
+    // Element of an array of structs/unions
+    FieldView element(size_t index) const;
+
+    // Scalar value; T must match the field's type exactly. Loaded straight
+    // from the buffer without allocating.
+    template <typename T>
+    T get() const {
+        if (isArray() || element_ || valueTypeFor(info_->type) != valueTypeOf<T>()) {
+            throw std::runtime_error("Field " + std::string(info_->name) + " is not a scalar " +
+                                     valueTypeName(valueTypeOf<T>()));
+        }
+        bool swap = ByteSwaps(endianness_)[info_->byte_order];
+        if (info_->bits <= 0) {
+            return ArraySpan<T>(data_, 1, sizeof(T), swap)[0];
+        }
+        if constexpr (std::is_integral_v<T>) {
+            if (info_->size != 1 && info_->size != 2 && info_->size != 4 && info_->size != 8) {
+                throw std::runtime_error("Unsupported bitfield size");
+            }
+            // Constants precomputed by validateLayout()
+            uint64_t mask = info_->bit_mask;
+            uint64_t sign = info_->bit_sign;
+            if (mask == 0) {
+                bitfieldConstants(*info_, mask, sign);
+            }
+            uint64_t unit = loadUnsigned(data_, static_cast<unsigned>(info_->size), swap);
+            uint64_t value = (((unit >> info_->bit_offset) & mask) ^ sign) - sign;
+            return static_cast<T>(value);
+        } else {
+            throw std::runtime_error("Unsupported bitfield type");
+        }
+    }
+
+    // Decodes the field the way BinaryParser does; no value for structs.
+    // Arrays longer than FieldValue::kInlineBytes allocate.
+    FieldValue value() const;
+
+    // Numeric array elements, decoded on access
+    template <typename T>
+    ArraySpan<T> array() const {
+        if (!isArray() || valueTypeFor(info_->type) != valueTypeOf<T>()) {
+            throw std::runtime_error("Field " + std::string(info_->name) + " is not an array of " +
+                                     valueTypeName(valueTypeOf<T>()));
+        }
+        return ArraySpan<T>(data_, info_->array_size, info_->size / info_->array_size,
+                            ByteSwaps(endianness_)[info_->byte_order]);
+    }
+
+    // char array up to its first NUL
+    std::string_view str() const;
+
+private:
+    friend class RecordView;
+    
+    template <typename T>
+    FieldValue decode() const;
+    
+    const uint8_t* data_;  // First byte of the field (or of the element)
+    const FieldInfo* info_;
+    bool element_;
+    Endianness endianness_;
+};
+
+// Zero-copy, lazy view of one record: a pointer into the input buffer plus
+// the schema. Nothing is decoded or allocated until a value is read.
+class RecordView {
+public:
+    // The schema must have a validated layout; data_size is checked once
+    // against its extent
+    RecordView(const uint8_t* data, size_t data_size, const StructInfo& struct_info,
+               Endianness endianness = Endianness::LITTLE);
+
+    const StructInfo& schema() const { return *struct_info_; }
+
+    // Top-level field by declaration position
+    FieldView field(size_t index) const;
+
+    // Field by dotted path; struct array elements are selected with [i],
+    // e.g. "header.seq" or "points[2].x"
+    FieldView field(std::string_view path) const;
+
+    // Field at positions from StructInfo::findPath()
+    FieldView field(const std::vector<uint32_t>& positions) const;
+
+private:
+    const uint8_t* data_;
+    const StructInfo* struct_info_;
+    Endianness endianness_;
+};
+
+} // namespace binary_parser
+
+#endif // RECORD_VIEW_H
\ No newline at end of file
@@ -0,0 +1,77 @@
+#include "xml_struct_parser.h"
+#include <algorithm>
+#include <cstring>
+
+namespace binary_parser {
+
+namespace {
+
+constexpr size_t kFieldChunkSize = 1024;
+constexpr size_t kCharChunkSize = 16 * 1024;
+
+} // namespace
+
+void SchemaArena::reserve(size_t field_count) {
+    if (chunk_capacity_ - chunk_used_ >= field_count) return;
+    field_chunks_.push_back(std::make_unique<FieldInfo[]>(field_count));
+    chunk_used_ = 0;
+    chunk_capacity_ = field_count;
+}
+
+FieldList SchemaArena::allocate(size_t count) {
+    if (count == 0) return FieldList();
+    if (chunk_capacity_ - chunk_used_ < count) {
+        reserve(std::max(count, kFieldChunkSize));
+    }
+    FieldInfo* fields = field_chunks_.back().get() + chunk_used_;
+    chunk_used_ += count;
+    field_count_ += count;
+    return FieldList(fields, count);
+}
+
+char* SchemaArena::allocateChars(size_t size) {
+    if (size == 0) return nullptr;
+    if (char_capacity_ - char_used_ < size) {
+        size_t capacity = std::max(size, kCharChunkSize);
+        char_chunks_.push_back(std::make_unique<char[]>(capacity));
+        char_used_ = 0;
+        char_capacity_ = capacity;
+    }
+    char* chars = char_chunks_.back().get() + char_used_;
+    char_used_ += size;
+    return chars;
+}
+
+std::string_view SchemaArena::intern(std::string_view name) {
+    if (name.empty()) return std::string_view();
+    auto it = names_.find(name);
+    if (it != names_.end()) return *it;
+
+    char* chars = allocateChars(name.size());
+    std::memcpy(chars, name.data(), name.size());
+    std::string_view stored(chars, name.size());
+    names_.insert(stored);
+    return stored;
+}
+
+UnionSelector* SchemaArena::allocateSelector() {
+    selectors_.push_back(std::make_unique<UnionSelector>());
+    return selectors_.back().get();
+}
+
+UnionSelector* SchemaArena::copySelector(const UnionSelector& selector) {
+    UnionSelector* copy = allocateSelector();
+    *copy = selector;
+    copy->discriminator = intern(selector.discriminator);
+    copy->cases = intern(selector.cases);
+    return copy;
+}
+
+std::string_view SchemaArena::storeStrings(std::string_view strings) {
+    if (strings.empty()) return std::string_view();
+    char* chars = allocateChars(strings.size());
+    std::memcpy(chars, strings.data(), strings.size());
+    return std::string_view(chars, strings.size());
+}
+
+} // namespace binary_parser
\ No newline at end of file
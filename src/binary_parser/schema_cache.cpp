@@ -0,0 +1,393 @@
+#include "schema_cache.h"
+#include "xml_struct_parser.h"
+#include "mapped_file.h"
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <filesystem>
+#include <fstream>
+#include <random>
+#include <stdexcept>
+#include <system_error>
+#include <unordered_map>
+#include <vector>
+
+namespace fs = std::filesystem;
+
+namespace binary_parser {
+
+namespace {
+
+constexpr char kCacheMagic[8] = {'B', 'P', 'S', 'C', 'H', 'E', 'M', 'A'};
+constexpr uint32_t kCacheVersion = 6;
+constexpr const char* kCacheSuffix = ".bpsc";
+
+struct CacheHeader {
+    char magic[8];
+    uint32_t version;
+    uint32_t header_size;
+    uint64_t source_size;
+    int64_t source_mtime;
+    uint64_t source_hash;
+    uint64_t struct_size;
+    uint32_t packed;
+    uint32_t field_count;       // Total number of field records
+    uint32_t root_first;        // Index of the first top-level field
+    uint32_t root_count;        // Number of top-level fields
+    uint32_t name_offset;       // Struct name in the string table
+    uint32_t name_length;
+    uint32_t path_offset;       // Absolute XML path in the string table
+    uint32_t path_length;
+    uint64_t strings_size;
+    uint64_t discriminator_value;
+    uint32_t has_discriminator;
+    uint32_t byte_order;
+};
+
+// Records mirror the arena layout: siblings are contiguous and a field
+// refers to its children by index. Child blocks are always written before
+// the fields that refer to them, so every child index is smaller than the
+// index of its parent and the records can be loaded in a single pass.
+struct CachedField {
+    uint32_t name_offset;
+    uint32_t name_length;
+    uint64_t offset;
+    uint64_t size;
+    uint64_t array_size;
+    int32_t bits;
+    int32_t bit_offset;
+    uint32_t first_child;
+    uint32_t child_count;
+    uint8_t type;
+    uint8_t is_union;
+    uint8_t has_selector;       // Tagged union: the strings below are set
+    uint8_t byte_order;
+    uint8_t reserved[4];
+    uint32_t discriminator_offset;
+    uint32_t discriminator_length;
+    uint32_t cases_offset;
+    uint32_t cases_length;
+};
+
+static_assert(sizeof(CacheHeader) % 8 == 0, "CacheHeader must keep records aligned");
+static_assert(sizeof(CachedField) % 8 == 0, "CachedField must keep records aligned");
+
+uint64_t fnv1a(const uint8_t* data, size_t size, uint64_t hash = 0xcbf29ce484222325ULL) {
+    for (size_t i = 0; i < size; i++) {
+        hash ^= data[i];
+        hash *= 0x100000001b3ULL;
+    }
+    return hash;
+}
+
+uint64_t fnv1a(const std::string& str) {
+    return fnv1a(reinterpret_cast<const uint8_t*>(str.data()), str.size());
+}
+
+std::string absolutePath(const std::string& path) {
+    std::error_code ec;
+    fs::path abs = fs::absolute(path, ec);
+    return ec ? path : abs.lexically_normal().string();
+}
+
+bool statFile(const std::string& path, SchemaStamp& stamp) {
+    std::error_code ec;
+    auto size = fs::file_size(path, ec);
+    if (ec) return false;
+    auto mtime = fs::last_write_time(path, ec);
+    if (ec) return false;
+    stamp.file_size = static_cast<uint64_t>(size);
+    stamp.mtime = static_cast<int64_t>(mtime.time_since_epoch().count());
+    return true;
+}
+
+uint64_t hashFile(const std::string& path) {
+    MappedFile file(path);
+    return fnv1a(file.data(), file.size());
+}
+
+class CacheWriter {
+public:
+    uint32_t addString(std::string_view str) {
+        auto it = string_offsets_.find(std::string(str));
+        if (it != string_offsets_.end()) return it->second;
+        uint32_t offset = static_cast<uint32_t>(strings_.size());
+        strings_.insert(strings_.end(), str.begin(), str.end());
+        string_offsets_.emplace(std::string(str), offset);
+        return offset;
+    }
+
+    // Returns the index of the first record of the list. A list shared by
+    // several fields is written only once.
+    uint32_t addFields(const FieldList& fields) {
+        if (fields.empty()) return 0;
+        auto it = list_index_.find(fields.begin());
+        if (it != list_index_.end()) return it->second;
+
+        std::vector<uint32_t> first_children;
+        first_children.reserve(fields.size());
+        for (const FieldInfo& field : fields) {
+            first_children.push_back(addFields(field.sub_fields));
+        }
+
+        uint32_t first = static_cast<uint32_t>(records_.size());
+        for (size_t i = 0; i < fields.size(); i++) {
+            const FieldInfo& field = fields[i];
+            CachedField record{};
+            record.name_offset = addString(field.name);
+            record.name_length = static_cast<uint32_t>(field.name.size());
+            record.offset = field.offset;
+            record.size = field.size;
+            record.array_size = field.array_size;
+            record.bits = field.bits;
+            record.bit_offset = field.bit_offset;
+            record.first_child = first_children[i];
+            record.child_count = static_cast<uint32_t>(field.sub_fields.size());
+            record.type = static_cast<uint8_t>(field.type);
+            record.is_union = field.is_union ? 1 : 0;
+            record.byte_order = static_cast<uint8_t>(field.byte_order);
+            if (field.selector) {
+                record.has_selector = 1;
+                record.discriminator_offset = addString(field.selector->discriminator);
+                record.discriminator_length = static_cast<uint32_t>(field.selector->discriminator.size());
+                record.cases_offset = addString(field.selector->cases);
+                record.cases_length = static_cast<uint32_t>(field.selector->cases.size());
+            }
+            records_.push_back(record);
+        }
+        list_index_.emplace(fields.begin(), first);
+        return first;
+    }
+
+    const std::vector<CachedField>& records() const { return records_; }
+    const std::vector<char>& strings() const { return strings_; }
+
+private:
+    std::vector<CachedField> records_;
+    std::vector<char> strings_;
+    std::unordered_map<std::string, uint32_t> string_offsets_;
+    std::unordered_map<const FieldInfo*, uint32_t> list_index_;
+};
+
+// Rebuilds the field tree in one arena chunk; returns false if the records
+// are inconsistent
+bool readFields(const CachedField* records, size_t record_count,
+                std::string_view strings, StructInfo& struct_info,
+                uint32_t root_first, uint32_t root_count) {
+    FieldList nodes = struct_info.arena.allocate(record_count);
+    for (size_t i = 0; i < record_count; i++) {
+        const CachedField& record = records[i];
+        if (static_cast<uint64_t>(record.name_offset) + record.name_length > strings.size()) return false;
+        if (record.type > static_cast<uint8_t>(FieldType::UNKNOWN)) return false;
+        if (record.byte_order > static_cast<uint8_t>(ByteOrder::BIG)) return false;
+        if (record.child_count > 0 &&
+            static_cast<uint64_t>(record.first_child) + record.child_count > i) {
+            return false;
+        }
+
+        FieldInfo& field = nodes[i];
+        field.name = strings.substr(record.name_offset, record.name_length);
+        field.type = static_cast<FieldType>(record.type);
+        field.offset = static_cast<size_t>(record.offset);
+        field.size = static_cast<size_t>(record.size);
+        field.array_size = static_cast<size_t>(record.array_size);
+        field.bits = record.bits;
+        field.bit_offset = record.bit_offset;
+        field.is_union = record.is_union != 0;
+        field.byte_order = static_cast<ByteOrder>(record.byte_order);
+        if (record.has_selector) {
+            if (static_cast<uint64_t>(record.discriminator_offset) + record.discriminator_length > strings.size() ||
+                static_cast<uint64_t>(record.cases_offset) + record.cases_length > strings.size()) {
+                return false;
+            }
+            // Resolved by validateLayout() once the tree is complete
+            field.selector = struct_info.arena.allocateSelector();
+            field.selector->discriminator = strings.substr(record.discriminator_offset, record.discriminator_length);
+            field.selector->cases = strings.substr(record.cases_offset, record.cases_length);
+        }
+        if (record.child_count > 0) {
+            field.sub_fields = FieldList(&nodes[record.first_child], record.child_count);
+        }
+    }
+
+    if (root_count > 0) {
+        if (static_cast<uint64_t>(root_first) + root_count > record_count) return false;
+        struct_info.fields = FieldList(&nodes[root_first], root_count);
+    }
+    return true;
+}
+
+} // namespace
+
+SchemaCache::SchemaCache(std::string cache_dir)
+    : cache_dir_(cache_dir.empty() ? defaultDirectory() : std::move(cache_dir)) {
+}
+
+std::string SchemaCache::defaultDirectory() {
+    const char* xdg = std::getenv("XDG_CACHE_HOME");
+    if (xdg && *xdg) {
+        return (fs::path(xdg) / "binary-parser-with-xml").string();
+    }
+#ifdef _WIN32
+    const char* local_app_data = std::getenv("LOCALAPPDATA");
+    if (local_app_data && *local_app_data) {
+        return (fs::path(local_app_data) / "binary-parser-with-xml").string();
+    }
+#else
+    const char* home = std::getenv("HOME");
+    if (home && *home) {
+        return (fs::path(home) / ".cache" / "binary-parser-with-xml").string();
+    }
+#endif
+    return "";
+}
+
+std::string SchemaCache::entryPath(const std::string& xml_file) const {
+    char name[17];
+    std::snprintf(name, sizeof(name), "%016llx",
+                  static_cast<unsigned long long>(fnv1a(absolutePath(xml_file))));
+    return (fs::path(cache_dir_) / (std::string(name) + kCacheSuffix)).string();
+}
+
+SchemaStamp SchemaCache::stamp(const std::string& xml_file) {
+    SchemaStamp stamp;
+    if (!statFile(xml_file, stamp)) {
+        throw std::runtime_error("Cannot stat schema file: " + xml_file);
+    }
+    stamp.content_hash = hashFile(xml_file);
+    return stamp;
+}
+
+std::unique_ptr<StructInfo> SchemaCache::lookup(const std::string& xml_file) const {
+    if (!enabled()) return nullptr;
+
+    SchemaStamp current;
+    if (!statFile(xml_file, current)) return nullptr;
+
+    std::string entry = entryPath(xml_file);
+    std::error_code ec;
+    if (!fs::is_regular_file(entry, ec)) return nullptr;
+
+    try {
+        MappedFile file(entry);
+        if (file.size() < sizeof(CacheHeader)) return nullptr;
+
+        CacheHeader header;
+        std::memcpy(&header, file.data(), sizeof(header));
+        if (std::memcmp(header.magic, kCacheMagic, sizeof(kCacheMagic)) != 0 ||
+            header.version != kCacheVersion ||
+            header.header_size != sizeof(CacheHeader)) {
+            return nullptr;
+        }
+
+        // Cheap checks first; the content hash needs a full read of the XML
+        if (header.source_size != current.file_size || header.source_mtime != current.mtime) {
+            return nullptr;
+        }
+
+        uint64_t records_size = static_cast<uint64_t>(header.field_count) * sizeof(CachedField);
+        if (sizeof(CacheHeader) + records_size + header.strings_size != file.size()) {
+            return nullptr;
+        }
+
+        if (header.source_hash != hashFile(xml_file)) return nullptr;
+
+        const auto* records = reinterpret_cast<const CachedField*>(file.data() + sizeof(CacheHeader));
+        std::string_view mapped_strings(reinterpret_cast<const char*>(file.data() + sizeof(CacheHeader) + records_size),
+                                        static_cast<size_t>(header.strings_size));
+
+        auto inString = [&](uint32_t offset, uint32_t length) {
+            return static_cast<uint64_t>(offset) + length <= mapped_strings.size();
+        };
+        if (!inString(header.path_offset, header.path_length) ||
+            !inString(header.name_offset, header.name_length) ||
+            mapped_strings.substr(header.path_offset, header.path_length) != absolutePath(xml_file)) {
+            return nullptr;
+        }
+
+        auto struct_info = std::make_unique<StructInfo>();
+        struct_info->name = std::string(mapped_strings.substr(header.name_offset, header.name_length));
+        struct_info->size = static_cast<size_t>(header.struct_size);
+        struct_info->packed = header.packed != 0;
+        if (header.has_discriminator) {
+            struct_info->discriminator_value = header.discriminator_value;
+        }
+        if (header.byte_order > static_cast<uint32_t>(ByteOrder::BIG)) return nullptr;
+        struct_info->byte_order = static_cast<ByteOrder>(header.byte_order);
+
+        // The string table is already deduplicated, so it is copied as is
+        // and field names point straight into it
+        std::string_view strings = struct_info->arena.storeStrings(mapped_strings);
+        if (!readFields(records, header.field_count, strings, *struct_info,
+                        header.root_first, header.root_count)) {
+            return nullptr;
+        }
+        validateLayout(*struct_info);
+        return struct_info;
+    } catch (const std::exception&) {
+        return nullptr;
+    }
+}
+
+bool SchemaCache::store(const std::string& xml_file, const StructInfo& struct_info,
+                        const SchemaStamp& source) const {
+    if (!enabled()) return false;
+
+    try {
+        CacheWriter writer;
+        std::string source_path = absolutePath(xml_file);
+        CacheHeader header{};
+        std::memcpy(header.magic, kCacheMagic, sizeof(kCacheMagic));
+        header.version = kCacheVersion;
+        header.header_size = sizeof(CacheHeader);
+        header.source_size = source.file_size;
+        header.source_mtime = source.mtime;
+        header.source_hash = source.content_hash;
+        header.struct_size = struct_info.size;
+        header.packed = struct_info.packed ? 1 : 0;
+        header.has_discriminator = struct_info.discriminator_value ? 1 : 0;
+        header.discriminator_value = struct_info.discriminator_value.value_or(0);
+        header.byte_order = static_cast<uint32_t>(struct_info.byte_order);
+        header.name_offset = writer.addString(struct_info.name);
+        header.name_length = static_cast<uint32_t>(struct_info.name.size());
+        header.path_offset = writer.addString(source_path);
+        header.path_length = static_cast<uint32_t>(source_path.size());
+        header.root_first = writer.addFields(struct_info.fields);
+        header.root_count = static_cast<uint32_t>(struct_info.fields.size());
+        header.field_count = static_cast<uint32_t>(writer.records().size());
+        header.strings_size = writer.strings().size();
+
+        std::error_code ec;
+        fs::create_directories(cache_dir_, ec);
+        if (ec) return false;
+
+        // Write to a private file and rename it into place so that
+        // concurrent readers never see a partially written entry
+        std::string entry = entryPath(xml_file);
+        std::string temp = entry + ".tmp" + std::to_string(std::random_device{}());
+        {
+            std::ofstream out(temp, std::ios::binary | std::ios::trunc);
+            if (!out) return false;
+            out.write(reinterpret_cast<const char*>(&header), sizeof(header));
+            out.write(reinterpret_cast<const char*>(writer.records().data()),
+                      writer.records().size() * sizeof(CachedField));
+            out.write(writer.strings().data(), writer.strings().size());
+            if (!out) {
+                out.close();
+                fs::remove(temp, ec);
+                return false;
+            }
+        }
+
+        fs::rename(temp, entry, ec);
+        if (ec) {
+            fs::remove(temp, ec);
+            return false;
+        }
+        return true;
+    } catch (const std::exception&) {
+        return false;
+    }
+}
+
+} // namespace binary_parser
\ No newline at end of file
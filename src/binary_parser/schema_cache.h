@@ -0,0 +1,57 @@
+#ifndef SCHEMA_CACHE_H
+#define SCHEMA_CACHE_H
+
+#include <string>
+#include <memory>
+#include <cstdint>
+
+namespace binary_parser {
+
+struct StructInfo;
+
+// Identifies the exact XML file a cache entry was built from
+struct SchemaStamp {
+    uint64_t file_size = 0;
+    int64_t mtime = 0;
+    uint64_t content_hash = 0;
+};
+
+// On-disk cache of loaded StructInfo trees.
+//
+// Each XML schema gets one cache file, named after a hash of its absolute
+// path. The file holds a fixed-size header followed by flat field records
+// and a string table, so it can be mapped and walked without any parsing.
+// An entry is only used when the XML file size, mtime and content hash
+// all match the values recorded when it was written.
+class SchemaCache {
+public:
+    // Empty cache_dir selects defaultDirectory()
+    explicit SchemaCache(std::string cache_dir = "");
+
+    // $XDG_CACHE_HOME/binary-parser-with-xml, falling back to ~/.cache.
+    // Returns an empty string when no suitable location exists.
+    static std::string defaultDirectory();
+
+    const std::string& directory() const { return cache_dir_; }
+    bool enabled() const { return !cache_dir_.empty(); }
+
+    // Returns nullptr when there is no valid entry for xml_file
+    std::unique_ptr<StructInfo> lookup(const std::string& xml_file) const;
+
+    // Writes (or replaces) the entry for xml_file. source is the stamp()
+    // taken before struct_info was read from the file. Returns false on failure.
+    bool store(const std::string& xml_file, const StructInfo& struct_info,
+               const SchemaStamp& source) const;
+
+    // Path of the cache file used for xml_file
+    std::string entryPath(const std::string& xml_file) const;
+
+    static SchemaStamp stamp(const std::string& xml_file);
+
+private:
+    std::string cache_dir_;
+};
+
+} // namespace binary_parser
+
+#endif // SCHEMA_CACHE_H
\ No newline at end of file
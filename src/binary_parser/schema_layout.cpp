@@ -0,0 +1,365 @@
+#include "xml_struct_parser.h"
+#include <algorithm>
+#include <limits>
+#include <map>
+#include <stdexcept>
+#include <unordered_map>
+#include <unordered_set>
+
+namespace binary_parser {
+
+namespace {
+
+size_t checkedAdd(size_t a, size_t b, std::string_view name) {
+    if (a > std::numeric_limits<size_t>::max() - b) {
+        throw std::runtime_error("Field exceeds addressable range: " + std::string(name));
+    }
+    return a + b;
+}
+
+size_t checkedMul(size_t a, size_t b, std::string_view name) {
+    if (b != 0 && a > std::numeric_limits<size_t>::max() / b) {
+        throw std::runtime_error("Field exceeds addressable range: " + std::string(name));
+    }
+    return a * b;
+}
+
+class ExtentCalculator {
+public:
+    // Furthest byte read by a list of sibling fields, relative to their base
+    size_t fieldsExtent(const FieldList& fields) {
+        if (fields.empty()) return 0;
+        // Lists shared by named types are measured once
+        auto it = memo_.find(fields.begin());
+        if (it != memo_.end()) return it->second;
+
+        size_t extent = 0;
+        for (const FieldInfo& field : fields) {
+            extent = std::max(extent, fieldExtent(field));
+        }
+        memo_.emplace(fields.begin(), extent);
+        return extent;
+    }
+
+private:
+    // Mirrors the reads BinaryParser performs for each kind of field
+    size_t fieldExtent(const FieldInfo& field) {
+        size_t end = checkedAdd(field.offset, field.size, field.name);
+        bool aggregate = field.type == FieldType::STRUCT || field.type == FieldType::UNION ||
+                         field.type == FieldType::UNKNOWN;
+
+        if (field.array_size > 1) {
+            size_t element_size = field.size / field.array_size;
+            size_t last = checkedAdd(field.offset, checkedMul(field.array_size - 1, element_size, field.name),
+                                     field.name);
+            if (aggregate) {
+                end = std::max(end, checkedAdd(last, fieldsExtent(field.sub_fields), field.name));
+            } else {
+                end = std::max(end, checkedAdd(last, fieldTypeWidth(field.type), field.name));
+                if (fieldTypeWidth(field.type) == 1) {
+                    // Byte arrays are copied in one piece
+                    end = std::max(end, checkedAdd(field.offset, field.array_size, field.name));
+                }
+            }
+        } else if (field.type == FieldType::STRUCT || field.type == FieldType::UNION) {
+            end = std::max(end, checkedAdd(field.offset, fieldsExtent(field.sub_fields), field.name));
+        } else if (field.bits == 0) {
+            end = std::max(end, checkedAdd(field.offset, fieldTypeWidth(field.type), field.name));
+        }
+        return end;
+    }
+
+    std::unordered_map<const FieldInfo*, size_t> memo_;
+};
+
+// Hands declared byte orders down to the fields that inherit theirs. A list
+// shared by named types may be reached under different orders, so a shared
+// list is copied before an inherited order is written into it.
+class ByteOrderResolver {
+public:
+    explicit ByteOrderResolver(SchemaArena& arena) : arena_(arena) {}
+    
+    void resolve(FieldList& fields, ByteOrder inherited) {
+        countReferences(fields);
+        resolveFields(fields, inherited);
+    }
+
+private:
+    void countReferences(const FieldList& fields) {
+        if (fields.empty() || references_[fields.begin()]++ > 0) return;
+        for (const FieldInfo& field : fields) {
+            countReferences(field.sub_fields);
+        }
+    }
+    
+    void resolveFields(FieldList& fields, ByteOrder inherited) {
+        // Lists reached again under the same order are resolved once
+        auto key = std::make_pair(static_cast<const FieldInfo*>(fields.begin()), inherited);
+        auto it = resolved_.find(key);
+        if (it != resolved_.end()) {
+            fields = it->second;
+            return;
+        }
+        
+        if (inherited != ByteOrder::DEFAULT && references_[fields.begin()] > 1 &&
+            std::any_of(fields.begin(), fields.end(),
+                        [](const FieldInfo& field) { return field.byte_order == ByteOrder::DEFAULT; })) {
+            FieldList copy = arena_.allocate(fields.size());
+            for (size_t i = 0; i < fields.size(); i++) {
+                copy[i] = fields[i];
+                if (fields[i].selector) {
+                    copy[i].selector = arena_.copySelector(*fields[i].selector);
+                }
+                if (!copy[i].sub_fields.empty()) {
+                    references_[copy[i].sub_fields.begin()]++;
+                }
+            }
+            references_[fields.begin()]--;
+            references_[copy.begin()] = 1;
+            fields = copy;
+        }
+        resolved_.emplace(key, fields);
+        
+        for (FieldInfo& field : fields) {
+            if (field.byte_order == ByteOrder::DEFAULT) {
+                field.byte_order = inherited;
+            }
+            if (!field.sub_fields.empty()) {
+                resolveFields(field.sub_fields, field.byte_order);
+            }
+        }
+    }
+    
+    SchemaArena& arena_;
+    std::unordered_map<const FieldInfo*, size_t> references_;
+    std::map<std::pair<const FieldInfo*, ByteOrder>, FieldList> resolved_;
+};
+
+void indexPaths(const FieldList& fields, const std::string& prefix, std::vector<uint32_t>& positions,
+                std::unordered_map<std::string, std::vector<uint32_t>>& paths) {
+    for (size_t i = 0; i < fields.size(); i++) {
+        const FieldInfo& field = fields[i];
+        std::string path = prefix.empty() ? std::string(field.name) : prefix + "." + std::string(field.name);
+        positions.push_back(static_cast<uint32_t>(i));
+        // The first of several same-named fields wins, as in ParsedFields::find()
+        paths.emplace(path, positions);
+        // Tagged unions hold only the selected member, so their members have
+        // no fixed position
+        if (field.array_size <= 1 && !field.sub_fields.empty() && !field.selector) {
+            indexPaths(field.sub_fields, path, positions, paths);
+        }
+        positions.pop_back();
+    }
+}
+
+// Stores each bitfield's mask and sign bit and groups runs of bitfields
+// that share a storage unit
+void prepareBitfields(FieldList& fields, std::unordered_set<const FieldInfo*>& visited) {
+    if (fields.empty() || !visited.insert(fields.begin()).second) return;
+    
+    for (size_t i = 0; i < fields.size(); i++) {
+        FieldInfo& field = fields[i];
+        field.unit_fields = 0;
+        if (field.bits > 0 && field.array_size <= 1) {
+            bitfieldConstants(field, field.bit_mask, field.bit_sign);
+        }
+        prepareBitfields(field.sub_fields, visited);
+    }
+    
+    auto groupable = [](const FieldInfo& field) {
+        return field.bits > 0 && field.array_size <= 1 && field.type != FieldType::FLOAT &&
+               field.type != FieldType::DOUBLE &&
+               (field.size == 1 || field.size == 2 || field.size == 4 || field.size == 8);
+    };
+    for (size_t i = 0; i < fields.size();) {
+        size_t end = i + 1;
+        if (groupable(fields[i])) {
+            while (end < fields.size() && groupable(fields[end]) && fields[end].offset == fields[i].offset &&
+                   fields[end].size == fields[i].size && fields[end].byte_order == fields[i].byte_order) {
+                end++;
+            }
+            fields[i].unit_fields = static_cast<uint32_t>(end - i);
+        }
+        i = end;
+    }
+}
+
+std::string_view trim(std::string_view text) {
+    while (!text.empty() && text.front() == ' ') text.remove_prefix(1);
+    while (!text.empty() && text.back() == ' ') text.remove_suffix(1);
+    return text;
+}
+
+uint64_t parseCaseValue(std::string_view text, const FieldInfo& union_field) {
+    std::string value(text);
+    try {
+        // Base 0 accepts decimal as well as 0x-prefixed values; negative
+        // values match sign-extended discriminators
+        size_t pos = 0;
+        uint64_t result = !value.empty() && value[0] == '-' ? static_cast<uint64_t>(std::stoll(value, &pos, 0))
+                                                             : std::stoull(value, &pos, 0);
+        if (pos == value.size()) return result;
+    } catch (const std::exception&) {
+    }
+    throw std::runtime_error("Invalid case value " + value + " in union " + std::string(union_field.name));
+}
+
+// Locates the discriminator among the siblings of a tagged union
+void resolveDiscriminator(const FieldList& siblings, const FieldInfo& union_field, UnionSelector& selector) {
+    std::string_view path = selector.discriminator;
+    const FieldList* level = &siblings;
+    const FieldInfo* found = nullptr;
+    size_t offset = 0;
+    for (;;) {
+        size_t dot = path.find('.');
+        std::string_view name = path.substr(0, dot);
+        found = nullptr;
+        for (const FieldInfo& field : *level) {
+            if (field.name == name) {
+                found = &field;
+                break;
+            }
+        }
+        if (!found) {
+            throw std::runtime_error("Discriminator " + std::string(selector.discriminator) + " of union " +
+                                     std::string(union_field.name) + " not found");
+        }
+        offset = checkedAdd(offset, found->offset, found->name);
+        if (dot == std::string_view::npos) break;
+        if (found->type != FieldType::STRUCT || found->array_size > 1) {
+            throw std::runtime_error("Discriminator path " + std::string(selector.discriminator) +
+                                     " goes through " + std::string(found->name) + ", which is not a struct");
+        }
+        level = &found->sub_fields;
+        path = path.substr(dot + 1);
+    }
+    
+    unsigned width = fieldTypeWidth(found->type);
+    if (width == 0 || found->type == FieldType::FLOAT || found->type == FieldType::DOUBLE ||
+        found->array_size > 1) {
+        throw std::runtime_error("Discriminator " + std::string(selector.discriminator) + " of union " +
+                                 std::string(union_field.name) + " must be an integer field");
+    }
+    selector.offset = offset;
+    selector.byte_order = found->byte_order;
+    if (found->bits > 0) {
+        if (found->size != 1 && found->size != 2 && found->size != 4 && found->size != 8) {
+            throw std::runtime_error("Unsupported bitfield size for discriminator " +
+                                     std::string(selector.discriminator));
+        }
+        selector.width = static_cast<unsigned>(found->size);
+        selector.shift = static_cast<unsigned>(found->bit_offset);
+        bitfieldConstants(*found, selector.mask, selector.sign);
+    } else {
+        bool is_signed = found->type == FieldType::INT8 || found->type == FieldType::INT16 ||
+                         found->type == FieldType::INT32 || found->type == FieldType::INT64;
+        selector.width = width;
+        selector.shift = 0;
+        selector.mask = width == 8 ? ~0ULL : (1ULL << (width * 8)) - 1;
+        selector.sign = is_signed ? 1ULL << (width * 8 - 1) : 0;
+    }
+    selector.resolved = true;
+}
+
+// Builds the value to member table from the cases text. Members missing
+// from the union are an error unless the schema is a projection, which
+// may have dropped them.
+void compileCases(const FieldInfo& union_field, UnionSelector& selector, bool require_members) {
+    selector.members.clear();
+    selector.default_member = UnionSelector::kNoMember;
+    
+    std::string_view cases = selector.cases;
+    while (!cases.empty()) {
+        size_t comma = cases.find(',');
+        std::string_view item = trim(cases.substr(0, comma));
+        cases = comma == std::string_view::npos ? std::string_view() : cases.substr(comma + 1);
+        if (item.empty()) continue;
+        
+        size_t equals = item.find('=');
+        if (equals == std::string_view::npos) {
+            throw std::runtime_error("Invalid case " + std::string(item) + " in union " +
+                                     std::string(union_field.name) + " (expected value=member)");
+        }
+        std::string_view key = trim(item.substr(0, equals));
+        std::string_view member = trim(item.substr(equals + 1));
+        uint32_t position = UnionSelector::kNoMember;
+        for (size_t i = 0; i < union_field.sub_fields.size(); i++) {
+            if (union_field.sub_fields[i].name == member) {
+                position = static_cast<uint32_t>(i);
+                break;
+            }
+        }
+        if (position == UnionSelector::kNoMember) {
+            if (require_members) {
+                throw std::runtime_error("Unknown member " + std::string(member) + " in cases of union " +
+                                         std::string(union_field.name));
+            }
+            continue;
+        }
+        
+        if (key == "default") {
+            selector.default_member = position;
+        } else {
+            selector.members.emplace_back(parseCaseValue(key, union_field), position);
+        }
+    }
+    
+    std::sort(selector.members.begin(), selector.members.end());
+    for (size_t i = 1; i < selector.members.size(); i++) {
+        if (selector.members[i].first == selector.members[i - 1].first) {
+            throw std::runtime_error("Duplicate case value " + std::to_string(selector.members[i].first) +
+                                     " in union " + std::string(union_field.name));
+        }
+    }
+}
+
+// Resolves the discriminators of tagged unions (once; projections keep the
+// resolved location even if the discriminator itself was not selected) and
+// builds their case tables
+void prepareSelectors(FieldList& fields, std::unordered_set<const FieldInfo*>& visited) {
+    if (fields.empty() || !visited.insert(fields.begin()).second) return;
+    
+    for (FieldInfo& field : fields) {
+        if (field.selector) {
+            bool fresh = !field.selector->resolved;
+            if (fresh) {
+                resolveDiscriminator(fields, field, *field.selector);
+            }
+            compileCases(field, *field.selector, fresh);
+        }
+        prepareSelectors(field.sub_fields, visited);
+    }
+}
+
+} // namespace
+
+uint32_t UnionSelector::select(uint64_t value) const {
+    auto it = std::lower_bound(members.begin(), members.end(), std::make_pair(value, uint32_t(0)));
+    return it != members.end() && it->first == value ? it->second : default_member;
+}
+
+void validateLayout(StructInfo& struct_info) {
+    ByteOrderResolver(struct_info.arena).resolve(struct_info.fields, struct_info.byte_order);
+    
+    ExtentCalculator calculator;
+    struct_info.extent = std::max(struct_info.size, calculator.fieldsExtent(struct_info.fields));
+    
+    std::vector<uint32_t> positions;
+    struct_info.field_paths.clear();
+    indexPaths(struct_info.fields, std::string(), positions, struct_info.field_paths);
+    
+    std::unordered_set<const FieldInfo*> visited;
+    prepareBitfields(struct_info.fields, visited);
+    
+    visited.clear();
+    prepareSelectors(struct_info.fields, visited);
+    
+    struct_info.layout_validated = true;
+}
+
+const std::vector<uint32_t>* StructInfo::findPath(std::string_view path) const {
+    auto it = field_paths.find(std::string(path));
+    return it == field_paths.end() ? nullptr : &it->second;
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,220 @@
+#include "schema_projection.h"
+#include <limits>
+#include <map>
+#include <stdexcept>
+#include <unordered_map>
+
+namespace binary_parser {
+
+namespace {
+
+// Fields picked from one list, keyed by their position in it
+struct Selection {
+    bool whole = false;  // The field and everything below it
+    bool ranged = false;
+    size_t first = 0;  // Element range of an array field
+    size_t last = 0;
+    std::map<size_t, Selection> members;
+};
+
+struct Segment {
+    std::string_view name;
+    bool indexed = false;
+    size_t first = 0;
+    size_t last = 0;
+};
+
+size_t parseIndex(std::string_view text, std::string_view path) {
+    if (text.empty() || text.size() > 18) {
+        throw std::runtime_error("Malformed field path: " + std::string(path));
+    }
+    size_t index = 0;
+    for (char c : text) {
+        if (c < '0' || c > '9') {
+            throw std::runtime_error("Malformed field path: " + std::string(path));
+        }
+        index = index * 10 + static_cast<size_t>(c - '0');
+    }
+    return index;
+}
+
+// Next '.' separating path segments; dots inside [first..last] are skipped
+size_t findSeparator(std::string_view path, size_t start) {
+    bool in_brackets = false;
+    for (size_t i = start; i < path.size(); i++) {
+        if (path[i] == '[') in_brackets = true;
+        else if (path[i] == ']') in_brackets = false;
+        else if (path[i] == '.' && !in_brackets) return i;
+    }
+    return std::string_view::npos;
+}
+
+// name, name[i] or name[first..last]
+Segment parseSegment(std::string_view segment, std::string_view path) {
+    Segment result;
+    size_t bracket = segment.find('[');
+    if (bracket == std::string_view::npos) {
+        result.name = segment;
+    } else {
+        if (segment.back() != ']') {
+            throw std::runtime_error("Malformed field path: " + std::string(path));
+        }
+        result.name = segment.substr(0, bracket);
+        std::string_view range = segment.substr(bracket + 1, segment.size() - bracket - 2);
+        size_t dots = range.find("..");
+        result.indexed = true;
+        result.first = parseIndex(range.substr(0, dots), path);
+        result.last = dots == std::string_view::npos ? result.first : parseIndex(range.substr(dots + 2), path);
+    }
+    if (result.name.empty()) {
+        throw std::runtime_error("Malformed field path: " + std::string(path));
+    }
+    return result;
+}
+
+void select(const FieldList& fields, std::map<size_t, Selection>& selected, std::string_view path) {
+    const FieldList* level = &fields;
+    std::map<size_t, Selection>* level_selected = &selected;
+    size_t start = 0;
+    
+    while (true) {
+        size_t dot = findSeparator(path, start);
+        Segment segment = parseSegment(path.substr(start, dot == std::string_view::npos ? std::string_view::npos
+                                                                                         : dot - start), path);
+        size_t position = 0;
+        while (position < level->size() && (*level)[position].name != segment.name) position++;
+        if (position == level->size()) {
+            throw std::runtime_error("No field " + std::string(segment.name) + " in field path " + std::string(path));
+        }
+        const FieldInfo& field = (*level)[position];
+        Selection& selection = (*level_selected)[position];
+        
+        if (field.array_size > 1) {
+            size_t first = segment.indexed ? segment.first : 0;
+            size_t last = segment.indexed ? segment.last : field.array_size - 1;
+            if (first > last || last >= field.array_size) {
+                throw std::runtime_error("Element range out of bounds in field path " + std::string(path));
+            }
+            if (selection.ranged && (selection.first != first || selection.last != last)) {
+                throw std::runtime_error("Conflicting element ranges for field " + std::string(field.name));
+            }
+            selection.ranged = true;
+            selection.first = first;
+            selection.last = last;
+        } else if (segment.indexed) {
+            throw std::runtime_error("Field " + std::string(field.name) + " is not an array in field path " +
+                                     std::string(path));
+        }
+        
+        if (dot == std::string_view::npos) {
+            selection.whole = true;
+            return;
+        }
+        if (field.sub_fields.empty()) {
+            throw std::runtime_error("Field " + std::string(field.name) + " has no members in field path " +
+                                     std::string(path));
+        }
+        level = &field.sub_fields;
+        level_selected = &selection.members;
+        start = dot + 1;
+    }
+}
+
+// Copies the selected fields into the arena of the projected schema
+class Projector {
+public:
+    explicit Projector(SchemaArena& arena) : arena_(arena) {}
+    
+    FieldList project(const FieldList& fields, const std::map<size_t, Selection>& selected) {
+        if (selected.empty()) return FieldList();
+        FieldList result = arena_.allocate(selected.size());
+        size_t i = 0;
+        for (const auto& [position, selection] : selected) {
+            const FieldInfo& source = fields[position];
+            FieldInfo& field = result[i++];
+            field = source;
+            field.name = arena_.intern(source.name);
+            if (source.selector) {
+                field.selector = arena_.copySelector(*source.selector);
+            }
+            if (selection.ranged) {
+                size_t element_size = source.size / source.array_size;
+                field.offset += selection.first * element_size;
+                field.array_size = selection.last - selection.first + 1;
+                field.size = field.array_size * element_size;
+                if (field.array_size == 1 && field.type == FieldType::UNKNOWN) {
+                    // A single element of a typedef'd struct array
+                    field.type = FieldType::STRUCT;
+                }
+            }
+            field.sub_fields = selection.whole ? copy(source.sub_fields)
+                                               : project(source.sub_fields, selection.members);
+        }
+        return result;
+    }
+    
+    // Whole lists; lists shared by named types stay shared
+    FieldList copy(const FieldList& fields) {
+        if (fields.empty()) return FieldList();
+        auto it = copies_.find(fields.begin());
+        if (it != copies_.end()) return it->second;
+        
+        FieldList result = arena_.allocate(fields.size());
+        for (size_t i = 0; i < fields.size(); i++) {
+            result[i] = fields[i];
+            result[i].name = arena_.intern(fields[i].name);
+            if (fields[i].selector) {
+                result[i].selector = arena_.copySelector(*fields[i].selector);
+            }
+            result[i].sub_fields = copy(fields[i].sub_fields);
+        }
+        copies_.emplace(fields.begin(), result);
+        return result;
+    }
+    
+private:
+    SchemaArena& arena_;
+    std::unordered_map<const FieldInfo*, FieldList> copies_;
+};
+
+} // namespace
+
+std::vector<std::string> splitFieldList(std::string_view list) {
+    std::vector<std::string> paths;
+    size_t start = 0;
+    while (start <= list.size()) {
+        size_t comma = list.find(',', start);
+        if (comma == std::string_view::npos) comma = list.size();
+        std::string_view path = list.substr(start, comma - start);
+        while (!path.empty() && path.front() == ' ') path.remove_prefix(1);
+        while (!path.empty() && path.back() == ' ') path.remove_suffix(1);
+        if (!path.empty()) paths.emplace_back(path);
+        start = comma + 1;
+    }
+    return paths;
+}
+
+std::unique_ptr<StructInfo> projectSchema(const StructInfo& struct_info, const std::vector<std::string>& paths) {
+    if (paths.empty()) {
+        throw std::runtime_error("No fields selected");
+    }
+    
+    std::map<size_t, Selection> selected;
+    for (const std::string& path : paths) {
+        select(struct_info.fields, selected, path);
+    }
+    
+    auto projected = std::make_unique<StructInfo>();
+    projected->name = struct_info.name;
+    projected->size = struct_info.size;
+    projected->packed = struct_info.packed;
+    projected->discriminator_value = struct_info.discriminator_value;
+    projected->byte_order = struct_info.byte_order;
+    
+    Projector projector(projected->arena);
+    projected->fields = projector.project(struct_info.fields, selected);
+    validateLayout(*projected);
+    return projected;
+}
+
+} // namespace binary_parser
\ No newline at end of file
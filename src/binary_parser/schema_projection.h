@@ -0,0 +1,31 @@
+#ifndef SCHEMA_PROJECTION_H
+#define SCHEMA_PROJECTION_H
+
+#include "xml_struct_parser.h"
+#include <memory>
+#include <string>
+#include <string_view>
+#include <vector>
+
+namespace binary_parser {
+
+// Splits a comma-separated field list ("header.seq,status.flags")
+std::vector<std::string> splitFieldList(std::string_view list);
+
+// Builds a schema holding only the fields named by paths, so everything
+// else is skipped without being decoded. Each path is dotted; an array
+// segment may select one element or an inclusive range, e.g.
+// "payload.samples[0..15]" or "points[2].x". A field selected whole keeps
+// all of its members. A path without an index through an array of structs
+// keeps every element.
+//
+// Fields keep their offsets and the record size is unchanged, so the
+// result parses the same records as the original (and is validated). A
+// range of one element becomes a plain field, as in the XML schema. Fields
+// appear in declaration order, whatever the order of paths. The result owns
+// its fields; the original may be destroyed.
+std::unique_ptr<StructInfo> projectSchema(const StructInfo& struct_info, const std::vector<std::string>& paths);
+
+} // namespace binary_parser
+
+#endif // SCHEMA_PROJECTION_H
\ No newline at end of file
@@ -0,0 +1,162 @@
+#include "schema_registry.h"
+#include "byte_swap.h"
+#include <algorithm>
+#include <filesystem>
+#include <stdexcept>
+
+namespace fs = std::filesystem;
+
+namespace binary_parser {
+
+namespace {
+
+// Values below this index the dense table directly; this covers 16-bit
+// type codes at 512 KiB of pointers
+constexpr uint64_t kMaxDenseValue = 1 << 16;
+
+} // namespace
+
+SchemaRegistry::SchemaRegistry(std::string discriminator_path, Endianness endianness)
+    : discriminator_path_(std::move(discriminator_path)), endianness_(endianness) {
+}
+
+const SchemaEntry& SchemaRegistry::add(uint64_t discriminator_value,
+                                       std::unique_ptr<StructInfo> struct_info,
+                                       std::string source) {
+    if (!struct_info) {
+        throw std::invalid_argument("SchemaRegistry::add requires a schema");
+    }
+    const std::string label = source.empty() ? struct_info->name : source;
+    if (struct_info->size == 0) {
+        throw std::runtime_error("Schema has no size: " + label);
+    }
+    if (find(discriminator_value)) {
+        throw std::runtime_error("Duplicate discriminator value " + std::to_string(discriminator_value) +
+                                 ": " + label);
+    }
+
+    auto entry = std::make_unique<SchemaEntry>();
+    entry->source = std::move(source);
+    entry->discriminator_value = discriminator_value;
+    entry->program = DecodeProgram::compile(*struct_info, endianness_);
+    entry->struct_info = std::move(struct_info);
+
+    const DecodeLeaf* leaf = entry->program.findLeaf(discriminator_path_);
+    if (!leaf) {
+        throw std::runtime_error("Discriminator " + discriminator_path_ + " not found in " + label);
+    }
+    const DecodeInstruction& in = entry->program.instructionFor(*leaf);
+    if (leaf->count != 1 || in.op == DecodeOp::FLOAT32 || in.op == DecodeOp::FLOAT64) {
+        throw std::runtime_error("Discriminator must be an integer scalar: " + discriminator_path_);
+    }
+
+    // Discriminators are compared as raw unsigned bits
+    Key key;
+    key.offset = in.offset;
+    key.width = in.width;
+    key.swap = in.swap;
+    if (in.op == DecodeOp::BITS_UNSIGNED || in.op == DecodeOp::BITS_SIGNED) {
+        key.shift = in.shift;
+        key.mask = in.mask;
+    } else {
+        key.mask = in.width >= 8 ? ~0ULL : (1ULL << (in.width * 8)) - 1;
+    }
+
+    if (entries_.empty()) {
+        key_ = key;
+        key_end_ = static_cast<size_t>(key.offset) + key.width;
+    } else if (key.offset != key_.offset || key.width != key_.width || key.shift != key_.shift ||
+               key.mask != key_.mask || key.swap != key_.swap) {
+        throw std::runtime_error("Discriminator " + discriminator_path_ +
+                                 " has a different layout in " + label);
+    }
+    if (key_end_ > entry->struct_info->size) {
+        throw std::runtime_error("Discriminator lies outside the record: " + label);
+    }
+    if ((discriminator_value & ~key_.mask) != 0) {
+        throw std::runtime_error("Discriminator value " + std::to_string(discriminator_value) +
+                                 " does not fit the field: " + label);
+    }
+
+    const SchemaEntry* added = entry.get();
+    if (discriminator_value < kMaxDenseValue) {
+        if (discriminator_value >= dense_.size()) {
+            dense_.resize(static_cast<size_t>(discriminator_value) + 1, nullptr);
+        }
+        dense_[discriminator_value] = added;
+    } else {
+        sparse_.emplace(discriminator_value, added);
+    }
+    entries_.push_back(std::move(entry));
+    return *added;
+}
+
+size_t SchemaRegistry::loadDirectory(const std::string& directory, XmlStructParser& parser) {
+    std::error_code ec;
+    if (!fs::is_directory(directory, ec)) {
+        throw std::runtime_error("Schema directory not found: " + directory);
+    }
+
+    // Sorted, so that errors and entry order do not depend on the file system
+    std::vector<std::string> files;
+    for (const auto& item : fs::directory_iterator(directory)) {
+        if (item.is_regular_file() && item.path().extension() == ".xml") {
+            files.push_back(item.path().string());
+        }
+    }
+    std::sort(files.begin(), files.end());
+
+    for (const std::string& file : files) {
+        auto struct_info = parser.parse(file);
+        if (!struct_info->discriminator_value) {
+            throw std::runtime_error("Schema has no discriminator_value: " + file);
+        }
+        uint64_t value = *struct_info->discriminator_value;
+        add(value, std::move(struct_info), file);
+    }
+    if (files.empty()) {
+        throw std::runtime_error("No XML schemas found in " + directory);
+    }
+    return files.size();
+}
+
+const SchemaEntry* SchemaRegistry::findSparse(uint64_t discriminator_value) const {
+    auto it = sparse_.find(discriminator_value);
+    return it == sparse_.end() ? nullptr : it->second;
+}
+
+uint64_t SchemaRegistry::readDiscriminator(const uint8_t* data) const {
+    return (loadUnsigned(data + key_.offset, key_.width, key_.swap) >> key_.shift) & key_.mask;
+}
+
+size_t SchemaRegistry::decodeStream(const uint8_t* data, size_t size,
+                                    const RecordCallback& callback, size_t max_records) const {
+    if (entries_.empty()) {
+        throw std::runtime_error("Schema registry is empty");
+    }
+
+    size_t offset = 0;
+    size_t count = 0;
+    while (offset < size && count < max_records) {
+        if (size - offset < key_end_) {
+            throw std::runtime_error("Truncated record at offset " + std::to_string(offset));
+        }
+        const uint8_t* record = data + offset;
+        uint64_t value = readDiscriminator(record);
+        const SchemaEntry* entry = find(value);
+        if (!entry) {
+            throw std::runtime_error("Unknown discriminator value " + std::to_string(value) +
+                                     " at offset " + std::to_string(offset));
+        }
+        size_t record_size = entry->struct_info->size;
+        if (size - offset < std::max(record_size, entry->program.extent())) {
+            throw std::runtime_error("Truncated record at offset " + std::to_string(offset));
+        }
+        callback(*entry, record, offset);
+        offset += record_size;
+        count++;
+    }
+    return count;
+}
+
+} // namespace binary_parser
\ No newline at end of file
@@ -0,0 +1,91 @@
+#ifndef SCHEMA_REGISTRY_H
+#define SCHEMA_REGISTRY_H
+
+#include "decode_program.h"
+#include "xml_struct_parser.h"
+#include <cstdint>
+#include <functional>
+#include <limits>
+#include <memory>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+namespace binary_parser {
+
+// A schema known to a registry together with its compiled program
+struct SchemaEntry {
+    std::string source;  // XML file the schema was loaded from, if any
+    uint64_t discriminator_value = 0;
+    std::unique_ptr<StructInfo> struct_info;
+    DecodeProgram program;
+};
+
+// Set of schemas for a stream of mixed records.
+//
+// All schemas share a discriminator field at the same position (typically a
+// message type in a common header). Its value selects the schema of each
+// record. Schemas are loaded and compiled once; dispatching a record is a
+// single load of the discriminator and an index into a dense table.
+class SchemaRegistry {
+public:
+    // Called for each record with its schema, its first byte and its
+    // offset in the stream
+    using RecordCallback = std::function<void(const SchemaEntry& entry, const uint8_t* record, size_t offset)>;
+
+    // discriminator_path names a leaf as in DecodeProgram, e.g. "header.type"
+    explicit SchemaRegistry(std::string discriminator_path,
+                            Endianness endianness = Endianness::LITTLE);
+
+    // Registers a schema for the given discriminator value
+    const SchemaEntry& add(uint64_t discriminator_value, std::unique_ptr<StructInfo> struct_info,
+                           std::string source = "");
+
+    // Loads every *.xml file in directory. Each root <struct> must carry a
+    // discriminator_value attribute. Returns the number of schemas loaded.
+    size_t loadDirectory(const std::string& directory, XmlStructParser& parser);
+
+    // Returns nullptr if no schema has this value
+    const SchemaEntry* find(uint64_t discriminator_value) const {
+        if (discriminator_value < dense_.size()) return dense_[discriminator_value];
+        return findSparse(discriminator_value);
+    }
+
+    // Discriminator of the record at data, which must hold discriminatorEnd() bytes
+    uint64_t readDiscriminator(const uint8_t* data) const;
+
+    // Decodes back-to-back records, each as long as its schema's size, and
+    // stops after max_records. Throws on an unknown discriminator or a
+    // truncated record. Returns the number of records.
+    size_t decodeStream(const uint8_t* data, size_t size, const RecordCallback& callback,
+                        size_t max_records = std::numeric_limits<size_t>::max()) const;
+
+    const std::string& discriminatorPath() const { return discriminator_path_; }
+    size_t discriminatorEnd() const { return key_end_; }  // Bytes needed to read the discriminator
+    size_t size() const { return entries_.size(); }
+    const std::vector<std::unique_ptr<SchemaEntry>>& entries() const { return entries_; }
+
+private:
+    const SchemaEntry* findSparse(uint64_t discriminator_value) const;
+
+    // Where the discriminator lives; identical in every schema
+    struct Key {
+        uint32_t offset = 0;
+        uint8_t width = 0;
+        uint8_t shift = 0;
+        bool swap = false;
+        uint64_t mask = 0;
+    };
+
+    std::string discriminator_path_;
+    Endianness endianness_;
+    Key key_;
+    size_t key_end_ = 0;
+    std::vector<std::unique_ptr<SchemaEntry>> entries_;
+    std::vector<const SchemaEntry*> dense_;  // Indexed by discriminator value
+    std::unordered_map<uint64_t, const SchemaEntry*> sparse_;  // Values too large for dense_
+};
+
+} // namespace binary_parser
+
+#endif // SCHEMA_REGISTRY_H
\ No newline at end of file
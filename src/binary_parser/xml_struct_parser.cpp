@@ -1,10 +1,34 @@
 #include "xml_struct_parser.h"
+#include "schema_cache.h"
 #include <tinyxml2.h>
+#include <optional>
 #include <stdexcept>
 
 namespace binary_parser {
 
 std::unique_ptr<StructInfo> XmlStructParser::parse(const std::string& xml_file) {
+    if (cache_ && cache_->enabled()) {
+        if (auto cached = cache_->lookup(xml_file)) {
+            return cached;
+        }
+        // Stamp the file before reading it: if it is edited in between, the
+        // entry records the older stamp and simply misses on the next run
+        std::optional<SchemaStamp> source;
+        try {
+            source = SchemaCache::stamp(xml_file);
+        } catch (const std::exception&) {
+            // Unreadable file: let parseXml() report it
+        }
+        auto struct_info = parseXml(xml_file);
+        if (source) {
+            cache_->store(xml_file, *struct_info, *source);  // A failed store only costs the next run
+        }
+        return struct_info;
+    }
+    return parseXml(xml_file);
+}
+
+std::unique_ptr<StructInfo> XmlStructParser::parseXml(const std::string& xml_file) {
     tinyxml2::XMLDocument doc;
     tinyxml2::XMLError result = doc.LoadFile(xml_file.c_str());
     
@@ -24,56 +48,184 @@ std::unique_ptr<StructInfo> XmlStructParser::parse(const std::string& xml_file)
     
     struct_info->size = root->UnsignedAttribute("size", 0);
     struct_info->packed = root->BoolAttribute("packed", false);
+    struct_info->byte_order = parseByteOrder(root);
+    
+    const char* discriminator_attr = root->Attribute("discriminator_value");
+    if (discriminator_attr) {
+        try {
+            // Base 0 accepts decimal as well as 0x-prefixed values
+            struct_info->discriminator_value = std::stoull(discriminator_attr, nullptr, 0);
+        } catch (const std::exception&) {
+            throw std::runtime_error("Invalid discriminator_value: " + std::string(discriminator_attr));
+        }
+    }
+    
+    // Named types are parsed once, on first reference, and shared by every
+    // field that refers to them
+    types_.clear();
+    for (const tinyxml2::XMLElement* type_node = root->FirstChildElement("type");
+         type_node;
+         type_node = type_node->NextSiblingElement("type")) {
+        const char* id = type_node->Attribute("id");
+        if (!id) {
+            throw std::runtime_error("type element without id");
+        }
+        NamedType named;
+        named.node = type_node;
+        if (!types_.emplace(id, named).second) {
+            throw std::runtime_error("Duplicate type id: " + std::string(id));
+        }
+    }
     
+    // Size the arena up front so the whole tree lands in one chunk
+    struct_info->arena.reserve(countFields(root));
+    arena_ = &struct_info->arena;
     parseSubFields(root, struct_info->fields);
+    arena_ = nullptr;
+    types_.clear();
     
+    validateLayout(*struct_info);
     return struct_info;
 }
 
-void XmlStructParser::parseSubFields(const tinyxml2::XMLElement* parent, 
-                                    std::vector<std::unique_ptr<FieldInfo>>& fields) {
+size_t XmlStructParser::countFields(const tinyxml2::XMLElement* parent) {
+    size_t count = 0;
     for (const tinyxml2::XMLElement* field_node = parent->FirstChildElement("field");
          field_node;
          field_node = field_node->NextSiblingElement("field")) {
-        fields.push_back(parseField(field_node));
+        count++;
+        for (const char* tag : {"struct", "union"}) {
+            if (const tinyxml2::XMLElement* child = field_node->FirstChildElement(tag)) {
+                count += countFields(child);
+            }
+        }
+    }
+    // Type definitions are counted once, however often they are referenced
+    for (const tinyxml2::XMLElement* type_node = parent->FirstChildElement("type");
+         type_node;
+         type_node = type_node->NextSiblingElement("type")) {
+        for (const char* tag : {"struct", "union"}) {
+            if (const tinyxml2::XMLElement* child = type_node->FirstChildElement(tag)) {
+                count += countFields(child);
+            }
+        }
     }
+    return count;
 }
 
-std::unique_ptr<FieldInfo> XmlStructParser::parseField(const tinyxml2::XMLElement* node) {
-    auto field = std::make_unique<FieldInfo>();
+void XmlStructParser::parseSubFields(const tinyxml2::XMLElement* parent, FieldList& fields) {
+    size_t count = 0;
+    for (const tinyxml2::XMLElement* field_node = parent->FirstChildElement("field");
+         field_node;
+         field_node = field_node->NextSiblingElement("field")) {
+        count++;
+    }
     
+    // Siblings are allocated as one block before any of their children
+    fields = arena_->allocate(count);
+    size_t index = 0;
+    for (const tinyxml2::XMLElement* field_node = parent->FirstChildElement("field");
+         field_node;
+         field_node = field_node->NextSiblingElement("field")) {
+        parseField(field_node, fields[index++]);
+    }
+}
+
+void XmlStructParser::parseField(const tinyxml2::XMLElement* node, FieldInfo& field) {
     const char* name_attr = node->Attribute("name");
-    if (name_attr) field->name = name_attr;
+    if (name_attr) field.name = arena_->intern(name_attr);
     
-    field->offset = node->UnsignedAttribute("offset", 0);
-    field->size = node->UnsignedAttribute("size", 0);
-    field->array_size = node->UnsignedAttribute("array_size", 1);
-    field->bits = node->IntAttribute("bits", 0);
-    field->bit_offset = node->IntAttribute("bit_offset", 0);
+    field.offset = node->UnsignedAttribute("offset", 0);
+    field.size = node->UnsignedAttribute("size", 0);
+    field.array_size = node->UnsignedAttribute("array_size", 1);
+    field.bits = node->IntAttribute("bits", 0);
+    field.bit_offset = node->IntAttribute("bit_offset", 0);
+    field.byte_order = parseByteOrder(node);
     
     // Check if it has a type attribute
     const char* type_attr = node->Attribute("type");
-    if (type_attr) {
-        field->type = parseFieldType(type_attr);
+    const char* type_ref_attr = node->Attribute("type_ref");
+    if (type_ref_attr) {
+        const NamedType& named = resolveType(type_ref_attr);
+        field.type = named.type;
+        field.is_union = named.type == FieldType::UNION;
+        field.sub_fields = named.fields;
+        if (field.size == 0) {
+            field.size = named.size * field.array_size;
+        }
+    } else if (type_attr) {
+        field.type = parseFieldType(type_attr);
     } else {
         // Check for struct or union sub-elements
         const tinyxml2::XMLElement* struct_node = node->FirstChildElement("struct");
         const tinyxml2::XMLElement* union_node = node->FirstChildElement("union");
         
         if (struct_node) {
-            field->type = FieldType::STRUCT;
-            field->is_union = false;
-            parseSubFields(struct_node, field->sub_fields);
+            field.type = FieldType::STRUCT;
+            field.is_union = false;
+            parseSubFields(struct_node, field.sub_fields);
         } else if (union_node) {
-            field->type = FieldType::UNION;
-            field->is_union = true;
-            parseSubFields(union_node, field->sub_fields);
+            field.type = FieldType::UNION;
+            field.is_union = true;
+            parseSubFields(union_node, field.sub_fields);
         } else {
-            field->type = FieldType::UNKNOWN;
+            field.type = FieldType::UNKNOWN;
+        }
+    }
+    
+    const char* discriminator_attr = node->Attribute("discriminator");
+    if (discriminator_attr) {
+        // Resolved against the union's siblings by validateLayout()
+        const char* cases_attr = node->Attribute("cases");
+        if (field.type != FieldType::UNION) {
+            throw std::runtime_error("discriminator on a field that is not a union: " + std::string(field.name));
         }
+        if (!cases_attr) {
+            throw std::runtime_error("Tagged union without cases: " + std::string(field.name));
+        }
+        field.selector = arena_->allocateSelector();
+        field.selector->discriminator = arena_->intern(discriminator_attr);
+        field.selector->cases = arena_->intern(cases_attr);
+    }
+}
+
+const XmlStructParser::NamedType& XmlStructParser::resolveType(const std::string& id) {
+    auto it = types_.find(id);
+    if (it == types_.end()) {
+        throw std::runtime_error("Unknown type_ref: " + id);
+    }
+    NamedType& named = it->second;
+    if (named.resolved) return named;
+    if (named.resolving) {
+        throw std::runtime_error("Recursive type definition: " + id);
     }
     
-    return field;
+    named.resolving = true;
+    named.size = named.node->UnsignedAttribute("size", 0);
+    const tinyxml2::XMLElement* struct_node = named.node->FirstChildElement("struct");
+    const tinyxml2::XMLElement* union_node = named.node->FirstChildElement("union");
+    if (struct_node) {
+        named.type = FieldType::STRUCT;
+        parseSubFields(struct_node, named.fields);
+    } else if (union_node) {
+        named.type = FieldType::UNION;
+        parseSubFields(union_node, named.fields);
+    } else {
+        throw std::runtime_error("type " + id + " has no struct or union");
+    }
+    named.resolving = false;
+    named.resolved = true;
+    return named;
+}
+
+ByteOrder XmlStructParser::parseByteOrder(const tinyxml2::XMLElement* node) {
+    const char* endian_attr = node->Attribute("endian");
+    if (!endian_attr) return ByteOrder::DEFAULT;
+    
+    std::string endian = endian_attr;
+    if (endian == "little") return ByteOrder::LITTLE;
+    if (endian == "big") return ByteOrder::BIG;
+    throw std::runtime_error("Invalid endian: " + endian);
 }
 
 FieldType XmlStructParser::parseFieldType(const std::string& type_str) {
@@ -87,7 +239,7 @@ FieldType XmlStructParser::parseFieldType(const std::string& type_str) {
     if (type_str == "int64_t") return FieldType::INT64;
     if (type_str == "float") return FieldType::FLOAT;
     if (type_str == "double") return FieldType::DOUBLE;
-    if (type_str == "char") return FieldType::UINT8;  // Treat char as uint8_t
+    if (type_str == "char") return FieldType::CHAR;  // Decoded as uint8_t; arrays are text
     
     return FieldType::UNKNOWN;
 }
@@ -2,9 +2,14 @@
 #define XML_STRUCT_PARSER_H
 
 #include <string>
+#include <string_view>
+#include <unordered_map>
+#include <unordered_set>
 #include <vector>
 #include <memory>
+#include <optional>
 #include <cstdint>
+#include "field_value.h"
 
 namespace tinyxml2 {
     class XMLElement;
@@ -29,37 +34,282 @@ enum class FieldType {
     UNKNOWN
 };
 
+// Bytes occupied by one value of a primitive type; 0 for aggregates
+inline unsigned fieldTypeWidth(FieldType type) {
+    switch (type) {
+        case FieldType::UINT8:
+        case FieldType::INT8:
+        case FieldType::CHAR:
+            return 1;
+        case FieldType::UINT16:
+        case FieldType::INT16:
+            return 2;
+        case FieldType::UINT32:
+        case FieldType::INT32:
+        case FieldType::FLOAT:
+            return 4;
+        case FieldType::UINT64:
+        case FieldType::INT64:
+        case FieldType::DOUBLE:
+            return 8;
+        default:
+            return 0;
+    }
+}
+
+// ValueType a primitive field decodes to (CHAR decodes as UINT8)
+inline ValueType valueTypeFor(FieldType type) {
+    switch (type) {
+        case FieldType::UINT8:
+        case FieldType::CHAR:
+            return ValueType::UINT8;
+        case FieldType::INT8: return ValueType::INT8;
+        case FieldType::UINT16: return ValueType::UINT16;
+        case FieldType::INT16: return ValueType::INT16;
+        case FieldType::UINT32: return ValueType::UINT32;
+        case FieldType::INT32: return ValueType::INT32;
+        case FieldType::UINT64: return ValueType::UINT64;
+        case FieldType::INT64: return ValueType::INT64;
+        case FieldType::FLOAT: return ValueType::FLOAT;
+        case FieldType::DOUBLE: return ValueType::DOUBLE;
+        default: return ValueType::NONE;
+    }
+}
+
+// Byte order declared by a schema (endian="big" or "little" on a struct or
+// field element). DEFAULT follows the endianness the parser was created with.
+enum class ByteOrder : uint8_t {
+    DEFAULT,
+    LITTLE,
+    BIG
+};
+
+struct FieldInfo;
+struct UnionSelector;
+
+// Contiguous run of sibling fields. The fields are owned by a SchemaArena;
+// a FieldList is only a view and is cheap to copy.
+class FieldList {
+public:
+    FieldList() = default;
+    FieldList(FieldInfo* data, size_t size) : data_(data), size_(size) {}
+    
+    size_t size() const { return size_; }
+    bool empty() const { return size_ == 0; }
+    
+    FieldInfo& operator[](size_t index);
+    const FieldInfo& operator[](size_t index) const;
+    
+    FieldInfo* begin() { return data_; }
+    FieldInfo* end();
+    const FieldInfo* begin() const { return data_; }
+    const FieldInfo* end() const;
+    
+private:
+    FieldInfo* data_ = nullptr;
+    size_t size_ = 0;
+};
+
 struct FieldInfo {
-    std::string name;
-    FieldType type;
-    size_t offset;
-    size_t size;
+    std::string_view name;  // Interned in the owning SchemaArena
+    FieldType type = FieldType::UNKNOWN;
+    size_t offset = 0;
+    size_t size = 0;
     size_t array_size = 1;  // 1 if not an array
     int bits = 0;  // 0 if not a bitfield
     int bit_offset = 0;  // bit offset within the field
     
-    // For struct/union fields
-    std::vector<std::unique_ptr<FieldInfo>> sub_fields;
+    // Declared byte order. validateLayout() hands it down to the members of
+    // struct/union fields that do not declare their own, so each field
+    // carries the order it is decoded with.
+    ByteOrder byte_order = ByteOrder::DEFAULT;
+    
+    // Bitfields, set by validateLayout(): the value is
+    // (unit >> bit_offset) & bit_mask, sign-extended from bit_sign if that
+    // is non-zero. The first bitfield of a run of siblings sharing one
+    // storage unit (same offset and size) holds the run's length in
+    // unit_fields, so the unit is loaded once for all of them; the others
+    // hold 0.
+    uint64_t bit_mask = 0;
+    uint64_t bit_sign = 0;
+    uint32_t unit_fields = 0;
+    
+    // For struct/union fields. Fields of the same named type (<type id=...>)
+    // share one list, so it must be treated as immutable once loaded.
+    FieldList sub_fields;
     bool is_union = false;
+    
+    // Tagged unions: picks the one member to decode; nullptr for plain
+    // unions, which decode every member. Owned by the SchemaArena.
+    UnionSelector* selector = nullptr;
+};
+
+// Member selection of a tagged union. The discriminator is a primitive
+// integer field among the union's siblings (a dotted path such as "type"
+// or "header.kind"), and cases maps its values to member names as written
+// in the schema: "1=ping, 2=data, 0x10=ext, default=raw". Values without a
+// case select the default member, or no member at all. Inside arrays of
+// structs every member is decoded, as the elements share one column layout.
+struct UnionSelector {
+    static constexpr uint32_t kNoMember = UINT32_MAX;
+    
+    std::string_view discriminator;  // Interned in the owning SchemaArena
+    std::string_view cases;
+    
+    // Set by validateLayout(): the discriminator is loaded from width bytes
+    // at offset (relative to the struct holding the union) and its value is
+    // (unit >> shift) & mask, sign-extended from sign if that is non-zero
+    bool resolved = false;
+    size_t offset = 0;
+    unsigned width = 0;
+    unsigned shift = 0;
+    uint64_t mask = 0;
+    uint64_t sign = 0;
+    ByteOrder byte_order = ByteOrder::DEFAULT;  // Of the discriminator
+    std::vector<std::pair<uint64_t, uint32_t>> members;  // Value to member position, sorted by value
+    uint32_t default_member = kNoMember;
+    
+    // Position of the member selected by a discriminator value, or kNoMember
+    uint32_t select(uint64_t value) const;
+};
+
+// Mask and sign bit of a bitfield's value, as stored by validateLayout().
+// Values are truncated to the declared type; sign is 0 for unsigned types.
+inline void bitfieldConstants(const FieldInfo& field, uint64_t& mask, uint64_t& sign) {
+    unsigned bits = static_cast<unsigned>(field.bits);
+    unsigned type_bits = fieldTypeWidth(field.type) * 8;
+    if (type_bits != 0 && bits > type_bits) bits = type_bits;
+    mask = bits >= 64 ? ~0ULL : (1ULL << bits) - 1;
+    bool is_signed = field.type == FieldType::INT8 || field.type == FieldType::INT16 ||
+                     field.type == FieldType::INT32 || field.type == FieldType::INT64;
+    sign = is_signed && bits > 0 ? 1ULL << (bits - 1) : 0;
+}
+
+inline FieldInfo& FieldList::operator[](size_t index) { return data_[index]; }
+inline const FieldInfo& FieldList::operator[](size_t index) const { return data_[index]; }
+inline FieldInfo* FieldList::end() { return data_ + size_; }
+inline const FieldInfo* FieldList::end() const { return data_ + size_; }
+
+// Storage for all FieldInfo nodes and field names of one schema.
+//
+// Fields are handed out in contiguous blocks from large chunks, so the
+// children of a field sit next to each other in memory and a whole schema
+// takes a handful of allocations. Names are interned: every distinct name
+// is stored once and FieldInfo::name points into that storage. Nothing is
+// freed or moved until the arena itself is destroyed.
+class SchemaArena {
+public:
+    SchemaArena() = default;
+    SchemaArena(const SchemaArena&) = delete;
+    SchemaArena& operator=(const SchemaArena&) = delete;
+    SchemaArena(SchemaArena&&) = default;
+    SchemaArena& operator=(SchemaArena&&) = default;
+    
+    // Make sure the next field_count fields come from a single chunk
+    void reserve(size_t field_count);
+    
+    // count default-initialised, contiguous fields
+    FieldList allocate(size_t count);
+    
+    std::string_view intern(std::string_view name);
+    
+    // A new selector, or a copy of one from another schema with its strings
+    // interned here
+    UnionSelector* allocateSelector();
+    UnionSelector* copySelector(const UnionSelector& selector);
+    
+    // Copy a block of strings in one piece; views into the returned copy
+    // stay valid for the arena's lifetime. Used for pre-deduplicated tables.
+    std::string_view storeStrings(std::string_view strings);
+    
+    size_t fieldCount() const { return field_count_; }
+    size_t chunkCount() const { return field_chunks_.size(); }
+    
+private:
+    char* allocateChars(size_t size);
+    
+    std::vector<std::unique_ptr<FieldInfo[]>> field_chunks_;
+    size_t chunk_used_ = 0;
+    size_t chunk_capacity_ = 0;
+    size_t field_count_ = 0;
+    
+    std::vector<std::unique_ptr<char[]>> char_chunks_;
+    size_t char_used_ = 0;
+    size_t char_capacity_ = 0;
+    std::unordered_set<std::string_view> names_;
+    
+    std::vector<std::unique_ptr<UnionSelector>> selectors_;
 };
 
+// A loaded schema. Once built (and validated) it is never modified while
+// parsing: BinaryParser, DecodeProgram and SchemaRegistry only read it, so
+// one StructInfo may be shared by any number of threads, each using its own
+// BinaryParser.
 struct StructInfo {
     std::string name;
-    size_t size;
+    size_t size = 0;
     bool packed = false;
-    std::vector<std::unique_ptr<FieldInfo>> fields;
+    std::optional<uint64_t> discriminator_value;  // Selects this schema in a SchemaRegistry
+    ByteOrder byte_order = ByteOrder::DEFAULT;  // Of fields that declare none
+    FieldList fields;
+    SchemaArena arena;  // Owns fields and everything below them
+    
+    // Set by validateLayout(): no field reads past extent bytes
+    size_t extent = 0;
+    bool layout_validated = false;
+    
+    // Set by validateLayout(): dotted path of every field outside struct
+    // arrays and tagged unions ("header.seq") to its position at each
+    // level, for ParsedStruct::find()
+    std::unordered_map<std::string, std::vector<uint32_t>> field_paths;
+    
+    // nullptr if the schema has no field at path
+    const std::vector<uint32_t>* findPath(std::string_view path) const;
 };
 
+// Hands the declared byte orders down to the fields, computes the furthest
+// byte any field of the schema reads, including element strides and
+// primitive load widths, indexes the field paths, precomputes the bitfield
+// constants, compiles the selectors of tagged unions, and marks the layout
+// as validated. A record of at least that many bytes can then be decoded
+// without per-field bounds checks. Loaders call this once per schema;
+// hand-built schemas may call it after they are complete.
+void validateLayout(StructInfo& struct_info);
+
+class SchemaCache;
+
 class XmlStructParser {
 public:
     XmlStructParser() = default;
     
+    // Consult (and fill) the given cache before parsing XML
+    explicit XmlStructParser(const SchemaCache* cache) : cache_(cache) {}
+    
     std::unique_ptr<StructInfo> parse(const std::string& xml_file);
     
 private:
-    std::unique_ptr<FieldInfo> parseField(const tinyxml2::XMLElement* node);
+    std::unique_ptr<StructInfo> parseXml(const std::string& xml_file);
+
+    void parseField(const tinyxml2::XMLElement* node, FieldInfo& field);
     FieldType parseFieldType(const std::string& type_str);
-    void parseSubFields(const tinyxml2::XMLElement* parent, std::vector<std::unique_ptr<FieldInfo>>& fields);
+    static ByteOrder parseByteOrder(const tinyxml2::XMLElement* node);
+    void parseSubFields(const tinyxml2::XMLElement* parent, FieldList& fields);
+    static size_t countFields(const tinyxml2::XMLElement* parent);
+    
+    // A <type id=...> definition, parsed on first reference
+    struct NamedType {
+        const tinyxml2::XMLElement* node = nullptr;
+        FieldType type = FieldType::UNKNOWN;
+        size_t size = 0;
+        FieldList fields;
+        bool resolving = false;
+        bool resolved = false;
+    };
+    const NamedType& resolveType(const std::string& id);
+    
+    const SchemaCache* cache_ = nullptr;
+    SchemaArena* arena_ = nullptr;  // Arena of the StructInfo being built
+    std::unordered_map<std::string, NamedType> types_;  // Types of the schema being built
 };
 
 } // namespace binary_parser
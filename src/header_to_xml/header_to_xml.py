@@ -26,7 +26,8 @@ class HeaderToXMLConverter:
         self.processed_files = set()
         self.macro_map = {}  # For #define expansion
     
-    def convert(self, header_file, root_struct_name, packed=False):
+    def convert(self, header_file, root_struct_name, packed=False, discriminator_value=None,
+                type_refs=False):
         # Reset state for new conversion
         self.typedef_map = {}
         self.struct_map = {}
@@ -89,13 +90,53 @@ class HeaderToXMLConverter:
         root = ET.Element('struct', name=root_struct_name)
         if packed:
             root.set('packed', 'true')
+        endian = self._body_endian(struct_body)
+        if endian:
+            root.set('endian', endian)
+        if discriminator_value is not None:
+            # Selects this struct in a directory of schemas (parse_binary --discriminator)
+            root.set('discriminator_value', str(discriminator_value))
         
         # Calculate offsets and sizes
         total_size = self._parse_struct_body(struct_body, root, 0, packed)
         root.set('size', str(total_size))
         
+        if type_refs:
+            self._hoist_named_types(root)
+        for elem in root.iter():
+            elem.attrib.pop('_type_name', None)
+        
         return self._prettify(root)
     
+    def _hoist_named_types(self, root):
+        """Moves expansions of named structs/unions into shared <type> definitions.
+
+        Each named type is emitted once as <type id=... size=...> at the top of
+        the root struct, and every field using it refers to it with type_ref.
+        Expansions that differ from the first one of the same name stay inline.
+        """
+        parents = {child: parent for parent in root.iter() for child in parent}
+        named = [elem for elem in root.iter() if elem.get('_type_name')]
+        types = {}
+        
+        # Innermost first, so that outer bodies already use type_ref
+        for elem in reversed(named):
+            type_name = elem.attrib.pop('_type_name')
+            field_elem = parents[elem]
+            body = ET.tostring(elem)
+            
+            if type_name not in types:
+                element_size = int(field_elem.get('size')) // int(field_elem.get('array_size', '1'))
+                type_elem = ET.Element('type', id=type_name, size=str(element_size))
+                type_elem.append(elem)
+                root.insert(len(types), type_elem)
+                types[type_name] = body
+            elif types[type_name] != body:
+                continue
+            
+            field_elem.remove(elem)
+            field_elem.set('type_ref', type_name)
+    
     def _process_header_file(self, header_file):
         if header_file in self.processed_files:
             return
@@ -204,6 +245,7 @@ class HeaderToXMLConverter:
                 union_elem = ET.SubElement(field_elem, 'union')
                 union_size = self._parse_union_body(union_body, union_elem, offset, packed)
                 field_elem.set('size', str(union_size))
+                self._apply_annotations(field_elem, lines[i], lines[end_idx])
                 
                 offset += union_size
                 i = end_idx + 1
@@ -228,6 +270,7 @@ class HeaderToXMLConverter:
                     element_size = self._parse_struct_body(struct_body, struct_elem, 0, packed)
                     field_size = element_size * int(expanded_size)
                     field_elem.set('size', str(field_size))
+                    self._apply_annotations(field_elem, lines[i], end_line)
                     
                     offset += field_size
                 else:
@@ -241,6 +284,7 @@ class HeaderToXMLConverter:
                     struct_elem = ET.SubElement(field_elem, 'struct')
                     struct_size = self._parse_struct_body(struct_body, struct_elem, 0, packed)
                     field_elem.set('size', str(struct_size))
+                    self._apply_annotations(field_elem, lines[i], end_line)
                     
                     offset += struct_size
                 i = end_idx + 1
@@ -275,6 +319,7 @@ class HeaderToXMLConverter:
                     # Set size based on base type
                     type_size = self.type_sizes.get(field_type, 4)
                     field_elem.set('size', str(type_size))
+                    self._apply_annotations(field_elem, line)
                     last_was_bitfield = True
                 else:
                     # Check if previous field was a bitfield and update offset
@@ -307,10 +352,11 @@ class HeaderToXMLConverter:
                             typedef_type, typedef_body = resolved_type_info
                             # For arrays of typedef structs, parse the structure
                             if typedef_type == 'struct':
-                                struct_elem = ET.SubElement(field_elem, 'struct')
+                                struct_elem = ET.SubElement(field_elem, 'struct', _type_name=field_type)
                                 element_size = self._parse_struct_body(typedef_body, struct_elem, 0, packed)
+                                self._apply_body_endian(field_elem, typedef_body)
                             else:
-                                union_elem = ET.SubElement(field_elem, 'union')
+                                union_elem = ET.SubElement(field_elem, 'union', _type_name=field_type)
                                 element_size = self._parse_union_body(typedef_body, union_elem, 0, packed)
                             field_size = element_size * int(expanded_size)
                         else:
@@ -323,8 +369,9 @@ class HeaderToXMLConverter:
                                     # Extract and parse the struct
                                     match = re.search(rf'struct\s+{field_type}\s*\{{((?:[^{{}}]|(?:\{{[^{{}}]*\}}))*)\}}', content, re.DOTALL)
                                     if match:
-                                        struct_elem = ET.SubElement(field_elem, 'struct')
+                                        struct_elem = ET.SubElement(field_elem, 'struct', _type_name=field_type)
                                         element_size = self._parse_struct_body(match.group(1), struct_elem, 0, packed)
+                                        self._apply_body_endian(field_elem, match.group(1))
                                         field_size = element_size * int(expanded_size)
                                     break
                             
@@ -335,6 +382,7 @@ class HeaderToXMLConverter:
                                 field_size = type_size * int(expanded_size)
                         
                         field_elem.set('size', str(field_size))
+                        self._apply_annotations(field_elem, line)
                         
                         if not packed:
                             # Get proper alignment
@@ -359,10 +407,11 @@ class HeaderToXMLConverter:
                             if isinstance(resolved_type_info, tuple):
                                 typedef_type, typedef_body = resolved_type_info
                                 if typedef_type == 'struct':
-                                    struct_elem = ET.SubElement(field_elem, 'struct')
+                                    struct_elem = ET.SubElement(field_elem, 'struct', _type_name=field_type)
                                     struct_size = self._parse_struct_body(typedef_body, struct_elem, 0, packed)
+                                    self._apply_body_endian(field_elem, typedef_body)
                                 else:  # union
-                                    struct_elem = ET.SubElement(field_elem, 'union')
+                                    struct_elem = ET.SubElement(field_elem, 'union', _type_name=field_type)
                                     struct_size = self._parse_union_body(typedef_body, struct_elem, offset, packed)
                                 field_elem.set('size', str(struct_size))
                                 offset += struct_size
@@ -378,8 +427,9 @@ class HeaderToXMLConverter:
                                         full_pattern = rf'struct\s+{field_type}\s*\{{([^{{}}]*(?:\{{[^{{}}]*\}}[^{{}}]*)*)\}}'
                                         match = re.search(full_pattern, content, re.DOTALL)
                                         if match:
-                                            struct_elem = ET.SubElement(field_elem, 'struct')
+                                            struct_elem = ET.SubElement(field_elem, 'struct', _type_name=field_type)
                                             struct_size = self._parse_struct_body(match.group(1), struct_elem, 0, packed)
+                                            self._apply_body_endian(field_elem, match.group(1))
                                             field_elem.set('size', str(struct_size))
                                             offset += struct_size
                                         break
@@ -394,6 +444,8 @@ class HeaderToXMLConverter:
                                         offset = self._align_offset(offset + type_size, type_size)
                                     else:
                                         offset += type_size
+                            
+                            self._apply_annotations(field_elem, line)
                 
                 i += 1
         
@@ -479,10 +531,10 @@ class HeaderToXMLConverter:
                 if isinstance(resolved_type_info, tuple):
                     typedef_type, typedef_body = resolved_type_info
                     if typedef_type == 'struct':
-                        struct_elem = ET.SubElement(field_elem, 'struct')
+                        struct_elem = ET.SubElement(field_elem, 'struct', _type_name=field_type)
                         struct_size = self._parse_struct_body(typedef_body, struct_elem, 0, packed)
                     else:  # union
-                        struct_elem = ET.SubElement(field_elem, 'union')
+                        struct_elem = ET.SubElement(field_elem, 'union', _type_name=field_type)
                         struct_size = self._parse_union_body(typedef_body, struct_elem, current_offset, packed)
                     field_elem.set('size', str(struct_size))
                     max_size = max(max_size, struct_size)
@@ -554,6 +606,51 @@ class HeaderToXMLConverter:
             return match.group(1)
         return 'unnamed'
     
+    def _apply_annotations(self, field_elem, *lines):
+        """Applies the annotation comments on a field's first or last line."""
+        endian = self._find_endian(lines)
+        if endian:
+            field_elem.set('endian', endian)
+        self._apply_discriminator(field_elem, lines)
+    
+    def _find_endian(self, lines):
+        """Byte order of a '// @endian(big)' or '// @endian(little)' comment, if any."""
+        for line in lines:
+            match = re.search(r'@endian\(\s*(\w*)\s*\)', line)
+            if match:
+                if match.group(1) not in ('big', 'little'):
+                    raise ValueError(f"Invalid @endian({match.group(1)}): expected big or little")
+                return match.group(1)
+        return None
+    
+    def _body_endian(self, body):
+        """Byte order annotated on the opening brace line of a struct body."""
+        return self._find_endian(body.split('\n', 1)[:1])
+    
+    def _apply_body_endian(self, field_elem, body):
+        """A field of a named struct type takes the type's byte order unless it declares its own."""
+        endian = self._body_endian(body)
+        if endian and not field_elem.get('endian'):
+            field_elem.set('endian', endian)
+    
+    def _apply_discriminator(self, field_elem, lines):
+        """Turns a '// @discriminator(type: 1=ping, 2=data, default=raw)' comment
+        on a union field's first or last line into discriminator/cases attributes."""
+        for line in lines:
+            match = re.search(r'@discriminator\(\s*([\w.]+)\s*:\s*([^)]*)\)', line)
+            if match:
+                break
+        else:
+            return
+        
+        if field_elem.find('union') is None:
+            raise ValueError(f"@discriminator on '{field_elem.get('name')}', which is not a union")
+        cases = ', '.join(case.strip() for case in match.group(2).split(',') if case.strip())
+        if not cases:
+            raise ValueError(f"@discriminator on '{field_elem.get('name')}' has no cases")
+        field_elem.set('discriminator', match.group(1))
+        field_elem.set('cases', cases)
+    
     def _extract_macros(self, content):
         """Extract #define macros from content"""
         # Process defines in order (important for dependent macros)
@@ -633,12 +730,17 @@ def main():
     parser.add_argument('struct_name', help='Root struct or union name to convert')
     parser.add_argument('-p', '--packed', action='store_true', help='Use packed alignment')
     parser.add_argument('-o', '--output', help='Output XML file name')
+    parser.add_argument('-d', '--discriminator-value', type=lambda v: int(v, 0),
+                        help='Discriminator value selecting this struct in a record stream')
+    parser.add_argument('-t', '--type-refs', action='store_true',
+                        help='Emit named structs once as <type> definitions referenced by type_ref')
     
     args = parser.parse_args()
     
     converter = HeaderToXMLConverter()
     try:
-        xml_content = converter.convert(args.header_file, args.struct_name, args.packed)
+        xml_content = converter.convert(args.header_file, args.struct_name, args.packed,
+                                        args.discriminator_value, args.type_refs)
         
         if args.output:
             with open(args.output, 'w') as f:
@@ -15,6 +15,10 @@ def main():
                         help='Output XML file (default: <struct_name>.xml)')
     parser.add_argument('-p', '--packed', action='store_true',
                         help='Mark struct as packed (no alignment)')
+    parser.add_argument('-d', '--discriminator-value', type=lambda v: int(v, 0),
+                        help='Discriminator value selecting this struct in a record stream')
+    parser.add_argument('-t', '--type-refs', action='store_true',
+                        help='Emit named structs once as <type> definitions referenced by type_ref')
     
     args = parser.parse_args()
     
@@ -26,7 +30,8 @@ def main():
     
     try:
         converter = HeaderToXMLConverter()
-        xml_content = converter.convert(args.header_file, args.struct_name, args.packed)
+        xml_content = converter.convert(args.header_file, args.struct_name, args.packed,
+                                        args.discriminator_value, args.type_refs)
         
         with open(output_file, 'w') as f:
             f.write(xml_content)
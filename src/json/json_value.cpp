@@ -5,6 +5,32 @@
 #include <stdexcept>
 #include <fstream>
 
+const std::shared_ptr<JsonValue>* JsonObject::find(const std::string& key) const {
+    if (!index_.empty()) {
+        auto it = index_.find(key);
+        return it == index_.end() ? nullptr : &entries_[it->second].second;
+    }
+    for (const Entry& entry : entries_) {
+        if (entry.first == key) return &entry.second;
+    }
+    return nullptr;
+}
+
+std::shared_ptr<JsonValue>& JsonObject::operator[](const std::string& key) {
+    if (const std::shared_ptr<JsonValue>* existing = find(key)) {
+        return const_cast<std::shared_ptr<JsonValue>&>(*existing);
+    }
+    entries_.emplace_back(key, nullptr);
+    if (!index_.empty()) {
+        index_.emplace(key, entries_.size() - 1);
+    } else if (entries_.size() > kIndexThreshold) {
+        for (size_t i = 0; i < entries_.size(); i++) {
+            index_.emplace(entries_[i].first, i);
+        }
+    }
+    return entries_.back().second;
+}
+
 JsonValue::JsonValue() : value_(nullptr) {}
 
 JsonValue::JsonValue(bool value) : value_(value) {}
@@ -200,7 +226,7 @@ bool JsonValue::contains(const std::string& key) const {
         return false;
     }
     auto obj = std::get<std::shared_ptr<ObjectType>>(value_);
-    return obj->find(key) != obj->end();
+    return obj->find(key) != nullptr;
 }
 
 JsonValue& JsonValue::operator[](const std::string& key) {
@@ -208,10 +234,11 @@ JsonValue& JsonValue::operator[](const std::string& key) {
         value_ = std::make_shared<ObjectType>();
     }
     auto obj = std::get<std::shared_ptr<ObjectType>>(value_);
-    if (obj->find(key) == obj->end()) {
-        (*obj)[key] = std::make_shared<JsonValue>();
+    std::shared_ptr<JsonValue>& member = (*obj)[key];
+    if (!member) {
+        member = std::make_shared<JsonValue>();
     }
-    return *(*obj)[key];
+    return *member;
 }
 
 const JsonValue& JsonValue::operator[](const std::string& key) const {
@@ -219,11 +246,11 @@ const JsonValue& JsonValue::operator[](const std::string& key) const {
         throw std::runtime_error("Not an object");
     }
     auto obj = std::get<std::shared_ptr<ObjectType>>(value_);
-    auto it = obj->find(key);
-    if (it == obj->end()) {
+    const std::shared_ptr<JsonValue>* member = obj->find(key);
+    if (!member) {
         throw std::out_of_range("Key not found");
     }
-    return *it->second;
+    return **member;
 }
 
 // Value getters
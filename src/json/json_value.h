@@ -4,13 +4,40 @@
 #include <string>
 #include <variant>
 #include <vector>
-#include <map>
+#include <unordered_map>
 #include <memory>
 
+class JsonValue;
+
+// オブジェクトのメンバー（挿入順を保持）
+class JsonObject {
+public:
+    using Entry = std::pair<std::string, std::shared_ptr<JsonValue>>;
+    using const_iterator = std::vector<Entry>::const_iterator;
+
+    size_t size() const { return entries_.size(); }
+    bool empty() const { return entries_.empty(); }
+    const_iterator begin() const { return entries_.begin(); }
+    const_iterator end() const { return entries_.end(); }
+
+    // nullptr if the key is not present
+    const std::shared_ptr<JsonValue>* find(const std::string& key) const;
+
+    // Existing member, or a new one appended at the end
+    std::shared_ptr<JsonValue>& operator[](const std::string& key);
+
+private:
+    // Small objects are searched linearly; larger ones get a key index
+    static constexpr size_t kIndexThreshold = 16;
+
+    std::vector<Entry> entries_;
+    std::unordered_map<std::string, size_t> index_;
+};
+
 class JsonValue {
 public:
     using ArrayType = std::vector<std::shared_ptr<JsonValue>>;
-    using ObjectType = std::map<std::string, std::shared_ptr<JsonValue>>;
+    using ObjectType = JsonObject;
 
     enum class Type {
         NULL_TYPE,
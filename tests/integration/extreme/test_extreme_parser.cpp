@@ -4,7 +4,6 @@
 #include <iomanip>
 #include <vector>
 #include <map>
-#include <any>
 #include <cstddef>  // for offsetof
 #include "extreme_test.h"
 #include "../../../src/binary_parser/binary_parser.h"
@@ -16,27 +15,24 @@ void printIndent(int level) {
     }
 }
 
-void printFieldValue(const std::string& name, const std::any& value, int indent = 0) {
+void printFieldValue(const std::string& name, const binary_parser::FieldValue& value, int indent = 0) {
     printIndent(indent);
     std::cout << name << ": ";
     
-    if (value.type() == typeid(uint8_t)) {
+    if (value.isArray()) {
+        std::cout << "[" << value.size() << " elements]";
+    } else if (value.type() == binary_parser::ValueType::UINT8) {
         std::cout << "0x" << std::hex << std::setw(2) << std::setfill('0') 
-                  << static_cast<int>(std::any_cast<uint8_t>(value)) << std::dec;
-    } else if (value.type() == typeid(uint16_t)) {
+                  << static_cast<int>(value.get<uint8_t>()) << std::dec;
+    } else if (value.type() == binary_parser::ValueType::UINT16) {
         std::cout << "0x" << std::hex << std::setw(4) << std::setfill('0') 
-                  << std::any_cast<uint16_t>(value) << std::dec;
-    } else if (value.type() == typeid(uint32_t)) {
+                  << value.get<uint16_t>() << std::dec;
+    } else if (value.type() == binary_parser::ValueType::UINT32) {
         std::cout << "0x" << std::hex << std::setw(8) << std::setfill('0') 
-                  << std::any_cast<uint32_t>(value) << std::dec;
-    } else if (value.type() == typeid(uint64_t)) {
+                  << value.get<uint32_t>() << std::dec;
+    } else if (value.type() == binary_parser::ValueType::UINT64) {
         std::cout << "0x" << std::hex << std::setw(16) << std::setfill('0') 
-                  << std::any_cast<uint64_t>(value) << std::dec;
-    } else if (value.type() == typeid(std::vector<std::any>)) {
-        auto vec = std::any_cast<std::vector<std::any>>(value);
-        std::cout << "[" << vec.size() << " elements]";
-    } else if (value.type() == typeid(std::map<std::string, std::any>)) {
-        std::cout << "{ nested structure }";
+                  << value.get<uint64_t>() << std::dec;
     } else {
         std::cout << "<unknown type>";
     }
@@ -49,10 +45,10 @@ void printParsedField(const binary_parser::ParsedField& field, int indent = 0) {
     
     if (!field.sub_fields.empty()) {
         std::cout << std::endl;
-        for (const auto& [name, sub_field] : field.sub_fields) {
+        for (const auto& sub_field : field.sub_fields) {
             printParsedField(sub_field, indent + 1);
         }
-    } else if (field.value.has_value()) {
+    } else if (field.value.hasValue()) {
         printFieldValue(field.name, field.value, 0);
     } else {
         std::cout << "<no value>" << std::endl;
@@ -61,7 +57,7 @@ void printParsedField(const binary_parser::ParsedField& field, int indent = 0) {
 
 void printParsedStruct(const binary_parser::ParsedStruct& parsed) {
     std::cout << "Struct: " << parsed.struct_name << std::endl;
-    for (const auto& [name, field] : parsed.fields) {
+    for (const auto& field : parsed.fields) {
         printParsedField(field, 1);
     }
 }
@@ -162,8 +158,8 @@ int main() {
         // Check signature
         if (result->fields.count("signature")) {
             const auto& sig_field = result->fields.at("signature");
-            if (sig_field.value.has_value() && sig_field.value.type() == typeid(uint32_t)) {
-                uint32_t sig = std::any_cast<uint32_t>(sig_field.value);
+            if (sig_field.value.type() == binary_parser::ValueType::UINT32 && !sig_field.value.isArray()) {
+                uint32_t sig = sig_field.value.get<uint32_t>();
                 std::cout << "✓ Signature: 0x" << std::hex << sig << std::dec 
                           << (sig == 0xDEADBEEF ? " (correct)" : " (INCORRECT!)") << std::endl;
             } else {
@@ -180,8 +176,8 @@ int main() {
             // In a union, we should see multiple fields at the same offset
             if (unnamed_field.sub_fields.count("timestamp")) {
                 const auto& ts_field = unnamed_field.sub_fields.at("timestamp");
-                if (ts_field.value.has_value() && ts_field.value.type() == typeid(uint64_t)) {
-                    uint64_t ts = std::any_cast<uint64_t>(ts_field.value);
+                if (ts_field.value.type() == binary_parser::ValueType::UINT64 && !ts_field.value.isArray()) {
+                    uint64_t ts = ts_field.value.get<uint64_t>();
                     std::cout << "✓ Timestamp: 0x" << std::hex << ts << std::dec 
                               << (ts == 0x123456789ABCDEF0 ? " (correct)" : " (INCORRECT!)") << std::endl;
                 }
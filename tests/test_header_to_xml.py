@@ -267,5 +267,216 @@ class TestHeaderToXMLConverter(unittest.TestCase):
         finally:
             os.unlink(header_file)
 
+    def test_discriminator_value(self):
+        header_content = """
+        #include <stdint.h>
+        
+        struct Heartbeat {
+            uint8_t type;
+            uint8_t flags;
+            uint16_t sequence;
+        };
+        """
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.h', delete=False) as f:
+            f.write(header_content)
+            header_file = f.name
+        
+        try:
+            converter = HeaderToXMLConverter()
+            root = ET.fromstring(converter.convert(header_file, "Heartbeat", discriminator_value=3))
+            self.assertEqual(root.get('discriminator_value'), '3')
+            
+            root = ET.fromstring(converter.convert(header_file, "Heartbeat"))
+            self.assertIsNone(root.get('discriminator_value'))
+            
+        finally:
+            os.unlink(header_file)
+
+    def test_type_refs(self):
+        header_content = """
+        #include <stdint.h>
+        
+        typedef struct {
+            int16_t x;
+            int16_t y;
+        } Point;
+        
+        typedef struct {
+            Point min;
+            Point max;
+        } Box;
+        
+        struct Scene {
+            uint32_t id;
+            Box bounds;
+            Point points[4];
+        };
+        """
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.h', delete=False) as f:
+            f.write(header_content)
+            header_file = f.name
+        
+        try:
+            converter = HeaderToXMLConverter()
+            inline = ET.fromstring(converter.convert(header_file, "Scene"))
+            root = ET.fromstring(converter.convert(header_file, "Scene", type_refs=True))
+            
+            self.assertEqual(root.get('size'), inline.get('size'))
+            
+            # Each named type is defined once, before the fields
+            types = root.findall('type')
+            self.assertEqual([t.get('id') for t in types], ['Point', 'Box'])
+            self.assertEqual(types[0].get('size'), '4')
+            self.assertEqual(types[1].get('size'), '8')
+            box_fields = types[1].find('struct').findall('field')
+            self.assertEqual([f.get('type_ref') for f in box_fields], ['Point', 'Point'])
+            
+            fields = {f.get('name'): f for f in root.findall('field')}
+            self.assertEqual(fields['bounds'].get('type_ref'), 'Box')
+            self.assertIsNone(fields['bounds'].find('struct'))
+            self.assertEqual(fields['points'].get('type_ref'), 'Point')
+            self.assertEqual(fields['points'].get('array_size'), '4')
+            self.assertEqual(fields['points'].get('size'), '16')
+            
+            # Without the option nothing changes and no helper attributes leak
+            self.assertEqual(inline.findall('type'), [])
+            self.assertEqual([e for e in inline.iter() if e.get('_type_name')], [])
+            
+        finally:
+            os.unlink(header_file)
+
+    def test_discriminator_annotation(self):
+        header_content = """
+        #include <stdint.h>
+        
+        typedef union {
+            uint32_t word;
+            uint8_t bytes[4];
+        } Raw;
+        
+        struct Packet {
+            uint16_t type;
+            uint16_t format;
+            union {  // @discriminator(type: 1=ping, 0x10=value, default=text)
+                uint16_t ping;
+                uint32_t value;
+                char text[4];
+            } body;
+            Raw raw;  // @discriminator(format: 0=word,1=bytes)
+            Raw plain;
+        };
+        """
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.h', delete=False) as f:
+            f.write(header_content)
+            header_file = f.name
+        
+        try:
+            converter = HeaderToXMLConverter()
+            root = ET.fromstring(converter.convert(header_file, "Packet"))
+            
+            fields = {f.get('name'): f for f in root.findall('field')}
+            self.assertEqual(fields['body'].get('discriminator'), 'type')
+            self.assertEqual(fields['body'].get('cases'), '1=ping, 0x10=value, default=text')
+            self.assertEqual(fields['raw'].get('discriminator'), 'format')
+            self.assertEqual(fields['raw'].get('cases'), '0=word, 1=bytes')
+            self.assertIsNone(fields['plain'].get('discriminator'))
+            self.assertIsNone(fields['type'].get('discriminator'))
+            
+            # The attributes stay on the field when the union becomes a named type
+            root = ET.fromstring(converter.convert(header_file, "Packet", type_refs=True))
+            raw = root.find("./field[@name='raw']")
+            self.assertEqual(raw.get('type_ref'), 'Raw')
+            self.assertEqual(raw.get('discriminator'), 'format')
+            
+        finally:
+            os.unlink(header_file)
+    
+    def test_discriminator_on_non_union(self):
+        header_content = """
+        #include <stdint.h>
+        
+        struct Bad {
+            uint16_t type;
+            uint32_t value;  // @discriminator(type: 1=a)
+        };
+        """
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.h', delete=False) as f:
+            f.write(header_content)
+            header_file = f.name
+        
+        try:
+            converter = HeaderToXMLConverter()
+            with self.assertRaises(ValueError):
+                converter.convert(header_file, "Bad")
+        finally:
+            os.unlink(header_file)
+
+    def test_endian_annotation(self):
+        header_content = """
+        #include <stdint.h>
+        
+        typedef struct {  // @endian(big)
+            uint16_t type;
+            uint16_t length;
+        } NetHeader;
+        
+        struct Frame {  // @endian(little)
+            NetHeader header;
+            NetHeader local;  // @endian(little)
+            struct {  // @endian(big)
+                uint32_t seq;
+            } trailer;
+            uint32_t crc;  // @endian(big)
+            uint16_t samples[4];
+        };
+        """
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.h', delete=False) as f:
+            f.write(header_content)
+            header_file = f.name
+        
+        try:
+            converter = HeaderToXMLConverter()
+            root = ET.fromstring(converter.convert(header_file, "Frame"))
+            self.assertEqual(root.get('endian'), 'little')
+            
+            fields = {f.get('name'): f for f in root.findall('field')}
+            self.assertEqual(fields['header'].get('endian'), 'big')
+            self.assertEqual(fields['local'].get('endian'), 'little')
+            self.assertEqual(fields['trailer'].get('endian'), 'big')
+            self.assertEqual(fields['crc'].get('endian'), 'big')
+            self.assertIsNone(fields['samples'].get('endian'))
+            self.assertIsNone(fields['header'].find("struct/field[@name='type']").get('endian'))
+            
+            root = ET.fromstring(converter.convert(header_file, "NetHeader"))
+            self.assertEqual(root.get('endian'), 'big')
+            
+        finally:
+            os.unlink(header_file)
+    
+    def test_invalid_endian_annotation(self):
+        header_content = """
+        #include <stdint.h>
+        
+        struct Bad {
+            uint32_t value;  // @endian(middle)
+        };
+        """
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.h', delete=False) as f:
+            f.write(header_content)
+            header_file = f.name
+        
+        try:
+            converter = HeaderToXMLConverter()
+            with self.assertRaises(ValueError):
+                converter.convert(header_file, "Bad")
+        finally:
+            os.unlink(header_file)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,12 @@
+#ifndef ALLOCATION_COUNTER_H
+#define ALLOCATION_COUNTER_H
+
+#include <atomic>
+#include <cstddef>
+
+// Heap allocations made by the test binary while g_count_allocations is
+// set. operator new is replaced in test_parse_into.cpp.
+extern std::atomic<bool> g_count_allocations;
+extern std::atomic<size_t> g_allocations;
+
+#endif // ALLOCATION_COUNTER_H
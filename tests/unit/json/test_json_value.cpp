@@ -91,13 +91,33 @@ TEST(JsonValueTest, ObjectValue) {
     EXPECT_EQ(obj["active"].getBool(), true);
     
     // Test object toString()
-    // Note: order may vary in std::map
     std::string json_str = obj.toString();
     EXPECT_TRUE(json_str.find("\"name\":\"John\"") != std::string::npos);
     EXPECT_TRUE(json_str.find("\"age\":30") != std::string::npos);
     EXPECT_TRUE(json_str.find("\"active\":true") != std::string::npos);
 }
 
+TEST(JsonValueTest, ObjectKeepsInsertionOrder) {
+    JsonValue obj = JsonValue::createObject();
+    obj.set("zeta", JsonValue(1));
+    obj.set("alpha", JsonValue(2));
+    obj.set("zeta", JsonValue(3));  // Replaced in place
+    EXPECT_EQ(obj.toString(), "{\"zeta\":3,\"alpha\":2}");
+    
+    // Large objects are indexed; order and lookups are unchanged
+    JsonValue large = JsonValue::createObject();
+    for (int i = 99; i >= 0; i--) {
+        large.set("k" + std::to_string(i), JsonValue(i));
+    }
+    EXPECT_EQ(large.getObject().size(), 100);
+    EXPECT_EQ(large.getObject().begin()->first, "k99");
+    EXPECT_EQ(large["k42"].getNumber(), 42);
+    EXPECT_TRUE(large.contains("k0"));
+    EXPECT_FALSE(large.contains("k100"));
+    large["k100"] = JsonValue(100);
+    EXPECT_EQ((large.getObject().end() - 1)->first, "k100");
+}
+
 TEST(JsonValueTest, NestedStructures) {
     // Nested array
     JsonValue nested_array;
@@ -0,0 +1,312 @@
+#include <gtest/gtest.h>
+#include "binary_parser/arrow_writer.h"
+#include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/binary_parser.h"
+#include <cstring>
+#include <sstream>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Sample {
+//     uint32_t id;
+//     int16_t v[2];
+//     char name[4];
+//     struct { uint8_t a; uint8_t b; } pairs[2];
+//     struct { double t; } meta;
+// };
+std::unique_ptr<StructInfo> createSample() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Sample";
+    struct_info->size = 24;
+    struct_info->fields = struct_info->arena.allocate(5);
+    setField(struct_info->fields[0], "id", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[1], "v", FieldType::INT16, 4, 4, 2);
+    setField(struct_info->fields[2], "name", FieldType::CHAR, 8, 4, 4);
+    setField(struct_info->fields[3], "pairs", FieldType::STRUCT, 12, 4, 2);
+    struct_info->fields[3].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[3].sub_fields[0], "a", FieldType::UINT8, 0, 1);
+    setField(struct_info->fields[3].sub_fields[1], "b", FieldType::UINT8, 1, 1);
+    setField(struct_info->fields[4], "meta", FieldType::STRUCT, 16, 8);
+    struct_info->fields[4].sub_fields = struct_info->arena.allocate(1);
+    setField(struct_info->fields[4].sub_fields[0], "t", FieldType::DOUBLE, 0, 8);
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> sampleRecord(uint32_t id) {
+    std::vector<uint8_t> data(24, 0);
+    std::memcpy(data.data(), &id, 4);
+    int16_t v[2] = {static_cast<int16_t>(-static_cast<int>(id)), static_cast<int16_t>(id * 2)};
+    std::memcpy(data.data() + 4, v, 4);
+    data[8] = 'r';
+    data[9] = static_cast<uint8_t>('0' + id);
+    for (int i = 0; i < 4; i++) data[12 + i] = static_cast<uint8_t>(id * 10 + i);
+    double t = id + 0.5;
+    std::memcpy(data.data() + 16, &t, 8);
+    return data;
+}
+
+std::string writeRecords(const StructInfo& struct_info, size_t count, const ArrowWriterOptions& options) {
+    std::ostringstream out;
+    ArrowWriter writer(out, struct_info, options);
+    BinaryParser parser;
+    for (size_t i = 0; i < count; i++) {
+        auto data = sampleRecord(static_cast<uint32_t>(i));
+        writer.write(*parser.parse(data.data(), data.size(), struct_info));
+    }
+    writer.finish();
+    return out.str();
+}
+
+// Reads FlatBuffers tables (little-endian host assumed)
+class FlatReader {
+public:
+    FlatReader(const std::string& bytes, size_t base) : bytes_(bytes), base_(base) {}
+
+    template <typename T>
+    T read(size_t pos) const {
+        T value;
+        std::memcpy(&value, bytes_.data() + base_ + pos, sizeof(T));
+        return value;
+    }
+
+    size_t root() const { return read<uint32_t>(0); }
+
+    // Position of field id of the table, or 0 if it is absent
+    size_t field(size_t table, int id) const {
+        size_t vtable = table - read<int32_t>(table);
+        if (4 + 2 * id >= read<uint16_t>(vtable)) return 0;
+        uint16_t offset = read<uint16_t>(vtable + 4 + 2 * id);
+        return offset ? table + offset : 0;
+    }
+
+    size_t ref(size_t table, int id) const {
+        size_t pos = field(table, id);
+        return pos + read<uint32_t>(pos);
+    }
+
+    std::string str(size_t table, int id) const {
+        size_t pos = ref(table, id);
+        return bytes_.substr(base_ + pos + 4, read<uint32_t>(pos));
+    }
+
+    // Element index of a vector of tables
+    size_t element(size_t vector, size_t index) const {
+        size_t pos = vector + 4 + 4 * index;
+        return pos + read<uint32_t>(pos);
+    }
+
+private:
+    const std::string& bytes_;
+    size_t base_;
+};
+
+// One encapsulated IPC message
+struct Message {
+    size_t metadata;  // Offset of the flatbuffer in the stream
+    size_t body;      // Offset of the body
+    size_t body_length;
+    size_t end;
+};
+
+Message readMessage(const std::string& bytes, size_t offset) {
+    uint32_t marker;
+    int32_t length;
+    std::memcpy(&marker, bytes.data() + offset, 4);
+    std::memcpy(&length, bytes.data() + offset + 4, 4);
+    EXPECT_EQ(marker, 0xFFFFFFFFu);
+    EXPECT_EQ(length % 8, 0);
+    Message message{offset + 8, offset + 8 + length, 0, 0};
+    if (length > 0) {
+        FlatReader reader(bytes, message.metadata);
+        message.body_length = reader.read<int64_t>(reader.field(reader.root(), 3));
+    }
+    message.end = message.body + message.body_length;
+    return message;
+}
+
+} // namespace
+
+TEST(ArrowWriterTest, StreamFormatLayout) {
+    auto struct_info = createSample();
+    ArrowWriterOptions options;
+    options.stream = true;
+    std::string bytes = writeRecords(*struct_info, 3, options);
+
+    // Schema message
+    Message schema = readMessage(bytes, 0);
+    FlatReader meta(bytes, schema.metadata);
+    size_t message = meta.root();
+    EXPECT_EQ(meta.read<int16_t>(meta.field(message, 0)), 4);  // V5
+    EXPECT_EQ(meta.read<uint8_t>(meta.field(message, 1)), 1);  // Schema
+    size_t schema_table = meta.ref(message, 2);
+    size_t fields = meta.ref(schema_table, 1);
+    ASSERT_EQ(meta.read<uint32_t>(fields), 5);
+
+    std::vector<std::string> names;
+    std::vector<int> types;
+    for (size_t i = 0; i < 5; i++) {
+        size_t field = meta.element(fields, i);
+        names.push_back(meta.str(field, 0));
+        types.push_back(meta.read<uint8_t>(meta.field(field, 2)));
+    }
+    EXPECT_EQ(names, (std::vector<std::string>{"id", "v", "name", "pairs", "meta"}));
+    EXPECT_EQ(types, (std::vector<int>{2, 16, 5, 16, 13}));  // Int, FixedSizeList, Utf8, FixedSizeList, Struct
+
+    size_t id_type = meta.ref(meta.element(fields, 0), 3);
+    EXPECT_EQ(meta.read<int32_t>(meta.field(id_type, 0)), 32);
+    EXPECT_EQ(meta.read<uint8_t>(meta.field(id_type, 1)), 0);
+    size_t pairs = meta.element(fields, 3);
+    EXPECT_EQ(meta.read<int32_t>(meta.field(meta.ref(pairs, 3), 0)), 2);
+    size_t pair_item = meta.element(meta.ref(pairs, 5), 0);
+    EXPECT_EQ(meta.read<uint8_t>(meta.field(pair_item, 2)), 13);
+    EXPECT_EQ(meta.read<uint32_t>(meta.ref(pair_item, 5)), 2);
+
+    // Record batch
+    Message batch = readMessage(bytes, schema.end);
+    FlatReader batch_meta(bytes, batch.metadata);
+    message = batch_meta.root();
+    EXPECT_EQ(batch_meta.read<uint8_t>(batch_meta.field(message, 1)), 3);  // RecordBatch
+    size_t record_batch = batch_meta.ref(message, 2);
+    EXPECT_EQ(batch_meta.read<int64_t>(batch_meta.field(record_batch, 0)), 3);
+
+    // Nodes: id, v, v.item, name, pairs, pairs.item, a, b, meta, t
+    size_t nodes = batch_meta.ref(record_batch, 1);
+    ASSERT_EQ(batch_meta.read<uint32_t>(nodes), 10);
+    EXPECT_EQ((nodes + 4) % 8, 0);
+    std::vector<int64_t> lengths;
+    for (size_t i = 0; i < 10; i++) {
+        lengths.push_back(batch_meta.read<int64_t>(nodes + 4 + 16 * i));
+    }
+    EXPECT_EQ(lengths, (std::vector<int64_t>{3, 3, 6, 3, 3, 6, 6, 6, 3, 3}));
+
+    // Buffers: validity + data for primitives, validity + offsets + data for utf8
+    size_t buffers = batch_meta.ref(record_batch, 2);
+    ASSERT_EQ(batch_meta.read<uint32_t>(buffers), 17);
+    auto buffer = [&](size_t index) {
+        int64_t offset = batch_meta.read<int64_t>(buffers + 4 + 16 * index);
+        int64_t length = batch_meta.read<int64_t>(buffers + 4 + 16 * index + 8);
+        EXPECT_EQ(offset % 8, 0);
+        return bytes.substr(batch.body + offset, length);
+    };
+    std::string ids = buffer(1);
+    ASSERT_EQ(ids.size(), 12);
+    uint32_t third_id;
+    std::memcpy(&third_id, ids.data() + 8, 4);
+    EXPECT_EQ(third_id, 2);
+
+    std::string v = buffer(4);
+    int16_t v_values[6];
+    std::memcpy(v_values, v.data(), 12);
+    EXPECT_EQ(v_values[2], -1);
+    EXPECT_EQ(v_values[3], 2);
+
+    std::string offsets = buffer(6);
+    int32_t name_offsets[4];
+    std::memcpy(name_offsets, offsets.data(), 16);
+    EXPECT_EQ(name_offsets[3], 6);
+    EXPECT_EQ(buffer(7), "r0r1r2");
+
+    // pairs[].b for all records, from the column
+    std::string b = buffer(13);
+    EXPECT_EQ(b, std::string("\x01\x03\x0B\x0D\x15\x17", 6));
+    std::string t = buffer(16);
+    double last;
+    std::memcpy(&last, t.data() + 16, 8);
+    EXPECT_DOUBLE_EQ(last, 2.5);
+
+    // End of stream
+    Message end = readMessage(bytes, batch.end);
+    EXPECT_EQ(end.end, bytes.size());
+}
+
+TEST(ArrowWriterTest, FileFormatFooterListsBatches) {
+    auto struct_info = createSample();
+    ArrowWriterOptions options;
+    options.batch_records = 2;
+    std::string bytes = writeRecords(*struct_info, 5, options);
+
+    ASSERT_GT(bytes.size(), 16);
+    EXPECT_EQ(bytes.substr(0, 8), std::string("ARROW1\0\0", 8));
+    EXPECT_EQ(bytes.substr(bytes.size() - 6), "ARROW1");
+
+    int32_t footer_size;
+    std::memcpy(&footer_size, bytes.data() + bytes.size() - 10, 4);
+    size_t footer_start = bytes.size() - 10 - footer_size;
+    FlatReader footer(bytes, footer_start);
+    size_t root = footer.root();
+    EXPECT_EQ(footer.read<int16_t>(footer.field(root, 0)), 4);
+    EXPECT_EQ(footer.read<uint32_t>(footer.ref(footer.ref(root, 1), 1)), 5);
+
+    size_t blocks = footer.ref(root, 3);
+    ASSERT_EQ(footer.read<uint32_t>(blocks), 3);
+    std::vector<int64_t> rows;
+    for (size_t i = 0; i < 3; i++) {
+        int64_t offset = footer.read<int64_t>(blocks + 4 + 24 * i);
+        int32_t metadata_length = footer.read<int32_t>(blocks + 4 + 24 * i + 8);
+        int64_t body_length = footer.read<int64_t>(blocks + 4 + 24 * i + 16);
+        Message batch = readMessage(bytes, static_cast<size_t>(offset));
+        EXPECT_EQ(batch.body, offset + metadata_length);
+        EXPECT_EQ(static_cast<int64_t>(batch.body_length), body_length);
+        FlatReader meta(bytes, batch.metadata);
+        rows.push_back(meta.read<int64_t>(meta.field(meta.ref(meta.root(), 2), 0)));
+    }
+    EXPECT_EQ(rows, (std::vector<int64_t>{2, 2, 1}));
+}
+
+TEST(ArrowWriterTest, RejectsMismatchedRecords) {
+    auto struct_info = createSample();
+    std::ostringstream out;
+    ArrowWriter writer(out, *struct_info);
+
+    ParsedStruct record;
+    record.fields["id"].value = uint16_t(1);  // Wrong type and too few fields
+    EXPECT_THROW(writer.write(record), std::runtime_error);
+
+    ArrowWriterOptions options;
+    options.batch_records = 0;
+    EXPECT_THROW(ArrowWriter(out, *struct_info, options), std::runtime_error);
+}
+TEST(ArrowWriterTest, ReplacesInvalidUtf8InCharArrays) {
+    auto struct_info = createSample();
+    auto data = sampleRecord(0);
+    const uint8_t name[4] = {0xFF, 0xC3, 0xA9, 0xE2};  // Invalid byte, "é", truncated sequence
+    std::memcpy(data.data() + 8, name, 4);
+
+    for (bool stream : {true, false}) {
+        std::ostringstream out;
+        ArrowWriterOptions options;
+        options.stream = stream;
+        ArrowWriter writer(out, *struct_info, options);
+        BinaryParser parser;
+        writer.write(*parser.parse(data.data(), data.size(), *struct_info));
+        writer.finish();
+        std::string bytes = out.str();
+
+        Message schema = readMessage(bytes, stream ? 0 : 8);
+        Message batch = readMessage(bytes, schema.end);
+        FlatReader meta(bytes, batch.metadata);
+        size_t buffers = meta.ref(meta.ref(meta.root(), 2), 2);
+        auto buffer = [&](size_t index) {
+            int64_t offset = meta.read<int64_t>(buffers + 4 + 16 * index);
+            int64_t length = meta.read<int64_t>(buffers + 4 + 16 * index + 8);
+            return bytes.substr(batch.body + offset, length);
+        };
+        std::string offsets = buffer(6);
+        int32_t name_offsets[2];
+        std::memcpy(name_offsets, offsets.data(), 8);
+        EXPECT_EQ(name_offsets[1], 8);
+        EXPECT_EQ(buffer(7), "\xEF\xBF\xBD\xC3\xA9\xEF\xBF\xBD");
+    }
+}
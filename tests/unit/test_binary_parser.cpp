@@ -151,3 +151,76 @@ int main(int argc, char **argv) {
     ::testing::InitGoogleTest(&argc, argv);
     return RUN_ALL_TESTS();
 }
+
+TEST_F(BinaryParserTest, ParseStructWithTypeReferences) {
+    const char* xml_content = R"(<?xml version="1.0" ?>
+<struct name="Scene" size="20">
+  <type id="Box" size="8">
+    <struct>
+      <field name="min" offset="0" size="4" type_ref="Point"/>
+      <field name="max" offset="4" size="4" type_ref="Point"/>
+    </struct>
+  </type>
+  <type id="Point" size="4">
+    <struct>
+      <field name="x" type="int16_t" offset="0" size="2"/>
+      <field name="y" type="int16_t" offset="2" size="2"/>
+    </struct>
+  </type>
+  <field name="bounds" offset="0" size="8" type_ref="Box"/>
+  <field name="points" offset="8" array_size="2" type_ref="Point"/>
+  <field name="id" type="uint32_t" offset="16" size="4"/>
+</struct>)";
+
+    std::ofstream out("test_type_ref_struct.xml");
+    out << xml_content;
+    out.close();
+
+    XmlStructParser xml_parser;
+    auto struct_info = xml_parser.parse("test_type_ref_struct.xml");
+    std::remove("test_type_ref_struct.xml");
+    ASSERT_EQ(struct_info->fields.size(), 3);
+
+    // Every use of a type shares one field list
+    const FieldInfo& bounds = struct_info->fields[0];
+    const FieldInfo& points = struct_info->fields[1];
+    EXPECT_EQ(bounds.type, FieldType::STRUCT);
+    ASSERT_EQ(bounds.sub_fields.size(), 2);
+    EXPECT_EQ(bounds.sub_fields[0].sub_fields.begin(), points.sub_fields.begin());
+    EXPECT_EQ(bounds.sub_fields[1].sub_fields.begin(), points.sub_fields.begin());
+    EXPECT_EQ(points.size, 8);  // Taken from the type when omitted
+    EXPECT_EQ(struct_info->arena.fieldCount(), 3 + 2 + 2);
+
+    int16_t values[8] = {-1, -2, 3, 4, 10, 20, 30, 40};
+    uint32_t id = 99;
+    uint8_t data[20];
+    std::memcpy(data, values, 16);
+    std::memcpy(data + 16, &id, 4);
+
+    BinaryParser parser;
+    auto parsed = parser.parse(data, sizeof(data), *struct_info);
+    auto& max = parsed->fields["bounds"].sub_fields["max"];
+    EXPECT_EQ(BinaryParser::getValue<int16_t>(max.sub_fields["x"]), 3);
+    EXPECT_EQ(BinaryParser::getValue<int16_t>(max.sub_fields["y"]), 4);
+    EXPECT_EQ(BinaryParser::getValue<uint32_t>(parsed->fields["id"]), 99);
+}
+
+TEST_F(BinaryParserTest, ParseStructRejectsRecursiveType) {
+    const char* xml_content = R"(<?xml version="1.0" ?>
+<struct name="Loop" size="4">
+  <type id="Node" size="4">
+    <struct>
+      <field name="next" offset="0" size="4" type_ref="Node"/>
+    </struct>
+  </type>
+  <field name="head" offset="0" size="4" type_ref="Node"/>
+</struct>)";
+
+    std::ofstream out("test_recursive_type.xml");
+    out << xml_content;
+    out.close();
+
+    XmlStructParser xml_parser;
+    EXPECT_THROW(xml_parser.parse("test_recursive_type.xml"), std::runtime_error);
+    std::remove("test_recursive_type.xml");
+}
\ No newline at end of file
@@ -1,6 +1,10 @@
 #include <gtest/gtest.h>
 #include "binary_parser/binary_parser.h"
 #include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/byte_swap.h"
+#include "binary_parser/decode_program.h"
+#include "binary_parser/record_view.h"
+#include <cstring>
 
 using namespace binary_parser;
 
@@ -15,12 +19,12 @@ TEST(EndiannessTest, ParseBigEndianUint32) {
     struct_info->name = "TestStruct";
     struct_info->size = 4;
     
-    auto field = std::make_unique<FieldInfo>();
-    field->name = "value";
-    field->type = FieldType::UINT32;
-    field->offset = 0;
-    field->size = 4;
-    struct_info->fields.push_back(std::move(field));
+    struct_info->fields = struct_info->arena.allocate(1);
+    FieldInfo& field = struct_info->fields[0];
+    field.name = "value";
+    field.type = FieldType::UINT32;
+    field.offset = 0;
+    field.size = 4;
     
     // Parse with big endian parser
     BinaryParser parser(Endianness::BIG);
@@ -29,6 +33,226 @@ TEST(EndiannessTest, ParseBigEndianUint32) {
     ASSERT_NE(result, nullptr);
     ASSERT_EQ(result->fields.count("value"), 1);
     
-    auto value = std::any_cast<uint32_t>(result->fields["value"].value);
+    auto value = BinaryParser::getValue<uint32_t>(result->fields["value"]);
     EXPECT_EQ(value, 0xDEADBEEF);
 }
+
+
+TEST(EndiannessTest, BulkByteSwap) {
+    // Counts around the vector block sizes, swapped into a copy and in place
+    for (size_t count : {0, 1, 7, 8, 9, 33}) {
+        std::vector<uint32_t> values(count);
+        for (size_t i = 0; i < count; i++) values[i] = 0x01020304u + static_cast<uint32_t>(i);
+        std::vector<uint32_t> swapped(count);
+        bswapArray<4>(reinterpret_cast<uint8_t*>(swapped.data()),
+                      reinterpret_cast<const uint8_t*>(values.data()), count);
+        bswapArray<4>(reinterpret_cast<uint8_t*>(values.data()),
+                      reinterpret_cast<const uint8_t*>(values.data()), count);
+        for (size_t i = 0; i < count; i++) {
+            EXPECT_EQ(swapped[i], bswap32(0x01020304u + static_cast<uint32_t>(i)));
+            EXPECT_EQ(values[i], swapped[i]);
+        }
+    }
+    
+    uint64_t wide[5] = {1, 2, 3, 4, 0x0102030405060708ULL};
+    bswapArray<8>(reinterpret_cast<uint8_t*>(wide), reinterpret_cast<const uint8_t*>(wide), 5);
+    EXPECT_EQ(wide[0], 1ULL << 56);
+    EXPECT_EQ(wide[4], 0x0807060504030201ULL);
+}
+
+TEST(EndiannessTest, ParseBigEndianArrays) {
+    // uint32_t samples[65536]; int16_t deltas[3]; double weights[2];
+    const size_t sample_count = 65536;
+    std::vector<uint8_t> data(sample_count * 4 + 6 + 16);
+    for (size_t i = 0; i < sample_count; i++) {
+        uint32_t value = static_cast<uint32_t>(i * 2654435761u);
+        for (int b = 0; b < 4; b++) data[i * 4 + b] = static_cast<uint8_t>(value >> (24 - 8 * b));
+    }
+    const uint8_t deltas[6] = {0xFF, 0xFE, 0x00, 0x05, 0x80, 0x00};  // -2, 5, -32768
+    std::memcpy(&data[sample_count * 4], deltas, sizeof(deltas));
+    const uint8_t weights[16] = {0x3F, 0xF8, 0, 0, 0, 0, 0, 0,   // 1.5
+                                 0xC0, 0x04, 0, 0, 0, 0, 0, 0};  // -2.5
+    std::memcpy(&data[sample_count * 4 + 6], weights, sizeof(weights));
+    
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Samples";
+    struct_info->size = data.size();
+    struct_info->fields = struct_info->arena.allocate(3);
+    FieldInfo& samples = struct_info->fields[0];
+    samples.name = "samples";
+    samples.type = FieldType::UINT32;
+    samples.size = sample_count * 4;
+    samples.array_size = sample_count;
+    FieldInfo& delta_field = struct_info->fields[1];
+    delta_field.name = "deltas";
+    delta_field.type = FieldType::INT16;
+    delta_field.offset = sample_count * 4;
+    delta_field.size = 6;
+    delta_field.array_size = 3;
+    FieldInfo& weight_field = struct_info->fields[2];
+    weight_field.name = "weights";
+    weight_field.type = FieldType::DOUBLE;
+    weight_field.offset = sample_count * 4 + 6;
+    weight_field.size = 16;
+    weight_field.array_size = 2;
+    
+    BinaryParser parser(Endianness::BIG);
+    auto result = parser.parse(data.data(), data.size(), *struct_info);
+    
+    ArrayView<uint32_t> values = result->fields["samples"].value.elements<uint32_t>();
+    ASSERT_EQ(values.size(), sample_count);
+    for (size_t i = 0; i < sample_count; i++) {
+        ASSERT_EQ(values[i], static_cast<uint32_t>(i * 2654435761u)) << "at " << i;
+    }
+    EXPECT_EQ(BinaryParser::getArray<int16_t>(result->fields["deltas"]), (std::vector<int16_t>{-2, 5, -32768}));
+    EXPECT_EQ(BinaryParser::getArray<double>(result->fields["weights"]), (std::vector<double>{1.5, -2.5}));
+}
+
+TEST(EndiannessTest, ParsePaddedArrayElements) {
+    // Elements 4 bytes apart holding 16-bit big-endian values
+    uint8_t data[] = {0x12, 0x34, 0xAA, 0xAA, 0xFF, 0xFF, 0xBB, 0xBB, 0x00, 0x01, 0xCC, 0xCC};
+    
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Padded";
+    struct_info->size = sizeof(data);
+    struct_info->fields = struct_info->arena.allocate(1);
+    FieldInfo& field = struct_info->fields[0];
+    field.name = "values";
+    field.type = FieldType::INT16;
+    field.size = sizeof(data);
+    field.array_size = 3;
+    
+    BinaryParser parser(Endianness::BIG);
+    auto result = parser.parse(data, sizeof(data), *struct_info);
+    EXPECT_EQ(BinaryParser::getArray<int16_t>(result->fields["values"]), (std::vector<int16_t>{0x1234, -1, 1}));
+}
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type, size_t offset, size_t size,
+              size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Frame {
+//     struct { uint16_t type; uint8_t version : 4; uint8_t flags : 4; } header;  // big-endian
+//     struct { uint16_t seq; uint16_t samples[2]; } payload;                     // parser's order
+//     uint32_t crc;                                                              // little-endian
+// };
+std::unique_ptr<StructInfo> createFrame() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Frame";
+    struct_info->size = 16;
+    struct_info->fields = struct_info->arena.allocate(3);
+    
+    FieldInfo& header = struct_info->fields[0];
+    setField(header, "header", FieldType::STRUCT, 0, 4);
+    header.byte_order = ByteOrder::BIG;
+    header.sub_fields = struct_info->arena.allocate(3);
+    setField(header.sub_fields[0], "type", FieldType::UINT16, 0, 2);
+    setField(header.sub_fields[1], "version", FieldType::UINT16, 2, 2);
+    header.sub_fields[1].bits = 4;
+    setField(header.sub_fields[2], "flags", FieldType::UINT16, 2, 2);
+    header.sub_fields[2].bits = 4;
+    header.sub_fields[2].bit_offset = 4;
+    
+    FieldInfo& payload = struct_info->fields[1];
+    setField(payload, "payload", FieldType::STRUCT, 4, 6);
+    payload.sub_fields = struct_info->arena.allocate(2);
+    setField(payload.sub_fields[0], "seq", FieldType::UINT16, 0, 2);
+    setField(payload.sub_fields[1], "samples", FieldType::UINT16, 2, 4, 2);
+    
+    setField(struct_info->fields[2], "crc", FieldType::UINT32, 12, 4);
+    struct_info->fields[2].byte_order = ByteOrder::LITTLE;
+    
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+const uint8_t kFrame[16] = {
+    0x01, 0x02, 0x00, 0x21,              // header: type 0x0102, version 1, flags 2 (big-endian)
+    0x03, 0x00, 0x04, 0x00, 0x05, 0x00,  // payload: 3, {4, 5} little-endian
+    0x00, 0x00,
+    0x78, 0x56, 0x34, 0x12               // crc 0x12345678 (little-endian)
+};
+
+} // namespace
+
+TEST(EndiannessTest, PerFieldByteOrder) {
+    auto struct_info = createFrame();
+    
+    // The header's members inherit its order; the payload follows the parser
+    EXPECT_EQ(struct_info->fields[0].sub_fields[0].byte_order, ByteOrder::BIG);
+    EXPECT_EQ(struct_info->fields[1].sub_fields[0].byte_order, ByteOrder::DEFAULT);
+    
+    BinaryParser parser;
+    auto result = parser.parse(kFrame, sizeof(kFrame), *struct_info);
+    const ParsedFields& header = result->fields.at("header").sub_fields;
+    EXPECT_EQ(header.at("type").value.get<uint16_t>(), 0x0102);
+    EXPECT_EQ(header.at("version").value.get<uint16_t>(), 1);
+    EXPECT_EQ(header.at("flags").value.get<uint16_t>(), 2);
+    const ParsedFields& payload = result->fields.at("payload").sub_fields;
+    EXPECT_EQ(payload.at("seq").value.get<uint16_t>(), 3);
+    EXPECT_EQ(BinaryParser::getArray<uint16_t>(payload.at("samples")), (std::vector<uint16_t>{4, 5}));
+    EXPECT_EQ(result->fields.at("crc").value.get<uint32_t>(), 0x12345678u);
+    
+    // A big-endian parser only changes the fields without a declared order
+    BinaryParser big_parser(Endianness::BIG);
+    result = big_parser.parse(kFrame, sizeof(kFrame), *struct_info);
+    EXPECT_EQ(result->fields.at("header").sub_fields.at("type").value.get<uint16_t>(), 0x0102);
+    EXPECT_EQ(result->fields.at("payload").sub_fields.at("seq").value.get<uint16_t>(), 0x0300);
+    EXPECT_EQ(result->fields.at("crc").value.get<uint32_t>(), 0x12345678u);
+    
+    // Programs and views bake in the same decisions
+    DecodeProgram program = DecodeProgram::compile(*struct_info);
+    std::vector<DecodedValue> slots;
+    program.decode(kFrame, sizeof(kFrame), slots);
+    EXPECT_EQ(slots[program.findLeaf("header.type")->slot].u, 0x0102u);
+    EXPECT_EQ(slots[program.findLeaf("header.flags")->slot].u, 2u);
+    EXPECT_EQ(slots[program.findLeaf("payload.samples")->slot + 1].u, 5u);
+    EXPECT_EQ(slots[program.findLeaf("crc")->slot].u, 0x12345678u);
+    
+    RecordView view(kFrame, sizeof(kFrame), *struct_info, Endianness::BIG);
+    EXPECT_EQ(view.field("header.type").get<uint16_t>(), 0x0102);
+    EXPECT_EQ(view.field("payload.samples").array<uint16_t>()[1], 0x0500);
+    EXPECT_EQ(view.field("crc").get<uint32_t>(), 0x12345678u);
+}
+
+TEST(EndiannessTest, SchemaByteOrderAndSharedTypes) {
+    // struct { Pair be; Pair le; } with both fields sharing one member list
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->size = 8;
+    struct_info->byte_order = ByteOrder::BIG;
+    struct_info->fields = struct_info->arena.allocate(2);
+    FieldList pair = struct_info->arena.allocate(2);
+    setField(pair[0], "a", FieldType::UINT16, 0, 2);
+    setField(pair[1], "b", FieldType::UINT16, 2, 2);
+    setField(struct_info->fields[0], "be", FieldType::STRUCT, 0, 4);
+    struct_info->fields[0].sub_fields = pair;
+    setField(struct_info->fields[1], "le", FieldType::STRUCT, 4, 4);
+    struct_info->fields[1].sub_fields = pair;
+    struct_info->fields[1].byte_order = ByteOrder::LITTLE;
+    validateLayout(*struct_info);
+    
+    // The shared list is copied rather than changed under the other field
+    EXPECT_NE(struct_info->fields[0].sub_fields.begin(), struct_info->fields[1].sub_fields.begin());
+    EXPECT_EQ(struct_info->fields[0].sub_fields[0].byte_order, ByteOrder::BIG);
+    EXPECT_EQ(struct_info->fields[1].sub_fields[0].byte_order, ByteOrder::LITTLE);
+    
+    const uint8_t data[8] = {0x00, 0x01, 0x00, 0x02, 0x03, 0x00, 0x04, 0x00};
+    BinaryParser parser;
+    auto result = parser.parse(data, sizeof(data), *struct_info);
+    EXPECT_EQ(result->fields.at("be").sub_fields.at("a").value.get<uint16_t>(), 1);
+    EXPECT_EQ(result->fields.at("be").sub_fields.at("b").value.get<uint16_t>(), 2);
+    EXPECT_EQ(result->fields.at("le").sub_fields.at("a").value.get<uint16_t>(), 3);
+    EXPECT_EQ(result->fields.at("le").sub_fields.at("b").value.get<uint16_t>(), 4);
+    
+    // Validating again changes nothing
+    const FieldInfo* be_members = struct_info->fields[0].sub_fields.begin();
+    validateLayout(*struct_info);
+    EXPECT_EQ(struct_info->fields[0].sub_fields.begin(), be_members);
+}
\ No newline at end of file
@@ -1,6 +1,9 @@
 #include <gtest/gtest.h>
 #include "binary_parser/binary_parser.h"
 #include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/record_view.h"
+#include <cstdio>
+#include <fstream>
 
 using namespace binary_parser;
 
@@ -15,13 +18,13 @@ TEST(CharTypeTest, ParseCharType) {
     struct_info->name = "TestStruct";
     struct_info->size = 5;
     
-    auto field = std::make_unique<FieldInfo>();
-    field->name = "text";
-    field->type = FieldType::CHAR;
-    field->offset = 0;
-    field->size = 5;
-    field->array_size = 5;
-    struct_info->fields.push_back(std::move(field));
+    struct_info->fields = struct_info->arena.allocate(1);
+    FieldInfo& field = struct_info->fields[0];
+    field.name = "text";
+    field.type = FieldType::CHAR;
+    field.offset = 0;
+    field.size = 5;
+    field.array_size = 5;
     
     // Parse
     BinaryParser parser;
@@ -31,7 +34,7 @@ TEST(CharTypeTest, ParseCharType) {
     ASSERT_EQ(result->fields.count("text"), 1);
     
     // Should get vector of chars
-    auto chars = std::any_cast<std::vector<uint8_t>>(result->fields["text"].value);
+    auto chars = BinaryParser::getArray<uint8_t>(result->fields["text"]);
     ASSERT_EQ(chars.size(), 5);
     EXPECT_EQ(chars[0], 'H');
     EXPECT_EQ(chars[1], 'e');
@@ -39,3 +42,31 @@ TEST(CharTypeTest, ParseCharType) {
     EXPECT_EQ(chars[3], 'l');
     EXPECT_EQ(chars[4], 'o');
 }
+
+TEST(CharTypeTest, LoadsCharFromXml) {
+    const char* xml_content = R"(<?xml version="1.0" ?>
+<struct name="Named" size="6">
+  <field name="text" type="char" offset="0" size="5" array_size="5"/>
+  <field name="mark" type="char" offset="5" size="1" bits="4" bit_offset="0"/>
+</struct>)";
+    {
+        std::ofstream out("test_char_struct.xml");
+        out << xml_content;
+    }
+    
+    XmlStructParser xml_parser;
+    auto struct_info = xml_parser.parse("test_char_struct.xml");
+    std::remove("test_char_struct.xml");
+    ASSERT_NE(struct_info, nullptr);
+    EXPECT_EQ(struct_info->fields[0].type, FieldType::CHAR);
+    EXPECT_EQ(struct_info->fields[1].type, FieldType::CHAR);
+    
+    uint8_t data[] = {'H', 'e', 'l', 'l', 'o', 0xA7};
+    RecordView view(data, sizeof(data), *struct_info);
+    EXPECT_EQ(view.field("text").str(), "Hello");
+    
+    // char bitfields decode as uint8_t
+    BinaryParser parser;
+    auto result = parser.parse(data, sizeof(data), *struct_info);
+    EXPECT_EQ(BinaryParser::getValue<uint8_t>(result->fields["mark"]), 7);
+}
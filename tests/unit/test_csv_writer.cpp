@@ -0,0 +1,101 @@
+#include <gtest/gtest.h>
+#include "binary_parser/csv_writer.h"
+#include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/binary_parser.h"
+#include <cstring>
+#include <sstream>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Sample {
+//     int32_t id;
+//     uint16_t v[2];
+//     struct { uint8_t a; char tag[3]; } items[2];
+//     float t;
+// };
+std::unique_ptr<StructInfo> createSample() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Sample";
+    struct_info->size = 20;
+    struct_info->fields = struct_info->arena.allocate(4);
+    setField(struct_info->fields[0], "id", FieldType::INT32, 0, 4);
+    setField(struct_info->fields[1], "v", FieldType::UINT16, 4, 4, 2);
+    setField(struct_info->fields[2], "items", FieldType::STRUCT, 8, 8, 2);
+    struct_info->fields[2].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[2].sub_fields[0], "a", FieldType::UINT8, 0, 1);
+    setField(struct_info->fields[2].sub_fields[1], "tag", FieldType::CHAR, 1, 3, 3);
+    setField(struct_info->fields[3], "t", FieldType::FLOAT, 16, 4);
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> sampleRecord(int32_t id, const char* tag0, const char* tag1, float t) {
+    std::vector<uint8_t> data(20, 0);
+    std::memcpy(data.data(), &id, 4);
+    uint16_t v[2] = {7, 65535};
+    std::memcpy(data.data() + 4, v, 4);
+    data[8] = 1;
+    std::memcpy(data.data() + 9, tag0, std::min<size_t>(3, std::strlen(tag0)));
+    data[12] = 2;
+    std::memcpy(data.data() + 13, tag1, std::min<size_t>(3, std::strlen(tag1)));
+    std::memcpy(data.data() + 16, &t, 4);
+    return data;
+}
+
+std::string writeCsv(const StructInfo& struct_info, const std::vector<std::vector<uint8_t>>& records,
+                     const CsvWriterOptions& options) {
+    std::ostringstream out;
+    CsvWriter writer(out, struct_info, options);
+    BinaryParser parser;
+    for (const auto& data : records) {
+        writer.write(*parser.parse(data.data(), data.size(), struct_info));
+    }
+    writer.finish();
+    EXPECT_EQ(writer.records(), records.size());
+    return out.str();
+}
+
+} // namespace
+
+TEST(CsvWriterTest, ExplodesArraysIntoColumns) {
+    auto struct_info = createSample();
+    std::string csv = writeCsv(*struct_info,
+                               {sampleRecord(-5, "ab", "xyz", 0.1f), sampleRecord(3, "a,b", "q\"", -2.5f)},
+                               CsvWriterOptions());
+    EXPECT_EQ(csv,
+              "id,v[0],v[1],items[0].a,items[1].a,items[0].tag,items[1].tag,t\n"
+              "-5,7,65535,1,2,ab,xyz,0.1\n"
+              "3,7,65535,1,2,\"a,b\",\"q\"\"\",-2.5\n");
+}
+
+TEST(CsvWriterTest, JoinsArraysIntoCells) {
+    auto struct_info = createSample();
+    CsvWriterOptions options;
+    options.join_arrays = true;
+    std::string csv = writeCsv(*struct_info, {sampleRecord(1, "ab", "c,d", 1e20f)}, options);
+    EXPECT_EQ(csv,
+              "id,v,items.a,items.tag,t\n"
+              "1,7 65535,1 2,\"ab c,d\",1e+20\n");
+}
+
+TEST(CsvWriterTest, TsvEscapesInsteadOfQuoting) {
+    auto struct_info = createSample();
+    CsvWriterOptions options;
+    options.delimiter = '\t';
+    options.buffer_size = 1;  // Flush after every row
+    std::string tsv = writeCsv(*struct_info, {sampleRecord(0, "a\tb", "\\", 0.0f)}, options);
+    EXPECT_EQ(tsv,
+              "id\tv[0]\tv[1]\titems[0].a\titems[1].a\titems[0].tag\titems[1].tag\tt\n"
+              "0\t7\t65535\t1\t2\ta\\tb\t\\\\\t0\n");
+}
\ No newline at end of file
@@ -0,0 +1,193 @@
+#include <gtest/gtest.h>
+#include "binary_parser/decode_program.h"
+#include "binary_parser/binary_parser.h"
+#include "binary_parser/xml_struct_parser.h"
+#include <cstring>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Sample {
+//     uint32_t id;
+//     struct { int16_t x; int16_t y; } pos;
+//     float samples[3];
+//     uint16_t mode : 3;
+//     int16_t delta : 5;
+//     struct { uint8_t a; int8_t b; } items[2];
+//     double scale;
+// };
+std::unique_ptr<StructInfo> createSampleStruct() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Sample";
+    struct_info->size = 36;
+
+    struct_info->fields = struct_info->arena.allocate(7);
+    FieldList& fields = struct_info->fields;
+    setField(fields[0], "id", FieldType::UINT32, 0, 4);
+
+    setField(fields[1], "pos", FieldType::STRUCT, 4, 4);
+    fields[1].sub_fields = struct_info->arena.allocate(2);
+    setField(fields[1].sub_fields[0], "x", FieldType::INT16, 0, 2);
+    setField(fields[1].sub_fields[1], "y", FieldType::INT16, 2, 2);
+
+    setField(fields[2], "samples", FieldType::FLOAT, 8, 12, 3);
+
+    setField(fields[3], "mode", FieldType::UINT16, 20, 2);
+    fields[3].bits = 3;
+    fields[3].bit_offset = 0;
+
+    setField(fields[4], "delta", FieldType::INT16, 20, 2);
+    fields[4].bits = 5;
+    fields[4].bit_offset = 3;
+
+    setField(fields[5], "items", FieldType::STRUCT, 22, 4, 2);
+    fields[5].sub_fields = struct_info->arena.allocate(2);
+    setField(fields[5].sub_fields[0], "a", FieldType::UINT8, 0, 1);
+    setField(fields[5].sub_fields[1], "b", FieldType::INT8, 1, 1);
+
+    setField(fields[6], "scale", FieldType::DOUBLE, 28, 8);
+    return struct_info;
+}
+
+std::vector<uint8_t> createSampleData() {
+    std::vector<uint8_t> data(36, 0);
+    uint32_t id = 0xCAFEBABE;
+    int16_t x = -100, y = 250;
+    float samples[3] = {1.5f, -2.25f, 1000.0f};
+    uint16_t bits = 5 | (0x1B << 3);  // mode = 5, delta = -5
+    uint8_t items[4] = {7, 0xFE, 200, 3};
+    double scale = -0.125;
+
+    std::memcpy(&data[0], &id, 4);
+    std::memcpy(&data[4], &x, 2);
+    std::memcpy(&data[6], &y, 2);
+    std::memcpy(&data[8], samples, 12);
+    std::memcpy(&data[20], &bits, 2);
+    std::memcpy(&data[22], items, 4);
+    std::memcpy(&data[28], &scale, 8);
+    return data;
+}
+
+} // namespace
+
+TEST(DecodeProgramTest, FlattensNestedFields) {
+    auto struct_info = createSampleStruct();
+    DecodeProgram program = DecodeProgram::compile(*struct_info);
+
+    // id, pos.x, pos.y, samples, mode, delta, 2 x (a, b), scale
+    EXPECT_EQ(program.instructions().size(), 11);
+    EXPECT_EQ(program.slotCount(), 13);
+    EXPECT_EQ(program.extent(), 36);
+
+    const DecodeLeaf* item_b = program.findLeaf("items[1].b");
+    ASSERT_NE(item_b, nullptr);
+    EXPECT_EQ(item_b->type, FieldType::INT8);
+    EXPECT_EQ(program.findLeaf("items.b"), nullptr);
+}
+
+TEST(DecodeProgramTest, DecodesAllLeafKinds) {
+    auto struct_info = createSampleStruct();
+    DecodeProgram program = DecodeProgram::compile(*struct_info);
+    std::vector<uint8_t> data = createSampleData();
+
+    std::vector<DecodedValue> slots;
+    program.decode(data.data(), data.size(), slots);
+
+    auto slot = [&](const std::string& path) { return slots[program.findLeaf(path)->slot]; };
+    EXPECT_EQ(slot("id").u, 0xCAFEBABE);
+    EXPECT_EQ(slot("pos.x").i, -100);
+    EXPECT_EQ(slot("pos.y").i, 250);
+    EXPECT_EQ(slot("mode").u, 5);
+    EXPECT_EQ(slot("delta").i, -5);
+    EXPECT_EQ(slot("items[0].a").u, 7);
+    EXPECT_EQ(slot("items[0].b").i, -2);
+    EXPECT_EQ(slot("items[1].a").u, 200);
+    EXPECT_EQ(slot("items[1].b").i, 3);
+    EXPECT_DOUBLE_EQ(slot("scale").f, -0.125);
+
+    const DecodeLeaf* samples = program.findLeaf("samples");
+    ASSERT_EQ(samples->count, 3);
+    EXPECT_FLOAT_EQ(slots[samples->slot + 0].f, 1.5f);
+    EXPECT_FLOAT_EQ(slots[samples->slot + 1].f, -2.25f);
+    EXPECT_FLOAT_EQ(slots[samples->slot + 2].f, 1000.0f);
+}
+
+TEST(DecodeProgramTest, MatchesTreeParser) {
+    auto struct_info = createSampleStruct();
+    std::vector<uint8_t> data = createSampleData();
+
+    for (Endianness endianness : {Endianness::LITTLE, Endianness::BIG}) {
+        DecodeProgram program = DecodeProgram::compile(*struct_info, endianness);
+        std::vector<DecodedValue> slots;
+        program.decode(data.data(), data.size(), slots);
+
+        BinaryParser parser(endianness);
+        auto parsed = parser.parse(data.data(), data.size(), *struct_info);
+
+        EXPECT_EQ(slots[program.findLeaf("id")->slot].u,
+                  BinaryParser::getValue<uint32_t>(parsed->fields["id"]));
+        EXPECT_EQ(slots[program.findLeaf("pos.x")->slot].i,
+                  BinaryParser::getValue<int16_t>(parsed->fields["pos"].sub_fields["x"]));
+        EXPECT_EQ(slots[program.findLeaf("mode")->slot].u,
+                  BinaryParser::getValue<uint16_t>(parsed->fields["mode"]));
+        EXPECT_EQ(slots[program.findLeaf("delta")->slot].i,
+                  BinaryParser::getValue<int16_t>(parsed->fields["delta"]));
+
+        auto samples = BinaryParser::getArray<float>(parsed->fields["samples"]);
+        const DecodeLeaf* samples_leaf = program.findLeaf("samples");
+        for (size_t i = 0; i < samples.size(); i++) {
+            EXPECT_EQ(static_cast<float>(slots[samples_leaf->slot + i].f), samples[i]);
+        }
+    }
+}
+
+TEST(DecodeProgramTest, RejectsShortData) {
+    auto struct_info = createSampleStruct();
+    DecodeProgram program = DecodeProgram::compile(*struct_info);
+    std::vector<uint8_t> data(20, 0);
+
+    std::vector<DecodedValue> slots;
+    EXPECT_THROW(program.decode(data.data(), data.size(), slots), std::runtime_error);
+}
+
+TEST(DecodeProgramTest, RejectsUnknownScalar) {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Unknown";
+    struct_info->size = 4;
+    struct_info->fields = struct_info->arena.allocate(1);
+    setField(struct_info->fields[0], "value", FieldType::UNKNOWN, 0, 4);
+
+    EXPECT_THROW(DecodeProgram::compile(*struct_info), std::runtime_error);
+}
+
+TEST(DecodeProgramTest, UnionMembersOnlyOnRequest) {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Tagged";
+    struct_info->size = 8;
+    struct_info->fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[0], "type", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[1], "data", FieldType::UNION, 4, 4);
+    struct_info->fields[1].is_union = true;
+    struct_info->fields[1].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[1].sub_fields[0], "word", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[1].sub_fields[1], "half", FieldType::INT16, 0, 2);
+
+    DecodeProgram program = DecodeProgram::compile(*struct_info);
+    EXPECT_EQ(program.instructions().size(), 1);
+    EXPECT_EQ(program.findLeaf("data.word"), nullptr);
+
+    DecodeProgram overlapped = DecodeProgram::compile(*struct_info, Endianness::LITTLE, true);
+    EXPECT_EQ(overlapped.instructions().size(), 3);
+    ASSERT_NE(overlapped.findLeaf("data.half"), nullptr);
+    EXPECT_EQ(overlapped.instructionFor(*overlapped.findLeaf("data.half")).offset, 4);
+}
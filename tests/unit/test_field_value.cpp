@@ -0,0 +1,95 @@
+#include <gtest/gtest.h>
+#include "binary_parser/field_value.h"
+#include <limits>
+#include <numeric>
+
+using namespace binary_parser;
+
+TEST(FieldValueTest, HoldsScalars) {
+    FieldValue empty;
+    EXPECT_FALSE(empty.hasValue());
+    EXPECT_EQ(empty.type(), ValueType::NONE);
+    EXPECT_EQ(empty.size(), 0);
+
+    FieldValue value = int16_t(-1234);
+    EXPECT_EQ(value.type(), ValueType::INT16);
+    EXPECT_FALSE(value.isArray());
+    EXPECT_EQ(value.size(), 1);
+    EXPECT_EQ(value.get<int16_t>(), -1234);
+
+    value = std::numeric_limits<uint64_t>::max();
+    EXPECT_EQ(value.type(), ValueType::UINT64);
+    EXPECT_EQ(value.get<uint64_t>(), std::numeric_limits<uint64_t>::max());
+
+    value = 2.5;
+    EXPECT_DOUBLE_EQ(value.get<double>(), 2.5);
+}
+
+TEST(FieldValueTest, RejectsOtherTypes) {
+    FieldValue value = uint32_t(7);
+    EXPECT_THROW(value.get<int32_t>(), std::runtime_error);
+    EXPECT_THROW(value.get<uint16_t>(), std::runtime_error);
+    EXPECT_THROW(value.elements<uint32_t>(), std::runtime_error);
+
+    FieldValue array = std::vector<uint32_t>{1, 2};
+    EXPECT_THROW(array.get<uint32_t>(), std::runtime_error);
+    EXPECT_THROW(FieldValue().get<uint8_t>(), std::runtime_error);
+}
+
+TEST(FieldValueTest, ShortArraysAreInline) {
+    FieldValue value = std::vector<uint16_t>{1, 2, 3, 4};
+    EXPECT_TRUE(value.isArray());
+    EXPECT_EQ(value.type(), ValueType::UINT16);
+    EXPECT_EQ(value.size(), 4);
+    // Stored inside the value itself
+    const uint8_t* begin = reinterpret_cast<const uint8_t*>(&value);
+    EXPECT_GE(value.bytes(), begin);
+    EXPECT_LT(value.bytes(), begin + sizeof(FieldValue));
+
+    ArrayView<uint16_t> view = value.elements<uint16_t>();
+    EXPECT_EQ(std::vector<uint16_t>(view.begin(), view.end()), (std::vector<uint16_t>{1, 2, 3, 4}));
+}
+
+TEST(FieldValueTest, LongArraysAreCopiedAndMoved) {
+    std::vector<uint32_t> values(100);
+    std::iota(values.begin(), values.end(), 0);
+    FieldValue value = values;
+    EXPECT_EQ(value.size(), 100);
+
+    FieldValue copy = value;
+    EXPECT_NE(copy.bytes(), value.bytes());
+    EXPECT_EQ(copy.elements<uint32_t>()[99], 99);
+
+    const uint8_t* heap = value.bytes();
+    FieldValue moved = std::move(value);
+    EXPECT_EQ(moved.bytes(), heap);
+    EXPECT_EQ(moved.elements<uint32_t>()[50], 50);
+
+    copy = moved;
+    copy = FieldValue(uint8_t(1));
+    EXPECT_EQ(copy.get<uint8_t>(), 1);
+    EXPECT_EQ(moved.elements<uint32_t>().size(), 100);
+}
+
+TEST(FieldValueTest, ArraysAreFilledInPlace) {
+    uint8_t* data = nullptr;
+    FieldValue value = FieldValue::array(ValueType::FLOAT, 8, &data);
+    float source[8] = {0.5f, 1.5f, 2.5f, 3.5f, 4.5f, 5.5f, 6.5f, 7.5f};
+    std::memcpy(data, source, sizeof(source));
+    EXPECT_FLOAT_EQ(value.elements<float>()[7], 7.5f);
+    EXPECT_EQ(value.size(), 8);
+}
+
+TEST(FieldValueTest, ElementsAndSlices) {
+    FieldValue array = std::vector<int32_t>{5, -6, 7, -8, 9};
+    EXPECT_EQ(array.at(1).get<int32_t>(), -6);
+    EXPECT_THROW(array.at(5), std::out_of_range);
+    EXPECT_THROW(FieldValue(int32_t(1)).at(0), std::out_of_range);
+
+    FieldValue middle = array.slice(1, 3);
+    ASSERT_TRUE(middle.isArray());
+    EXPECT_EQ(std::vector<int32_t>(middle.elements<int32_t>().begin(), middle.elements<int32_t>().end()),
+              (std::vector<int32_t>{-6, 7, -8}));
+    EXPECT_EQ(array.slice(5, 0).size(), 0);
+    EXPECT_THROW(array.slice(4, 2), std::out_of_range);
+}
\ No newline at end of file
@@ -3,6 +3,7 @@
 #include "binary_parser/xml_struct_parser.h"
 #include "binary_parser/json_converter.h"
 #include "json/json_value.h"
+#include <limits>
 
 using namespace binary_parser;
 
@@ -135,4 +136,43 @@ TEST(JsonConverterTest, ConvertEmptyStruct) {
     EXPECT_EQ(json.getType(), JsonValue::Type::OBJECT);
     auto obj = json.getObject();
     EXPECT_EQ(obj.size(), 0);
-}
\ No newline at end of file
+}
+
+TEST(JsonConverterTest, WriteMatchesConvert) {
+    auto parsed = createNestedParsedStruct();
+    
+    JsonConverter converter;
+    std::string text = "prefix ";
+    converter.write(*parsed, text);
+    
+    EXPECT_EQ(text, "prefix " + converter.convert(*parsed).toString(false));
+    EXPECT_EQ(text, "prefix {\"id\":1001,\"position\":{\"x\":100,\"y\":200},\"data\":[10,20,30,40]}");
+}
+
+TEST(JsonConverterTest, WriteStructColumnsAndNumbers) {
+    ParsedStruct parsed;
+    
+    // Point pts[2] = {{1, "a"}, {2, "b\""}}, stored by column
+    ParsedField& pts = parsed.fields.add("pts");
+    pts.array_size = 2;
+    pts.sub_fields.add("id").value = std::vector<uint16_t>{1, 2};
+    pts.sub_fields.add("tag").value = std::vector<uint8_t>{'a', 0, 'b', '"'};
+    
+    parsed.fields.add("ratio").value = 0.1f;
+    parsed.fields.add("big").value = uint64_t(18446744073709551615ULL);
+    parsed.fields.add("nan").value = std::numeric_limits<double>::quiet_NaN();
+    
+    JsonConverter converter;
+    std::string text;
+    converter.write(parsed, text);
+    
+    EXPECT_EQ(text,
+              "{\"pts\":[{\"id\":1,\"tag\":\"a\"},{\"id\":2,\"tag\":\"b\\\"\"}],"
+              "\"ratio\":0.1,\"big\":18446744073709551615,\"nan\":null}");
+}
+
+TEST(JsonConverterTest, WriteStringEscapes) {
+    std::string text;
+    JsonConverter::writeString("a\"b\\c\nd\x01", text);
+    EXPECT_EQ(text, "\"a\\\"b\\\\c\\nd\\u0001\"");
+}
@@ -122,9 +122,9 @@ TEST_F(JsonConverterEdgeCasesTest, DeeplyNestedStructures) {
     binary_parser::ParsedStruct parsed;
     parsed.struct_name = "NestedStruct";
     
-    // Create nested structure
+    // Create nested structure (a field's name is its key)
     binary_parser::ParsedField level1;
-    level1.name = "level1";
+    level1.name = "nested";
     
     binary_parser::ParsedField level2;
     level2.name = "level2";
@@ -143,18 +143,11 @@ TEST_F(JsonConverterEdgeCasesTest, StructArrays) {
     binary_parser::ParsedStruct parsed;
     parsed.struct_name = "StructWithArrays";
     
-    // Create an array of ParsedField (simulating struct array)
-    std::vector<std::any> structArray;
-    
-    for (int i = 0; i < 3; ++i) {
-        binary_parser::ParsedField element;
-        element.name = std::to_string(i);
-        element.sub_fields["x"].value = int32_t(i * 10);
-        element.sub_fields["y"].value = int32_t(i * 20);
-        structArray.push_back(element);
-    }
-    
-    parsed.fields["points"].value = structArray;
+    // A struct array stored as one column per member
+    binary_parser::ParsedField& points = parsed.fields["points"];
+    points.array_size = 3;
+    points.sub_fields["x"].value = std::vector<int32_t>{0, 10, 20};
+    points.sub_fields["y"].value = std::vector<int32_t>{0, 20, 40};
     
     JsonValue json = converter->convert(parsed);
     
@@ -162,6 +155,7 @@ TEST_F(JsonConverterEdgeCasesTest, StructArrays) {
     EXPECT_EQ(json["points"][0]["x"].getNumber(), 0);
     EXPECT_EQ(json["points"][1]["x"].getNumber(), 10);
     EXPECT_EQ(json["points"][2]["x"].getNumber(), 20);
+    EXPECT_EQ(json["points"][2]["y"].getNumber(), 40);
 }
 
 // Test char arrays with non-printable characters
@@ -196,14 +190,14 @@ TEST_F(JsonConverterEdgeCasesTest, EmptyStruct) {
     EXPECT_EQ(json.toString(), "{}");
 }
 
-// Test field with no value (empty std::any)
+// Test field with no value (empty FieldValue)
 TEST_F(JsonConverterEdgeCasesTest, EmptyFieldValue) {
     binary_parser::ParsedStruct parsed;
     parsed.struct_name = "StructWithEmptyField";
     
     binary_parser::ParsedField emptyField;
     emptyField.name = "empty";
-    // emptyField.value is not set (empty std::any)
+    // emptyField.value is not set (empty FieldValue)
     
     parsed.fields["empty_field"] = emptyField;
     parsed.fields["normal_field"].value = uint32_t(123);
@@ -0,0 +1,66 @@
+#include <gtest/gtest.h>
+#include "binary_parser/mapped_file.h"
+#include <cstdio>
+#include <fstream>
+#include <numeric>
+
+using namespace binary_parser;
+
+class MappedFileTest : public ::testing::Test {
+protected:
+    void SetUp() override {
+        content.resize(3 * 4096 + 17);
+        std::iota(content.begin(), content.end(), 0);
+        std::ofstream out(path, std::ios::binary);
+        out.write(reinterpret_cast<const char*>(content.data()), content.size());
+    }
+
+    void TearDown() override {
+        std::remove(path.c_str());
+    }
+
+    std::string path = "mapped_file_test.bin";
+    std::vector<uint8_t> content;
+};
+
+TEST_F(MappedFileTest, MapsRegularFile) {
+    MappedFile file(path);
+#ifndef _WIN32
+    EXPECT_TRUE(file.isMapped());
+#endif
+    ASSERT_EQ(file.size(), content.size());
+    EXPECT_TRUE(std::equal(content.begin(), content.end(), file.data()));
+}
+
+TEST_F(MappedFileTest, SequentialAccessAndPrefetch) {
+    MappedFile file(path, MappedFile::Access::SEQUENTIAL);
+    ASSERT_EQ(file.size(), content.size());
+
+    // Hints at unaligned and out-of-range positions are harmless
+    file.prefetch(100, 5000);
+    file.prefetch(file.size() - 1, 1 << 20);
+    file.prefetch(file.size() + 10, 10);
+    EXPECT_TRUE(std::equal(content.begin(), content.end(), file.data()));
+}
+
+TEST_F(MappedFileTest, MoveKeepsView) {
+    MappedFile file(path);
+    MappedFile moved(std::move(file));
+    EXPECT_EQ(file.size(), 0);
+    EXPECT_EQ(file.data(), nullptr);
+    ASSERT_EQ(moved.size(), content.size());
+    EXPECT_EQ(moved.data()[4096], content[4096]);
+}
+
+TEST_F(MappedFileTest, MissingFileThrows) {
+    EXPECT_THROW(MappedFile("mapped_file_test_missing.bin"), std::runtime_error);
+}
+
+#ifdef __linux__
+TEST_F(MappedFileTest, ReadsFilesWithoutSize) {
+    // procfs reports a size of zero, so the file is read instead of mapped
+    MappedFile file("/proc/self/status");
+    EXPECT_FALSE(file.isMapped());
+    EXPECT_GT(file.size(), 0);
+}
+#endif
\ No newline at end of file
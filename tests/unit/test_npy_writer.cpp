@@ -0,0 +1,161 @@
+#include <gtest/gtest.h>
+#include "binary_parser/npy_writer.h"
+#include "binary_parser/leaf_columns.h"
+#include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/binary_parser.h"
+#include <cstring>
+#include <filesystem>
+#include <fstream>
+#include <sstream>
+
+using namespace binary_parser;
+
+namespace fs = std::filesystem;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Frame {
+//     uint32_t id;
+//     int16_t v[2];
+//     struct { uint8_t a; char tag[3]; } items[2];
+//     struct { double t; } meta;
+// };
+std::unique_ptr<StructInfo> createFrame() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Frame";
+    struct_info->size = 24;
+    struct_info->fields = struct_info->arena.allocate(4);
+    setField(struct_info->fields[0], "id", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[1], "v", FieldType::INT16, 4, 4, 2);
+    setField(struct_info->fields[2], "items", FieldType::STRUCT, 8, 8, 2);
+    struct_info->fields[2].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[2].sub_fields[0], "a", FieldType::UINT8, 0, 1);
+    setField(struct_info->fields[2].sub_fields[1], "tag", FieldType::CHAR, 1, 3, 3);
+    setField(struct_info->fields[3], "meta", FieldType::STRUCT, 16, 8);
+    struct_info->fields[3].sub_fields = struct_info->arena.allocate(1);
+    setField(struct_info->fields[3].sub_fields[0], "t", FieldType::DOUBLE, 0, 8);
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> frameRecord(uint32_t id) {
+    std::vector<uint8_t> data(24, 0);
+    std::memcpy(data.data(), &id, 4);
+    int16_t v[2] = {static_cast<int16_t>(id), static_cast<int16_t>(-1)};
+    std::memcpy(data.data() + 4, v, 4);
+    for (int i = 0; i < 2; i++) {
+        data[8 + 4 * i] = static_cast<uint8_t>(id * 10 + i);
+        data[9 + 4 * i] = 'x';
+        data[10 + 4 * i] = static_cast<uint8_t>('0' + i);
+    }
+    double t = id * 0.25;
+    std::memcpy(data.data() + 16, &t, 8);
+    return data;
+}
+
+// Header text and data of a .npy file
+std::pair<std::string, std::string> readNpy(const fs::path& path) {
+    std::ifstream in(path, std::ios::binary);
+    std::stringstream buffer;
+    buffer << in.rdbuf();
+    std::string bytes = buffer.str();
+    EXPECT_EQ(bytes.substr(0, 8), std::string("\x93NUMPY\x01\x00", 8));
+    size_t length = static_cast<uint8_t>(bytes[8]) | (static_cast<uint8_t>(bytes[9]) << 8);
+    EXPECT_EQ((10 + length) % 64, 0);
+    EXPECT_EQ(bytes[10 + length - 1], '\n');
+    return {bytes.substr(10, length), bytes.substr(10 + length)};
+}
+
+} // namespace
+
+TEST(NpyWriterTest, LeavesFlattenStructArrays) {
+    auto struct_info = createFrame();
+    std::vector<LeafColumn> leaves = leafColumns(*struct_info);
+    ASSERT_EQ(leaves.size(), 5);
+
+    EXPECT_EQ(leaves[0].path, "id");
+    EXPECT_TRUE(leaves[0].shape.empty());
+    EXPECT_EQ(leaves[1].shape, (std::vector<size_t>{2}));
+    EXPECT_EQ(leaves[2].path, "items.a");
+    EXPECT_EQ(leaves[2].shape, (std::vector<size_t>{2}));
+    EXPECT_EQ(leaves[3].path, "items.tag");
+    EXPECT_TRUE(leaves[3].text);
+    EXPECT_EQ(leaves[3].width, 3);
+    EXPECT_EQ(leaves[3].values, 2);
+    EXPECT_EQ(leaves[4].path, "meta.t");
+    EXPECT_EQ(leaves[4].positions, (std::vector<uint32_t>{3, 0}));
+}
+
+TEST(NpyWriterTest, WritesOneFilePerLeaf) {
+    const fs::path dir = "npy_writer_test_dir";
+    fs::remove_all(dir);
+    auto struct_info = createFrame();
+
+    {
+        NpyWriter writer(dir.string(), *struct_info);
+        BinaryParser parser;
+        for (uint32_t i = 0; i < 3; i++) {
+            auto data = frameRecord(i);
+            writer.write(*parser.parse(data.data(), data.size(), *struct_info));
+        }
+        writer.finish();
+        EXPECT_EQ(writer.records(), 3);
+    }
+
+    auto id = readNpy(dir / "id.npy");
+    EXPECT_NE(id.first.find("'descr': '<u4'"), std::string::npos);
+    EXPECT_NE(id.first.find("'fortran_order': False"), std::string::npos);
+    EXPECT_NE(id.first.find("'shape': (3,)"), std::string::npos);
+    ASSERT_EQ(id.second.size(), 12);
+    uint32_t last_id;
+    std::memcpy(&last_id, id.second.data() + 8, 4);
+    EXPECT_EQ(last_id, 2);
+
+    auto v = readNpy(dir / "v.npy");
+    EXPECT_NE(v.first.find("'descr': '<i2'"), std::string::npos);
+    EXPECT_NE(v.first.find("'shape': (3, 2)"), std::string::npos);
+    EXPECT_EQ(v.second.size(), 12);
+
+    auto a = readNpy(dir / "items.a.npy");
+    EXPECT_NE(a.first.find("'descr': '|u1'"), std::string::npos);
+    EXPECT_NE(a.first.find("'shape': (3, 2)"), std::string::npos);
+    EXPECT_EQ(a.second, std::string("\x00\x01\x0A\x0B\x14\x15", 6));
+
+    auto tag = readNpy(dir / "items.tag.npy");
+    EXPECT_NE(tag.first.find("'descr': '|S3'"), std::string::npos);
+    EXPECT_NE(tag.first.find("'shape': (3, 2)"), std::string::npos);
+    EXPECT_EQ(tag.second.substr(0, 6), std::string("x0\0x1\0", 6));
+
+    auto t = readNpy(dir / "meta.t.npy");
+    EXPECT_NE(t.first.find("'descr': '<f8'"), std::string::npos);
+    double last_t;
+    std::memcpy(&last_t, t.second.data() + 16, 8);
+    EXPECT_DOUBLE_EQ(last_t, 0.5);
+
+    // Headers keep their size whatever the count
+    EXPECT_EQ(id.first.size(), readNpy(dir / "v.npy").first.size());
+
+    fs::remove_all(dir);
+}
+
+TEST(NpyWriterTest, EmptyOutputIsValid) {
+    const fs::path dir = "npy_writer_empty_dir";
+    fs::remove_all(dir);
+    auto struct_info = createFrame();
+    NpyWriter writer(dir.string(), *struct_info);
+    writer.finish();
+
+    auto id = readNpy(dir / "id.npy");
+    EXPECT_NE(id.first.find("'shape': (0,)"), std::string::npos);
+    EXPECT_TRUE(id.second.empty());
+    fs::remove_all(dir);
+}
\ No newline at end of file
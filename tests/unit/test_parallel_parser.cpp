@@ -0,0 +1,191 @@
+#include <gtest/gtest.h>
+#include "binary_parser/parallel_parser.h"
+#include "binary_parser/xml_struct_parser.h"
+#include <algorithm>
+#include <cstring>
+#include <mutex>
+#include <sstream>
+#include <thread>
+
+using namespace binary_parser;
+
+namespace {
+
+// struct { uint32_t id; struct { uint16_t a; uint16_t b; } pair; } (size 8)
+std::unique_ptr<StructInfo> createRecordStruct() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Record";
+    struct_info->size = 8;
+    struct_info->fields = struct_info->arena.allocate(2);
+
+    FieldInfo& id = struct_info->fields[0];
+    id.name = "id";
+    id.type = FieldType::UINT32;
+    id.offset = 0;
+    id.size = 4;
+
+    FieldInfo& pair = struct_info->fields[1];
+    pair.name = "pair";
+    pair.type = FieldType::STRUCT;
+    pair.offset = 4;
+    pair.size = 4;
+    pair.sub_fields = struct_info->arena.allocate(2);
+    pair.sub_fields[0].name = "a";
+    pair.sub_fields[0].type = FieldType::UINT16;
+    pair.sub_fields[0].offset = 0;
+    pair.sub_fields[0].size = 2;
+    pair.sub_fields[1].name = "b";
+    pair.sub_fields[1].type = FieldType::UINT16;
+    pair.sub_fields[1].offset = 2;
+    pair.sub_fields[1].size = 2;
+
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> createRecords(size_t count) {
+    std::vector<uint8_t> data(count * 8);
+    for (size_t i = 0; i < count; i++) {
+        uint32_t id = static_cast<uint32_t>(i);
+        uint16_t a = static_cast<uint16_t>(i * 3);
+        uint16_t b = static_cast<uint16_t>(i * 7);
+        std::memcpy(&data[i * 8], &id, 4);
+        std::memcpy(&data[i * 8 + 4], &a, 2);
+        std::memcpy(&data[i * 8 + 6], &b, 2);
+    }
+    return data;
+}
+
+void formatRecord(size_t index, size_t offset, const ParsedStruct& record, std::ostream& out) {
+    const ParsedField& pair = record.fields.at("pair");
+    out << index << "@" << offset << ":"
+        << BinaryParser::getValue<uint32_t>(record.fields.at("id")) << ","
+        << BinaryParser::getValue<uint16_t>(pair.sub_fields.at("a")) << ","
+        << BinaryParser::getValue<uint16_t>(pair.sub_fields.at("b")) << "\n";
+}
+
+} // namespace
+
+TEST(ParallelParserTest, OutputMatchesSerialOrder) {
+    auto struct_info = createRecordStruct();
+    std::vector<uint8_t> data = createRecords(1000);
+    data.push_back(0);  // Incomplete trailing record is ignored, as in parseMany()
+
+    std::ostringstream expected;
+    BinaryParser serial;
+    serial.parseMany(data.data(), data.size(), 0, *struct_info,
+        [&](size_t index, size_t offset, const ParsedStruct& record) {
+            formatRecord(index, offset, record, expected);
+        });
+
+    ParallelOptions options;
+    options.threads = 4;
+    options.chunk_records = 7;  // Many chunks, last one partial
+
+    std::string output;
+    size_t written = 0;
+    size_t count = parseManyParallel(data.data(), data.size(), 0, *struct_info, options, formatRecord,
+        [&](const std::string& buffer, size_t records) {
+            output += buffer;
+            written += records;
+        });
+
+    EXPECT_EQ(count, 1000);
+    EXPECT_EQ(written, 1000);
+    EXPECT_EQ(output, expected.str());
+}
+
+TEST(ParallelParserTest, HonoursStride) {
+    auto struct_info = createRecordStruct();
+    std::vector<uint8_t> records = createRecords(10);
+    // Records in 12-byte slots
+    std::vector<uint8_t> data(10 * 12, 0xEE);
+    for (size_t i = 0; i < 10; i++) {
+        std::memcpy(&data[i * 12], &records[i * 8], 8);
+    }
+
+    ParallelOptions options;
+    options.threads = 3;
+    options.chunk_records = 3;
+    std::vector<uint32_t> ids;
+    std::vector<size_t> offsets;
+    std::mutex mutex;
+    parseManyParallel(data.data(), data.size(), 12, *struct_info, options,
+        [&](size_t index, size_t offset, const ParsedStruct& record, std::ostream& out) {
+            out << index << " ";
+            std::lock_guard<std::mutex> lock(mutex);
+            offsets.push_back(offset);
+            EXPECT_EQ(BinaryParser::getValue<uint32_t>(record.fields.at("id")), index);
+        },
+        [&](const std::string& buffer, size_t) {
+            std::istringstream in(buffer);
+            uint32_t id;
+            while (in >> id) ids.push_back(id);
+        });
+
+    EXPECT_EQ(ids, (std::vector<uint32_t>{0, 1, 2, 3, 4, 5, 6, 7, 8, 9}));
+    std::sort(offsets.begin(), offsets.end());
+    for (size_t i = 0; i < offsets.size(); i++) {
+        EXPECT_EQ(offsets[i], i * 12);
+    }
+}
+
+TEST(ParallelParserTest, PropagatesErrors) {
+    auto struct_info = createRecordStruct();
+    std::vector<uint8_t> data = createRecords(100);
+    ParallelOptions options;
+    options.threads = 4;
+    options.chunk_records = 5;
+
+    EXPECT_THROW(parseManyParallel(data.data(), data.size(), 0, *struct_info, options,
+        [](size_t index, size_t, const ParsedStruct&, std::ostream&) {
+            if (index == 42) throw std::runtime_error("bad record");
+        },
+        [](const std::string&, size_t) {}), std::runtime_error);
+
+    size_t chunks = 0;
+    EXPECT_THROW(parseManyParallel(data.data(), data.size(), 0, *struct_info, options, formatRecord,
+        [&](const std::string&, size_t) {
+            if (++chunks == 3) throw std::runtime_error("write failed");
+        }), std::runtime_error);
+    EXPECT_EQ(chunks, 3);
+}
+
+TEST(ParallelParserTest, EmptyInput) {
+    auto struct_info = createRecordStruct();
+    ParallelOptions options;
+    options.threads = 4;
+    size_t calls = 0;
+    EXPECT_EQ(parseManyParallel(nullptr, 0, 0, *struct_info, options, formatRecord,
+                                [&](const std::string&, size_t) { calls++; }), 0);
+    EXPECT_EQ(calls, 0);
+}
+
+TEST(ParallelParserTest, StructInfoIsSharedReadOnly) {
+    // One schema, many threads, each with its own parser
+    auto struct_info = createRecordStruct();
+    std::vector<uint8_t> data = createRecords(500);
+
+    std::vector<std::string> outputs(8);
+    std::vector<std::thread> threads;
+    for (size_t t = 0; t < outputs.size(); t++) {
+        threads.emplace_back([&, t]() {
+            BinaryParser parser(t % 2 ? Endianness::BIG : Endianness::LITTLE);
+            std::ostringstream out;
+            parser.parseMany(data.data(), data.size(), 0, *struct_info,
+                [&](size_t index, size_t offset, const ParsedStruct& record) {
+                    formatRecord(index, offset, record, out);
+                });
+            outputs[t] = out.str();
+        });
+    }
+    for (std::thread& thread : threads) {
+        thread.join();
+    }
+
+    for (size_t t = 2; t < outputs.size(); t++) {
+        EXPECT_EQ(outputs[t], outputs[t % 2]);
+    }
+    EXPECT_NE(outputs[0], outputs[1]);
+    EXPECT_EQ(struct_info->extent, 8);
+}
\ No newline at end of file
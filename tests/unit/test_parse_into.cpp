@@ -0,0 +1,214 @@
+#include <gtest/gtest.h>
+#include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/binary_parser.h"
+#include "allocation_counter.h"
+#include <atomic>
+#include <cstdlib>
+#include <cstring>
+#include <new>
+
+using namespace binary_parser;
+
+// Counts heap allocations made by this test binary while enabled
+std::atomic<bool> g_count_allocations{false};
+std::atomic<size_t> g_allocations{0};
+
+void* operator new(size_t size) {
+    if (g_count_allocations) g_allocations++;
+    if (void* ptr = std::malloc(size ? size : 1)) return ptr;
+    throw std::bad_alloc();
+}
+
+// GCC cannot tell that the replaced operator new returns malloc()ed memory
+#if defined(__GNUC__) && !defined(__clang__)
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wmismatched-new-delete"
+#endif
+void operator delete(void* ptr) noexcept {
+    std::free(ptr);
+}
+
+void operator delete(void* ptr, size_t) noexcept {
+    std::free(ptr);
+}
+#if defined(__GNUC__) && !defined(__clang__)
+#pragma GCC diagnostic pop
+#endif
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Sample {
+//     uint32_t seq;
+//     struct { uint8_t type : 4; uint8_t flags : 4; } header;
+//     uint8_t kind;
+//     uint16_t pad;
+//     float values[8];                          // Longer than a FieldValue holds inline
+//     struct { uint16_t a; uint16_t b; } pairs[3];
+//     union { uint32_t word; char text[4]; } body;   // Tagged by kind
+// };
+std::unique_ptr<StructInfo> createSample() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Sample";
+    struct_info->size = 60;
+    struct_info->fields = struct_info->arena.allocate(6);
+    
+    setField(struct_info->fields[0], "seq", FieldType::UINT32, 0, 4);
+    FieldInfo& header = struct_info->fields[1];
+    setField(header, "header", FieldType::STRUCT, 4, 1);
+    header.sub_fields = struct_info->arena.allocate(2);
+    setField(header.sub_fields[0], "type", FieldType::UINT8, 0, 1);
+    header.sub_fields[0].bits = 4;
+    setField(header.sub_fields[1], "flags", FieldType::UINT8, 0, 1);
+    header.sub_fields[1].bits = 4;
+    header.sub_fields[1].bit_offset = 4;
+    setField(struct_info->fields[2], "kind", FieldType::UINT8, 5, 1);
+    setField(struct_info->fields[3], "values", FieldType::FLOAT, 8, 32, 8);
+    
+    FieldInfo& pairs = struct_info->fields[4];
+    setField(pairs, "pairs", FieldType::STRUCT, 40, 12, 3);
+    pairs.sub_fields = struct_info->arena.allocate(2);
+    setField(pairs.sub_fields[0], "a", FieldType::UINT16, 0, 2);
+    setField(pairs.sub_fields[1], "b", FieldType::UINT16, 2, 2);
+    
+    FieldInfo& body = struct_info->fields[5];
+    setField(body, "body", FieldType::UNION, 52, 4);
+    body.is_union = true;
+    body.sub_fields = struct_info->arena.allocate(2);
+    setField(body.sub_fields[0], "word", FieldType::UINT32, 0, 4);
+    setField(body.sub_fields[1], "text", FieldType::CHAR, 0, 4, 4);
+    body.selector = struct_info->arena.allocateSelector();
+    body.selector->discriminator = "kind";
+    body.selector->cases = "1=word, 2=text";
+    
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> sample(uint32_t seq, uint8_t kind) {
+    std::vector<uint8_t> data(60, 0);
+    std::memcpy(data.data(), &seq, 4);
+    data[4] = static_cast<uint8_t>(0x20 | (seq & 0xF));
+    data[5] = kind;
+    for (int i = 0; i < 8; i++) {
+        float value = static_cast<float>(seq) + i * 0.5f;
+        std::memcpy(data.data() + 8 + i * 4, &value, 4);
+    }
+    for (int i = 0; i < 6; i++) {
+        uint16_t value = static_cast<uint16_t>(seq * 10 + i);
+        std::memcpy(data.data() + 40 + i * 2, &value, 2);
+    }
+    std::memcpy(data.data() + 52, "abcd", 4);
+    return data;
+}
+
+} // namespace
+
+TEST(ParseIntoTest, OverwritesValuesInPlace) {
+    auto struct_info = createSample();
+    BinaryParser parser;
+    ParsedStruct result;
+    
+    auto first = sample(1, 1);
+    parser.parseInto(first.data(), first.size(), *struct_info, result);
+    EXPECT_EQ(result.struct_name, "Sample");
+    ASSERT_EQ(result.fields.size(), 6);
+    const uint8_t* values = result.fields.at("values").value.bytes();
+    const uint8_t* column = result.fields.at("pairs").sub_fields.at("a").value.bytes();
+    
+    auto second = sample(2, 1);
+    parser.parseInto(second.data(), second.size(), *struct_info, result);
+    ASSERT_EQ(result.fields.size(), 6);
+    EXPECT_EQ(result.fields.at("seq").value.get<uint32_t>(), 2u);
+    EXPECT_EQ(result.fields.at("header").sub_fields.at("type").value.get<uint8_t>(), 2);
+    EXPECT_EQ(result.fields.at("values").value.elements<float>()[7], 5.5f);
+    EXPECT_EQ(result.fields.at("pairs").sub_fields.at("b").value.elements<uint16_t>()[2], 25);
+    EXPECT_EQ(result.fields.at("body").sub_fields.at("word").value.get<uint32_t>(), 0x64636261u);
+    
+    // Array storage is refilled rather than reallocated
+    EXPECT_EQ(result.fields.at("values").value.bytes(), values);
+    EXPECT_EQ(result.fields.at("pairs").sub_fields.at("a").value.bytes(), column);
+    
+    // The same record decodes the same way into a fresh result
+    auto fresh = parser.parse(second.data(), second.size(), *struct_info);
+    EXPECT_EQ(fresh->fields.at("values").value.elements<float>()[3], 3.5f);
+}
+
+TEST(ParseIntoTest, ReshapesOnSchemaOrMemberChange) {
+    auto struct_info = createSample();
+    BinaryParser parser;
+    ParsedStruct result;
+    
+    auto data = sample(1, 1);
+    parser.parseInto(data.data(), data.size(), *struct_info, result);
+    ASSERT_EQ(result.fields.at("body").sub_fields[0].name, "word");
+    
+    // Another member of the tagged union, then none
+    data = sample(2, 2);
+    parser.parseInto(data.data(), data.size(), *struct_info, result);
+    ASSERT_EQ(result.fields.at("body").sub_fields.size(), 1);
+    EXPECT_EQ(result.fields.at("body").sub_fields[0].name, "text");
+    data = sample(3, 9);
+    parser.parseInto(data.data(), data.size(), *struct_info, result);
+    EXPECT_TRUE(result.fields.at("body").sub_fields.empty());
+    
+    // A result shaped by another schema starts over
+    StructInfo other;
+    other.name = "Other";
+    other.size = 4;
+    other.fields = other.arena.allocate(1);
+    setField(other.fields[0], "value", FieldType::UINT32, 0, 4);
+    validateLayout(other);
+    parser.parseInto(data.data(), data.size(), other, result);
+    EXPECT_EQ(result.struct_name, "Other");
+    ASSERT_EQ(result.fields.size(), 1);
+    EXPECT_EQ(result.fields[0].name, "value");
+    EXPECT_EQ(result.fields[0].value.get<uint32_t>(), 3u);
+}
+
+TEST(ParseIntoTest, SteadyStateDoesNotAllocate) {
+    auto struct_info = createSample();
+    std::vector<uint8_t> records;
+    for (uint32_t i = 0; i < 64; i++) {
+        auto record = sample(i, i % 2 ? 1 : 2);
+        records.insert(records.end(), record.begin(), record.end());
+    }
+    
+    for (bool checked : {false, true}) {
+        BinaryParser parser;
+        parser.setFieldBoundsChecks(checked);
+        ParsedStruct result;
+        // Shaped by the first record of each union member
+        parser.parseInto(records.data(), records.size(), *struct_info, result);
+        
+        g_allocations = 0;
+        g_count_allocations = true;
+        for (size_t i = 0; i < 64; i += 2) {
+            parser.parseInto(records.data() + i * 60, records.size() - i * 60, *struct_info, result);
+        }
+        g_count_allocations = false;
+        EXPECT_EQ(g_allocations, 0u) << (checked ? "checked" : "unchecked");
+        EXPECT_EQ(result.fields.at("seq").value.get<uint32_t>(), 62u);
+    }
+    
+    // parseMany() hands every callback the same, refilled record
+    BinaryParser parser;
+    const ParsedStruct* seen = nullptr;
+    size_t same = 0;
+    size_t count = parser.parseMany(records.data(), records.size(), 0, *struct_info,
+        [&](size_t index, size_t, const ParsedStruct& record) {
+            if (seen == &record) same++;
+            seen = &record;
+            EXPECT_EQ(record.fields.at("seq").value.get<uint32_t>(), index);
+        });
+    EXPECT_EQ(count, 64u);
+    EXPECT_EQ(same, 63u);
+}
\ No newline at end of file
@@ -0,0 +1,146 @@
+#include <gtest/gtest.h>
+#include "binary_parser/record_filter.h"
+#include "binary_parser/parallel_parser.h"
+#include "binary_parser/xml_struct_parser.h"
+#include <cstring>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct {
+//     struct { uint16_t type; int16_t level; } header;
+//     uint32_t flags : 4;
+//     int32_t delta : 6;   // Same 32-bit unit, bits 4..9
+//     float temp;
+//     uint8_t samples[4];
+// };
+std::unique_ptr<StructInfo> createEventStruct() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Event";
+    struct_info->size = 16;
+    struct_info->fields = struct_info->arena.allocate(5);
+    setField(struct_info->fields[0], "header", FieldType::STRUCT, 0, 4);
+    struct_info->fields[0].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[0].sub_fields[0], "type", FieldType::UINT16, 0, 2);
+    setField(struct_info->fields[0].sub_fields[1], "level", FieldType::INT16, 2, 2);
+    setField(struct_info->fields[1], "flags", FieldType::UINT32, 4, 4);
+    struct_info->fields[1].bits = 4;
+    setField(struct_info->fields[2], "delta", FieldType::INT32, 4, 4);
+    struct_info->fields[2].bits = 6;
+    struct_info->fields[2].bit_offset = 4;
+    setField(struct_info->fields[3], "temp", FieldType::FLOAT, 8, 4);
+    setField(struct_info->fields[4], "samples", FieldType::UINT8, 12, 4, 4);
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> createEvent(uint16_t type, int16_t level, uint32_t flags, int32_t delta, float temp,
+                                 uint8_t first_sample) {
+    std::vector<uint8_t> data(16, 0);
+    std::memcpy(&data[0], &type, 2);
+    std::memcpy(&data[2], &level, 2);
+    uint32_t unit = (flags & 0xF) | ((static_cast<uint32_t>(delta) & 0x3F) << 4);
+    std::memcpy(&data[4], &unit, 4);
+    std::memcpy(&data[8], &temp, 4);
+    data[12] = first_sample;
+    return data;
+}
+
+bool matches(const std::string& expression, const std::vector<uint8_t>& record) {
+    auto struct_info = createEventStruct();
+    return RecordFilter::compile(expression, *struct_info).matches(record.data());
+}
+
+} // namespace
+
+TEST(RecordFilterTest, ComparesFields) {
+    auto record = createEvent(3, -20, 0x5, -3, 90.5f, 200);
+    EXPECT_TRUE(matches("header.type == 3", record));
+    EXPECT_FALSE(matches("header.type != 3", record));
+    EXPECT_TRUE(matches("header.type >= 0x3 && header.type < 4", record));
+    EXPECT_TRUE(matches("header.level < 0", record));
+    EXPECT_TRUE(matches("header.level == -20", record));
+    EXPECT_TRUE(matches("temp > 85.5", record));
+    EXPECT_TRUE(matches("temp < 1e3", record));
+    EXPECT_TRUE(matches("samples[0] >= 200 && samples[1] == 0", record));
+    EXPECT_TRUE(matches("samples[0] > -1", record));
+    EXPECT_TRUE(matches("header.level < header.type", record));
+}
+
+TEST(RecordFilterTest, ReadsBitfields) {
+    auto record = createEvent(1, 0, 0x5, -3, 0.0f, 0);
+    EXPECT_TRUE(matches("flags == 5", record));
+    EXPECT_TRUE(matches("delta == -3", record));
+    EXPECT_TRUE(matches("flags & 0x4", record));
+    EXPECT_FALSE(matches("flags & 0x2", record));
+    EXPECT_TRUE(matches("(flags & 0x6) == 4", record));
+}
+
+TEST(RecordFilterTest, CombinesConditions) {
+    auto record = createEvent(3, 5, 0, 0, 20.0f, 0);
+    EXPECT_TRUE(matches("header.type == 3 && (flags || header.level > 1)", record));
+    EXPECT_FALSE(matches("header.type == 3 && !(header.level > 1)", record));
+    EXPECT_TRUE(matches("header.type == 9 || header.type == 3", record));
+    EXPECT_TRUE(matches("!flags", record));
+    EXPECT_TRUE(matches("header.level", record));
+}
+
+TEST(RecordFilterTest, RejectsBadExpressions) {
+    auto struct_info = createEventStruct();
+    EXPECT_THROW(RecordFilter::compile("", *struct_info), std::runtime_error);
+    EXPECT_THROW(RecordFilter::compile("header.missing == 1", *struct_info), std::runtime_error);
+    EXPECT_THROW(RecordFilter::compile("samples == 1", *struct_info), std::runtime_error);
+    EXPECT_THROW(RecordFilter::compile("samples[4] == 1", *struct_info), std::runtime_error);
+    EXPECT_THROW(RecordFilter::compile("header.type == 1 &&", *struct_info), std::runtime_error);
+    EXPECT_THROW(RecordFilter::compile("(header.type == 1", *struct_info), std::runtime_error);
+    EXPECT_THROW(RecordFilter::compile("temp & 1", *struct_info), std::runtime_error);
+    EXPECT_THROW(RecordFilter::compile("header.type == 12abc", *struct_info), std::runtime_error);
+}
+
+TEST(RecordFilterTest, SkipsRecordsBeforeDecoding) {
+    auto struct_info = createEventStruct();
+    std::vector<uint8_t> data;
+    for (uint16_t type = 0; type < 10; type++) {
+        auto record = createEvent(type, 0, 0, 0, 0.0f, 0);
+        data.insert(data.end(), record.begin(), record.end());
+    }
+    RecordFilter filter = RecordFilter::compile("header.type > 6 || header.type == 2", *struct_info);
+
+    BinaryParser parser;
+    parser.setRecordFilter(&filter);
+    std::vector<size_t> indices;
+    size_t count = parser.parseMany(data.data(), data.size(), 0, *struct_info,
+        [&](size_t index, size_t offset, const ParsedStruct& record) {
+            EXPECT_EQ(offset, index * 16);
+            EXPECT_EQ(BinaryParser::getValue<uint16_t>(record.fields.at("header").sub_fields.at("type")), index);
+            indices.push_back(index);
+        });
+    EXPECT_EQ(count, 4);
+    EXPECT_EQ(indices, (std::vector<size_t>{2, 7, 8, 9}));
+
+    ParallelOptions options;
+    options.threads = 2;
+    options.chunk_records = 3;
+    options.filter = &filter;
+    std::string output;
+    size_t written = 0;
+    count = parseManyParallel(data.data(), data.size(), 0, *struct_info, options,
+        [](size_t index, size_t, const ParsedStruct&, std::ostream& out) { out << index << ";"; },
+        [&](const std::string& buffer, size_t records) {
+            output += buffer;
+            written += records;
+        });
+    EXPECT_EQ(count, 4);
+    EXPECT_EQ(written, 4);
+    EXPECT_EQ(output, "2;7;8;9;");
+}
\ No newline at end of file
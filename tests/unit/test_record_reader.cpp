@@ -0,0 +1,124 @@
+#include <gtest/gtest.h>
+#include "binary_parser/record_reader.h"
+#include "binary_parser/binary_parser.h"
+#include "binary_parser/xml_struct_parser.h"
+#include <cstring>
+#include <sstream>
+
+using namespace binary_parser;
+
+namespace {
+
+std::string createStream(size_t count, size_t stride) {
+    std::string data(count * stride, '\xEE');
+    for (size_t i = 0; i < count; i++) {
+        uint32_t id = static_cast<uint32_t>(i);
+        std::memcpy(&data[i * stride], &id, 4);
+    }
+    return data;
+}
+
+// Reads every record id from the stream, checking offsets along the way
+std::vector<uint32_t> readIds(RecordReader& reader, size_t stride) {
+    std::vector<uint32_t> ids;
+    RecordReader::Block block;
+    while (reader.next(block)) {
+        EXPECT_GT(block.records, 0);
+        for (size_t i = 0; i < block.records; i++) {
+            uint32_t id;
+            std::memcpy(&id, block.data + i * stride, 4);
+            EXPECT_EQ(block.offset + i * stride, id * stride);
+            ids.push_back(id);
+        }
+    }
+    return ids;
+}
+
+} // namespace
+
+TEST(RecordReaderTest, CarriesPartialRecordsAcrossChunks) {
+    // 6-byte records in 16-byte chunks: every chunk ends mid-record
+    std::istringstream in(createStream(10, 6) + "xy");
+    RecordReader reader(in, 6, 6, 16);
+    EXPECT_EQ(reader.capacity(), 16);
+
+    std::vector<uint32_t> ids = readIds(reader, 6);
+    EXPECT_EQ(ids, (std::vector<uint32_t>{0, 1, 2, 3, 4, 5, 6, 7, 8, 9}));
+    EXPECT_EQ(reader.trailingBytes(), 2);
+}
+
+TEST(RecordReaderTest, HonoursStrideAndSkip) {
+    // 4-byte records in 10-byte slots after a 3-byte header; the last
+    // record needs only its own 4 bytes
+    std::string data = "hdr" + createStream(7, 10);
+    data.resize(3 + 6 * 10 + 4);
+    std::istringstream in(data);
+    RecordReader reader(in, 10, 4, 16);
+    reader.skip(3);
+
+    std::vector<uint32_t> ids;
+    RecordReader::Block block;
+    while (reader.next(block)) {
+        for (size_t i = 0; i < block.records; i++) {
+            uint32_t id;
+            std::memcpy(&id, block.data + i * 10, 4);
+            EXPECT_EQ(block.offset + i * 10, 3 + id * 10);
+            ids.push_back(id);
+        }
+        EXPECT_EQ(block.size, (block.records - 1) * 10 + 4);
+    }
+    EXPECT_EQ(ids, (std::vector<uint32_t>{0, 1, 2, 3, 4, 5, 6}));
+}
+
+TEST(RecordReaderTest, RecordLargerThanChunk) {
+    std::istringstream in(createStream(3, 64));
+    RecordReader reader(in, 64, 64, 16);
+    EXPECT_EQ(reader.capacity(), 64);
+    EXPECT_EQ(readIds(reader, 64), (std::vector<uint32_t>{0, 1, 2}));
+}
+
+TEST(RecordReaderTest, EmptyAndShortStreams) {
+    std::istringstream empty;
+    RecordReader empty_reader(empty, 8, 8);
+    RecordReader::Block block;
+    EXPECT_FALSE(empty_reader.next(block));
+    EXPECT_EQ(empty_reader.trailingBytes(), 0);
+
+    std::istringstream short_in("abc");
+    RecordReader short_reader(short_in, 8, 8);
+    EXPECT_FALSE(short_reader.next(block));
+    EXPECT_EQ(short_reader.trailingBytes(), 3);
+
+    std::istringstream in;
+    EXPECT_THROW(RecordReader(in, 0, 8), std::runtime_error);
+}
+
+TEST(RecordReaderTest, BlocksFeedParseMany) {
+    StructInfo struct_info;
+    struct_info.name = "Record";
+    struct_info.size = 8;
+    struct_info.fields = struct_info.arena.allocate(1);
+    struct_info.fields[0].name = "id";
+    struct_info.fields[0].type = FieldType::UINT32;
+    struct_info.fields[0].offset = 0;
+    struct_info.fields[0].size = 4;
+    validateLayout(struct_info);
+
+    std::istringstream in(createStream(100, 8));
+    RecordReader reader(in, 8, 8, 60);
+
+    BinaryParser parser;
+    std::vector<uint32_t> ids;
+    RecordReader::Block block;
+    while (reader.next(block)) {
+        size_t parsed = parser.parseMany(block.data, block.size, 8, struct_info,
+            [&](size_t, size_t, const ParsedStruct& record) {
+                ids.push_back(BinaryParser::getValue<uint32_t>(record.fields.at("id")));
+            });
+        EXPECT_EQ(parsed, block.records);
+    }
+    ASSERT_EQ(ids.size(), 100);
+    for (size_t i = 0; i < ids.size(); i++) {
+        EXPECT_EQ(ids[i], i);
+    }
+}
\ No newline at end of file
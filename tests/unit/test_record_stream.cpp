@@ -0,0 +1,103 @@
+#include <gtest/gtest.h>
+#include "binary_parser/binary_parser.h"
+#include "binary_parser/xml_struct_parser.h"
+#include <cstring>
+
+using namespace binary_parser;
+
+namespace {
+
+// struct { uint32_t id; uint16_t value; } (size 8, 2 bytes padding)
+std::unique_ptr<StructInfo> createRecordStruct() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Record";
+    struct_info->size = 8;
+    struct_info->fields = struct_info->arena.allocate(2);
+
+    FieldInfo& id = struct_info->fields[0];
+    id.name = "id";
+    id.type = FieldType::UINT32;
+    id.offset = 0;
+    id.size = 4;
+
+    FieldInfo& value = struct_info->fields[1];
+    value.name = "value";
+    value.type = FieldType::UINT16;
+    value.offset = 4;
+    value.size = 2;
+
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> createRecords(size_t count, size_t stride) {
+    std::vector<uint8_t> data(count * stride, 0xEE);
+    for (size_t i = 0; i < count; i++) {
+        uint32_t id = static_cast<uint32_t>(i);
+        uint16_t value = static_cast<uint16_t>(i * 100);
+        std::memcpy(&data[i * stride], &id, 4);
+        std::memcpy(&data[i * stride + 4], &value, 2);
+    }
+    return data;
+}
+
+} // namespace
+
+TEST(RecordStreamTest, ParsesEveryRecord) {
+    auto struct_info = createRecordStruct();
+    std::vector<uint8_t> data = createRecords(5, 8);
+    data.push_back(0);  // Incomplete trailing record is ignored
+
+    BinaryParser parser;
+    std::vector<uint32_t> ids;
+    std::vector<size_t> offsets;
+    size_t count = parser.parseMany(data.data(), data.size(), 0, *struct_info,
+        [&](size_t index, size_t offset, const ParsedStruct& record) {
+            EXPECT_EQ(index, ids.size());
+            ids.push_back(BinaryParser::getValue<uint32_t>(record.fields.at("id")));
+            offsets.push_back(offset);
+            EXPECT_EQ(BinaryParser::getValue<uint16_t>(record.fields.at("value")), index * 100);
+        });
+
+    EXPECT_EQ(count, 5);
+    EXPECT_EQ(ids, (std::vector<uint32_t>{0, 1, 2, 3, 4}));
+    EXPECT_EQ(offsets, (std::vector<size_t>{0, 8, 16, 24, 32}));
+}
+
+TEST(RecordStreamTest, HonoursStride) {
+    auto struct_info = createRecordStruct();
+    // 12-byte slots; the last record needs only its own 8 bytes
+    std::vector<uint8_t> data = createRecords(3, 12);
+    data.resize(2 * 12 + 8);
+
+    BinaryParser parser;
+    std::vector<uint32_t> ids;
+    size_t count = parser.parseMany(data.data(), data.size(), 12, *struct_info,
+        [&](size_t, size_t, const ParsedStruct& record) {
+            ids.push_back(BinaryParser::getValue<uint32_t>(record.fields.at("id")));
+        });
+
+    EXPECT_EQ(count, 3);
+    EXPECT_EQ(ids, (std::vector<uint32_t>{0, 1, 2}));
+}
+
+TEST(RecordStreamTest, EmptyInputHasNoRecords) {
+    auto struct_info = createRecordStruct();
+    BinaryParser parser;
+    size_t calls = 0;
+    auto callback = [&](size_t, size_t, const ParsedStruct&) { calls++; };
+
+    EXPECT_EQ(parser.parseMany(nullptr, 0, 0, *struct_info, callback), 0);
+    uint8_t short_data[7] = {};
+    EXPECT_EQ(parser.parseMany(short_data, sizeof(short_data), 0, *struct_info, callback), 0);
+    EXPECT_EQ(calls, 0);
+}
+
+TEST(RecordStreamTest, RejectsZeroStride) {
+    StructInfo empty;
+    uint8_t data[4] = {};
+    BinaryParser parser;
+    EXPECT_THROW(parser.parseMany(data, sizeof(data), 0, empty,
+                                  [](size_t, size_t, const ParsedStruct&) {}),
+                 std::runtime_error);
+}
\ No newline at end of file
@@ -0,0 +1,151 @@
+#include <gtest/gtest.h>
+#include "binary_parser/record_view.h"
+#include "allocation_counter.h"
+#include <cstring>
+#include <vector>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct {
+//     struct { uint32_t seq; uint8_t flags : 3; } header;
+//     char name[8];
+//     int16_t samples[4];
+//     struct { uint16_t a; uint16_t b; } pairs[2];
+// };
+std::unique_ptr<StructInfo> createRecordStruct() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Record";
+    struct_info->size = 32;
+    struct_info->fields = struct_info->arena.allocate(4);
+    setField(struct_info->fields[0], "header", FieldType::STRUCT, 0, 8);
+    struct_info->fields[0].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[0].sub_fields[0], "seq", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[0].sub_fields[1], "flags", FieldType::UINT8, 4, 1);
+    struct_info->fields[0].sub_fields[1].bits = 3;
+    setField(struct_info->fields[1], "name", FieldType::CHAR, 8, 8, 8);
+    setField(struct_info->fields[2], "samples", FieldType::INT16, 16, 8, 4);
+    setField(struct_info->fields[3], "pairs", FieldType::STRUCT, 24, 8, 2);
+    struct_info->fields[3].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[3].sub_fields[0], "a", FieldType::UINT16, 0, 2);
+    setField(struct_info->fields[3].sub_fields[1], "b", FieldType::UINT16, 2, 2);
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> createRecordData(bool big_endian) {
+    std::vector<uint8_t> data(32, 0);
+    auto put16 = [&](size_t offset, uint16_t value) {
+        data[offset + (big_endian ? 1 : 0)] = value & 0xFF;
+        data[offset + (big_endian ? 0 : 1)] = value >> 8;
+    };
+    uint32_t seq = 0x01020304;
+    for (int i = 0; i < 4; i++) {
+        data[big_endian ? 3 - i : i] = (seq >> (8 * i)) & 0xFF;
+    }
+    data[4] = 0xFD;  // flags = 0b101
+    std::memcpy(&data[8], "abc", 3);
+    const int16_t samples[4] = {-1, 2, -300, 400};
+    for (int i = 0; i < 4; i++) put16(16 + 2 * i, static_cast<uint16_t>(samples[i]));
+    put16(24, 10);
+    put16(26, 11);
+    put16(28, 20);
+    put16(30, 21);
+    return data;
+}
+
+} // namespace
+
+TEST(RecordViewTest, ReadsFieldsByPath) {
+    auto struct_info = createRecordStruct();
+    auto data = createRecordData(false);
+    RecordView view(data.data(), data.size(), *struct_info);
+
+    EXPECT_EQ(view.field("header.seq").get<uint32_t>(), 0x01020304u);
+    EXPECT_EQ(view.field("header.flags").get<uint8_t>(), 5);
+    EXPECT_EQ(view.field("pairs[1].b").get<uint16_t>(), 21);
+    EXPECT_EQ(view.field("pairs[0]").field("a").get<uint16_t>(), 10);
+    EXPECT_EQ(view.field(2).name(), "samples");
+    EXPECT_EQ(view.field(std::vector<uint32_t>{0, 0}).get<uint32_t>(), 0x01020304u);
+}
+
+TEST(RecordViewTest, CharArraysAreStringViewsIntoTheBuffer) {
+    auto struct_info = createRecordStruct();
+    auto data = createRecordData(false);
+    RecordView view(data.data(), data.size(), *struct_info);
+
+    std::string_view name = view.field("name").str();
+    EXPECT_EQ(name, "abc");
+    EXPECT_EQ(reinterpret_cast<const uint8_t*>(name.data()), data.data() + 8);
+}
+
+TEST(RecordViewTest, NumericArraysAreSwappingSpans) {
+    auto struct_info = createRecordStruct();
+    for (bool big_endian : {false, true}) {
+        auto data = createRecordData(big_endian);
+        RecordView view(data.data(), data.size(), *struct_info,
+                        big_endian ? Endianness::BIG : Endianness::LITTLE);
+
+        ArraySpan<int16_t> samples = view.field("samples").array<int16_t>();
+        EXPECT_EQ(std::vector<int16_t>(samples.begin(), samples.end()),
+                  (std::vector<int16_t>{-1, 2, -300, 400}));
+        EXPECT_EQ(view.field("header.seq").get<uint32_t>(), 0x01020304u);
+
+        EXPECT_EQ(view.field("pairs[1].a").get<uint16_t>(), 20);
+    }
+}
+
+TEST(RecordViewTest, ChangesInTheBufferAreSeen) {
+    auto struct_info = createRecordStruct();
+    auto data = createRecordData(false);
+    RecordView view(data.data(), data.size(), *struct_info);
+    FieldView seq = view.field("header.seq");
+
+    data[0] = 0xFF;
+    EXPECT_EQ(seq.get<uint32_t>(), 0x010203FFu);
+}
+
+TEST(RecordViewTest, ScalarReadsDoNotAllocate) {
+    auto struct_info = createRecordStruct();
+    for (bool big_endian : {false, true}) {
+        auto data = createRecordData(big_endian);
+        RecordView view(data.data(), data.size(), *struct_info,
+                        big_endian ? Endianness::BIG : Endianness::LITTLE);
+
+        g_allocations = 0;
+        g_count_allocations = true;
+        uint32_t seq = view.field("header.seq").get<uint32_t>();
+        uint8_t flags = view.field("header.flags").get<uint8_t>();
+        uint16_t b = view.field("pairs[1].b").value().get<uint16_t>();
+        g_count_allocations = false;
+
+        EXPECT_EQ(g_allocations, 0u);
+        EXPECT_EQ(seq, 0x01020304u);
+        EXPECT_EQ(flags, 5);
+        EXPECT_EQ(b, 21);
+    }
+}
+
+TEST(RecordViewTest, RejectsBadAccess) {
+    auto struct_info = createRecordStruct();
+    auto data = createRecordData(false);
+    EXPECT_THROW(RecordView(data.data(), 16, *struct_info), std::runtime_error);
+
+    RecordView view(data.data(), data.size(), *struct_info);
+    EXPECT_THROW(view.field("header.missing"), std::runtime_error);
+    EXPECT_THROW(view.field("pairs.a"), std::runtime_error);
+    EXPECT_THROW(view.field("pairs[2]"), std::out_of_range);
+    EXPECT_THROW(view.field("samples").array<uint16_t>(), std::runtime_error);
+    EXPECT_THROW(view.field("header.seq").get<uint16_t>(), std::runtime_error);
+    EXPECT_THROW(view.field(4), std::out_of_range);
+}
\ No newline at end of file
@@ -0,0 +1,54 @@
+#include <gtest/gtest.h>
+#include "binary_parser/xml_struct_parser.h"
+#include <string>
+
+using namespace binary_parser;
+
+TEST(SchemaArenaTest, InternsNamesOnce) {
+    SchemaArena arena;
+    std::string first = "position";
+    std::string second = "position";
+
+    std::string_view a = arena.intern(first);
+    std::string_view b = arena.intern(second);
+    EXPECT_EQ(a, "position");
+    EXPECT_EQ(a.data(), b.data());
+    EXPECT_NE(a.data(), first.data());
+    EXPECT_NE(arena.intern("velocity").data(), a.data());
+}
+
+TEST(SchemaArenaTest, AllocatesContiguousSiblings) {
+    SchemaArena arena;
+    FieldList fields = arena.allocate(3);
+    ASSERT_EQ(fields.size(), 3);
+    EXPECT_EQ(&fields[1], &fields[0] + 1);
+    EXPECT_EQ(&fields[2], &fields[0] + 2);
+
+    // Default field values
+    EXPECT_EQ(fields[0].array_size, 1);
+    EXPECT_EQ(fields[0].bits, 0);
+    EXPECT_TRUE(fields[0].sub_fields.empty());
+}
+
+TEST(SchemaArenaTest, FieldsNeverMove) {
+    SchemaArena arena;
+    FieldList first = arena.allocate(1);
+    first[0].name = arena.intern("first");
+    FieldInfo* address = &first[0];
+
+    for (int i = 0; i < 100; i++) {
+        arena.allocate(100);
+    }
+    EXPECT_EQ(&first[0], address);
+    EXPECT_EQ(first[0].name, "first");
+    EXPECT_EQ(arena.fieldCount(), 10001);
+}
+
+TEST(SchemaArenaTest, ReserveKeepsTreeInOneChunk) {
+    SchemaArena arena;
+    arena.reserve(5000);
+    for (int i = 0; i < 50; i++) {
+        arena.allocate(100);
+    }
+    EXPECT_EQ(arena.chunkCount(), 1);
+}
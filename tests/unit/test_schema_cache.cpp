@@ -0,0 +1,236 @@
+#include <gtest/gtest.h>
+#include "binary_parser/schema_cache.h"
+#include "binary_parser/xml_struct_parser.h"
+#include <filesystem>
+#include <fstream>
+#include <cstdlib>
+
+using namespace binary_parser;
+
+namespace fs = std::filesystem;
+
+class SchemaCacheTest : public ::testing::Test {
+protected:
+    void SetUp() override {
+        fs::remove_all(cache_dir);
+        writeXml("<struct name=\"CachedStruct\" size=\"8\"/>");
+    }
+
+    void TearDown() override {
+        fs::remove_all(cache_dir);
+        std::remove(xml_file);
+    }
+
+    void writeXml(const std::string& content) {
+        std::ofstream out(xml_file);
+        out << content;
+    }
+
+    // The cache never looks inside the XML, so any StructInfo will do
+    static std::unique_ptr<StructInfo> createStructInfo() {
+        auto struct_info = std::make_unique<StructInfo>();
+        struct_info->name = "CachedStruct";
+        struct_info->size = 8;
+        struct_info->packed = true;
+        struct_info->fields = struct_info->arena.allocate(2);
+
+        FieldInfo& id = struct_info->fields[0];
+        id.name = "id";
+        id.type = FieldType::UINT32;
+        id.offset = 0;
+        id.size = 4;
+
+        FieldInfo& data = struct_info->fields[1];
+        data.name = "data";
+        data.type = FieldType::UNION;
+        data.is_union = true;
+        data.offset = 4;
+        data.size = 4;
+        data.sub_fields = struct_info->arena.allocate(2);
+
+        FieldInfo& flags = data.sub_fields[0];
+        flags.name = "flags";
+        flags.type = FieldType::INT16;
+        flags.offset = 0;
+        flags.size = 2;
+        flags.bits = 3;
+        flags.bit_offset = 5;
+
+        FieldInfo& bytes = data.sub_fields[1];
+        bytes.name = "bytes";
+        bytes.type = FieldType::UINT8;
+        bytes.offset = 0;
+        bytes.size = 4;
+        bytes.array_size = 4;
+
+        return struct_info;
+    }
+
+    const char* cache_dir = "schema_cache_test_dir";
+    const char* xml_file = "schema_cache_test.xml";
+};
+
+TEST_F(SchemaCacheTest, MissWithoutEntry) {
+    SchemaCache cache(cache_dir);
+    EXPECT_EQ(cache.lookup(xml_file), nullptr);
+}
+
+TEST_F(SchemaCacheTest, RoundTrip) {
+    SchemaCache cache(cache_dir);
+    ASSERT_TRUE(cache.store(xml_file, *createStructInfo(), SchemaCache::stamp(xml_file)));
+    EXPECT_TRUE(fs::exists(cache.entryPath(xml_file)));
+
+    auto loaded = cache.lookup(xml_file);
+    ASSERT_NE(loaded, nullptr);
+    EXPECT_EQ(loaded->name, "CachedStruct");
+    EXPECT_EQ(loaded->size, 8);
+    EXPECT_TRUE(loaded->packed);
+    EXPECT_FALSE(loaded->discriminator_value.has_value());
+    ASSERT_EQ(loaded->fields.size(), 2);
+
+    const FieldInfo& id = loaded->fields[0];
+    EXPECT_EQ(id.name, "id");
+    EXPECT_EQ(id.type, FieldType::UINT32);
+    EXPECT_EQ(id.size, 4);
+
+    const FieldInfo& data = loaded->fields[1];
+    EXPECT_EQ(data.name, "data");
+    EXPECT_EQ(data.type, FieldType::UNION);
+    EXPECT_TRUE(data.is_union);
+    EXPECT_EQ(data.offset, 4);
+    ASSERT_EQ(data.sub_fields.size(), 2);
+
+    const FieldInfo& flags = data.sub_fields[0];
+    EXPECT_EQ(flags.name, "flags");
+    EXPECT_EQ(flags.type, FieldType::INT16);
+    EXPECT_EQ(flags.bits, 3);
+    EXPECT_EQ(flags.bit_offset, 5);
+
+    const FieldInfo& bytes = data.sub_fields[1];
+    EXPECT_EQ(bytes.name, "bytes");
+    EXPECT_EQ(bytes.array_size, 4);
+}
+
+TEST_F(SchemaCacheTest, KeepsDiscriminatorValue) {
+    SchemaCache cache(cache_dir);
+    auto struct_info = createStructInfo();
+    struct_info->discriminator_value = 0x1234;
+    ASSERT_TRUE(cache.store(xml_file, *struct_info, SchemaCache::stamp(xml_file)));
+
+    auto loaded = cache.lookup(xml_file);
+    ASSERT_NE(loaded, nullptr);
+    EXPECT_EQ(loaded->discriminator_value, 0x1234u);
+}
+
+TEST_F(SchemaCacheTest, KeepsUnionSelector) {
+    SchemaCache cache(cache_dir);
+    auto struct_info = createStructInfo();
+    FieldInfo& data = struct_info->fields[1];
+    data.selector = struct_info->arena.allocateSelector();
+    data.selector->discriminator = "id";
+    data.selector->cases = "1=flags, 2=bytes";
+    ASSERT_TRUE(cache.store(xml_file, *struct_info, SchemaCache::stamp(xml_file)));
+
+    auto loaded = cache.lookup(xml_file);
+    ASSERT_NE(loaded, nullptr);
+    const UnionSelector* selector = loaded->fields[1].selector;
+    ASSERT_NE(selector, nullptr);
+    EXPECT_EQ(selector->discriminator, "id");
+    EXPECT_EQ(selector->cases, "1=flags, 2=bytes");
+    EXPECT_TRUE(selector->resolved);
+    EXPECT_EQ(selector->select(2), 1u);
+    EXPECT_EQ(loaded->fields[0].selector, nullptr);
+}
+
+TEST_F(SchemaCacheTest, KeepsByteOrders) {
+    SchemaCache cache(cache_dir);
+    auto struct_info = createStructInfo();
+    struct_info->byte_order = ByteOrder::BIG;
+    struct_info->fields[0].byte_order = ByteOrder::LITTLE;
+    ASSERT_TRUE(cache.store(xml_file, *struct_info, SchemaCache::stamp(xml_file)));
+
+    auto loaded = cache.lookup(xml_file);
+    ASSERT_NE(loaded, nullptr);
+    EXPECT_EQ(loaded->byte_order, ByteOrder::BIG);
+    EXPECT_EQ(loaded->fields[0].byte_order, ByteOrder::LITTLE);
+    EXPECT_EQ(loaded->fields[1].byte_order, ByteOrder::BIG);
+    EXPECT_EQ(loaded->fields[1].sub_fields[0].byte_order, ByteOrder::BIG);
+}
+
+TEST_F(SchemaCacheTest, LoadsIntoSingleChunk) {
+    SchemaCache cache(cache_dir);
+    ASSERT_TRUE(cache.store(xml_file, *createStructInfo(), SchemaCache::stamp(xml_file)));
+
+    auto loaded = cache.lookup(xml_file);
+    ASSERT_NE(loaded, nullptr);
+    EXPECT_EQ(loaded->arena.fieldCount(), 4);
+    EXPECT_EQ(loaded->arena.chunkCount(), 1);
+}
+
+TEST_F(SchemaCacheTest, SharedFieldListsStayShared) {
+    auto struct_info = createStructInfo();
+    // A second union field reusing the same member list
+    FieldList fields = struct_info->arena.allocate(3);
+    fields[0] = struct_info->fields[0];
+    fields[1] = struct_info->fields[1];
+    fields[2] = struct_info->fields[1];
+    fields[2].name = "data2";
+    fields[2].offset = 8;
+    struct_info->fields = fields;
+
+    SchemaCache cache(cache_dir);
+    ASSERT_TRUE(cache.store(xml_file, *struct_info, SchemaCache::stamp(xml_file)));
+
+    auto loaded = cache.lookup(xml_file);
+    ASSERT_NE(loaded, nullptr);
+    ASSERT_EQ(loaded->fields.size(), 3);
+    EXPECT_EQ(loaded->fields[2].name, "data2");
+    EXPECT_EQ(loaded->fields[1].sub_fields.begin(), loaded->fields[2].sub_fields.begin());
+    EXPECT_EQ(loaded->arena.fieldCount(), 5);
+}
+
+TEST_F(SchemaCacheTest, StaleAfterContentChange) {
+    SchemaCache cache(cache_dir);
+    ASSERT_TRUE(cache.store(xml_file, *createStructInfo(), SchemaCache::stamp(xml_file)));
+
+    // Same size, so only the mtime and content hash can tell the difference
+    writeXml("<struct name=\"CachedStruct\" size=\"9\"/>");
+    EXPECT_EQ(cache.lookup(xml_file), nullptr);
+}
+
+TEST_F(SchemaCacheTest, StaleWhenEditedWhileLoading) {
+    SchemaCache cache(cache_dir);
+    SchemaStamp before = SchemaCache::stamp(xml_file);
+
+    // The file changes after it was stamped but before the tree is stored
+    writeXml("<struct name=\"CachedStruct\" size=\"16\"/>");
+    ASSERT_TRUE(cache.store(xml_file, *createStructInfo(), before));
+    EXPECT_EQ(cache.lookup(xml_file), nullptr);
+}
+
+TEST_F(SchemaCacheTest, CorruptEntryIsIgnored) {
+    SchemaCache cache(cache_dir);
+    ASSERT_TRUE(cache.store(xml_file, *createStructInfo(), SchemaCache::stamp(xml_file)));
+
+    {
+        std::ofstream out(cache.entryPath(xml_file), std::ios::binary | std::ios::trunc);
+        out << "garbage";
+    }
+    EXPECT_EQ(cache.lookup(xml_file), nullptr);
+}
+
+#ifndef _WIN32
+TEST_F(SchemaCacheTest, DefaultDirectoryUsesXdgCacheHome) {
+    const char* saved = std::getenv("XDG_CACHE_HOME");
+    std::string saved_value = saved ? saved : "";
+
+    setenv("XDG_CACHE_HOME", "/tmp/xdg-cache", 1);
+    EXPECT_EQ(SchemaCache::defaultDirectory(), "/tmp/xdg-cache/binary-parser-with-xml");
+
+    if (saved) {
+        setenv("XDG_CACHE_HOME", saved_value.c_str(), 1);
+    } else {
+        unsetenv("XDG_CACHE_HOME");
+    }
+}
+#endif
\ No newline at end of file
@@ -0,0 +1,214 @@
+#include <gtest/gtest.h>
+#include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/binary_parser.h"
+#include "binary_parser/json_converter.h"
+#include <cstring>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct {
+//     uint32_t id;
+//     struct { uint16_t a; uint16_t b; } pairs[3];
+//     uint8_t tail;
+// };
+std::unique_ptr<StructInfo> createPairsStruct() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Pairs";
+    struct_info->size = 20;
+    struct_info->fields = struct_info->arena.allocate(3);
+    setField(struct_info->fields[0], "id", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[1], "pairs", FieldType::STRUCT, 4, 12, 3);
+    struct_info->fields[1].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[1].sub_fields[0], "a", FieldType::UINT16, 0, 2);
+    setField(struct_info->fields[1].sub_fields[1], "b", FieldType::UINT16, 2, 2);
+    setField(struct_info->fields[2], "tail", FieldType::UINT8, 16, 1);
+    return struct_info;
+}
+
+} // namespace
+
+TEST(SchemaLayoutTest, ExtentCoversStructSize) {
+    auto struct_info = createPairsStruct();
+    EXPECT_FALSE(struct_info->layout_validated);
+
+    validateLayout(*struct_info);
+    EXPECT_TRUE(struct_info->layout_validated);
+    EXPECT_EQ(struct_info->extent, 20);  // Padding after tail is part of the record
+}
+
+TEST(SchemaLayoutTest, ExtentIncludesLoadWidths) {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->size = 4;
+    struct_info->fields = struct_info->arena.allocate(2);
+    // A declared size smaller than the type still loads the full width
+    setField(struct_info->fields[0], "narrow", FieldType::UINT32, 0, 2);
+    // Last element of a nested struct array lies past the declared size
+    setField(struct_info->fields[1], "items", FieldType::STRUCT, 2, 2, 2);
+    struct_info->fields[1].sub_fields = struct_info->arena.allocate(1);
+    setField(struct_info->fields[1].sub_fields[0], "value", FieldType::UINT16, 2, 2);
+
+    validateLayout(*struct_info);
+    // items[1].value: 2 + 1 * 1 + 2 + 2
+    EXPECT_EQ(struct_info->extent, 7);
+}
+
+TEST(SchemaLayoutTest, OneCheckPerRecord) {
+    auto struct_info = createPairsStruct();
+    struct_info->size = 17;  // Declared size leaves no room for padding
+    validateLayout(*struct_info);
+    EXPECT_EQ(struct_info->extent, 17);
+
+    uint8_t data[17] = {};
+    uint32_t id = 7;
+    uint16_t pairs[6] = {1, 2, 3, 4, 5, 6};
+    std::memcpy(data, &id, 4);
+    std::memcpy(data + 4, pairs, 12);
+    data[16] = 0xAA;
+
+    BinaryParser parser;
+    auto parsed = parser.parse(data, sizeof(data), *struct_info);
+    EXPECT_EQ(BinaryParser::getValue<uint32_t>(parsed->fields["id"]), 7);
+    EXPECT_EQ(BinaryParser::getValue<uint8_t>(parsed->fields["tail"]), 0xAA);
+
+    const ParsedField& items = parsed->fields["pairs"];
+    ASSERT_EQ(items.array_size, 3);
+    EXPECT_EQ(BinaryParser::getValue<uint16_t>(items.element(2).sub_fields["b"]), 6);
+
+    EXPECT_THROW(parser.parse(data, 16, *struct_info), std::runtime_error);
+}
+
+TEST(SchemaLayoutTest, DebugModeChecksEachField) {
+    // A schema whose fields run past its declared size
+    auto struct_info = createPairsStruct();
+    struct_info->size = 8;
+    validateLayout(*struct_info);
+    EXPECT_EQ(struct_info->extent, 17);
+
+    uint8_t data[12] = {};
+    BinaryParser parser;
+
+    // Validated: rejected up front by the extent check
+    EXPECT_THROW(parser.parse(data, sizeof(data), *struct_info), std::runtime_error);
+
+    // Debug mode: rejected by the per-field check with the field named
+    parser.setFieldBoundsChecks(true);
+    try {
+        parser.parse(data, sizeof(data), *struct_info);
+        FAIL() << "Expected an out-of-bounds error";
+    } catch (const std::runtime_error& e) {
+        EXPECT_NE(std::string(e.what()).find("pairs"), std::string::npos);
+    }
+}
+
+TEST(SchemaLayoutTest, SharedListsAreMeasuredOnce) {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->size = 8;
+    struct_info->fields = struct_info->arena.allocate(2);
+    FieldList point = struct_info->arena.allocate(2);
+    setField(point[0], "x", FieldType::INT16, 0, 2);
+    setField(point[1], "y", FieldType::INT16, 2, 2);
+    setField(struct_info->fields[0], "min", FieldType::STRUCT, 0, 4);
+    setField(struct_info->fields[1], "max", FieldType::STRUCT, 4, 4);
+    struct_info->fields[0].sub_fields = point;
+    struct_info->fields[1].sub_fields = point;
+
+    validateLayout(*struct_info);
+    EXPECT_EQ(struct_info->extent, 8);
+}
+
+TEST(SchemaLayoutTest, FieldsFollowDeclarationOrder) {
+    // struct { uint32_t zeta; struct { uint16_t b; uint16_t a; } inner; uint8_t alpha; }
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->size = 12;
+    struct_info->fields = struct_info->arena.allocate(3);
+    setField(struct_info->fields[0], "zeta", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[1], "inner", FieldType::STRUCT, 4, 4);
+    struct_info->fields[1].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[1].sub_fields[0], "b", FieldType::UINT16, 0, 2);
+    setField(struct_info->fields[1].sub_fields[1], "a", FieldType::UINT16, 2, 2);
+    setField(struct_info->fields[2], "alpha", FieldType::UINT8, 8, 1);
+    validateLayout(*struct_info);
+
+    ASSERT_NE(struct_info->findPath("inner.a"), nullptr);
+    EXPECT_EQ(*struct_info->findPath("inner.a"), (std::vector<uint32_t>{1, 1}));
+    EXPECT_EQ(*struct_info->findPath("alpha"), (std::vector<uint32_t>{2}));
+    EXPECT_EQ(struct_info->findPath("inner.c"), nullptr);
+
+    uint8_t data[12] = {1, 0, 0, 0, 2, 0, 3, 0, 4};
+    BinaryParser parser;
+    auto parsed = parser.parse(data, sizeof(data), *struct_info);
+
+    std::vector<std::string> names;
+    for (const ParsedField& field : parsed->fields) {
+        names.push_back(field.name);
+    }
+    EXPECT_EQ(names, (std::vector<std::string>{"zeta", "inner", "alpha"}));
+    EXPECT_EQ(parsed->fields[1].sub_fields[0].name, "b");
+
+    const ParsedField* a = parsed->find(*struct_info->findPath("inner.a"));
+    ASSERT_NE(a, nullptr);
+    EXPECT_EQ(BinaryParser::getValue<uint16_t>(*a), 3);
+    EXPECT_EQ(&parsed->fields.at("alpha"), &parsed->fields[2]);
+    EXPECT_THROW(parsed->fields.at("missing"), std::out_of_range);
+
+    JsonConverter converter;
+    EXPECT_EQ(converter.convert(*parsed).toString(), R"({"zeta":1,"inner":{"b":2,"a":3},"alpha":4})");
+}
+
+TEST(SchemaLayoutTest, BitfieldsShareStorageUnits) {
+    // struct { uint32_t flag0 : 1; ... flag19 : 1; int32_t level : 4; uint16_t mode : 3; uint8_t tail; };
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->size = 8;
+    struct_info->fields = struct_info->arena.allocate(23);
+    std::vector<std::string> names;
+    for (int i = 0; i < 20; i++) names.push_back("flag" + std::to_string(i));
+    for (int i = 0; i < 20; i++) {
+        FieldInfo& flag = struct_info->fields[i];
+        setField(flag, names[i], FieldType::UINT32, 0, 4);
+        flag.bits = 1;
+        flag.bit_offset = i;
+    }
+    setField(struct_info->fields[20], "level", FieldType::INT32, 0, 4);
+    struct_info->fields[20].bits = 4;
+    struct_info->fields[20].bit_offset = 20;
+    setField(struct_info->fields[21], "mode", FieldType::UINT16, 4, 2);
+    struct_info->fields[21].bits = 3;
+    setField(struct_info->fields[22], "tail", FieldType::UINT8, 6, 1);
+    validateLayout(*struct_info);
+
+    EXPECT_EQ(struct_info->fields[0].unit_fields, 21);
+    EXPECT_EQ(struct_info->fields[1].unit_fields, 0);
+    EXPECT_EQ(struct_info->fields[21].unit_fields, 1);
+    EXPECT_EQ(struct_info->fields[22].unit_fields, 0);
+    EXPECT_EQ(struct_info->fields[20].bit_mask, 0xFu);
+    EXPECT_EQ(struct_info->fields[20].bit_sign, 0x8u);
+    EXPECT_EQ(struct_info->fields[21].bit_sign, 0u);
+
+    // Big-endian unit: flags 0, 3 and 19 set, level = -3, mode = 6
+    uint32_t unit = (1u << 0) | (1u << 3) | (1u << 19) | (0xDu << 20);
+    uint8_t data[8] = {static_cast<uint8_t>(unit >> 24), static_cast<uint8_t>(unit >> 16),
+                       static_cast<uint8_t>(unit >> 8), static_cast<uint8_t>(unit), 0x00, 0x06, 0x2A, 0};
+    BinaryParser parser(Endianness::BIG);
+    auto parsed = parser.parse(data, sizeof(data), *struct_info);
+    ASSERT_EQ(parsed->fields.size(), 23);
+    for (int i = 0; i < 20; i++) {
+        uint32_t expected = (i == 0 || i == 3 || i == 19) ? 1 : 0;
+        EXPECT_EQ(BinaryParser::getValue<uint32_t>(parsed->fields[i]), expected) << names[i];
+        // Same value as decoding the field on its own
+        EXPECT_EQ(parser.parseBitfield(data, 0, struct_info->fields[i]).get<uint32_t>(), expected);
+    }
+    EXPECT_EQ(BinaryParser::getValue<int32_t>(parsed->fields.at("level")), -3);
+    EXPECT_EQ(BinaryParser::getValue<uint16_t>(parsed->fields.at("mode")), 6);
+    EXPECT_EQ(BinaryParser::getValue<uint8_t>(parsed->fields.at("tail")), 0x2A);
+}
\ No newline at end of file
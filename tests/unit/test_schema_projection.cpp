@@ -0,0 +1,128 @@
+#include <gtest/gtest.h>
+#include "binary_parser/schema_projection.h"
+#include "binary_parser/binary_parser.h"
+#include <numeric>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct {
+//     struct { uint32_t seq; uint16_t len; } header;
+//     struct { uint16_t samples[32]; } payload;
+//     struct { uint8_t flags; uint8_t code; } status;
+//     struct { uint16_t a; uint16_t b; } pairs[3];
+// };
+std::unique_ptr<StructInfo> createWideStruct() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Wide";
+    struct_info->size = 88;
+    struct_info->fields = struct_info->arena.allocate(4);
+    setField(struct_info->fields[0], "header", FieldType::STRUCT, 0, 8);
+    struct_info->fields[0].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[0].sub_fields[0], "seq", FieldType::UINT32, 0, 4);
+    setField(struct_info->fields[0].sub_fields[1], "len", FieldType::UINT16, 4, 2);
+    setField(struct_info->fields[1], "payload", FieldType::STRUCT, 8, 64);
+    struct_info->fields[1].sub_fields = struct_info->arena.allocate(1);
+    setField(struct_info->fields[1].sub_fields[0], "samples", FieldType::UINT16, 0, 64, 32);
+    setField(struct_info->fields[2], "status", FieldType::STRUCT, 72, 2);
+    struct_info->fields[2].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[2].sub_fields[0], "flags", FieldType::UINT8, 0, 1);
+    setField(struct_info->fields[2].sub_fields[1], "code", FieldType::UINT8, 1, 1);
+    setField(struct_info->fields[3], "pairs", FieldType::STRUCT, 76, 12, 3);
+    struct_info->fields[3].sub_fields = struct_info->arena.allocate(2);
+    setField(struct_info->fields[3].sub_fields[0], "a", FieldType::UINT16, 0, 2);
+    setField(struct_info->fields[3].sub_fields[1], "b", FieldType::UINT16, 2, 2);
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> createWideData() {
+    std::vector<uint8_t> data(88);
+    std::iota(data.begin(), data.end(), 0);
+    return data;
+}
+
+} // namespace
+
+TEST(SchemaProjectionTest, SplitsFieldLists) {
+    EXPECT_EQ(splitFieldList("header.seq, payload.samples[0..15],,status.flags"),
+              (std::vector<std::string>{"header.seq", "payload.samples[0..15]", "status.flags"}));
+    EXPECT_TRUE(splitFieldList("").empty());
+}
+
+TEST(SchemaProjectionTest, KeepsOnlySelectedFields) {
+    auto schema = createWideStruct();
+    auto projected = projectSchema(*schema, {"status.flags", "header.seq", "payload.samples[0..15]"});
+
+    EXPECT_EQ(projected->size, schema->size);
+    ASSERT_EQ(projected->fields.size(), 3);
+    // Declaration order, not request order
+    EXPECT_EQ(projected->fields[0].name, "header");
+    EXPECT_EQ(projected->fields[1].name, "payload");
+    EXPECT_EQ(projected->fields[2].name, "status");
+    EXPECT_EQ(projected->fields[0].sub_fields.size(), 1);
+    EXPECT_EQ(projected->fields[2].sub_fields.size(), 1);
+
+    const FieldInfo& samples = projected->fields[1].sub_fields[0];
+    EXPECT_EQ(samples.array_size, 16);
+    EXPECT_EQ(samples.size, 32);
+
+    auto data = createWideData();
+    BinaryParser parser;
+    auto parsed = parser.parse(data.data(), data.size(), *projected);
+    EXPECT_EQ(BinaryParser::getValue<uint32_t>(parsed->fields.at("header").sub_fields.at("seq")), 0x03020100u);
+    EXPECT_FALSE(parsed->fields.at("header").sub_fields.count("len"));
+    EXPECT_EQ(BinaryParser::getValue<uint8_t>(parsed->fields.at("status").sub_fields.at("flags")), 72);
+    auto values = BinaryParser::getArray<uint16_t>(parsed->fields.at("payload").sub_fields.at("samples"));
+    ASSERT_EQ(values.size(), 16);
+    EXPECT_EQ(values[15], 0x2726);
+}
+
+TEST(SchemaProjectionTest, SelectsRangesInsideStructArrays) {
+    auto schema = createWideStruct();
+    auto projected = projectSchema(*schema, {"pairs[1..2].b", "payload.samples[4]"});
+
+    auto data = createWideData();
+    BinaryParser parser;
+    auto parsed = parser.parse(data.data(), data.size(), *projected);
+    const ParsedField& pairs = parsed->fields.at("pairs");
+    ASSERT_EQ(pairs.array_size, 2);
+    EXPECT_EQ(pairs.sub_fields.size(), 1);
+    EXPECT_EQ(BinaryParser::getArray<uint16_t>(pairs.sub_fields.at("b")), (std::vector<uint16_t>{0x5352, 0x5756}));
+    // A single element becomes a plain field
+    EXPECT_EQ(BinaryParser::getValue<uint16_t>(parsed->fields.at("payload").sub_fields.at("samples")), 0x1110);
+}
+
+TEST(SchemaProjectionTest, WholeFieldsKeepAllMembers) {
+    auto schema = createWideStruct();
+    auto projected = projectSchema(*schema, {"pairs", "pairs[0..2].a"});
+    ASSERT_EQ(projected->fields.size(), 1);
+    EXPECT_EQ(projected->fields[0].array_size, 3);
+    EXPECT_EQ(projected->fields[0].sub_fields.size(), 2);
+
+    // The projection owns its fields
+    schema.reset();
+    EXPECT_EQ(projected->fields[0].sub_fields[1].name, "b");
+}
+
+TEST(SchemaProjectionTest, RejectsBadPaths) {
+    auto schema = createWideStruct();
+    EXPECT_THROW(projectSchema(*schema, {}), std::runtime_error);
+    EXPECT_THROW(projectSchema(*schema, {"header.missing"}), std::runtime_error);
+    EXPECT_THROW(projectSchema(*schema, {"header.seq.x"}), std::runtime_error);
+    EXPECT_THROW(projectSchema(*schema, {"header[0]"}), std::runtime_error);
+    EXPECT_THROW(projectSchema(*schema, {"payload.samples[10..40]"}), std::runtime_error);
+    EXPECT_THROW(projectSchema(*schema, {"payload.samples[5..2]"}), std::runtime_error);
+    EXPECT_THROW(projectSchema(*schema, {"pairs[0].a", "pairs[1].b"}), std::runtime_error);
+    EXPECT_THROW(projectSchema(*schema, {"payload.samples[x]"}), std::runtime_error);
+}
\ No newline at end of file
@@ -0,0 +1,170 @@
+#include <gtest/gtest.h>
+#include "binary_parser/schema_registry.h"
+#include "binary_parser/xml_struct_parser.h"
+#include <cstdio>
+#include <filesystem>
+#include <fstream>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+}
+
+// struct { struct { uint8_t type; uint8_t flags; } header; <payload> }
+std::unique_ptr<StructInfo> createMessage(const std::string& name, FieldType payload_type,
+                                          size_t payload_size) {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = name;
+    struct_info->size = 2 + payload_size;
+    struct_info->fields = struct_info->arena.allocate(2);
+
+    FieldInfo& header = struct_info->fields[0];
+    setField(header, "header", FieldType::STRUCT, 0, 2);
+    header.sub_fields = struct_info->arena.allocate(2);
+    setField(header.sub_fields[0], "type", FieldType::UINT8, 0, 1);
+    setField(header.sub_fields[1], "flags", FieldType::UINT8, 1, 1);
+
+    setField(struct_info->fields[1], "value", payload_type, 2, payload_size);
+    return struct_info;
+}
+
+} // namespace
+
+TEST(SchemaRegistryTest, DispatchesRecordsByDiscriminator) {
+    SchemaRegistry registry("header.type");
+    registry.add(1, createMessage("Small", FieldType::UINT16, 2));
+    registry.add(7, createMessage("Large", FieldType::UINT32, 4));
+
+    // Small(0x1234), Large(0xDEADBEEF), Small(0x0042)
+    std::vector<uint8_t> data = {
+        1, 0, 0x34, 0x12,
+        7, 0, 0xEF, 0xBE, 0xAD, 0xDE,
+        1, 0, 0x42, 0x00,
+    };
+
+    std::vector<std::string> names;
+    std::vector<size_t> offsets;
+    std::vector<uint64_t> values;
+    std::vector<DecodedValue> slots;
+    size_t count = registry.decodeStream(data.data(), data.size(),
+        [&](const SchemaEntry& entry, const uint8_t* record, size_t offset) {
+            names.push_back(entry.struct_info->name);
+            offsets.push_back(offset);
+            entry.program.decode(record, data.size() - offset, slots);
+            values.push_back(slots[entry.program.findLeaf("value")->slot].u);
+        });
+
+    EXPECT_EQ(count, 3);
+    EXPECT_EQ(names, (std::vector<std::string>{"Small", "Large", "Small"}));
+    EXPECT_EQ(offsets, (std::vector<size_t>{0, 4, 10}));
+    EXPECT_EQ(values, (std::vector<uint64_t>{0x1234, 0xDEADBEEF, 0x42}));
+}
+
+TEST(SchemaRegistryTest, LargeValuesUseSparseLookup) {
+    SchemaRegistry registry("header.type");
+    auto struct_info = createMessage("Wide", FieldType::UINT32, 4);
+    setField(struct_info->fields[0].sub_fields[0], "type", FieldType::UINT16, 0, 2);
+    struct_info->fields[0].sub_fields = FieldList(struct_info->fields[0].sub_fields.begin(), 1);
+    registry.add(0xBEEF, std::move(struct_info));
+
+    ASSERT_NE(registry.find(0xBEEF), nullptr);
+    EXPECT_EQ(registry.find(0xBEEF)->struct_info->name, "Wide");
+    EXPECT_EQ(registry.find(0xBEEE), nullptr);
+
+    std::vector<uint8_t> record = {0xEF, 0xBE, 0, 0, 0, 0};
+    EXPECT_EQ(registry.readDiscriminator(record.data()), 0xBEEF);
+}
+
+TEST(SchemaRegistryTest, RejectsUnknownDiscriminator) {
+    SchemaRegistry registry("header.type");
+    registry.add(1, createMessage("Small", FieldType::UINT16, 2));
+
+    std::vector<uint8_t> data = {1, 0, 0, 0, 2, 0, 0, 0};
+    size_t seen = 0;
+    EXPECT_THROW(registry.decodeStream(data.data(), data.size(),
+                                       [&](const SchemaEntry&, const uint8_t*, size_t) { seen++; }),
+                 std::runtime_error);
+    EXPECT_EQ(seen, 1);
+}
+
+TEST(SchemaRegistryTest, StopsAfterMaxRecords) {
+    SchemaRegistry registry("header.type");
+    registry.add(1, createMessage("Small", FieldType::UINT16, 2));
+
+    // The second record is never read, so its unknown discriminator is not an error
+    std::vector<uint8_t> data = {1, 0, 0, 0, 2, 0, 0, 0};
+    size_t seen = 0;
+    size_t count = registry.decodeStream(data.data(), data.size(),
+                                         [&](const SchemaEntry&, const uint8_t*, size_t) { seen++; }, 1);
+    EXPECT_EQ(count, 1);
+    EXPECT_EQ(seen, 1);
+}
+
+TEST(SchemaRegistryTest, RejectsTruncatedRecord) {
+    SchemaRegistry registry("header.type");
+    registry.add(7, createMessage("Large", FieldType::UINT32, 4));
+
+    std::vector<uint8_t> data = {7, 0, 1, 2, 3};
+    EXPECT_THROW(registry.decodeStream(data.data(), data.size(),
+                                       [](const SchemaEntry&, const uint8_t*, size_t) {}),
+                 std::runtime_error);
+}
+
+TEST(SchemaRegistryTest, RejectsInconsistentSchemas) {
+    SchemaRegistry registry("header.type");
+    registry.add(1, createMessage("Small", FieldType::UINT16, 2));
+
+    // Same value twice
+    EXPECT_THROW(registry.add(1, createMessage("Other", FieldType::UINT16, 2)), std::runtime_error);
+
+    // Discriminator at a different offset
+    auto moved = createMessage("Moved", FieldType::UINT16, 2);
+    moved->fields[0].sub_fields[0].offset = 1;
+    EXPECT_THROW(registry.add(2, std::move(moved)), std::runtime_error);
+
+    // Discriminator missing
+    SchemaRegistry missing("header.kind");
+    EXPECT_THROW(missing.add(1, createMessage("Small", FieldType::UINT16, 2)), std::runtime_error);
+
+    // Value wider than the field
+    EXPECT_THROW(registry.add(256, createMessage("Wide", FieldType::UINT16, 2)), std::runtime_error);
+    EXPECT_EQ(registry.size(), 1);
+}
+
+TEST(SchemaRegistryTest, LoadsDirectoryFromXml) {
+    namespace fs = std::filesystem;
+    const fs::path dir = "schema_registry_test_dir";
+    fs::create_directories(dir);
+
+    auto writeSchema = [&](const std::string& file, const std::string& name, int value) {
+        std::ofstream out(dir / file);
+        out << "<struct name=\"" << name << "\" size=\"4\" discriminator_value=\"" << value << "\">\n"
+            << "  <field name=\"header\" offset=\"0\" size=\"2\">\n"
+            << "    <struct>\n"
+            << "      <field name=\"type\" type=\"uint8_t\" offset=\"0\" size=\"1\"/>\n"
+            << "      <field name=\"flags\" type=\"uint8_t\" offset=\"1\" size=\"1\"/>\n"
+            << "    </struct>\n"
+            << "  </field>\n"
+            << "  <field name=\"value\" type=\"uint16_t\" offset=\"2\" size=\"2\"/>\n"
+            << "</struct>\n";
+    };
+    writeSchema("ping.xml", "Ping", 1);
+    writeSchema("pong.xml", "Pong", 2);
+    std::ofstream(dir / "notes.txt") << "not a schema";
+
+    XmlStructParser parser;
+    SchemaRegistry registry("header.type");
+    EXPECT_EQ(registry.loadDirectory(dir.string(), parser), 2);
+    ASSERT_NE(registry.find(2), nullptr);
+    EXPECT_EQ(registry.find(2)->struct_info->name, "Pong");
+    EXPECT_EQ(registry.find(2)->struct_info->discriminator_value, 2u);
+
+    fs::remove_all(dir);
+}
\ No newline at end of file
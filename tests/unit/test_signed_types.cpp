@@ -1,6 +1,7 @@
 #include <gtest/gtest.h>
 #include "binary_parser/binary_parser.h"
 #include "binary_parser/xml_struct_parser.h"
+#include <cstring>
 
 using namespace binary_parser;
 
@@ -15,12 +16,12 @@ TEST(SignedTypesTest, ParseSignedInt8) {
     struct_info->name = "TestStruct";
     struct_info->size = 1;
     
-    auto field = std::make_unique<FieldInfo>();
-    field->name = "value";
-    field->type = FieldType::INT8;
-    field->offset = 0;
-    field->size = 1;
-    struct_info->fields.push_back(std::move(field));
+    struct_info->fields = struct_info->arena.allocate(1);
+    FieldInfo& field = struct_info->fields[0];
+    field.name = "value";
+    field.type = FieldType::INT8;
+    field.offset = 0;
+    field.size = 1;
     
     // Parse
     BinaryParser parser;
@@ -29,7 +30,7 @@ TEST(SignedTypesTest, ParseSignedInt8) {
     ASSERT_NE(result, nullptr);
     ASSERT_EQ(result->fields.count("value"), 1);
     
-    auto value = std::any_cast<int8_t>(result->fields["value"].value);
+    auto value = BinaryParser::getValue<int8_t>(result->fields["value"]);
     EXPECT_EQ(value, -1);
 }
 
@@ -44,12 +45,12 @@ TEST(SignedTypesTest, ParseSignedInt32) {
     struct_info->name = "TestStruct";
     struct_info->size = 4;
     
-    auto field = std::make_unique<FieldInfo>();
-    field->name = "value";
-    field->type = FieldType::INT32;
-    field->offset = 0;
-    field->size = 4;
-    struct_info->fields.push_back(std::move(field));
+    struct_info->fields = struct_info->arena.allocate(1);
+    FieldInfo& field = struct_info->fields[0];
+    field.name = "value";
+    field.type = FieldType::INT32;
+    field.offset = 0;
+    field.size = 4;
     
     // Parse
     BinaryParser parser;
@@ -58,6 +59,45 @@ TEST(SignedTypesTest, ParseSignedInt32) {
     ASSERT_NE(result, nullptr);
     ASSERT_EQ(result->fields.count("value"), 1);
     
-    auto value = std::any_cast<int32_t>(result->fields["value"].value);
+    auto value = BinaryParser::getValue<int32_t>(result->fields["value"]);
     EXPECT_EQ(value, -123456);
 }
+
+
+TEST(SignedTypesTest, ParseSignedArrays) {
+    // int8_t a[3]; int16_t b[2]; int32_t c[2]; int64_t d[2];
+    uint8_t data[31] = {};
+    const int8_t a[3] = {-1, 2, -128};
+    const int16_t b[2] = {-300, 300};
+    const int32_t c[2] = {-123456, 7};
+    const int64_t d[2] = {-5000000000LL, 1};
+    std::memcpy(data, a, sizeof(a));
+    std::memcpy(data + 3, b, sizeof(b));
+    std::memcpy(data + 7, c, sizeof(c));
+    std::memcpy(data + 15, d, sizeof(d));
+    
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "TestStruct";
+    struct_info->size = sizeof(data);
+    struct_info->fields = struct_info->arena.allocate(4);
+    const struct { const char* name; FieldType type; size_t offset; size_t size; } layout[] = {
+        {"a", FieldType::INT8, 0, 3}, {"b", FieldType::INT16, 3, 4},
+        {"c", FieldType::INT32, 7, 8}, {"d", FieldType::INT64, 15, 16},
+    };
+    for (size_t i = 0; i < 4; i++) {
+        FieldInfo& field = struct_info->fields[i];
+        field.name = layout[i].name;
+        field.type = layout[i].type;
+        field.offset = layout[i].offset;
+        field.size = layout[i].size;
+        field.array_size = layout[i].type == FieldType::INT8 ? 3 : 2;
+    }
+    
+    BinaryParser parser;
+    auto result = parser.parse(data, sizeof(data), *struct_info);
+    
+    EXPECT_EQ(BinaryParser::getArray<int8_t>(result->fields["a"]), (std::vector<int8_t>{-1, 2, -128}));
+    EXPECT_EQ(BinaryParser::getArray<int16_t>(result->fields["b"]), (std::vector<int16_t>{-300, 300}));
+    EXPECT_EQ(BinaryParser::getArray<int32_t>(result->fields["c"]), (std::vector<int32_t>{-123456, 7}));
+    EXPECT_EQ(BinaryParser::getArray<int64_t>(result->fields["d"]), (std::vector<int64_t>{-5000000000LL, 1}));
+}
\ No newline at end of file
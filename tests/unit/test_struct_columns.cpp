@@ -0,0 +1,154 @@
+#include <gtest/gtest.h>
+#include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/binary_parser.h"
+#include "binary_parser/json_converter.h"
+#include <cstring>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Particle {
+//     float x;
+//     uint16_t id;
+//     uint8_t kind : 3;
+//     uint8_t tag[3];
+// };                      // 12 bytes with padding
+// struct { Particle particles[4]; };
+std::unique_ptr<StructInfo> createParticles() {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Cloud";
+    struct_info->size = 48;
+    struct_info->fields = struct_info->arena.allocate(1);
+    FieldInfo& particles = struct_info->fields[0];
+    setField(particles, "particles", FieldType::STRUCT, 0, 48, 4);
+    particles.sub_fields = struct_info->arena.allocate(4);
+    setField(particles.sub_fields[0], "x", FieldType::FLOAT, 0, 4);
+    setField(particles.sub_fields[1], "id", FieldType::UINT16, 4, 2);
+    setField(particles.sub_fields[2], "kind", FieldType::UINT8, 6, 1);
+    particles.sub_fields[2].bits = 3;
+    setField(particles.sub_fields[3], "tag", FieldType::CHAR, 7, 3, 3);
+    return struct_info;
+}
+
+// Big-endian records of createParticles()
+std::vector<uint8_t> particleData() {
+    std::vector<uint8_t> data(48, 0);
+    for (uint8_t i = 0; i < 4; i++) {
+        uint8_t* p = data.data() + i * 12;
+        float x = 1.5f * i;
+        uint32_t bits;
+        std::memcpy(&bits, &x, 4);
+        p[0] = bits >> 24; p[1] = bits >> 16; p[2] = bits >> 8; p[3] = bits;
+        p[4] = 0x01; p[5] = i;  // id = 0x0100 + i
+        p[6] = 0xF8 | i;        // Only the low 3 bits belong to kind
+        p[7] = 'a' + i; p[8] = 'b'; p[9] = 0;
+    }
+    return data;
+}
+
+} // namespace
+
+TEST(StructColumnsTest, OneColumnPerMember) {
+    auto struct_info = createParticles();
+    validateLayout(*struct_info);
+    auto data = particleData();
+
+    BinaryParser parser(Endianness::BIG);
+    auto parsed = parser.parse(data.data(), data.size(), *struct_info);
+    const ParsedField& particles = parsed->fields.at("particles");
+    EXPECT_EQ(particles.array_size, 4);
+    ASSERT_EQ(particles.sub_fields.size(), 4);
+
+    EXPECT_EQ(BinaryParser::getArray<float>(particles.sub_fields.at("x")),
+              (std::vector<float>{0.0f, 1.5f, 3.0f, 4.5f}));
+    EXPECT_EQ(BinaryParser::getArray<uint16_t>(particles.sub_fields.at("id")),
+              (std::vector<uint16_t>{0x100, 0x101, 0x102, 0x103}));
+    EXPECT_EQ(BinaryParser::getArray<uint8_t>(particles.sub_fields.at("kind")),
+              (std::vector<uint8_t>{0, 1, 2, 3}));
+    // Member arrays are stored element after element
+    ArrayView<uint8_t> tags = particles.sub_fields.at("tag").value.elements<uint8_t>();
+    ASSERT_EQ(tags.size(), 12);
+    EXPECT_EQ(tags[9], 'd');
+    EXPECT_EQ(tags[10], 'b');
+
+    ParsedField third = particles.element(2);
+    EXPECT_EQ(third.name, "2");
+    EXPECT_EQ(BinaryParser::getValue<uint16_t>(third.sub_fields.at("id")), 0x102);
+    EXPECT_EQ(BinaryParser::getArray<uint8_t>(third.sub_fields.at("tag")), (std::vector<uint8_t>{'c', 'b', 0}));
+    EXPECT_THROW(particles.element(4), std::out_of_range);
+
+    JsonConverter converter;
+    EXPECT_EQ(converter.convert(*parsed)["particles"][3].toString(), R"({"x":4.5,"id":259,"kind":3,"tag":"db"})");
+
+    // The per-field checked path decodes the same columns
+    parser.setFieldBoundsChecks(true);
+    auto checked = parser.parse(data.data(), data.size(), *struct_info);
+    EXPECT_EQ(converter.convert(*checked).toString(), converter.convert(*parsed).toString());
+}
+
+TEST(StructColumnsTest, NestedStructArrays) {
+    // struct { uint8_t n; struct { uint16_t v; } items[2]; struct { uint8_t q; } inner; } groups[3];
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->size = 24;
+    struct_info->fields = struct_info->arena.allocate(1);
+    FieldInfo& groups = struct_info->fields[0];
+    setField(groups, "groups", FieldType::STRUCT, 0, 24, 3);
+    groups.sub_fields = struct_info->arena.allocate(3);
+    setField(groups.sub_fields[0], "n", FieldType::UINT8, 0, 1);
+    setField(groups.sub_fields[1], "items", FieldType::STRUCT, 2, 4, 2);
+    groups.sub_fields[1].sub_fields = struct_info->arena.allocate(1);
+    setField(groups.sub_fields[1].sub_fields[0], "v", FieldType::UINT16, 0, 2);
+    setField(groups.sub_fields[2], "inner", FieldType::STRUCT, 6, 1);
+    groups.sub_fields[2].sub_fields = struct_info->arena.allocate(1);
+    setField(groups.sub_fields[2].sub_fields[0], "q", FieldType::UINT8, 0, 1);
+    validateLayout(*struct_info);
+
+    std::vector<uint8_t> data(24, 0);
+    for (uint8_t g = 0; g < 3; g++) {
+        uint8_t* p = data.data() + g * 8;
+        p[0] = g;
+        p[2] = 10 * g + 1;
+        p[4] = 10 * g + 2;
+        p[6] = 100 + g;
+    }
+
+    BinaryParser parser;
+    auto parsed = parser.parse(data.data(), data.size(), *struct_info);
+    const ParsedField& columns = parsed->fields.at("groups");
+    const ParsedField& items = columns.sub_fields.at("items");
+    EXPECT_EQ(items.array_size, 2);
+    EXPECT_EQ(BinaryParser::getArray<uint16_t>(items.sub_fields.at("v")),
+              (std::vector<uint16_t>{1, 2, 11, 12, 21, 22}));
+    EXPECT_EQ(BinaryParser::getArray<uint8_t>(columns.sub_fields.at("inner").sub_fields.at("q")),
+              (std::vector<uint8_t>{100, 101, 102}));
+
+    ParsedField last = columns.element(2);
+    EXPECT_EQ(last.sub_fields.at("items").array_size, 2);
+    EXPECT_EQ(BinaryParser::getArray<uint16_t>(last.sub_fields.at("items").sub_fields.at("v")),
+              (std::vector<uint16_t>{21, 22}));
+
+    JsonConverter converter;
+    EXPECT_EQ(converter.convert(*parsed)["groups"][1].toString(),
+              R"({"n":1,"items":[{"v":11},{"v":12}],"inner":{"q":101}})");
+}
+
+TEST(StructColumnsTest, CheckedModeChecksEveryElement) {
+    auto struct_info = createParticles();
+    auto data = particleData();
+
+    // Without a validated layout every element's members are checked
+    BinaryParser parser;
+    EXPECT_THROW(parser.parseField(data.data(), 40, 0, struct_info->fields[0]), std::runtime_error);
+    ParsedField field = parser.parseField(data.data(), data.size(), 0, struct_info->fields[0]);
+    EXPECT_EQ(field.array_size, 4);
+}
\ No newline at end of file
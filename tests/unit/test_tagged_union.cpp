@@ -0,0 +1,161 @@
+#include <gtest/gtest.h>
+#include "binary_parser/binary_parser.h"
+#include "binary_parser/xml_struct_parser.h"
+#include "binary_parser/schema_projection.h"
+#include "binary_parser/leaf_columns.h"
+#include <cstring>
+
+using namespace binary_parser;
+
+namespace {
+
+void setField(FieldInfo& field, std::string_view name, FieldType type,
+              size_t offset, size_t size, size_t array_size = 1) {
+    field.name = name;
+    field.type = type;
+    field.offset = offset;
+    field.size = size;
+    field.array_size = array_size;
+}
+
+// struct Packet {
+//     struct { uint8_t kind : 4; uint8_t flags : 4; } header;
+//     uint8_t pad;
+//     uint16_t type;
+//     union {
+//         struct { uint16_t seq; } ping;
+//         uint32_t data;
+//         char text[4];
+//     } body;
+// };
+std::unique_ptr<StructInfo> createPacket(const char* discriminator, const char* cases) {
+    auto struct_info = std::make_unique<StructInfo>();
+    struct_info->name = "Packet";
+    struct_info->size = 8;
+    struct_info->fields = struct_info->arena.allocate(4);
+
+    FieldInfo& header = struct_info->fields[0];
+    setField(header, "header", FieldType::STRUCT, 0, 1);
+    header.sub_fields = struct_info->arena.allocate(2);
+    setField(header.sub_fields[0], "kind", FieldType::UINT8, 0, 1);
+    header.sub_fields[0].bits = 4;
+    setField(header.sub_fields[1], "flags", FieldType::UINT8, 0, 1);
+    header.sub_fields[1].bits = 4;
+    header.sub_fields[1].bit_offset = 4;
+
+    setField(struct_info->fields[1], "pad", FieldType::UINT8, 1, 1);
+    setField(struct_info->fields[2], "type", FieldType::UINT16, 2, 2);
+
+    FieldInfo& body = struct_info->fields[3];
+    setField(body, "body", FieldType::UNION, 4, 4);
+    body.is_union = true;
+    body.sub_fields = struct_info->arena.allocate(3);
+    setField(body.sub_fields[0], "ping", FieldType::STRUCT, 0, 2);
+    body.sub_fields[0].sub_fields = struct_info->arena.allocate(1);
+    setField(body.sub_fields[0].sub_fields[0], "seq", FieldType::UINT16, 0, 2);
+    setField(body.sub_fields[1], "data", FieldType::UINT32, 0, 4);
+    setField(body.sub_fields[2], "text", FieldType::CHAR, 0, 4, 4);
+
+    body.selector = struct_info->arena.allocateSelector();
+    body.selector->discriminator = discriminator;
+    body.selector->cases = cases;
+    validateLayout(*struct_info);
+    return struct_info;
+}
+
+std::vector<uint8_t> packet(uint8_t header, uint16_t type, uint32_t payload) {
+    std::vector<uint8_t> data(8, 0);
+    data[0] = header;
+    std::memcpy(data.data() + 2, &type, 2);
+    std::memcpy(data.data() + 4, &payload, 4);
+    return data;
+}
+
+} // namespace
+
+TEST(TaggedUnionTest, DecodesOnlySelectedMember) {
+    auto struct_info = createPacket("type", "1=ping, 2=data, 0x10=text");
+    BinaryParser parser;
+
+    auto data = packet(0, 1, 0x00000102);
+    auto parsed = parser.parse(data.data(), data.size(), *struct_info);
+    const ParsedField& body = parsed->fields.at("body");
+    ASSERT_EQ(body.sub_fields.size(), 1);
+    EXPECT_EQ(body.sub_fields[0].name, "ping");
+    EXPECT_EQ(body.sub_fields[0].sub_fields.at("seq").value.get<uint16_t>(), 0x0102);
+
+    data = packet(0, 2, 0xDEADBEEF);
+    parsed = parser.parse(data.data(), data.size(), *struct_info);
+    ASSERT_EQ(parsed->fields.at("body").sub_fields.size(), 1);
+    EXPECT_EQ(parsed->fields.at("body").sub_fields.at("data").value.get<uint32_t>(), 0xDEADBEEF);
+
+    data = packet(0, 0x10, 0x00636261);
+    parsed = parser.parse(data.data(), data.size(), *struct_info);
+    ASSERT_EQ(parsed->fields.at("body").sub_fields.size(), 1);
+    EXPECT_EQ(parsed->fields.at("body").sub_fields[0].name, "text");
+
+    // No case and no default: nothing is decoded
+    data = packet(0, 99, 0);
+    parsed = parser.parse(data.data(), data.size(), *struct_info);
+    EXPECT_TRUE(parsed->fields.at("body").sub_fields.empty());
+    EXPECT_FALSE(parsed->fields.at("body").value.hasValue());
+
+    // Members have no fixed position to look up
+    EXPECT_NE(struct_info->findPath("body"), nullptr);
+    EXPECT_EQ(struct_info->findPath("body.data"), nullptr);
+}
+
+TEST(TaggedUnionTest, DiscriminatorFollowsEndianness) {
+    auto struct_info = createPacket("type", "0x0200=data");
+    BinaryParser parser(Endianness::BIG);
+
+    // 0x0002 stored little-endian reads as 0x0200 big-endian
+    auto data = packet(0, 2, 0x01000000);
+    auto parsed = parser.parse(data.data(), data.size(), *struct_info);
+    ASSERT_EQ(parsed->fields.at("body").sub_fields.size(), 1);
+    EXPECT_EQ(parsed->fields.at("body").sub_fields.at("data").value.get<uint32_t>(), 1u);
+}
+
+TEST(TaggedUnionTest, BitfieldDiscriminatorWithDefault) {
+    auto struct_info = createPacket("header.kind", "3=data, default=ping");
+    BinaryParser parser;
+    parser.setFieldBoundsChecks(true);
+
+    // kind is the low nibble of the header byte
+    auto data = packet(0xF3, 0, 7);
+    auto parsed = parser.parse(data.data(), data.size(), *struct_info);
+    EXPECT_EQ(parsed->fields.at("body").sub_fields.at("data").value.get<uint32_t>(), 7u);
+
+    data = packet(0x34, 0, 7);
+    parsed = parser.parse(data.data(), data.size(), *struct_info);
+    ASSERT_EQ(parsed->fields.at("body").sub_fields.size(), 1);
+    EXPECT_EQ(parsed->fields.at("body").sub_fields[0].name, "ping");
+}
+
+TEST(TaggedUnionTest, RejectsInvalidSelectors) {
+    EXPECT_THROW(createPacket("missing", "1=data"), std::runtime_error);
+    EXPECT_THROW(createPacket("type", "1=nothing"), std::runtime_error);
+    EXPECT_THROW(createPacket("type", "1=data, 1=ping"), std::runtime_error);
+    EXPECT_THROW(createPacket("type", "one=data"), std::runtime_error);
+    EXPECT_THROW(createPacket("type", "data"), std::runtime_error);
+    EXPECT_THROW(createPacket("header", "1=data"), std::runtime_error);
+}
+
+TEST(TaggedUnionTest, ProjectionKeepsSelection) {
+    auto struct_info = createPacket("type", "1=ping, 2=data");
+
+    // The discriminator is still read although it is not selected
+    auto projected = projectSchema(*struct_info, {"body"});
+    ASSERT_EQ(projected->fields.size(), 1);
+    ASSERT_NE(projected->fields[0].selector, nullptr);
+    EXPECT_NE(projected->fields[0].selector, struct_info->fields[3].selector);
+
+    BinaryParser parser;
+    auto data = packet(0, 2, 42);
+    auto parsed = parser.parse(data.data(), data.size(), *projected);
+    ASSERT_EQ(parsed->fields.size(), 1);
+    EXPECT_EQ(parsed->fields.at("body").sub_fields.at("data").value.get<uint32_t>(), 42u);
+
+    // Columnar exports need every field in every record
+    EXPECT_THROW(leafColumns(*struct_info), std::runtime_error);
+}
\ No newline at end of file